@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Benchmark: streaming audio chunking with bytearray reslicing vs a ring buffer
+
+Simulates ``--sessions`` concurrent 16 kHz, 16-bit streams, each receiving
+20 ms frames, chunked into 250 ms chunks with 25 ms overlap. Every chunk is
+viewed as int16 samples and reduced to its RMS level (into a preallocated
+scratch array), standing in for the downstream consumer. Reports, for the original loop (extend, copy the chunk
+out with ``bytes()``, reslice to keep the overlap) and ``AudioRingBuffer``:
+
+- time per chunk and per 20 ms frame, across all sessions;
+- transient memory high-water while streaming (tracemalloc peak above the
+  steady state), i.e. the short-lived copies the loop allocates;
+- memory held per session.
+
+Usage:
+    python benchmarks/bench_audio_buffer.py [--sessions 200] [--seconds 10]
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from trafficwise.audio_buffer import AudioRingBuffer, as_int16
+
+SAMPLE_RATE = 16000
+FRAME_BYTES = SAMPLE_RATE * 2 // 50      # 20 ms
+CHUNK_BYTES = SAMPLE_RATE * 2 // 4       # 250 ms
+OVERLAP_BYTES = CHUNK_BYTES // 10        # 25 ms
+
+
+# Preallocated scratch so the consumer itself does not allocate per chunk
+_SCRATCH = np.empty(CHUNK_BYTES // 2, dtype=np.float32)
+
+
+def rms(samples):
+    scratch = _SCRATCH[:len(samples)]
+    np.copyto(scratch, samples)
+    return float(np.sqrt(np.dot(scratch, scratch) / len(samples)))
+
+
+class ResliceSession:
+    """The original session loop"""
+
+    def __init__(self):
+        self.buffer = bytearray()
+
+    def add(self, frame):
+        self.buffer.extend(frame)
+        levels = 0
+        while len(self.buffer) >= CHUNK_BYTES:
+            chunk = bytes(self.buffer[:CHUNK_BYTES])
+            levels += rms(np.frombuffer(chunk, dtype=np.int16)) > 0
+            self.buffer = self.buffer[CHUNK_BYTES - OVERLAP_BYTES:]
+        return levels
+
+
+class RingSession:
+    def __init__(self):
+        self.buffer = AudioRingBuffer(CHUNK_BYTES, OVERLAP_BYTES, capacity=2 * CHUNK_BYTES)
+
+    def add(self, frame):
+        # A 20 ms frame always fits once chunks are drained, so write() suffices
+        buffer = self.buffer
+        buffer.write(frame)
+        levels = 0
+        chunk = buffer.next_chunk()
+        while chunk is not None:
+            levels += rms(as_int16(chunk)) > 0
+            chunk = buffer.next_chunk()
+        return levels
+
+
+def run(session_cls, sessions, frames, traced=False):
+    rng = np.random.default_rng(5)
+    frame_pool = [rng.integers(-3000, 3000, FRAME_BYTES // 2, dtype=np.int16).tobytes() for _ in range(16)]
+    pool = [session_cls() for _ in range(sessions)]
+    # Warm up to steady state (buffers sized, first chunks emitted)
+    for step in range(frames // 4):
+        for session in pool:
+            session.add(frame_pool[step % 16])
+    if traced:
+        tracemalloc.start()
+        baseline = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+    chunks = 0
+    start = time.perf_counter()
+    for step in range(frames):
+        frame = frame_pool[step % 16]
+        for session in pool:
+            chunks += session.add(frame)
+    elapsed = time.perf_counter() - start
+    transient = 0
+    if traced:
+        transient = tracemalloc.get_traced_memory()[1] - baseline
+        tracemalloc.stop()
+    held = sum(len(s.buffer._storage if isinstance(s, RingSession) else s.buffer) for s in pool) / sessions
+    return elapsed, chunks, transient, held
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--seconds", type=float, default=10.0, help="Audio streamed per session")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs; the fastest is reported")
+    args = parser.parse_args()
+
+    frames = int(args.seconds * 50)
+    print(f"🎵 {args.sessions} sessions x {args.seconds:g}s of 16 kHz audio in 20 ms frames, "
+          f"{CHUNK_BYTES}-byte chunks with {OVERLAP_BYTES}-byte overlap")
+    for name, session_cls in (("bytearray reslice", ResliceSession), ("ring buffer", RingSession)):
+        elapsed, chunks, _, held = min(run(session_cls, args.sessions, frames) for _ in range(args.repeat))
+        _, _, transient, _ = run(session_cls, args.sessions, frames // 5, traced=True)
+        per_frame_us = elapsed / (frames * args.sessions) * 1e6
+        print(f"  {name:18s} {elapsed / chunks * 1e6:6.2f} us/chunk  {per_frame_us:5.2f} us/frame  "
+              f"transient peak={transient / 1024:7.1f} KB  held/session={held / 1024:5.1f} KB  "
+              f"realtime factor={args.seconds * args.sessions / elapsed:7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
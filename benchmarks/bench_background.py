@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Benchmark: background LLM executor under mixed slow/fast load
+
+Two local stub servers play a slow provider and a fast one. Reports:
+
+- how long the submitting callback (the session's script thread) is
+  blocked per question, inline versus ``BackgroundExecutor.submit``;
+- latency of fast-provider requests from many sessions while as many
+  sessions as there are workers wait on the slow provider, with and
+  without per-lane limits.
+
+Usage:
+    python benchmarks/bench_background.py [--workers 8] [--slow-sessions 4] [--fast-sessions 16]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from trafficwise.background import BackgroundExecutor
+from trafficwise.llm_client import LLMClient
+from trafficwise.providers import chat_with_gemini
+from trafficwise.stub_server import StubLLMServer
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))]
+
+
+def ask(server, client):
+    return lambda: chat_with_gemini("Lahore to Islamabad", 0.7, "key", "gemini-1.5-flash",
+                                    client=client, base_url=server.base_url)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--slow-sessions", type=int, default=8)
+    parser.add_argument("--fast-sessions", type=int, default=16)
+    parser.add_argument("--questions", type=int, default=5, help="Questions per fast session")
+    parser.add_argument("--slow-delay", type=float, default=2.0)
+    parser.add_argument("--fast-delay", type=float, default=0.05)
+    args = parser.parse_args()
+
+    client = LLMClient(pool_maxsize=args.workers * 2)
+    with StubLLMServer(delay=args.slow_delay) as slow, StubLLMServer(delay=args.fast_delay) as fast:
+        executor = BackgroundExecutor(max_workers=args.workers, max_pending=args.workers * 8)
+        print(f"⚙️ Background executor - {args.workers} workers, slow={args.slow_delay}s, fast={args.fast_delay}s")
+
+        start = time.perf_counter()
+        ask(fast, client)()
+        inline_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        handle = executor.submit("probe", ask(fast, client))
+        submit_ms = (time.perf_counter() - start) * 1000
+        handle.result()
+        print(f"  callback blocked per question: inline={inline_ms:8.2f} ms  background submit={submit_ms:6.3f} ms")
+        executor.shutdown()
+
+        for label, max_per_lane in (("no lane limit", args.workers), ("per-lane limit", args.workers // 2)):
+            executor = BackgroundExecutor(max_workers=args.workers, max_pending=args.workers * 8,
+                                          max_per_lane=max_per_lane)
+            slow_handles = [
+                executor.submit(f"slow-{i}", ask(slow, client), lane="slow") for i in range(args.slow_sessions)
+            ]
+            latencies = []
+            lock = threading.Lock()
+
+            def fast_session(index):
+                for _ in range(args.questions):
+                    handle = executor.submit(f"fast-{index}", ask(fast, client), lane="fast")
+                    handle.result()
+                    with lock:
+                        latencies.append(handle.elapsed * 1000)
+
+            threads = [threading.Thread(target=fast_session, args=(i,)) for i in range(args.fast_sessions)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            for handle in slow_handles:
+                handle.result()
+
+            print(f"  {label:<15} fast requests with {args.slow_sessions} slow calls queued: n={len(latencies)} "
+                  f"p50={statistics.median(latencies):7.1f} ms  p95={percentile(latencies, 95):7.1f} ms")
+            executor.shutdown()
+    client.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Benchmark: chat history memory and rerun cost over a long planning session
+
+Plays a session of ``--turns`` question/answer turns and, at checkpoints,
+compares the old unbounded list against ``ChatHistory``:
+
+- session state size (pickled, as Streamlit would hold it);
+- markdown rendered per rerun (every message for the list, one page plus
+  the digest for ``ChatHistory``) and the time to produce it, including
+  building the multi-turn context for ``ChatHistory``;
+- tokens of conversation context sent with the next question.
+
+Usage:
+    python benchmarks/bench_chat_history.py [--turns 500] [--answer-chars 1500]
+"""
+
+import argparse
+import os
+import pickle
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from trafficwise.chat_history import ChatHistory, estimate_tokens
+
+CITIES = ["Lahore", "Karachi", "Islamabad", "Rawalpindi", "Faisalabad", "Peshawar", "Multan"]
+ADVICE = [
+    "Take the M-2 motorway outside peak hours.",
+    "Use the Orange Line to avoid Mall Road congestion.",
+    "Expect delays near the old city during Friday prayers.",
+    "Fog closes sections of the motorway between December and February.",
+    "The Metro Bus runs every five minutes during rush hour.",
+]
+
+
+def make_turn(rng, turn, answer_chars):
+    question = f"Turn {turn}: best way from {rng.choice(CITIES)} to {rng.choice(CITIES)} at {rng.randint(6, 22)}:00?"
+    answer = []
+    while sum(len(sentence) + 1 for sentence in answer) < answer_chars:
+        answer.append(rng.choice(ADVICE))
+    return question, "**Route advice:** " + " ".join(answer)
+
+
+def render(messages):
+    """The markdown strings a rerun produces for the given messages"""
+    rendered = []
+    for message in messages:
+        prefix = "**👤 You:**" if message["role"] == "user" else "**🚦 TrafficWise:**"
+        rendered.append(f"{prefix} {message['content']}")
+    return rendered
+
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--turns", type=int, default=500)
+    parser.add_argument("--answer-chars", type=int, default=1500)
+    parser.add_argument("--repeat", type=int, default=20, help="Reruns timed per checkpoint")
+    parser.add_argument("--seed", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    plain = []
+    history = ChatHistory()
+    checkpoints = {args.turns * step // 5 for step in range(1, 6)} | {10}
+
+    print(f"💬 Chat history over {args.turns} turns (~{args.answer_chars} chars per answer), "
+          f"window={history.window} messages, page={history.page_size}")
+    print(f"  {'turns':>5s}  {'list state':>10s}  {'history state':>13s}  {'list rerun':>18s}  "
+          f"{'history rerun':>18s}  {'context':>9s}")
+    for turn in range(1, args.turns + 1):
+        question, answer = make_turn(rng, turn, args.answer_chars)
+        for message in ({"role": "user", "content": question}, {"role": "assistant", "content": answer}):
+            plain.append(message)
+            history.append(message)
+
+        if turn in checkpoints:
+            list_bytes = len(pickle.dumps(plain))
+            history_bytes = len(pickle.dumps(history))
+            list_ms = timed(lambda: render(plain), args.repeat)
+            history_ms = timed(lambda: (render(history.page(0)), history.digest, history.context()), args.repeat)
+            list_kb = sum(len(text) for text in render(plain)) / 1024
+            history_kb = (sum(len(text) for text in render(history.page(0))) + len(history.digest)) / 1024
+            context_tokens = sum(estimate_tokens(message["content"]) for message in history.context())
+            print(f"  {turn:5d}  {list_bytes / 1024:7.0f} KB  {history_bytes / 1024:10.0f} KB  "
+                  f"{list_kb:5.0f} KB {list_ms:6.3f} ms  {history_kb:5.0f} KB {history_ms:6.3f} ms  "
+                  f"{context_tokens:5d} tok")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Benchmark: streaming audio queues when the STT provider stalls
+
+Simulates (in virtual time) ``--sessions`` sessions sending a 250 ms chunk
+of 16 kHz audio every 250 ms for ``--seconds``. The provider normally
+transcribes a chunk in ``--service-ms``, but stops answering between
+``--stall-start`` and ``--stall-end``. For an unbounded queue and each
+``AudioQueue`` policy, reports:
+
+- peak audio held in queues across all sessions (memory);
+- audio dropped or rejected, and pause requests sent to clients;
+- provider requests made and audio still queued when the run ends.
+
+With ``pause`` the simulated client honours the request and holds its
+audio until resumed.
+
+Usage:
+    python benchmarks/bench_flow_control.py [--sessions 100] [--seconds 60] [--stall-start 10] [--stall-end 40]
+"""
+
+import argparse
+import os
+import sys
+from collections import deque
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from trafficwise.flow_control import AudioQueue
+
+CHUNK_BYTES = 16000 * 2 // 4
+BYTES_PER_SECOND = 16000 * 2
+TICK = 0.25
+
+
+class UnboundedQueue:
+    """The previous behaviour: audio accumulates until the provider takes it"""
+
+    def __init__(self):
+        self._chunks = deque()
+        self.bytes = 0
+
+    def put(self, chunk):
+        self._chunks.append(bytes(chunk))
+        self.bytes += len(chunk)
+
+    def get(self, timeout=None):
+        if not self._chunks:
+            return None
+        data = self._chunks.popleft()
+        self.bytes -= len(data)
+        return data
+
+    def get_stats(self):
+        return {"dropped_bytes": 0, "pauses": 0}
+
+
+def simulate(make_queue, args):
+    chunk = bytes(CHUNK_BYTES)
+    queues = [make_queue() for _ in range(args.sessions)]
+    paused = [False] * args.sessions
+    for index, queue in enumerate(queues):
+        if isinstance(queue, AudioQueue):
+            queue.on_pause = lambda index=index: paused.__setitem__(index, True)
+            queue.on_resume = lambda index=index: paused.__setitem__(index, False)
+    provider_free = [0.0] * args.sessions
+    requests = peak = 0
+    for step in range(int(args.seconds / TICK)):
+        now = step * TICK
+        stalled = args.stall_start <= now < args.stall_end
+        for index, queue in enumerate(queues):
+            if not paused[index]:
+                queue.put(chunk)
+            if stalled:
+                provider_free[index] = now + TICK
+                continue
+            # The provider works through queued chunks until its time runs out
+            while provider_free[index] <= now:
+                data = queue.get(timeout=0)
+                if data is None:
+                    provider_free[index] = now
+                    break
+                requests += 1
+                provider_free[index] += args.service_ms / 1000 * max(1, len(data) / CHUNK_BYTES) ** 0.5
+        peak = max(peak, sum(queue.bytes for queue in queues))
+    dropped = sum(queue.get_stats()["dropped_bytes"] for queue in queues)
+    pauses = sum(queue.get_stats()["pauses"] for queue in queues)
+    backlog = sum(queue.bytes for queue in queues)
+    return peak, dropped, pauses, requests, backlog
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sessions", type=int, default=100)
+    parser.add_argument("--seconds", type=float, default=60.0)
+    parser.add_argument("--service-ms", type=float, default=200.0, help="Provider time per 250 ms chunk")
+    parser.add_argument("--stall-start", type=float, default=10.0)
+    parser.add_argument("--stall-end", type=float, default=40.0)
+    args = parser.parse_args()
+
+    print(f"🚰 {args.sessions} sessions x {args.seconds:g}s, provider stalled "
+          f"{args.stall_start:g}-{args.stall_end:g}s")
+    print(f"  {'queue':12s}  {'peak held':>10s}  {'dropped':>9s}  {'pauses':>6s}  {'requests':>8s}  {'backlog at end':>14s}")
+    variants = [("unbounded", UnboundedQueue)] + [
+        (policy, lambda policy=policy: AudioQueue(policy=policy)) for policy in ("drop_oldest", "coalesce", "pause")
+    ]
+    for name, make_queue in variants:
+        peak, dropped, pauses, requests, backlog = simulate(make_queue, args)
+        print(f"  {name:12s}  {peak / 2**20:7.1f} MB  {dropped / BYTES_PER_SECOND:7.0f} s  {pauses:6d}  "
+              f"{requests:8d}  {backlog / BYTES_PER_SECOND:11.1f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Benchmark: serialization of streaming transcription results
+
+Replays ``--messages`` transcript deltas (as produced by
+``TranscriptAssembler`` for an interim-per-word stream) and reports, per
+message, the serialization CPU and bytes on the wire for:
+
+- the previous path: build the response model (a Pydantic model with a
+  ``datetime`` timestamp, like ``StreamTranscriptionResponse``), then a
+  dict with ``timestamp.isoformat()``, then ``json.dumps``;
+- ``TranscriptFrame`` encoded as json, binary and (when installed) msgpack,
+  including building the frame;
+- fan-out to ``--listeners`` listeners, where the frame's cached encoding
+  is reused instead of serializing again for each one.
+
+Usage:
+    python benchmarks/bench_framing.py [--messages 100000] [--listeners 4]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime
+
+from pydantic import BaseModel, Field
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from trafficwise.framing import TranscriptFrame, available_formats
+from trafficwise.transcript import TranscriptAssembler
+
+WORDS = "take the ring road or the Orange Line and avoid Mall Road until the Metro Bus resumes".split()
+
+
+def make_messages(count, seed):
+    rng = random.Random(seed)
+    # Deltas only: periodic full-text syncs would dominate the averages over a long stream
+    assembler = TranscriptAssembler(resync_every=0)
+    messages = []
+    while len(messages) < count:
+        words = [rng.choice(WORDS) for _ in range(rng.randint(6, 18))]
+        for index in range(1, len(words) + 1):
+            messages.append(assembler.update(" ".join(words[:index]), index == len(words)))
+    return messages[:count]
+
+
+class LegacyResponse(BaseModel):
+    """Shape of the streaming service's response model"""
+
+    text: str
+    is_final: bool = False
+    confidence: float = 0.0
+    language: str = "en"
+    timestamp: datetime = Field(default_factory=datetime.now)
+
+
+def json_path(message, confidence):
+    response = LegacyResponse(text=message["text"], is_final=message["is_final"], confidence=confidence)
+    return json.dumps({
+        **message,
+        "confidence": response.confidence,
+        "language": response.language,
+        "timestamp": response.timestamp.isoformat(),
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--messages", type=int, default=100000)
+    parser.add_argument("--listeners", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=8)
+    args = parser.parse_args()
+
+    messages = make_messages(args.messages, args.seed)
+    print(f"📦 {len(messages)} interim results, fan-out to {args.listeners} listeners")
+
+    start = time.perf_counter()
+    sizes = [len(json_path(message, 0.9)) for message in messages]
+    base_us = (time.perf_counter() - start) / len(messages) * 1e6
+    start = time.perf_counter()
+    for message in messages:
+        response = LegacyResponse(text=message["text"], is_final=message["is_final"], confidence=0.9)
+        for _ in range(args.listeners):
+            json.dumps({**message, "confidence": response.confidence, "language": response.language,
+                        "timestamp": response.timestamp.isoformat()})
+    base_fanout_us = (time.perf_counter() - start) / len(messages) * 1e6
+    print(f"  {'model + isoformat + json.dumps':32s} {base_us:6.2f} us/msg  {sum(sizes) / len(sizes):6.1f} B/msg  "
+          f"fan-out {base_fanout_us:6.2f} us/msg")
+
+    for fmt in available_formats():
+        start = time.perf_counter()
+        sizes = [len(TranscriptFrame.from_message(message, 0.9).encode(fmt)) for message in messages]
+        frame_us = (time.perf_counter() - start) / len(messages) * 1e6
+        start = time.perf_counter()
+        for message in messages:
+            frame = TranscriptFrame.from_message(message, 0.9)
+            for _ in range(args.listeners):
+                frame.encode(fmt)
+        fanout_us = (time.perf_counter() - start) / len(messages) * 1e6
+        print(f"  {'TranscriptFrame -> ' + fmt:32s} {frame_us:6.2f} us/msg  {sum(sizes) / len(sizes):6.1f} B/msg  "
+              f"fan-out {fanout_us:6.2f} us/msg")
+
+
+if __name__ == "__main__":
+    main()
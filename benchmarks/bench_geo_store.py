@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Benchmark: traffic map payload and render time as the road network grows
+
+Generates synthetic intersections and road segments around the major
+cities and compares, for each size, the map HTML produced by one Folium
+Marker/PolyLine per feature (the previous approach) with the clustered and
+simplified GeoJSON layers from ``GeoStore`` at the default zoom and at a
+city-level zoom, plus the GeoJSON for one city tile.
+
+Usage:
+    python benchmarks/bench_geo_store.py [--sizes 10 1000 100000] [--naive-limit 10000]
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from trafficwise.geo_store import GeoStore, LineLayer, PointLayer
+from trafficwise.traffic_map import CITIES, DEFAULT_ZOOM, HIGHWAY_ROUTES, build_traffic_map, render_map_html
+
+SEGMENT_VERTICES = 12
+
+
+def synthetic_network(size, seed=0):
+    """``size`` intersections and ``size`` road segments scattered around the cities"""
+    rng = np.random.default_rng(seed)
+    centres = np.array([[city["lat"], city["lon"]] for city in CITIES])
+    home = centres[rng.integers(0, len(centres), size)]
+    points = home + rng.normal(0, 0.08, (size, 2))
+    levels = rng.integers(0, 4, size)
+
+    starts = centres[rng.integers(0, len(centres), size)] + rng.normal(0, 0.08, (size, 2))
+    headings = rng.uniform(0, 2 * np.pi, size)
+    steps = np.stack([np.cos(headings), np.sin(headings)], axis=1)[:, None, :] * 0.002
+    wiggle = rng.normal(0, 0.0003, (size, SEGMENT_VERTICES, 2))
+    paths = starts[:, None, :] + np.cumsum(steps + wiggle, axis=1)
+
+    return GeoStore(
+        PointLayer([f"Junction {i}" for i in range(size)], points[:, 0], points[:, 1], levels),
+        LineLayer(
+            [f"Segment {i}" for i in range(size)],
+            paths.reshape(-1, 2),
+            np.arange(size + 1) * SEGMENT_VERTICES,
+            rng.integers(0, 4, size),
+        ),
+    )
+
+
+def naive_html(store):
+    """One Folium object per feature, full geometry"""
+    import folium
+
+    colors = ["green", "orange", "red", "darkred"]
+    m = build_traffic_map(CITIES, HIGHWAY_ROUTES)
+    for name, lat, lon, level in zip(store.points.names, store.points.lat, store.points.lon, store.points.levels):
+        folium.Marker([lat, lon], tooltip=name, icon=folium.Icon(color=colors[level])).add_to(m)
+    for index, name in enumerate(store.lines.names):
+        folium.PolyLine(store.lines.path(index).tolist(), color=colors[store.lines.levels[index]],
+                        tooltip=name).add_to(m)
+    return render_map_html(m)
+
+
+def lahore_tile(zoom):
+    """Slippy-map tile containing Lahore at ``zoom``"""
+    lat, lon = CITIES[0]["lat"], CITIES[0]["lon"]
+    n = 2 ** zoom
+    x = int((lon + 180.0) / 360.0 * n)
+    y = int((1 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2 * n)
+    return zoom, x, y
+
+
+def measure(label, render):
+    start = time.perf_counter()
+    html = render()
+    elapsed = time.perf_counter() - start
+    print(f"    {label:<30} {len(html) / 1024:>10,.1f} KiB  {elapsed * 1000:>10,.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 1000, 100000])
+    parser.add_argument("--naive-limit", type=int, default=10000,
+                        help="Skip the per-feature Folium map above this many features")
+    args = parser.parse_args()
+
+    render_map_html(build_traffic_map())  # import folium and warm templates
+
+    for size in args.sizes:
+        store = synthetic_network(size)
+        print(f"🗺️ {size:,} intersections + {size:,} road segments")
+        if size <= args.naive_limit:
+            measure("per-feature markers/polylines", lambda: naive_html(store))
+        else:
+            print(f"    {'per-feature markers/polylines':<30} skipped (--naive-limit {args.naive_limit})")
+        for zoom in (DEFAULT_ZOOM, 12):
+            measure(f"GeoStore layers, zoom {zoom}",
+                    lambda: render_map_html(build_traffic_map(CITIES, HIGHWAY_ROUTES, store, zoom)))
+        z, x, y = lahore_tile(12)
+        measure(f"GeoJSON tile {z}/{x}/{y} (Lahore)", lambda: json.dumps(store.tile(z, x, y)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Benchmark: offline intent matching throughput
+
+Compares the compiled Aho-Corasick intent engine with the previous style of
+matching (one ``any(word in message ...)`` scan per intent) as the number of
+city/corridor intents grows.
+
+Usage:
+    python benchmarks/bench_intents.py [--intents 4 100 500 1000] [--messages 20000]
+"""
+
+import argparse
+import itertools
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from trafficwise.intents import IntentEngine, get_intent_engine
+
+CITIES = ["lahore", "karachi", "islamabad", "rawalpindi", "faisalabad", "peshawar", "multan",
+          "quetta", "sialkot", "gujranwala", "hyderabad", "bahawalpur", "sargodha", "sukkur"]
+PERIODS = ["morning", "evening", "friday", "ramadan", "monsoon"]
+TOPICS = ["route", "congestion", "parking", "metro", "toll", "fog", "flooding", "roadworks",
+          "accident", "school traffic", "signal timing", "bus lane"]
+FILLER = ["what", "is", "the", "best", "way", "during", "peak", "hours", "today", "near", "from", "to"]
+
+
+def synthetic_intents(count):
+    """City-topic, city-to-city corridor and city-topic-period intents"""
+    intents = []
+    pairs = itertools.chain(
+        ((city, topic) for city in CITIES for topic in TOPICS),
+        ((a, f"{a} {b}") for a, b in itertools.permutations(CITIES, 2)),
+        ((city, f"{period} {topic}") for city in CITIES for topic in TOPICS for period in PERIODS),
+    )
+    for city, topic in itertools.islice(pairs, count):
+        intents.append({
+            "name": f"{city}:{topic}",
+            "keywords": [topic, f"{city} {topic}", f"{topic} in {city}"],
+            "response": f"Advice about {topic} for $query",
+        })
+    return intents
+
+
+def naive_respond(intents, message):
+    """The previous approach: scan every intent's keyword list in turn (first hit wins)"""
+    message = message.lower()
+    for intent in intents:
+        if any(word in message for word in intent["keywords"]):
+            return intent["response"]
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--intents", type=int, nargs="+", default=[4, 100, 500, 1000])
+    parser.add_argument("--messages", type=int, default=20000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    messages = [
+        " ".join(rng.choice(FILLER + CITIES + TOPICS + PERIODS) for _ in range(rng.randint(4, 14)))
+        for _ in range(args.messages)
+    ]
+
+    print(f"🚦 Offline intent matching - {args.messages} messages")
+    for count in args.intents:
+        if count == 4:
+            engine = get_intent_engine()
+            intents = engine.intents
+        else:
+            intents = synthetic_intents(count)
+            engine = IntentEngine(intents, {"name": "default", "response": "General tips"})
+
+        start = time.perf_counter()
+        for message in messages:
+            engine.respond(message)
+        compiled = args.messages / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        for message in messages:
+            naive_respond(intents, message)
+        naive = args.messages / (time.perf_counter() - start)
+
+        print(f"  {len(intents):>5} intents  compiled={compiled:>10,.0f} matches/s  "
+              f"linear scan={naive:>10,.0f} matches/s")
+
+
+if __name__ == "__main__":
+    main()
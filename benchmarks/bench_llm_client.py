@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Benchmark: pooled LLM client vs bare requests.post
+
+Runs chat_with_gemini and chat_with_openai against a local stub server,
+once with the module-level ``requests`` functions (a new connection per
+call, the previous behaviour) and once with the shared pooled client.
+Reports p50/p99 latency and the number of TCP connections opened.
+
+Usage:
+    python benchmarks/bench_llm_client.py [--requests 500] [--delay 0.0]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from trafficwise.llm_client import LLMClient
+from trafficwise.providers import chat_with_gemini, chat_with_openai
+from trafficwise.stub_server import StubLLMServer
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def run(label, call, count, server):
+    connections_before = server.connections
+    latencies = []
+    for _ in range(count):
+        start = time.perf_counter()
+        call()
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    print(f"  {label:<28} p50={percentile(latencies, 50):7.3f}ms  "
+          f"p99={percentile(latencies, 99):7.3f}ms  "
+          f"mean={statistics.mean(latencies):7.3f}ms  "
+          f"connections={server.connections - connections_before}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--delay", type=float, default=0.0, help="Server-side delay per request (s)")
+    args = parser.parse_args()
+
+    pooled = LLMClient()
+
+    with StubLLMServer(delay=args.delay) as server:
+        base = server.base_url
+        print(f"🚦 LLM client benchmark - {args.requests} requests per case against {base}")
+
+        print("Gemini (generateContent):")
+        run("requests.post (per call)",
+            lambda: chat_with_gemini("Lahore to Islamabad", 0.7, "key", "gemini-1.5-flash",
+                                     client=requests, base_url=base),
+            args.requests, server)
+        run("LLMClient (pooled)",
+            lambda: chat_with_gemini("Lahore to Islamabad", 0.7, "key", "gemini-1.5-flash",
+                                     client=pooled, base_url=base),
+            args.requests, server)
+
+        print("OpenAI (chat/completions):")
+        run("requests.post (per call)",
+            lambda: chat_with_openai("Lahore to Islamabad", 0.7, "key", client=requests, base_url=base),
+            args.requests, server)
+        run("LLMClient (pooled)",
+            lambda: chat_with_openai("Lahore to Islamabad", 0.7, "key", client=pooled, base_url=base),
+            args.requests, server)
+
+    pooled.close()
+    print("\nNote: the stub server is plain HTTP on loopback; against the real providers the")
+    print("per-call TLS handshake adds a further round trip that pooling also removes.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Benchmark: local Whisper throughput vs concurrent sessions, with and without batching
+
+Runs ``--sessions-list`` concurrent streaming sessions, each sending
+``--chunks`` chunks of ``--chunk-seconds`` audio at real-time pace, through
+``LocalWhisperBackend`` with batching off (``--max-batch 1``) and on. For
+each run it reports:
+
+- throughput in audio seconds transcribed per wall second;
+- real-time factor (compute seconds per audio second; below 1 is faster
+  than real time) and mean batch size;
+- median and p95 chunk latency (submit to text); a p95 that keeps growing
+  with the session count means the box can no longer keep up.
+
+With ``--model`` (faster-whisper installed) the real int8 model is used.
+Otherwise a synthetic model costs ``--fixed-ms`` per forward pass plus
+``--per-item-ms`` per chunk in it (the shape of Whisper's padded 30-second
+encoder window), so batching behaviour can be compared on any box.
+
+Usage:
+    python benchmarks/bench_local_whisper.py [--model base.en] [--sessions-list 1,2,4,8,16]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from trafficwise.local_whisper import SAMPLE_RATE, LocalWhisperBackend
+
+
+def synthetic_loader(fixed_ms, per_item_ms):
+    def infer(batch):
+        time.sleep((fixed_ms + per_item_ms * len(batch)) / 1000)
+        return ["synthetic transcript"] * len(batch)
+
+    return lambda *args: infer
+
+
+async def run(backend, sessions, chunks, chunk_seconds):
+    audio = (np.random.default_rng(23).standard_normal(int(SAMPLE_RATE * chunk_seconds)) * 3000).astype(np.int16)
+    audio = audio.tobytes()
+    latencies = []
+
+    async def session(index):
+        start = time.perf_counter() + index * chunk_seconds / sessions
+        for step in range(chunks):
+            # A chunk is ready once its audio has been spoken
+            await asyncio.sleep(max(0.0, start + (step + 1) * chunk_seconds - time.perf_counter()))
+            submitted = time.perf_counter()
+            await backend.transcribe(audio)
+            latencies.append(time.perf_counter() - submitted)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(session(index) for index in range(sessions)))
+    return time.perf_counter() - start, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--model", default=None)
+    parser.add_argument("--sessions-list", default="1,2,4,8,16")
+    parser.add_argument("--chunks", type=int, default=6)
+    parser.add_argument("--chunk-seconds", type=float, default=0.5)
+    parser.add_argument("--max-batch", type=int, default=8)
+    parser.add_argument("--max-wait-ms", type=float, default=30.0)
+    parser.add_argument("--fixed-ms", type=float, default=120.0)
+    parser.add_argument("--per-item-ms", type=float, default=15.0)
+    args = parser.parse_args()
+
+    if args.model:
+        label = f"{args.model} int8 on CPU"
+        loader = {}
+    else:
+        label = f"synthetic model ({args.fixed_ms:g} ms/pass + {args.per_item_ms:g} ms/chunk)"
+        loader = {"loader": synthetic_loader(args.fixed_ms, args.per_item_ms)}
+
+    print(f"🖥️ {label}, {args.chunks} x {args.chunk_seconds:g} s chunks per session")
+    for max_batch in (1, args.max_batch):
+        print(f"  max batch {max_batch}:")
+        for sessions in (int(value) for value in args.sessions_list.split(",")):
+            backend = LocalWhisperBackend(args.model or "synthetic", max_batch=max_batch,
+                                          max_wait_ms=args.max_wait_ms, **loader)
+            backend.load()
+            elapsed, latencies = asyncio.run(run(backend, sessions, args.chunks, args.chunk_seconds))
+            stats = backend.get_stats()
+            backend.close()
+            latencies.sort()
+            p95 = latencies[int(len(latencies) * 0.95) - 1] if len(latencies) > 1 else latencies[0]
+            print(f"    {sessions:3d} sessions:  {stats['audio_seconds'] / elapsed:6.2f} audio s/s  "
+                  f"RTF {stats['real_time_factor']:5.3f}  batch {stats['mean_batch']:4.1f}  "
+                  f"latency p50 {statistics.median(latencies) * 1000:7.0f} ms  p95 {p95 * 1000:7.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Benchmark: prompt assembly and token budgets
+
+Reports:
+
+- time to build a Gemini request body, with the previous inline f-string
+  and dict literal versus the compiled template and shared skeleton;
+- RAG prompt size when the retrieved chunks are joined without limit versus
+  trimmed to ``RAG_CONTEXT_TOKENS``;
+- that an oversized question is answered locally without a request.
+
+Usage:
+    python benchmarks/bench_prompts.py [--iterations 200000] [--chunk-chars 6000]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from trafficwise.llm_client import LLMClient
+from trafficwise.prompts import DEFAULT_RAG_CONTEXT_TOKENS, RAG_PROMPT, build_rag_prompt, estimate_tokens
+from trafficwise.providers import _build_gemini_payload, chat_with_gemini
+from trafficwise.stub_server import StubLLMServer
+
+
+def inline_gemini_payload(user_message, temperature):
+    """The request body as it was built before templates and skeletons"""
+    enhanced_prompt = f"""You are a traffic and urban planning expert for Pakistan. Help with the following query: {user_message}
+
+    Consider Pakistani context including:
+    - Local traffic patterns and peak hours (7-9 AM, 5-8 PM)
+    - Public transport systems (Metro Bus, Orange Line, BRT)
+    - Weather impacts (monsoon season July-Sept, fog Dec-Feb)
+    - Cultural and religious events affecting traffic (Friday prayers, Ramadan, Eid)
+    - Infrastructure challenges and ongoing development projects
+    - Major cities: Karachi, Lahore, Islamabad, Rawalpindi, Faisalabad, Peshawar
+    - Highway systems: Motorways (M-1, M-2, M-3), GT Road, National Highways
+
+    Provide practical, actionable advice specific to Pakistani traffic conditions.
+    """
+    return {
+        "contents": [{"parts": [{"text": enhanced_prompt}]}],
+        "generationConfig": {"temperature": temperature, "topK": 40, "topP": 0.95, "maxOutputTokens": 1024},
+        "safetySettings": [
+            {"category": "HARM_CATEGORY_HARASSMENT", "threshold": "BLOCK_MEDIUM_AND_ABOVE"},
+            {"category": "HARM_CATEGORY_HATE_SPEECH", "threshold": "BLOCK_MEDIUM_AND_ABOVE"},
+            {"category": "HARM_CATEGORY_SEXUALLY_EXPLICIT", "threshold": "BLOCK_MEDIUM_AND_ABOVE"},
+            {"category": "HARM_CATEGORY_DANGEROUS_CONTENT", "threshold": "BLOCK_MEDIUM_AND_ABOVE"},
+        ],
+    }
+
+
+def per_call_us(fn, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn("Best route from Lahore to Islamabad during peak hours?", 0.7)
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--iterations", type=int, default=200000)
+    parser.add_argument("--chunks", type=int, default=3, help="Retrieved chunks per RAG question")
+    parser.add_argument("--chunk-chars", type=int, default=6000)
+    args = parser.parse_args()
+
+    print("📝 Prompt assembly")
+    inline_us = per_call_us(inline_gemini_payload, args.iterations)
+    compiled_us = per_call_us(_build_gemini_payload, args.iterations)
+    print(f"  Gemini payload build: inline={inline_us:6.2f} us  template+skeleton+budget check={compiled_us:6.2f} us")
+
+    sentence = "Traffic on Mall Road peaks between 5 and 8 PM, so use the Orange Line or the canal road. "
+    chunk = (sentence * (args.chunk_chars // len(sentence) + 1))[:args.chunk_chars]
+    documents = [chunk] * args.chunks
+    query = "How do I avoid evening congestion in Lahore?"
+    unbounded = RAG_PROMPT.render(context="\n".join(documents), user_message=query)
+    trimmed = build_rag_prompt(query, documents)
+    print(f"  RAG prompt ({args.chunks} x {args.chunk_chars} chars retrieved): "
+          f"unbounded ~{estimate_tokens(unbounded)} tokens, trimmed ~{estimate_tokens(trimmed)} tokens "
+          f"(budget {DEFAULT_RAG_CONTEXT_TOKENS} + template)")
+
+    client = LLMClient()
+    with StubLLMServer() as server:
+        start = time.perf_counter()
+        answer = chat_with_gemini("Lahore traffic " * 5000, 0.7, "key", "gemini-1.5-flash",
+                                  client=client, base_url=server.base_url)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        print(f"  oversized question: {answer[:40]}... in {elapsed_ms:.2f} ms, upstream requests={server.requests}")
+    client.close()
+
+
+if __name__ == "__main__":
+    main()
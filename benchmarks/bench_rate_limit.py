@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Gemini quota under bursty load, direct versus rate limited + coalesced
+
+A local stub server enforces a free-tier style quota (``--quota`` requests
+per sliding ``--window`` seconds, answering 429 with Retry-After beyond it).
+Sessions fire bursts of questions drawn from a small pool of popular
+prompts, so identical prompts are often in flight at the same time. The
+window is scaled down from 60 s so a run takes seconds. Reports answered
+questions, upstream requests, 429s, queue wait and the coalesced ratio.
+
+Usage:
+    python benchmarks/bench_rate_limit.py [--sessions 24] [--quota 15] [--window 3]
+"""
+
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from trafficwise.llm_client import LLMClient
+from trafficwise.providers import chat_with_gemini
+from trafficwise.rate_limit import RateLimiter, RequestCoalescer
+from trafficwise.response_cache import make_cache_key
+from trafficwise.stub_server import StubLLMServer
+
+PROMPTS = [
+    "Best route from Lahore to Islamabad",
+    "Karachi traffic during rush hour",
+    "Is the M-2 open in fog",
+    "Peshawar old city congestion",
+    "Metro bus timings in Lahore",
+    "Friday prayer traffic in Rawalpindi",
+]
+
+
+def run(server, client, args, limiter=None, coalescer=None):
+    rng = random.Random(args.seed)
+    schedule = [
+        [(burst * args.burst_gap + rng.random() * 0.2, rng.choice(PROMPTS)) for burst in range(args.bursts)]
+        for _ in range(args.sessions)
+    ]
+    answers = []
+    lock = threading.Lock()
+
+    def ask(prompt):
+        call = lambda: chat_with_gemini(prompt, 0.7, "key", "gemini-1.5-flash", client=client,
+                                        base_url=server.base_url, limiter=limiter)
+        if coalescer is None:
+            return call()
+        return coalescer.call(make_cache_key(prompt, "gemini:gemini-1.5-flash", 0.7), call)
+
+    def session(questions):
+        start = time.monotonic()
+        for at, prompt in questions:
+            time.sleep(max(0.0, start + at - time.monotonic()))
+            answer = ask(prompt)
+            with lock:
+                answers.append(answer)
+
+    requests_before, limited_before = server.requests, server.rate_limited
+    start = time.perf_counter()
+    threads = [threading.Thread(target=session, args=(questions,)) for questions in schedule]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    ok = sum(1 for answer in answers if not answer.startswith("❌"))
+    return {
+        "questions": len(answers),
+        "ok": ok,
+        "upstream": server.requests - requests_before,
+        "http_429": server.rate_limited - limited_before,
+        "elapsed": elapsed,
+        "limiter": limiter.get_stats() if limiter is not None else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sessions", type=int, default=24)
+    parser.add_argument("--bursts", type=int, default=3, help="Questions per session")
+    parser.add_argument("--burst-gap", type=float, default=1.0, help="Seconds between a session's questions")
+    parser.add_argument("--quota", type=int, default=15)
+    parser.add_argument("--window", type=float, default=3.0, help="Quota window in seconds (60 in production)")
+    parser.add_argument("--burst", type=int, default=3, help="Limiter burst size")
+    parser.add_argument("--max-wait", type=float, default=6.0)
+    parser.add_argument("--delay", type=float, default=0.3, help="Stub response latency")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    client = LLMClient(pool_maxsize=args.sessions)
+    print(f"⏳ Gemini quota {args.quota}/{args.window:g}s - {args.sessions} sessions x {args.bursts} questions, "
+          f"{len(PROMPTS)} distinct prompts")
+
+    results = {}
+    with StubLLMServer(delay=args.delay, quota=args.quota, quota_window=args.window) as server:
+        results["direct"] = run(server, client, args)
+        time.sleep(args.window)
+        limiter = RateLimiter(args.quota, burst=args.burst, max_wait=args.max_wait, window=args.window)
+        coalescer = RequestCoalescer()
+        results["limited"] = run(server, client, args, limiter=limiter)
+        time.sleep(args.window)
+        limiter = RateLimiter(args.quota, burst=args.burst, max_wait=args.max_wait, window=args.window)
+        results["limited+coalesced"] = run(server, client, args, limiter=limiter, coalescer=coalescer)
+
+    for label, result in results.items():
+        line = (f"  {label:18s} answered {result['ok']:3d}/{result['questions']}  upstream={result['upstream']:3d}  "
+                f"429s={result['http_429']:3d}  wall={result['elapsed']:5.1f}s")
+        if result["limiter"] is not None:
+            line += (f"  queue wait mean={result['limiter']['mean_queue_wait_ms']:5.0f} ms "
+                     f"max={result['limiter']['max_queue_wait_ms']:5.0f} ms  rejected={result['limiter']['rejected']}")
+        print(line)
+
+    coalescer_stats = coalescer.get_stats()
+    print(f"  coalesced ratio: {coalescer_stats['coalesced_ratio']:.0%} "
+          f"({coalescer_stats['coalesced']} of {coalescer_stats['calls']} questions)")
+    client.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Benchmark: recall vs latency of the RAG retrievers
+
+Generates clustered synthetic corpora (384-dimensional, like
+all-MiniLM-L6-v2), uses exact float32 search as ground truth and reports
+recall@k and per-query latency for the NumPy flat retriever (float32 and
+float16), the IVF retriever at several nprobe settings and, when chromadb
+is installed, an in-memory Chroma collection.
+
+Usage:
+    python benchmarks/bench_retrievers.py [--sizes 10000 100000] [--queries 200] [--k 10]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from trafficwise.retrievers import ChromaRetriever, IVFRetriever, NumpyRetriever, normalize_rows
+
+DIM = 384
+
+
+def synthetic_corpus(size, queries, seed=0):
+    """Gaussian clusters around random topic centres, plus noisy queries near corpus points"""
+    rng = np.random.default_rng(seed)
+    topics = rng.standard_normal((max(16, size // 500), DIM), dtype=np.float32)
+    corpus = topics[rng.integers(0, len(topics), size)] + 0.6 * rng.standard_normal((size, DIM), dtype=np.float32)
+    picks = rng.integers(0, size, queries)
+    query_vectors = corpus[picks] + 0.4 * rng.standard_normal((queries, DIM), dtype=np.float32)
+    return normalize_rows(corpus), normalize_rows(query_vectors)
+
+
+def row_lookup(rows):
+    rows = [int(r) for r in rows]
+    return rows, [f"doc-{r}" for r in rows], [{} for _ in rows]
+
+
+def evaluate(label, retriever, queries, truth, k, batch):
+    retriever.search(queries[:1], k)  # warm-up
+    start = time.perf_counter()
+    found = []
+    for offset in range(0, len(queries), batch):
+        found.extend(retriever.search(queries[offset:offset + batch], k))
+    elapsed = time.perf_counter() - start
+
+    recall = np.mean([
+        len({int(chunk.id) for chunk in chunks} & truth_row) / k
+        for chunks, truth_row in zip(found, truth)
+    ])
+    print(f"    {label:<24} recall@{k}={recall:6.3f}  {elapsed / len(queries) * 1000:8.3f} ms/query")
+
+
+def chroma_retriever(corpus):
+    try:
+        import chromadb
+    except ImportError:
+        return None
+    collection = chromadb.Client().create_collection(
+        f"bench_{len(corpus)}", metadata={"hnsw:space": "cosine"}
+    )
+    for offset in range(0, len(corpus), 5000):
+        block = corpus[offset:offset + 5000]
+        collection.add(
+            ids=[str(offset + i) for i in range(len(block))],
+            embeddings=block.tolist(),
+            documents=[f"doc-{offset + i}" for i in range(len(block))],
+        )
+    return ChromaRetriever(collection)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--batch", type=int, default=32, help="Queries per search call")
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        corpus, queries = synthetic_corpus(size, args.queries)
+        print(f"🔎 {size:,} chunks, {args.queries} queries, batch={args.batch}")
+
+        flat = NumpyRetriever(corpus, row_lookup)
+        truth = [
+            {int(chunk.id) for chunk in chunks}
+            for chunks in flat.search(queries, args.k)
+        ]
+
+        evaluate("numpy flat float32", flat, queries, truth, args.k, args.batch)
+        evaluate("numpy flat float16", NumpyRetriever(corpus.astype(np.float16), row_lookup),
+                 queries, truth, args.k, args.batch)
+
+        start = time.perf_counter()
+        ivf = IVFRetriever(corpus, row_lookup).train()
+        print(f"    ivf train: {len(ivf.centroids)} cells in {time.perf_counter() - start:.2f}s")
+        for nprobe in (1, 4, 8, 16):
+            ivf.nprobe = nprobe
+            evaluate(f"numpy ivf nprobe={nprobe}", ivf, queries, truth, args.k, args.batch)
+
+        chroma = chroma_retriever(corpus)
+        if chroma is None:
+            print("    chroma                   skipped (chromadb not installed)")
+        else:
+            evaluate("chroma (hnsw)", chroma, queries, truth, args.k, args.batch)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Benchmark: hedged multi-provider routing against fault-injecting stub servers
+
+Two stub servers stand in for Gemini and OpenAI. For each scenario the
+same questions are answered by calling Gemini directly (the previous
+single-backend behaviour) and through ``HedgedRouter``. Reports latency
+percentiles, the share of error answers and upstream requests per question
+(spend).
+
+Scenarios:
+    tail     Gemini 50 ms with a 4% 1 s latency tail, OpenAI 80 ms
+    429      Gemini rate-limits 30% of requests, OpenAI healthy
+    outage   both providers stall for 5 s; 1 s routing deadline
+
+Usage:
+    python benchmarks/bench_routing.py [--questions 300]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from trafficwise.llm_client import LLMClient
+from trafficwise.providers import chat_with_gemini
+from trafficwise.routing import HedgedRouter, RoutingProfiles, is_error_response, percentile, provider_backends
+from trafficwise.stub_server import StubLLMServer
+
+SCENARIOS = {
+    "tail": ({"delay": 0.05, "slow_fraction": 0.04, "slow_delay": 1.0}, {"delay": 0.08}, 12.0),
+    "429": ({"delay": 0.05, "error_rate": 0.3, "retry_after": 1}, {"delay": 0.08}, 12.0),
+    "outage": ({"delay": 5.0}, {"delay": 5.0}, 1.0),
+}
+
+
+def report(label, latencies, errors, upstream, questions):
+    print(f"    {label:<8} p50={percentile(latencies, 50) * 1000:7.1f} ms  "
+          f"p95={percentile(latencies, 95) * 1000:7.1f} ms  p99={percentile(latencies, 99) * 1000:7.1f} ms  "
+          f"errors={errors / questions:5.1%}  requests/question={upstream / questions:4.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--questions", type=int, default=300)
+    parser.add_argument("--scenarios", nargs="+", default=list(SCENARIOS))
+    args = parser.parse_args()
+
+    client = LLMClient()
+    for name in args.scenarios:
+        gemini_faults, openai_faults, deadline = SCENARIOS[name]
+        questions = args.questions if name != "outage" else min(args.questions, 10)
+        print(f"🧭 scenario '{name}' - {questions} questions")
+        with StubLLMServer(**gemini_faults) as gemini, StubLLMServer(**openai_faults) as openai:
+            latencies, errors = [], 0
+            for _ in range(questions if name != "outage" else 2):
+                start = time.perf_counter()
+                text = chat_with_gemini("Lahore to Islamabad", 0.7, "key", "gemini-1.5-flash",
+                                        client=client, base_url=gemini.base_url)
+                latencies.append(time.perf_counter() - start)
+                errors += is_error_response(text)
+            report("direct", latencies, errors, gemini.requests, len(latencies))
+
+            before = gemini.requests + openai.requests
+            profiles = RoutingProfiles()
+            backends = provider_backends(0.7, "key", "key", client=client,
+                                         gemini_base_url=gemini.base_url, openai_base_url=openai.base_url)
+            latencies, errors, offline = [], 0, 0
+            for _ in range(questions):
+                result = HedgedRouter(backends, profiles=profiles, deadline=deadline,
+                                      default_hedge_delay=0.3).route("Lahore to Islamabad")
+                latencies.append(result.latency)
+                errors += is_error_response(result.text)
+                offline += result.backend == "offline"
+            report("routed", latencies, errors, gemini.requests + openai.requests - before, questions)
+            stats = profiles.get_stats()
+            print(f"    routing: hedge rate {stats['hedge_rate']:.1%}, failovers {stats['failovers']}, "
+                  f"offline fallbacks {offline}, wins {stats['wins']}")
+    client.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Benchmark: session expiry and lookup, linear scan vs sharded timer-wheel store
+
+For 100, 10k and 100k live sessions whose last activity is spread over the
+timeout window, runs a cleanup pass every simulated second (so about
+1/300 of the sessions expire per pass) and reports:
+
+- cleanup CPU per pass: scanning every session with ``is_expired`` under
+  one lock, as the streaming session manager did, vs ``SessionStore.expire``;
+- lookup latency for ``get`` from ``--threads`` concurrent threads: one
+  dict behind one lock vs the sharded store.
+
+Usage:
+    python benchmarks/bench_session_store.py [--sizes 100,10000,100000] [--passes 30]
+"""
+
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from trafficwise.session_store import SessionStore
+
+TIMEOUT = 300.0
+
+
+class Session:
+    __slots__ = ("session_id", "last_activity")
+
+    def __init__(self, session_id, last_activity):
+        self.session_id = session_id
+        self.last_activity = last_activity
+
+    def is_expired(self, now, timeout_seconds=TIMEOUT):
+        return now - self.last_activity > timeout_seconds
+
+
+class ScanManager:
+    """One dict, one lock, cleanup by scanning every session"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.sessions = {}
+
+    def put(self, session_id, session, last_activity):
+        self.sessions[session_id] = session
+
+    def get(self, session_id):
+        with self.lock:
+            return self.sessions.get(session_id)
+
+    def expire(self, now):
+        with self.lock:
+            expired = [session_id for session_id, session in self.sessions.items() if session.is_expired(now)]
+            for session_id in expired:
+                del self.sessions[session_id]
+        return expired
+
+
+class Clock:
+    now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def populate(manager, size, rng):
+    ids = [f"session-{i}" for i in range(size)]
+    for session_id in ids:
+        last_activity = -rng.uniform(0, TIMEOUT)
+        manager.put(session_id, Session(session_id, last_activity), last_activity=last_activity)
+    return ids
+
+
+def cleanup_us(manager, clock, passes):
+    elapsed = 0.0
+    expired = 0
+    for second in range(1, passes + 1):
+        clock.now = float(second)
+        start = time.perf_counter()
+        expired += len(manager.expire(clock.now))
+        elapsed += time.perf_counter() - start
+    return elapsed / passes * 1e6, expired / passes
+
+
+def lookup_us(manager, ids, threads, lookups):
+    def worker(seed, results):
+        rng = random.Random(seed)
+        keys = [rng.choice(ids) for _ in range(lookups)]
+        start = time.perf_counter()
+        for key in keys:
+            manager.get(key)
+        results.append((time.perf_counter() - start) / lookups)
+
+    results = []
+    workers = [threading.Thread(target=worker, args=(n, results)) for n in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return sum(results) / len(results) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", default="100,10000,100000")
+    parser.add_argument("--passes", type=int, default=30, help="Cleanup passes (simulated seconds)")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--lookups", type=int, default=20000, help="Lookups per thread")
+    args = parser.parse_args()
+
+    print(f"🗂️  Session expiry and lookup (timeout {TIMEOUT:g}s, cleanup every 1s, {args.threads} lookup threads)")
+    print(f"  {'sessions':>8s}  {'expiring/pass':>13s}  {'scan cleanup':>13s}  {'wheel cleanup':>13s}  "
+          f"{'locked dict get':>15s}  {'sharded get':>11s}")
+    for size in (int(size) for size in args.sizes.split(",")):
+        clock = Clock()
+        scan = ScanManager()
+        store = SessionStore(timeout=TIMEOUT, clock=clock)
+        ids = populate(scan, size, random.Random(size))
+        populate(store, size, random.Random(size))
+
+        scan_lookup = lookup_us(scan, ids, args.threads, args.lookups)
+        store_lookup = lookup_us(store, ids, args.threads, args.lookups)
+
+        scan_us, expiring = cleanup_us(scan, clock, args.passes)
+        wheel_us, _ = cleanup_us(store, clock, args.passes)
+        print(f"  {size:8d}  {expiring:13.1f}  {scan_us:10.1f} us  {wheel_us:10.1f} us  "
+              f"{scan_lookup:12.3f} us  {store_lookup:8.3f} us")
+
+
+if __name__ == "__main__":
+    main()
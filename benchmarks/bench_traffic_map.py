@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Benchmark: traffic map cost per Streamlit rerun
+
+Measures the map work done on each rerun with ``show_map`` on: rebuilding
+and serializing the Folium map every time (the previous behaviour) versus
+looking up the cached HTML for the current data version, against the
+no-map baseline. Also times the one-off re-render after a data change.
+
+Usage:
+    python benchmarks/bench_traffic_map.py [--reruns 200]
+"""
+
+import argparse
+import copy
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from trafficwise.traffic_map import CITIES, HIGHWAY_ROUTES, TrafficMapCache, render_traffic_map
+
+
+def run(label, call, reruns):
+    latencies = []
+    for _ in range(reruns):
+        start = time.perf_counter()
+        call()
+        latencies.append((time.perf_counter() - start) * 1000)
+    print(f"  {label:<28} mean={statistics.mean(latencies):8.3f} ms  "
+          f"p50={statistics.median(latencies):8.3f} ms  max={max(latencies):8.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--reruns", type=int, default=200)
+    args = parser.parse_args()
+
+    render_traffic_map()  # import folium and warm templates
+    cache = TrafficMapCache()
+
+    print(f"🗺️ Traffic map work per rerun - {args.reruns} reruns")
+    run("no map (baseline)", lambda: None, args.reruns)
+    run("rebuild + render each rerun", render_traffic_map, args.reruns)
+    run("cached HTML", lambda: cache.get_html(CITIES, HIGHWAY_ROUTES), args.reruns)
+
+    updated = copy.deepcopy(CITIES)
+    updated[0]["traffic"] = "Very Heavy"
+    start = time.perf_counter()
+    cache.get_html(updated, HIGHWAY_ROUTES)
+    print(f"  re-render after data change  {(time.perf_counter() - start) * 1000:8.3f} ms (once per version)")
+    print(f"  cache stats: {cache.get_stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Benchmark: transcript messages over a long call, full text vs deltas
+
+Plays a call of ``--minutes`` minutes of speech (about 150 words a minute,
+one interim hypothesis per word and a final per utterance) and compares, at
+checkpoints, the previous behaviour (each message carries the whole
+transcript so far) with ``TranscriptAssembler`` deltas:
+
+- JSON payload size of the messages sent in the last minute;
+- server CPU per message to assemble and serialize it.
+
+Usage:
+    python benchmarks/bench_transcript.py [--minutes 60] [--resync-every 100]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from trafficwise.transcript import TranscriptAssembler
+
+WORDS = ("traffic on the motorway near Lahore is heavy this evening so please take the ring road "
+         "or the Orange Line and avoid Mall Road until the Metro Bus service resumes").split()
+WORDS_PER_MINUTE = 150
+
+
+def hypotheses(rng, minutes):
+    """(interim or final text for the current utterance, is_final) as a provider streams them"""
+    for _ in range(int(minutes * WORDS_PER_MINUTE / 12)):
+        words = [rng.choice(WORDS) for _ in range(rng.randint(6, 18))]
+        for count in range(1, len(words) + 1):
+            yield " ".join(words[:count]), False
+        yield " ".join(words).capitalize() + ".", True
+
+
+class FullTextSession:
+    """Previous behaviour: accumulated text replaced and sent whole on every response"""
+
+    def __init__(self):
+        self.finals = ""
+        self.accumulated_text = ""
+
+    def update(self, text, is_final):
+        self.accumulated_text = f"{self.finals} {text}".strip()
+        if is_final:
+            self.finals = self.accumulated_text
+        return {"type": "transcription", "text": self.accumulated_text, "is_final": is_final}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--minutes", type=float, default=60.0)
+    parser.add_argument("--resync-every", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=4)
+    args = parser.parse_args()
+
+    stream = list(hypotheses(random.Random(args.seed), args.minutes))
+    per_minute = len(stream) / args.minutes
+    checkpoints = {int(per_minute * minute) for minute in (1, 10, 30, 60) if minute <= args.minutes}
+    window = int(per_minute)
+
+    full = FullTextSession()
+    assembler = TranscriptAssembler(resync_every=args.resync_every)
+    sizes = {"full": [], "delta": []}
+    seconds = {"full": [], "delta": []}
+
+    print(f"📝 {args.minutes:g}-minute call, {len(stream)} transcription messages "
+          f"(resync every {args.resync_every})")
+    print(f"  {'minute':>6s}  {'transcript':>10s}  {'full text/msg':>20s}  {'delta/msg':>20s}")
+    for index, (text, is_final) in enumerate(stream, 1):
+        start = time.perf_counter()
+        payload = json.dumps(full.update(text, is_final))
+        seconds["full"].append(time.perf_counter() - start)
+        sizes["full"].append(len(payload))
+
+        start = time.perf_counter()
+        payload = json.dumps(assembler.update(text, is_final))
+        seconds["delta"].append(time.perf_counter() - start)
+        sizes["delta"].append(len(payload))
+
+        if index in checkpoints:
+            minute = index / per_minute
+            report = []
+            for name in ("full", "delta"):
+                recent_size = sum(sizes[name][-window:]) / window
+                recent_us = sum(seconds[name][-window:]) / window * 1e6
+                report.append(f"{recent_size:8.0f} B {recent_us:6.2f} us")
+            print(f"  {minute:6.0f}  {len(assembler):7d} ch  {report[0]:>20s}  {report[1]:>20s}")
+
+    total_full = sum(sizes["full"]) / 2**20
+    total_delta = sum(sizes["delta"]) / 2**20
+    print(f"  total sent: full text={total_full:.1f} MB  deltas={total_delta:.2f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Benchmark: first-call latency with and without phrase pre-warming
+
+Simulates a TTS provider whose latency matches the documented telephony
+voices (about 600 ms for English, 700 ms for French, scaled by
+``--scale``) and ``--callers`` callers, arriving ``--arrival-ms`` apart
+right after startup, each asking for catalog phrases in a random order.
+Reports, cold and with ``PhrasePrewarmer`` started at initialize time:
+
+- how long initialize takes to return (pre-warming must not block it);
+- per-request latency p50/p95 and cache hit rate over the first callers;
+- pre-warm duration by concurrency.
+
+Usage:
+    python benchmarks/bench_tts_prewarm.py [--callers 50] [--scale 0.1] [--concurrency 4]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from trafficwise.tts_cache import TTSAudioCache
+from trafficwise.tts_prewarm import PhrasePrewarmer, load_phrase_catalog
+
+VOICES = {
+    "en": SimpleNamespace(voice_id="Joanna", provider="polly", latency_ms=600),
+    "fr": SimpleNamespace(voice_id="Lea", provider="polly", latency_ms=700),
+}
+
+
+async def simulate(args, prewarm, concurrency):
+    phrases = load_phrase_catalog()
+    cache = TTSAudioCache(cache_dir=None)
+    rng = random.Random(args.seed)
+
+    async def synthesize(text, voice):
+        await asyncio.sleep(voice.latency_ms / 1000 * args.scale * rng.uniform(0.8, 1.3))
+        return text.encode("utf-8") * 200
+
+    async def speak(phrase):
+        voice = VOICES[phrase.language]
+        start = time.perf_counter()
+        audio = cache.get(phrase.text, voice.voice_id, voice.provider, "standard")
+        if audio is None:
+            audio = await synthesize(phrase.text, voice)
+            cache.put(phrase.text, voice.voice_id, voice.provider, "standard", audio)
+        return time.perf_counter() - start
+
+    async def caller(index):
+        await asyncio.sleep(index * args.arrival_ms / 1000 * args.scale)
+        turns = rng.sample(phrases, args.turns)
+        return [await speak(phrase) for phrase in turns]
+
+    start = time.perf_counter()
+    prewarmer = PhrasePrewarmer(synthesize, cache, VOICES.get, concurrency=concurrency)
+    if prewarm:
+        prewarmer.start(phrases)
+    init_seconds = time.perf_counter() - start
+
+    latencies = [latency for turns in await asyncio.gather(*(caller(index) for index in range(args.callers)))
+                 for latency in turns]
+    await prewarmer.wait()
+    latencies.sort()
+    return init_seconds, latencies, cache.get_stats()["hit_rate"], prewarmer.get_stats()["elapsed_seconds"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--callers", type=int, default=50)
+    parser.add_argument("--turns", type=int, default=4)
+    parser.add_argument("--arrival-ms", type=float, default=500.0)
+    parser.add_argument("--scale", type=float, default=0.1)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=25)
+    args = parser.parse_args()
+
+    print(f"📞 {args.callers} callers x {args.turns} phrases, {len(load_phrase_catalog())} catalog phrases, "
+          f"provider latency x{args.scale:g}")
+    for label, prewarm in (("cold cache", False), (f"pre-warm x{args.concurrency}", True)):
+        init_seconds, latencies, hit_rate, _ = asyncio.run(simulate(args, prewarm, args.concurrency))
+        p95 = latencies[int(len(latencies) * 0.95) - 1]
+        print(f"  {label:16s} initialize {init_seconds * 1000:6.2f} ms  p50 {statistics.median(latencies) * 1000:7.2f} ms  "
+              f"p95 {p95 * 1000:7.2f} ms  hit rate {hit_rate:.1%}")
+    for concurrency in (1, 2, 4, 8):
+        _, _, _, elapsed = asyncio.run(simulate(args, True, concurrency))
+        print(f"  pre-warm concurrency {concurrency}: catalog warm in {elapsed / args.scale:5.2f} s (unscaled)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Benchmark: voice activity detection on mostly-silent phone calls
+
+Synthesizes ``--calls`` calls of ``--seconds`` each: short vowel-like
+utterances separated by pauses, over quiet line noise, at 16 kHz. Audio is
+chunked into 250 ms chunks (25 ms overlap) with ``AudioRingBuffer`` and
+passed through ``VoiceActivityDetector``. Reports:
+
+- chunks sent to the provider without and with the VAD gate;
+- utterances detected vs synthesized, and how soon after the speech ends
+  ``utterance_ended`` fires (without the VAD, ``is_final`` waits for the
+  client to end the stream);
+- VAD cost per chunk.
+
+Usage:
+    python benchmarks/bench_vad.py [--calls 20] [--seconds 60] [--speech-ratio 0.3]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from trafficwise.audio_buffer import AudioRingBuffer, as_int16
+from trafficwise.vad import VoiceActivityDetector
+
+SAMPLE_RATE = 16000
+CHUNK_BYTES = SAMPLE_RATE * 2 // 4
+OVERLAP_BYTES = CHUNK_BYTES // 10
+
+
+def synthesize_call(rng, seconds, speech_ratio):
+    """int16 call audio and the (start, end) sample of each utterance"""
+    total = int(seconds * SAMPLE_RATE)
+    audio = rng.normal(0, 0.002 * 32767, total)
+    utterances = []
+    position = int(rng.uniform(0.5, 2.0) * SAMPLE_RATE)
+    mean_utterance = 2.0
+    mean_pause = mean_utterance * (1 - speech_ratio) / speech_ratio
+    while position < total:
+        length = int(rng.uniform(0.5, 1.5) * mean_utterance * SAMPLE_RATE)
+        end = min(total, position + length)
+        t = np.arange(end - position) / SAMPLE_RATE
+        pitch = rng.uniform(100, 250)
+        wave = sum(np.sin(2 * np.pi * pitch * k * t) / k for k in range(1, 5))
+        envelope = 0.5 + 0.5 * np.sin(2 * np.pi * 4 * t) ** 2
+        audio[position:end] += wave / 2.1 * envelope * rng.uniform(0.1, 0.5) * 32767
+        utterances.append((position, end))
+        position = end + int(rng.uniform(0.5, 1.5) * mean_pause * SAMPLE_RATE)
+    return np.clip(audio, -32768, 32767).astype(np.int16), utterances
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--calls", type=int, default=20)
+    parser.add_argument("--seconds", type=float, default=60.0)
+    parser.add_argument("--speech-ratio", type=float, default=0.3)
+    parser.add_argument("--seed", type=int, default=11)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    chunks = forwarded = utterances = detected = 0
+    latencies = []
+    vad_seconds = 0.0
+    for _ in range(args.calls):
+        audio, spoken = synthesize_call(rng, args.seconds, args.speech_ratio)
+        utterances += len(spoken)
+        buffer = AudioRingBuffer(CHUNK_BYTES, OVERLAP_BYTES)
+        vad = VoiceActivityDetector()
+        pending = [end for _, end in spoken]
+        for index, chunk in enumerate(buffer.feed(audio.tobytes())):
+            start = time.perf_counter()
+            decision = vad.process(as_int16(chunk))
+            vad_seconds += time.perf_counter() - start
+            chunks += 1
+            forwarded += decision.forward
+            # Samples received when this chunk completes
+            position = (index * buffer.step + CHUNK_BYTES) // 2
+            if decision.utterance_ended:
+                detected += 1
+                ended = [end for end in pending if end <= position]
+                if ended:
+                    latencies.append((position - ended[-1]) / SAMPLE_RATE * 1000)
+                    pending = [end for end in pending if end > position]
+
+    print(f"🔇 {args.calls} calls x {args.seconds:g}s, ~{args.speech_ratio:.0%} speech, 250 ms chunks")
+    print(f"  provider chunks: without VAD={chunks}  with VAD={forwarded} "
+          f"({1 - forwarded / chunks:.0%} fewer calls)")
+    print(f"  utterances: synthesized={utterances}  ended by VAD={detected}")
+    if latencies:
+        print(f"  end of speech -> utterance_ended: median={np.median(latencies):.0f} ms  "
+              f"p95={np.percentile(latencies, 95):.0f} ms (vs. waiting for the stream to close)")
+    print(f"  VAD cost: {vad_seconds / chunks * 1e6:.1f} us per 250 ms chunk")
+
+
+if __name__ == "__main__":
+    main()
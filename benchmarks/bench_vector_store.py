@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Benchmark: cold start of the persistent RAG vector store
+
+Builds indexes of random 384-dimensional embeddings (the all-MiniLM-L6-v2
+size) and measures, in a fresh subprocess per size, how long it takes to
+open the index and answer a first query, and the resident memory after
+opening and after querying.
+
+Usage:
+    python benchmarks/bench_vector_store.py [--sizes 10000 100000 1000000] [--dtype float16]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from trafficwise.vector_store import PersistentVectorStore
+
+DIM = 384
+BUILD_BATCH = 50000
+
+
+def resident_mb():
+    """Current resident set size of this process in MB (Linux)"""
+    with open("/proc/self/statm") as handle:
+        pages = int(handle.read().split()[1])
+    return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+
+
+def build(path, size, dtype):
+    store = PersistentVectorStore(path, dim=DIM, dtype=dtype, model_name="all-MiniLM-L6-v2")
+    rng = np.random.default_rng(42)
+    for start in range(store.count(), size, BUILD_BATCH):
+        rows = min(BUILD_BATCH, size - start)
+        ids = [f"chunk-{start + i}" for i in range(rows)]
+        documents = [f"Synthetic traffic note {start + i}" for i in range(rows)]
+        store.add(ids, documents, [{"source": "bench"}] * rows, rng.standard_normal((rows, DIM), dtype=np.float32))
+    store.close()
+
+
+def measure_open(path):
+    """Run in a child process: open the index, query once, report timings"""
+    baseline = resident_mb()
+    start = time.perf_counter()
+    store = PersistentVectorStore(path)
+    opened = time.perf_counter() - start
+    after_open = resident_mb()
+
+    query = np.random.default_rng(7).standard_normal(DIM, dtype=np.float32)
+    start = time.perf_counter()
+    store.query([query], n_results=3)
+    first_query = time.perf_counter() - start
+    after_query = resident_mb()
+
+    print(json.dumps({
+        "count": store.count(),
+        "open_ms": opened * 1000,
+        "first_query_ms": first_query * 1000,
+        "open_rss_delta_mb": after_open - baseline,
+        "query_rss_delta_mb": after_query - baseline,
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--dtype", default="float32", choices=["float32", "float16"])
+    parser.add_argument("--open", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.open:
+        measure_open(args.open)
+        return
+
+    print(f"📦 Vector store cold start - dim={DIM}, dtype={args.dtype}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            path = os.path.join(tmp, f"index-{size}")
+            start = time.perf_counter()
+            build(path, size, args.dtype)
+            build_seconds = time.perf_counter() - start
+
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--open", path],
+                check=True, capture_output=True, text=True,
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            disk_mb = sum(
+                os.path.getsize(os.path.join(path, name)) for name in os.listdir(path)
+            ) / (1024 * 1024)
+
+            print(f"  {size:>9,} chunks  build={build_seconds:7.1f}s  disk={disk_mb:8.1f}MB  "
+                  f"open={result['open_ms']:7.2f}ms  rss+={result['open_rss_delta_mb']:6.1f}MB  "
+                  f"first query={result['first_query_ms']:8.1f}ms  rss+={result['query_rss_delta_mb']:7.1f}MB")
+
+
+if __name__ == "__main__":
+    main()
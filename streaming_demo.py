@@ -17,6 +17,12 @@ from unittest.mock import Mock, AsyncMock
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from stt_service.models import StreamTranscriptionRequest, StreamTranscriptionResponse
+from trafficwise.audio_buffer import AudioRingBuffer, as_int16
+from trafficwise.chunk_pipeline import OrderedChunkTranscriber
+from trafficwise.framing import TranscriptFrame, negotiate_format
+from trafficwise.session_store import SessionStore
+from trafficwise.transcript import TranscriptAssembler
+from trafficwise.vad import VoiceActivityDetector
 
 
 class MockStreamingDemo:
@@ -39,7 +45,9 @@ class MockStreamingDemo:
             "session_id": self.session_id,
             "language": "en",
             "provider": "google",
-            "sample_rate": 16000
+            "sample_rate": 16000,
+            # First format from the client's preference list that the server supports
+            "wire_format": negotiate_format("binary,json")
         }
         
         print(f"📡 Session Start: {json.dumps(session_start, indent=2)}")
@@ -58,6 +66,9 @@ class MockStreamingDemo:
             "Hello world, this is a test of streaming transcription."
         ]
         
+        # Messages carry only what changed since the previous hypothesis
+        assembler = TranscriptAssembler()
+        
         for i, text in enumerate(audio_chunks):
             await asyncio.sleep(0.5)  # Simulate processing delay
             
@@ -74,9 +85,7 @@ class MockStreamingDemo:
             
             # Simulate WebSocket message
             ws_message = {
-                "type": "transcription",
-                "text": response.text,
-                "is_final": response.is_final,
+                **assembler.update(response.text, response.is_final),
                 "confidence": response.confidence,
                 "language": response.language,
                 "timestamp": response.timestamp.isoformat()
@@ -84,6 +93,10 @@ class MockStreamingDemo:
             
             print(f"🔊 Chunk {i+1}: {json.dumps(ws_message, indent=2)}")
             
+            frame = TranscriptFrame.from_message(ws_message, response.confidence, response.language)
+            print(f"   📦 {session_start['wire_format']} frame: {len(frame.encode(session_start['wire_format']))} bytes "
+                  f"(JSON: {len(frame.encode('json'))} bytes)")
+            
             if is_final:
                 print("\n✅ Final transcription received!")
         
@@ -118,6 +131,25 @@ class MockStreamingDemo:
             print(f"   Confidence: {response.confidence:.2f}")
             print()
         
+        # Whisper chunks are transcribed several at a time and reassembled in order
+        chunk_texts = ["traffic on the", "the motorway near", "near Lahore is heavy"]
+        latencies = [0.3, 0.1, 0.2]
+        
+        async def transcribe(sequence_id):
+            await asyncio.sleep(latencies[sequence_id])
+            return chunk_texts[sequence_id]
+        
+        transcriber = OrderedChunkTranscriber(transcribe, in_flight=3)
+        start = time.time()
+        results = []
+        for sequence_id in range(len(chunk_texts)):
+            results.extend(await transcriber.submit(sequence_id, sequence_id))
+        results.extend(await transcriber.drain())
+        print(f"🔀 Pipelined {len(results)} chunks in {time.time() - start:.1f}s "
+              f"(serial: {sum(latencies):.1f}s)")
+        print(f"   Ordered text: '{' '.join(result.text for result in results)}'")
+        print()
+        
         print("✅ HTTP chunk processing complete!")
         print("=" * 60)
     
@@ -167,14 +199,16 @@ class MockStreamingDemo:
             print(f"    Text: '{session_data['accumulated_text']}'")
             print()
         
-        # Session statistics
-        active_count = sum(1 for s in sessions.values() 
-                          if time.time() - s["last_activity"] <= 300)
+        # Session statistics: expiry visits only sessions whose deadline has passed
+        store = SessionStore(timeout=300, clock=time.time)
+        for session_id, session_data in sessions.items():
+            store.put(session_id, session_data, last_activity=session_data["last_activity"])
+        expired = store.expire()
         
         stats = {
-            "active_sessions": active_count,
+            "active_sessions": len(store),
             "total_sessions": len(sessions),
-            "expired_sessions": len(sessions) - active_count
+            "expired_sessions": len(expired)
         }
         
         print(f"📊 Session Statistics: {json.dumps(stats, indent=2)}")
@@ -197,39 +231,46 @@ class MockStreamingDemo:
         print(f"  Overlap Size: {overlap_size} bytes (25ms)")
         print()
         
-        # Simulate incoming audio data
-        audio_buffer = bytearray()
+        # Simulate incoming audio data into a preallocated ring buffer
+        audio_buffer = AudioRingBuffer(chunk_size, overlap_size, capacity=buffer_size)
+        vad = VoiceActivityDetector()
         chunk_counter = 0
         
         # Simulate 3 seconds of audio data arriving in chunks
         for i in range(12):  # 12 x 250ms = 3 seconds
             # Simulate incoming audio chunk
             incoming_data = b'\x00' * (chunk_size // 2)  # Simulate audio data
-            audio_buffer.extend(incoming_data)
             
             print(f"📥 Received audio chunk {i+1}: {len(incoming_data)} bytes")
-            print(f"   Buffer size: {len(audio_buffer)} bytes")
             
-            # Process when buffer is full enough
-            while len(audio_buffer) >= chunk_size:
-                # Extract chunk for processing
-                chunk_data = bytes(audio_buffer[:chunk_size])
+            # Chunks are memoryviews into the ring; the overlap is re-read, not copied
+            for chunk_data in audio_buffer.feed(incoming_data):
                 chunk_counter += 1
+                samples = as_int16(chunk_data)
                 
-                print(f"   🔄 Processing chunk {chunk_counter}: {len(chunk_data)} bytes")
+                decision = vad.process(samples)
                 
-                # Remove processed data, keeping overlap
-                audio_buffer = audio_buffer[chunk_size - overlap_size:]
+                if decision.forward and decision.speech_frames:
+                    print(f"   🔄 Processing chunk {chunk_counter}: {len(chunk_data)} bytes ({len(samples)} samples)")
+                elif decision.forward:
+                    print(f"   🔉 Forwarding trailing chunk {chunk_counter}: {len(chunk_data)} bytes (word endings)")
+                else:
+                    print(f"   🔇 Skipping silent chunk {chunk_counter}: {len(chunk_data)} bytes")
+                if decision.utterance_ended:
+                    print("   🏁 Utterance ended, finalizing transcript")
                 print(f"   📦 Buffer after processing: {len(audio_buffer)} bytes")
             
+            print(f"   Buffer size: {len(audio_buffer)} bytes")
             print()
         
         # Final chunk processing
-        if len(audio_buffer) > 0:
+        final_chunk = audio_buffer.flush()
+        if final_chunk is not None:
             chunk_counter += 1
-            print(f"🏁 Final chunk {chunk_counter}: {len(audio_buffer)} bytes")
+            print(f"🏁 Final chunk {chunk_counter}: {len(final_chunk)} bytes")
         
         print(f"✅ Processed {chunk_counter} total chunks")
+        print(f"🔇 Speech ratio: {vad.speech_ratio:.0%}, silent chunks skipped: {vad.get_stats()['chunks_dropped']}")
         print("=" * 60)
     
     def demonstrate_error_handling(self):
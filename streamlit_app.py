@@ -1,10 +1,22 @@
 
 import streamlit as st
-import folium
-from streamlit_folium import folium_static
-import requests
-import json
+import streamlit.components.v1 as components
+import os
 import time
+import uuid
+
+from trafficwise.background import get_background_executor
+from trafficwise.chat_history import ChatHistory, context_fingerprint
+from trafficwise.geo_store import load_geo_store
+from trafficwise.intents import offline_traffic_response
+from trafficwise.llm_client import get_llm_client
+from trafficwise.providers import (
+    OPENAI_MODEL, StreamInterrupted, chat_with_gemini, chat_with_openai, stream_gemini, stream_openai,
+)
+from trafficwise.rate_limit import get_gemini_rate_limiter, get_request_coalescer
+from trafficwise.response_cache import get_response_cache, make_cache_key
+from trafficwise.routing import OFFLINE_BACKEND, HedgedRouter, RouteResult, get_routing_profiles, provider_backends
+from trafficwise.traffic_map import DEFAULT_ZOOM, get_traffic_map_html
 
 # Configure page
 st.set_page_config(
@@ -14,10 +26,27 @@ st.set_page_config(
 )
 
 # Initialize session state
+# Bounded window of recent turns plus a digest of older ones (flat memory over long sessions)
 if 'chat_history' not in st.session_state:
-    st.session_state.chat_history = []
+    st.session_state.chat_history = ChatHistory()
+if 'history_page' not in st.session_state:
+    st.session_state.history_page = 0
 if 'user_input' not in st.session_state:
     st.session_state.user_input = ""
+if 'session_id' not in st.session_state:
+    st.session_state.session_id = uuid.uuid4().hex
+
+# Shared keep-alive HTTP client (one per process, reused across sessions and reruns)
+llm_client = get_llm_client()
+# Answers shared across sessions; repeated questions skip the provider round-trip
+response_cache = get_response_cache()
+# Provider calls run on a worker pool shared by all sessions, not in the UI callback
+background = get_background_executor()
+# Gemini calls wait for a per-key token (free-tier quota); identical in-flight questions share one call
+gemini_limiter = get_gemini_rate_limiter()
+coalescer = get_request_coalescer()
+# Seconds between reruns while an answer is pending
+POLL_INTERVAL = 0.5
 
 # Sidebar configuration
 st.sidebar.title("🚦 TrafficWise Urban Planner")
@@ -26,7 +55,7 @@ st.sidebar.markdown("Your AI Assistant for Traffic & Urban Planning")
 # AI Service Selection
 ai_service = st.sidebar.selectbox(
     "Choose AI Service:",
-    ["Google Gemini API", "OpenAI API", "Local RAG", "Offline Mode"]
+    ["Google Gemini API", "OpenAI API", "Smart Routing", "Local RAG", "Offline Mode"]
 )
 
 # API Configuration
@@ -49,12 +78,20 @@ elif ai_service == "OpenAI API":
     if not api_key:
         st.sidebar.warning("⚠️ Please enter your OpenAI API key")
 
+elif ai_service == "Smart Routing":
+    # Each question goes to the fastest healthy provider, hedged to the other when slow
+    gemini_api_key = st.sidebar.text_input("Google Gemini API Key:", type="password")
+    openai_api_key = st.sidebar.text_input("OpenAI API Key:", type="password")
+    api_key = gemini_api_key or openai_api_key
+    if not api_key:
+        st.sidebar.warning("⚠️ Please enter at least one API key (both enable hedging)")
+
 # Model selection for Gemini
 gemini_model = st.sidebar.selectbox(
     "Gemini Model:",
     ["gemini-1.5-flash", "gemini-1.5-pro", "gemini-pro"],
     help="Flash is faster, Pro is more capable"
-) if ai_service == "Google Gemini API" else "gemini-1.5-flash"
+) if ai_service in ("Google Gemini API", "Smart Routing") else "gemini-1.5-flash"
 
 # Temperature slider
 temperature = st.sidebar.slider(
@@ -66,314 +103,30 @@ temperature = st.sidebar.slider(
     help="Higher values provide more varied suggestions"
 )
 
+# Token streaming for the API services
+stream_responses = st.sidebar.checkbox(
+    "Stream AI responses",
+    value=True,
+    help="Show the answer while it is being generated"
+) if ai_service in ("Google Gemini API", "OpenAI API") else False
+
 # Map toggle
 show_map = st.sidebar.checkbox("Show Interactive Traffic Map", value=True)
 
-def generate_pakistan_traffic_map():
-    """Generate an interactive map of Pakistan with traffic information"""
-    # Center on Pakistan
-    m = folium.Map(location=[30.3753, 69.3451], zoom_start=6)
-    
-    # Major Pakistani cities with simulated traffic data
-    cities = [
-        {
-            "city": "Lahore", 
-            "lat": 31.582045, 
-            "lon": 74.329376, 
-            "color": "red",
-            "traffic": "Heavy",
-            "info": "Cultural capital - Heavy traffic during peak hours (7-9 AM, 5-8 PM)"
-        },
-        {
-            "city": "Karachi", 
-            "lat": 24.8607, 
-            "lon": 67.0011, 
-            "color": "darkred",
-            "traffic": "Very Heavy",
-            "info": "Economic hub - Severe congestion on main arteries"
-        },
-        {
-            "city": "Islamabad", 
-            "lat": 33.6844, 
-            "lon": 73.0479, 
-            "color": "green",
-            "traffic": "Moderate",
-            "info": "Capital city - Well-planned roads, moderate traffic"
-        },
-        {
-            "city": "Rawalpindi", 
-            "lat": 33.5651, 
-            "lon": 73.0169, 
-            "color": "orange",
-            "traffic": "Heavy",
-            "info": "Twin city - Connected to Islamabad, busy commercial area"
-        },
-        {
-            "city": "Faisalabad", 
-            "lat": 31.4187, 
-            "lon": 73.0790, 
-            "color": "blue",
-            "traffic": "Moderate",
-            "info": "Industrial city - Traffic concentrated in textile areas"
-        },
-        {
-            "city": "Peshawar", 
-            "lat": 34.0151, 
-            "lon": 71.5249, 
-            "color": "purple",
-            "traffic": "Moderate",
-            "info": "Historic city - Congestion in old city areas"
-        },
-        {
-            "city": "Multan", 
-            "lat": 30.1575, 
-            "lon": 71.5249, 
-            "color": "cadetblue",
-            "traffic": "Light",
-            "info": "City of Saints - Manageable traffic flow"
-        }
-    ]
-    
-    # Add markers for each city
-    for city in cities:
-        popup_html = f"""
-        <div style="width: 200px;">
-            <h4>{city['city']}</h4>
-            <p><b>Traffic Level:</b> {city['traffic']}</p>
-            <p>{city['info']}</p>
-            <p><i>Click for route suggestions</i></p>
-        </div>
-        """
-        
-        folium.Marker(
-            [city["lat"], city["lon"]],
-            popup=folium.Popup(popup_html, max_width=250),
-            tooltip=f"{city['city']} - {city['traffic']} Traffic",
-            icon=folium.Icon(color=city["color"], icon="car", prefix="fa")
-        ).add_to(m)
-    
-    # Add major highways
-    highway_routes = [
-        # Grand Trunk Road (Lahore to Peshawar)
-        [[31.582045, 74.329376], [33.6844, 73.0479], [34.0151, 71.5249]],
-        # Motorway (Lahore to Karachi)
-        [[31.582045, 74.329376], [31.4187, 73.0790], [30.1575, 71.5249], [24.8607, 67.0011]]
-    ]
-    
-    colors = ['blue', 'red']
-    names = ['GT Road', 'M-1/M-2 Motorway']
-    
-    for i, route in enumerate(highway_routes):
-        folium.PolyLine(
-            route,
-            color=colors[i],
-            weight=4,
-            opacity=0.7,
-            popup=f"Major Highway: {names[i]}"
-        ).add_to(m)
-    
-    return m
-
-def chat_with_gemini(user_message, temperature, api_key, model):
-    """Chat with Google Gemini API"""
-    enhanced_prompt = f"""You are a traffic and urban planning expert for Pakistan. Help with the following query: {user_message}
-
-    Consider Pakistani context including:
-    - Local traffic patterns and peak hours (7-9 AM, 5-8 PM)
-    - Public transport systems (Metro Bus, Orange Line, BRT)
-    - Weather impacts (monsoon season July-Sept, fog Dec-Feb)
-    - Cultural and religious events affecting traffic (Friday prayers, Ramadan, Eid)
-    - Infrastructure challenges and ongoing development projects
-    - Major cities: Karachi, Lahore, Islamabad, Rawalpindi, Faisalabad, Peshawar
-    - Highway systems: Motorways (M-1, M-2, M-3), GT Road, National Highways
-    
-    Provide practical, actionable advice specific to Pakistani traffic conditions.
-    """
-    
-    # Gemini API endpoint
-    url = f"https://generativelanguage.googleapis.com/v1beta/models/{model}:generateContent?key={api_key}"
-    
-    # Prepare the request payload
-    payload = {
-        "contents": [
-            {
-                "parts": [
-                    {
-                        "text": enhanced_prompt
-                    }
-                ]
-            }
-        ],
-        "generationConfig": {
-            "temperature": temperature,
-            "topK": 40,
-            "topP": 0.95,
-            "maxOutputTokens": 1024,
-        },
-        "safetySettings": [
-            {
-                "category": "HARM_CATEGORY_HARASSMENT",
-                "threshold": "BLOCK_MEDIUM_AND_ABOVE"
-            },
-            {
-                "category": "HARM_CATEGORY_HATE_SPEECH",
-                "threshold": "BLOCK_MEDIUM_AND_ABOVE"
-            },
-            {
-                "category": "HARM_CATEGORY_SEXUALLY_EXPLICIT",
-                "threshold": "BLOCK_MEDIUM_AND_ABOVE"
-            },
-            {
-                "category": "HARM_CATEGORY_DANGEROUS_CONTENT",
-                "threshold": "BLOCK_MEDIUM_AND_ABOVE"
-            }
-        ]
-    }
-    
-    headers = {
-        "Content-Type": "application/json"
-    }
-    
-    try:
-        response = requests.post(url, headers=headers, json=payload, timeout=30)
-        
-        if response.status_code == 400:
-            error_detail = response.json()
-            return f"❌ Gemini API Error 400: {error_detail.get('error', {}).get('message', 'Bad request - check your API key and request format')}"
-        elif response.status_code == 403:
-            return "❌ API Error 403: Invalid API key or insufficient permissions. Please check your Gemini API key."
-        elif response.status_code == 429:
-            return "❌ Rate Limit: Too many requests. Please wait a moment and try again."
-        elif response.status_code == 404:
-            return f"❌ Model not found: {model}. Try using 'gemini-pro' or 'gemini-1.5-flash'"
-        
-        response.raise_for_status()
-        response_data = response.json()
-        
-        # Extract the generated text from Gemini response
-        if 'candidates' in response_data and len(response_data['candidates']) > 0:
-            candidate = response_data['candidates'][0]
-            if 'content' in candidate and 'parts' in candidate['content']:
-                return candidate['content']['parts'][0]['text']
-            else:
-                return "❌ Unexpected response format from Gemini API"
-        else:
-            return "❌ No response generated. The content might have been blocked by safety filters."
-            
-    except requests.exceptions.Timeout:
-        return "❌ Request timed out. Please try again."
-    except requests.exceptions.RequestException as e:
-        return f"❌ Connection Error: {str(e)}"
-    except json.JSONDecodeError:
-        return "❌ Invalid response format from Gemini API"
-    except Exception as e:
-        return f"❌ Unexpected Error: {str(e)}"
-
-def chat_with_openai(user_message, temperature, api_key):
-    """Chat with OpenAI API"""
-    enhanced_prompt = f"""As a traffic and urban planning expert for Pakistan, help with: {user_message}"""
-    
-    headers = {
-        "Authorization": f"Bearer {api_key}",
-        "Content-Type": "application/json"
-    }
-    
-    payload = {
-        "model": "gpt-3.5-turbo",
-        "messages": [{"role": "user", "content": enhanced_prompt}],
-        "temperature": temperature,
-        "max_tokens": 1000
-    }
-    
-    try:
-        response = requests.post(
-            "https://api.openai.com/v1/chat/completions",
-            headers=headers,
-            json=payload,
-            timeout=30
-        )
-        response.raise_for_status()
-        return response.json()["choices"][0]["message"]["content"]
-    except Exception as e:
-        return f"❌ OpenAI Error: {str(e)}"
-
-def offline_traffic_response(user_message):
-    """Provide offline traffic responses using rule-based logic"""
-    user_message_lower = user_message.lower()
-    
-    # Route suggestions
-    if any(word in user_message_lower for word in ['route', 'road', 'path', 'way']):
-        return """🛣️ **Route Planning Tips for Pakistan:**
-
-**Major Cities Routes:**
-- **Lahore to Islamabad**: Use Motorway M-2 (3.5 hours) - fastest option
-- **Karachi to Lahore**: M-9 to M-2 Motorway (18-20 hours) - avoid GT Road
-- **Islamabad to Peshawar**: M-1 Motorway (2 hours) - safer than GT Road
-
-**Peak Hours to Avoid:**
-- Morning: 7:00-9:30 AM
-- Evening: 4:30-7:30 PM
-- Friday: 12:00-2:00 PM (Jumma prayers)
-
-**Monsoon Season (July-September):**
-- Check weather before traveling
-- Avoid underpass areas in Karachi, Lahore
-- Keep emergency kit in car"""
-
-    elif any(word in user_message_lower for word in ['congestion', 'traffic jam', 'heavy traffic']):
-        return """🚦 **Congestion Management:**
-
-**Most Congested Areas:**
-- Karachi: Shahrah-e-Faisal, I.I. Chundrigar Road
-- Lahore: Mall Road, Canal Road, Ring Road
-- Islamabad: Blue Area, Margalla Road during office hours
-
-**Solutions:**
-1. **Use Apps**: Google Maps, Careem for real-time traffic
-2. **Alternative Transport**: Metro Bus (Lahore, Rawalpindi, Islamabad)
-3. **Time Management**: Travel 30 minutes earlier/later
-4. **Carpooling**: Share rides during peak hours"""
-
-    elif any(word in user_message_lower for word in ['public transport', 'metro', 'bus']):
-        return """🚌 **Public Transport in Pakistan:**
-
-**Metro Systems:**
-- **Lahore**: Orange Line Metro Train + Metro Bus
-- **Rawalpindi-Islamabad**: Metro Bus Service
-- **Karachi**: Green Line BRT (operational)
-
-**Benefits:**
-- Cost-effective (Rs. 15-40 per ride)
-- Dedicated lanes avoid traffic
-- Air-conditioned comfort
-- Environmentally friendly
-
-**Tips:**
-- Buy rechargeable cards for convenience
-- Avoid peak hours if possible
-- Check route maps on official apps"""
-
-    else:
-        return """🚦 **TrafficWise Pakistan - General Tips:**
-
-**Smart Travel:**
-- Use GPS navigation (Google Maps, Waze)
-- Check traffic conditions before leaving
-- Keep fuel tank at least half full
-- Carry emergency contact numbers
-
-**Safety First:**
-- Follow speed limits (120 km/h on motorways)
-- Use seat belts always
-- Avoid using phone while driving
-- Keep vehicle documents updated
-
-**Cultural Considerations:**
-- Prayer times affect traffic flow
-- Ramadan timings change traffic patterns
-- Wedding seasons (winter) increase congestion
-
-How can I help you with specific route or traffic planning?"""
+# Optional road network (GeoJSON or CSV) drawn as clustered, simplified layers
+TRAFFIC_NETWORK_PATH = os.getenv("TRAFFIC_NETWORK_PATH", "")
+traffic_network = load_geo_store(TRAFFIC_NETWORK_PATH) if show_map and TRAFFIC_NETWORK_PATH else None
+map_zoom = st.sidebar.slider(
+    "Map detail (zoom)", min_value=5, max_value=12, value=DEFAULT_ZOOM
+) if traffic_network is not None else DEFAULT_ZOOM
+
+# Model identifier used in response cache keys
+if ai_service == "Google Gemini API":
+    cache_model = f"gemini:{gemini_model}"
+elif ai_service == "Smart Routing":
+    cache_model = f"routing:{gemini_model}+{OPENAI_MODEL}"
+else:
+    cache_model = f"openai:{OPENAI_MODEL}"
 
 def local_rag_response(user_message):
     """Simulate RAG-based response using local knowledge base"""
@@ -411,8 +164,23 @@ with col1:
     - 🚌 Public Transport Integration
     """)
 
-    # Display chat history
-    for message in st.session_state.chat_history:
+    # Display chat history, one page at a time (page 0 = most recent)
+    chat_history = st.session_state.chat_history
+    if chat_history.digest:
+        with st.expander(f"🗂️ Earlier conversation ({chat_history.folded} messages summarized)"):
+            st.text(chat_history.digest)
+    page_count = chat_history.page_count()
+    st.session_state.history_page = min(st.session_state.history_page, page_count - 1)
+    if page_count > 1:
+        older_col, page_col, newer_col = st.columns([1, 2, 1])
+        if older_col.button("⬆️ Earlier", disabled=st.session_state.history_page >= page_count - 1):
+            st.session_state.history_page += 1
+            st.rerun()
+        page_col.caption(f"Page {page_count - st.session_state.history_page} of {page_count}")
+        if newer_col.button("⬇️ Newer", disabled=st.session_state.history_page == 0):
+            st.session_state.history_page -= 1
+            st.rerun()
+    for message in chat_history.page(st.session_state.history_page):
         role = message["role"]
         content = message["content"]
         
@@ -422,23 +190,106 @@ with col1:
             st.markdown(f"**🚦 TrafficWise:** {content}")
         st.markdown("---")
 
+    def render_pending_request():
+        """Show the pending answer (partial tokens while streaming) and collect it when done"""
+        handle = background.get(st.session_state.session_id)
+        if handle is None:
+            return
+        if not handle.done:
+            partial = handle.text
+            if partial:
+                st.markdown(f"**🚦 TrafficWise:** {partial}▌")
+            else:
+                st.markdown("**🚦 TrafficWise:** 🤖 Analyzing traffic patterns with AI...")
+            return
+
+        finished = background.pop_finished(st.session_state.session_id)
+        pending = st.session_state.pop("pending_request", None)
+        if finished is not None:
+            routed_backend = None
+            completed = True
+            try:
+                response = finished.result()
+            except StreamInterrupted as e:
+                # The stream broke off mid-answer; the partial text is not an answer
+                completed, response = False, str(e)
+            except Exception as e:
+                completed, response = False, f"❌ Error: {str(e)}"
+            if isinstance(response, RouteResult):
+                routed_backend, response = response.backend, response.text
+            # Only answers that finished cleanly are cached; offline deadline fallbacks are not provider answers
+            if pending is not None and completed and routed_backend != OFFLINE_BACKEND:
+                response_cache.put(pending["prompt"], pending["cache_model"], pending["temperature"], response)
+            st.session_state.chat_history.append({"role": "assistant", "content": response})
+        st.rerun()
+
+    # Poll the background request without blocking this session's script thread
+    if background.get(st.session_state.session_id) is not None:
+        if hasattr(st, "fragment"):
+            st.fragment(render_pending_request, run_every=POLL_INTERVAL)()
+        else:
+            render_pending_request()
+            time.sleep(POLL_INTERVAL)
+            st.rerun()
+
     # Chat input
     def submit_message():
         if st.session_state.user_input:
             user_message = st.session_state.user_input
+            # Earlier turns within the token budget, sent as multi-turn context
+            context = st.session_state.chat_history.context()
             st.session_state.chat_history.append({"role": "user", "content": user_message})
-            
-            with st.spinner('🤖 Analyzing traffic patterns with AI...'):
-                # Choose response method based on selected service
-                if ai_service == "Google Gemini API" and 'api_key' in locals() and api_key:
-                    response = chat_with_gemini(user_message, temperature, api_key, gemini_model)
-                elif ai_service == "OpenAI API" and 'api_key' in locals() and api_key:
-                    response = chat_with_openai(user_message, temperature, api_key)
-                elif ai_service == "Local RAG":
-                    response = local_rag_response(user_message)
+            st.session_state.history_page = 0
+            # Follow-up questions only share cached answers when asked in the same context
+            turn_model = f"{cache_model}|ctx:{context_fingerprint(context)}" if context else cache_model
+            has_api_key = 'api_key' in globals() and api_key
+            uses_api = has_api_key and ai_service in ("Google Gemini API", "OpenAI API", "Smart Routing")
+
+            if uses_api:
+                cached_response = response_cache.get(user_message, turn_model, temperature)
+                if cached_response is not None:
+                    st.session_state.chat_history.append({"role": "assistant", "content": cached_response})
+                    st.session_state.user_input = ""
+                    return
+
+            # API calls run in the background; submitting again cancels this session's previous call
+            if uses_api:
+                if ai_service == "Smart Routing":
+                    router = HedgedRouter(provider_backends(
+                        temperature, gemini_api_key, openai_api_key, gemini_model,
+                        client=llm_client, gemini_limiter=gemini_limiter, history=context
+                    ))
+                    call, args, kwargs = router.route, (user_message,), {}
+                elif ai_service == "Google Gemini API":
+                    call = stream_gemini if stream_responses else chat_with_gemini
+                    args = (user_message, temperature, api_key, gemini_model)
+                    kwargs = {"client": llm_client, "limiter": gemini_limiter, "history": context}
                 else:
-                    response = offline_traffic_response(user_message)
-            
+                    call = stream_openai if stream_responses else chat_with_openai
+                    args = (user_message, temperature, api_key)
+                    kwargs = {"client": llm_client, "history": context}
+                if not stream_responses and ai_service != "Smart Routing":
+                    # The same question in flight from another session shares its upstream call
+                    args = (make_cache_key(user_message, turn_model, temperature), call) + args
+                    call = coalescer.call
+                background.submit(
+                    st.session_state.session_id, call, *args,
+                    stream=stream_responses, lane=ai_service, **kwargs
+                )
+                st.session_state.pending_request = {
+                    "prompt": user_message,
+                    "cache_model": turn_model,
+                    "temperature": temperature,
+                }
+                st.session_state.user_input = ""
+                return
+
+            # Local answers are instant and stay on the script thread
+            if ai_service == "Local RAG":
+                response = local_rag_response(user_message)
+            else:
+                response = offline_traffic_response(user_message)
+
             st.session_state.chat_history.append({"role": "assistant", "content": response})
             st.session_state.user_input = ""
 
@@ -450,7 +301,10 @@ with col1:
     )
 
     if st.button("🗑️ Clear Chat"):
-        st.session_state.chat_history = []
+        background.cancel(st.session_state.session_id)
+        st.session_state.pop("pending_request", None)
+        st.session_state.chat_history.clear()
+        st.session_state.history_page = 0
 
     # API Status indicator
     if ai_service == "Google Gemini API":
@@ -462,7 +316,54 @@ with col1:
 with col2:
     if show_map:
         st.subheader("🗺️ Pakistan Traffic Map")
-        folium_static(generate_pakistan_traffic_map(), width=400, height=500)
+        # Rendered once per map data version; reruns reuse the cached HTML
+        components.html(
+            get_traffic_map_html(store=traffic_network, zoom=map_zoom),
+            width=400,
+            height=510,
+        )
+
+# Response cache statistics
+with st.sidebar.expander("📊 Response Cache"):
+    cache_stats = response_cache.get_stats()
+    st.markdown(f"""
+- **Hit rate:** {cache_stats['hit_rate']:.0%} ({cache_stats['hits']} hits / {cache_stats['misses']} misses)
+- **Memory / disk hits:** {cache_stats['memory_hits']} / {cache_stats['disk_hits']}
+- **Entries:** {cache_stats['entries']} ({cache_stats['bytes'] / 1024:.1f} KB of {cache_stats['max_bytes'] / 1024 / 1024:.0f} MB)
+""")
+
+# Gemini free-tier quota: client-side token bucket per API key and request coalescing
+with st.sidebar.expander("⏳ Rate Limiting"):
+    limiter_stats = gemini_limiter.get_stats()
+    coalescer_stats = coalescer.get_stats()
+    st.markdown(f"""
+- **Gemini quota:** {gemini_limiter.requests_per_minute} requests/min per key (burst {gemini_limiter.burst})
+- **Queue wait:** mean {limiter_stats['mean_queue_wait_ms']:.0f} ms, max {limiter_stats['max_queue_wait_ms']:.0f} ms ({limiter_stats['waiting']} waiting)
+- **Rejected / Retry-After pauses:** {limiter_stats['rejected']} / {limiter_stats['retry_after_pauses']}
+- **Coalesced:** {coalescer_stats['coalesced_ratio']:.0%} of {coalescer_stats['calls']} requests
+""")
+
+# Smart Routing: rolling latency/error profile per backend
+if ai_service == "Smart Routing":
+    with st.sidebar.expander("🧭 Smart Routing"):
+        routing_stats = get_routing_profiles().get_stats()
+        for name, profile in routing_stats["backends"].items():
+            p50 = f"{profile['p50_ms']:.0f} ms" if profile["p50_ms"] is not None else "n/a"
+            p95 = f"{profile['p95_ms']:.0f} ms" if profile["p95_ms"] is not None else "n/a"
+            st.markdown(f"- **{name}:** p50 {p50}, p95 {p95}, errors {profile['error_rate']:.0%}")
+        st.markdown(
+            f"- **Hedged:** {routing_stats['hedge_rate']:.0%} of {routing_stats['routed']} questions, "
+            f"**failovers:** {routing_stats['failovers']}, **offline fallbacks:** {routing_stats['fallbacks']}"
+        )
+
+# Background worker pool statistics (shared by all sessions in this process)
+with st.sidebar.expander("⚙️ Background Requests"):
+    worker_stats = background.get_stats()
+    st.markdown(f"""
+- **In flight:** {worker_stats['in_flight']} (limit {background.max_pending}, {background.max_workers} workers)
+- **Mean queue wait:** {worker_stats['mean_queue_wait_ms']:.0f} ms
+- **Completed / cancelled / rejected:** {worker_stats['completed']} / {worker_stats['cancelled']} / {worker_stats['rejected']}
+""")
 
 # Sidebar information
 st.sidebar.markdown("---")
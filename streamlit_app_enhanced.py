@@ -1,11 +1,32 @@
 import streamlit as st
-import folium
-from streamlit_folium import folium_static
-import requests
-import json
+import streamlit.components.v1 as components
+import hashlib
+import os
 import time
-from sentence_transformers import SentenceTransformer
-import chromadb
+import uuid
+
+from trafficwise.background import get_background_executor
+from trafficwise.chat_history import ChatHistory, context_fingerprint
+from trafficwise.embeddings import LazyEmbedder
+from trafficwise.geo_store import load_geo_store
+from trafficwise.ingestion import IngestionPipeline, InvalidDocumentError
+from trafficwise.intents import offline_traffic_response
+from trafficwise.prompts import PromptTooLongError, build_rag_prompt
+from trafficwise.providers import OPENAI_MODEL, chat_with_gemini, chat_with_openai
+from trafficwise.rate_limit import get_gemini_rate_limiter, get_request_coalescer
+from trafficwise.response_cache import get_response_cache, make_cache_key
+from trafficwise.retrievers import ChromaRetriever
+from trafficwise.traffic_map import DEFAULT_ZOOM, get_traffic_map_html
+from trafficwise.vector_store import DEFAULT_INDEX_PATH, PersistentVectorStore
+
+EMBEDDING_MODEL = 'all-MiniLM-L6-v2'
+# Set RAG_INDEX_PATH to an empty string to use an in-memory Chroma collection instead
+RAG_INDEX_PATH = DEFAULT_INDEX_PATH
+# "flat" (exact) or "ivf" (k-means cells) search over the persistent index
+RAG_RETRIEVER = os.getenv("RAG_RETRIEVER", "flat")
+
+# Wall-clock cost of this script run, reported per AI service in the sidebar
+run_started = time.perf_counter()
 
 # Configure page
 st.set_page_config(
@@ -15,21 +36,58 @@ st.set_page_config(
 )
 
 # Initialize session state
+# Bounded window of recent turns plus a digest of older ones (flat memory over long sessions)
 if 'chat_history' not in st.session_state:
-    st.session_state.chat_history = []
+    st.session_state.chat_history = ChatHistory()
+if 'history_page' not in st.session_state:
+    st.session_state.history_page = 0
 if 'user_input' not in st.session_state:
     st.session_state.user_input = ""
+if 'session_id' not in st.session_state:
+    st.session_state.session_id = uuid.uuid4().hex
+
+if 'run_timings' not in st.session_state:
+    st.session_state.run_timings = {}
 
 # Initialize vector database and embedding model
 @st.cache_resource
 def initialize_rag():
-    model = SentenceTransformer('all-MiniLM-L6-v2')
-    client = chromadb.Client()
-    collection = client.get_or_create_collection("traffic_data")
+    # The SentenceTransformer is only loaded on first RAG query or upload
+    model = LazyEmbedder(EMBEDDING_MODEL)
+    if RAG_INDEX_PATH:
+        # Persistent index: reopens instantly after a restart, no re-embedding
+        collection = PersistentVectorStore(RAG_INDEX_PATH, model_name=EMBEDDING_MODEL)
+    else:
+        import chromadb
+
+        client = chromadb.Client()
+        collection = client.get_or_create_collection("traffic_data")
     return model, collection
 
 model, collection = initialize_rag()
 
+@st.cache_resource
+def initialize_retriever(_collection):
+    """Pick the search backend: NumPy (flat/ivf) for the persistent index, else Chroma"""
+    if isinstance(_collection, PersistentVectorStore):
+        return _collection.retriever("ivf" if RAG_RETRIEVER == "ivf" else "flat")
+    return ChromaRetriever(_collection)
+
+retriever = initialize_retriever(collection)
+
+# Shared answer cache; once RAG has loaded the embedding model it also matches
+# near-duplicate questions (never loads the model just for the cache)
+response_cache = get_response_cache()
+response_cache.set_embedder(model.encode_query if model.is_loaded else None)
+
+# Provider calls run on a worker pool shared by all sessions, not in the UI callback
+background = get_background_executor()
+# Gemini calls wait for a per-key token (free-tier quota); identical in-flight questions share one call
+gemini_limiter = get_gemini_rate_limiter()
+coalescer = get_request_coalescer()
+# Seconds between reruns while an answer is pending
+POLL_INTERVAL = 0.5
+
 # Sidebar configuration
 st.sidebar.title("🚦 TrafficWise Urban Planner")
 st.sidebar.markdown("Your AI Assistant for Traffic & Urban Planning")
@@ -63,24 +121,59 @@ temperature = st.sidebar.slider(
 # Map toggle
 show_map = st.sidebar.checkbox("Show Interactive Traffic Map", value=True)
 
+# Optional road network (GeoJSON or CSV) drawn as clustered, simplified layers
+TRAFFIC_NETWORK_PATH = os.getenv("TRAFFIC_NETWORK_PATH", "")
+traffic_network = load_geo_store(TRAFFIC_NETWORK_PATH) if show_map and TRAFFIC_NETWORK_PATH else None
+map_zoom = st.sidebar.slider(
+    "Map detail (zoom)", min_value=5, max_value=12, value=DEFAULT_ZOOM
+) if traffic_network is not None else DEFAULT_ZOOM
+
 # Upload new documents to the knowledge base
+ingestion = IngestionPipeline(model, collection)
+if 'ingested_uploads' not in st.session_state:
+    st.session_state.ingested_uploads = {}
+
+st.sidebar.caption(
+    f"📦 Knowledge base: {collection.count()} chunks "
+    f"({'persistent at ' + RAG_INDEX_PATH if RAG_INDEX_PATH else 'in-memory'})"
+)
 uploaded_file = st.sidebar.file_uploader("Upload Traffic Data", type=["txt", "json"])
 if uploaded_file:
-    new_data = uploaded_file.read().decode("utf-8")
-    embedding = model.encode(new_data)
-    collection.add(
-        documents=[new_data],
-        metadatas=[{"source": "uploaded"}],
-        ids=[str(time.time())]
-    )
-    st.sidebar.success("✅ Data added to knowledge base!")
+    # The uploader keeps the file attached across reruns; ingest each upload once
+    file_bytes = uploaded_file.getvalue()
+    upload_hash = hashlib.sha256(file_bytes).hexdigest()
+    if upload_hash not in st.session_state.ingested_uploads:
+        with st.sidebar, st.spinner("📥 Indexing document..."):
+            try:
+                report = ingestion.ingest_upload(uploaded_file.name, file_bytes)
+            except InvalidDocumentError as e:
+                # Remembered like a report, so a bad file is not parsed again on every rerun
+                report = e
+            st.session_state.ingested_uploads[upload_hash] = report
+    report = st.session_state.ingested_uploads[upload_hash]
+    if isinstance(report, InvalidDocumentError):
+        st.sidebar.warning(f"⚠️ File skipped: {report}")
+    else:
+        st.sidebar.success(f"✅ Data added to knowledge base! {report.summary()}")
+
+bulk_directory = st.sidebar.text_input("Bulk import directory (TXT/JSON):")
+if bulk_directory and st.sidebar.button("📚 Import Directory"):
+    if os.path.isdir(bulk_directory):
+        with st.sidebar, st.spinner("📥 Indexing directory..."):
+            report = ingestion.ingest_directory(bulk_directory)
+        st.sidebar.success(f"✅ {report.files} files imported: {report.summary()}")
+        for skipped in report.skipped_files:
+            st.sidebar.warning(f"⚠️ File skipped: {skipped}")
+    else:
+        st.sidebar.error(f"❌ Directory not found: {bulk_directory}")
 
 # RAG-based response generation
 def retrieve_documents(query, top_k=3):
     """Retrieve relevant documents from the vector database."""
-    query_embedding = model.encode(query)
-    results = collection.query(query_embeddings=[query_embedding], n_results=top_k)
-    return [result["document"] for result in results["documents"]]
+    if collection.count() == 0:
+        return []
+    query_embedding = [model.encode_query(query)]
+    return [chunk.document for chunk in retriever.search(query_embedding, top_k)[0]]
 
 def local_rag_response(user_message):
     """Generate a response using RAG."""
@@ -88,16 +181,11 @@ def local_rag_response(user_message):
     if not retrieved_docs:
         return "❌ No relevant information found in the knowledge base."
     
-    context = "\n".join(retrieved_docs)
-    enhanced_prompt = f"""You are a senior traffic and urban planning consultant specializing in Pakistani cities. Use the following knowledge base to answer the query:
-
-### Knowledge Base:
-{context}
-
-### Query:
-{user_message}
-
-### Response:"""
+    # Retrieved chunks are trimmed to the RAG context budget (best match first)
+    try:
+        enhanced_prompt = build_rag_prompt(user_message, retrieved_docs)
+    except PromptTooLongError as e:
+        return f"❌ {e}"
     
     # Simulate response generation
     return f"""📚 **RAG-Enhanced Response:**
@@ -120,8 +208,23 @@ with col1:
     - 🚌 Public Transport Integration
     """)
 
-    # Display chat history
-    for message in st.session_state.chat_history:
+    # Display chat history, one page at a time (page 0 = most recent)
+    chat_history = st.session_state.chat_history
+    if chat_history.digest:
+        with st.expander(f"🗂️ Earlier conversation ({chat_history.folded} messages summarized)"):
+            st.text(chat_history.digest)
+    page_count = chat_history.page_count()
+    st.session_state.history_page = min(st.session_state.history_page, page_count - 1)
+    if page_count > 1:
+        older_col, page_col, newer_col = st.columns([1, 2, 1])
+        if older_col.button("⬆️ Earlier", disabled=st.session_state.history_page >= page_count - 1):
+            st.session_state.history_page += 1
+            st.rerun()
+        page_col.caption(f"Page {page_count - st.session_state.history_page} of {page_count}")
+        if newer_col.button("⬇️ Newer", disabled=st.session_state.history_page == 0):
+            st.session_state.history_page -= 1
+            st.rerun()
+    for message in chat_history.page(st.session_state.history_page):
         role = message["role"]
         content = message["content"]
         
@@ -131,21 +234,81 @@ with col1:
             st.markdown(f"**🚦 TrafficWise:** {content}")
         st.markdown("---")
 
+    def render_pending_request():
+        """Show a placeholder while the background answer is pending and collect it when done"""
+        handle = background.get(st.session_state.session_id)
+        if handle is None:
+            return
+        if not handle.done:
+            st.markdown("**🚦 TrafficWise:** 🤖 Analyzing traffic patterns with AI...")
+            return
+
+        finished = background.pop_finished(st.session_state.session_id)
+        pending = st.session_state.pop("pending_request", None)
+        if finished is not None:
+            try:
+                response = finished.result()
+            except Exception as e:
+                response = f"❌ Error: {str(e)}"
+            if pending is not None:
+                response_cache.put(pending["prompt"], pending["cache_model"], pending["temperature"], response)
+            st.session_state.chat_history.append({"role": "assistant", "content": response})
+        st.rerun()
+
+    # Poll the background request without blocking this session's script thread
+    if background.get(st.session_state.session_id) is not None:
+        if hasattr(st, "fragment"):
+            st.fragment(render_pending_request, run_every=POLL_INTERVAL)()
+        else:
+            render_pending_request()
+            time.sleep(POLL_INTERVAL)
+            st.rerun()
+
     # Chat input
     def submit_message():
         if st.session_state.user_input:
             user_message = st.session_state.user_input
+            # Earlier turns within the token budget, sent as multi-turn context
+            context = st.session_state.chat_history.context()
             st.session_state.chat_history.append({"role": "user", "content": user_message})
+            st.session_state.history_page = 0
             
-            with st.spinner('🤖 Analyzing traffic patterns with AI...'):
-                if ai_service == "Google Gemini API" and api_key:
-                    response = chat_with_gemini(user_message, temperature, api_key, "gemini-1.5-flash")
-                elif ai_service == "OpenAI API" and api_key:
-                    response = chat_with_openai(user_message, temperature, api_key)
-                elif ai_service == "Local RAG":
-                    response = local_rag_response(user_message)
+            cache_model = "gemini:gemini-1.5-flash" if ai_service == "Google Gemini API" else f"openai:{OPENAI_MODEL}"
+            # Follow-up questions only share cached answers when asked in the same context
+            if context:
+                cache_model = f"{cache_model}|ctx:{context_fingerprint(context)}"
+            uses_api = ai_service in ("Google Gemini API", "OpenAI API") and api_key
+            response = response_cache.get(user_message, cache_model, temperature) if uses_api else None
+
+            # API calls run in the background; submitting again cancels this session's previous call
+            if response is None and uses_api:
+                # The same question in flight from another session shares its upstream call
+                coalesce_key = make_cache_key(user_message, cache_model, temperature)
+                if ai_service == "Google Gemini API":
+                    background.submit(
+                        st.session_state.session_id, coalescer.call, coalesce_key, chat_with_gemini,
+                        user_message, temperature, api_key, "gemini-1.5-flash",
+                        lane=ai_service, limiter=gemini_limiter, history=context
+                    )
                 else:
-                    response = offline_traffic_response(user_message)
+                    background.submit(
+                        st.session_state.session_id, coalescer.call, coalesce_key, chat_with_openai,
+                        user_message, temperature, api_key, lane=ai_service, history=context
+                    )
+                st.session_state.pending_request = {
+                    "prompt": user_message,
+                    "cache_model": cache_model,
+                    "temperature": temperature,
+                }
+                st.session_state.user_input = ""
+                return
+
+            if response is None:
+                with st.spinner('🤖 Analyzing traffic patterns with AI...'):
+                    if ai_service == "Local RAG":
+                        response = local_rag_response(user_message)
+                    else:
+                        response = offline_traffic_response(user_message)
             
             st.session_state.chat_history.append({"role": "assistant", "content": response})
             st.session_state.user_input = ""
@@ -158,13 +321,42 @@ with col1:
     )
 
     if st.button("🗑️ Clear Chat"):
-        st.session_state.chat_history = []
+        background.cancel(st.session_state.session_id)
+        st.session_state.pop("pending_request", None)
+        st.session_state.chat_history.clear()
+        st.session_state.history_page = 0
 
 with col2:
     if show_map:
         st.subheader("🗺️ Pakistan Traffic Map")
-        folium_static(generate_pakistan_traffic_map(), width=400, height=500)
+        # Rendered once per map data version; reruns reuse the cached HTML
+        components.html(
+            get_traffic_map_html(store=traffic_network, zoom=map_zoom),
+            width=400,
+            height=510,
+        )
 
 # Footer
 st.markdown("---")
-st.markdown("🚦 **TrafficWise Pakistan** - Powered by RAG | Smart Traffic Solutions for Pakistani Cities")
\ No newline at end of file
+st.markdown("🚦 **TrafficWise Pakistan** - Powered by RAG | Smart Traffic Solutions for Pakistani Cities")
+# Performance instrumentation: script run time per AI service and RAG encode cost
+run_ms = (time.perf_counter() - run_started) * 1000
+timing = st.session_state.run_timings.setdefault(ai_service, {"first_run_ms": run_ms, "runs": 0})
+timing["runs"] += 1
+timing["last_run_ms"] = run_ms
+
+with st.sidebar.expander("⏱️ Performance"):
+    for service, service_timing in st.session_state.run_timings.items():
+        st.markdown(
+            f"- **{service}:** first run {service_timing['first_run_ms']:.0f} ms, "
+            f"last run {service_timing['last_run_ms']:.0f} ms ({service_timing['runs']} runs)"
+        )
+    embedder_stats = model.get_stats()
+    if embedder_stats["loaded"]:
+        st.markdown(f"- **Embedding model:** loaded in {embedder_stats['load_seconds']:.2f} s")
+    else:
+        st.markdown("- **Embedding model:** not loaded yet")
+    st.markdown(
+        f"- **Query embeddings:** {embedder_stats['query_hits']} cached / {embedder_stats['query_misses']} encoded, "
+        f"{embedder_stats['mean_encode_ms']:.1f} ms per encode"
+    )
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Test script for the streaming audio ring buffer
+"""
+
+import sys
+import os
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+
+from trafficwise.audio_buffer import AudioRingBuffer, as_int16
+
+
+def reslice_chunks(frames, chunk_size, overlap_size):
+    """Chunks as produced by the original bytearray reslicing loop"""
+    buffer = bytearray()
+    chunks = []
+    for frame in frames:
+        buffer.extend(frame)
+        while len(buffer) >= chunk_size:
+            chunks.append(bytes(buffer[:chunk_size]))
+            buffer = buffer[chunk_size - overlap_size:]
+    if buffer:
+        chunks.append(bytes(buffer))
+    return chunks
+
+
+def ring_chunks(frames, ring):
+    chunks = [bytes(chunk) for frame in frames for chunk in ring.feed(frame)]
+    final = ring.flush()
+    if final is not None:
+        chunks.append(bytes(final))
+    return chunks
+
+
+def test_matches_reslicing():
+    """Test chunks and overlap match the bytearray loop, across wrap-around and frame sizes"""
+    print("Testing chunk equivalence...")
+
+    rng = np.random.default_rng(7)
+    for chunk_size, overlap_size, capacity, frame_size in [
+        (8000, 800, 32000, 4000),
+        (8000, 800, 8000, 640),
+        (8000, 800, 10002, 3334),
+        (320, 0, 320, 1000),
+        (640, 64, 1280, 20000),
+    ]:
+        frames = [rng.integers(0, 256, frame_size, dtype=np.uint8).tobytes() for _ in range(25)]
+        ring = AudioRingBuffer(chunk_size, overlap_size, capacity=capacity)
+        assert ring_chunks(frames, ring) == reslice_chunks(frames, chunk_size, overlap_size)
+        assert len(ring) == 0
+
+    print("✅ Chunk equivalence test passed")
+
+
+def test_zero_copy_views():
+    """Test chunks are views into the preallocated storage and int16 views share it"""
+    print("Testing zero-copy views...")
+
+    ring = AudioRingBuffer(8, 2, capacity=16)
+    storage = ring._storage
+    samples = np.arange(20, dtype=np.int16)
+    chunks = []
+    for chunk in ring.feed(samples.tobytes()):
+        assert isinstance(chunk, memoryview) and chunk.obj is storage
+        view = as_int16(chunk)
+        assert not view.flags.owndata
+        chunks.append(view.tolist())
+    assert chunks == [[0, 1, 2, 3], [3, 4, 5, 6], [6, 7, 8, 9], [9, 10, 11, 12],
+                      [12, 13, 14, 15], [15, 16, 17, 18]]
+    assert ring._storage is storage
+    assert as_int16(ring.flush()).tolist() == [18, 19]
+    assert ring.flush() is None
+
+    print("✅ Zero-copy view test passed")
+
+
+def test_write_and_validation():
+    """Test partial writes when full and rejected configurations"""
+    print("Testing writes and validation...")
+
+    ring = AudioRingBuffer(4, 0, capacity=8)
+    assert ring.write(b"abcdefghij") == 8
+    assert ring.free == 0 and ring.write(b"k") == 0
+    assert bytes(ring.next_chunk()) == b"abcd"
+    assert ring.write(b"klmnop") == 4
+    assert bytes(ring.next_chunk()) == b"efgh"
+    assert bytes(ring.next_chunk()) == b"klmn"
+    assert ring.next_chunk() is None and len(ring) == 0
+    assert ring.chunks_emitted == 3
+
+    for kwargs in ({"chunk_size": 3}, {"chunk_size": 8, "overlap_size": 8},
+                   {"chunk_size": 8, "overlap_size": 3}, {"chunk_size": 8, "capacity": 6}):
+        try:
+            AudioRingBuffer(**kwargs)
+            raise AssertionError(f"expected ValueError for {kwargs}")
+        except ValueError:
+            pass
+
+    print("✅ Write and validation test passed")
+
+
+def main():
+    """Run all tests"""
+    print("Running audio buffer tests...\n")
+
+    try:
+        test_matches_reslicing()
+        test_zero_copy_views()
+        test_write_and_validation()
+
+        print("\n🎉 All audio buffer tests passed!")
+
+    except Exception as e:
+        print(f"\n❌ Test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Test script for the background LLM executor
+"""
+
+import sys
+import os
+import threading
+import time
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from trafficwise.background import BUSY_MESSAGE, BackgroundExecutor
+
+
+def slow_answer(text, delay):
+    time.sleep(delay)
+    return text
+
+
+def test_submit_and_poll():
+    """Test a request completes in the background and can be collected once"""
+    print("Testing submit and poll...")
+
+    executor = BackgroundExecutor(max_workers=2, max_pending=4)
+    handle = executor.submit("s1", slow_answer, "Take the M-2", 0.05)
+    assert not handle.done
+    assert handle.result(timeout=2) == "Take the M-2"
+    assert executor.pop_finished("s1") is handle
+    assert executor.pop_finished("s1") is None
+    assert executor.get_stats()["completed"] == 1
+    executor.shutdown()
+
+    print("✅ Submit and poll test passed")
+
+
+def test_resubmit_cancels_previous():
+    """Test a new submission cancels the session's previous request"""
+    print("Testing cancellation on resubmit...")
+
+    executor = BackgroundExecutor(max_workers=1, max_pending=4)
+    blocker = executor.submit("other", slow_answer, "busy", 0.2)
+    queued = executor.submit("s1", slow_answer, "first", 0.0)
+    latest = executor.submit("s1", slow_answer, "second", 0.0)
+
+    assert queued.done and queued.cancelled and queued.result() is None
+    assert latest.result(timeout=2) == "second"
+    assert blocker.result(timeout=2) == "busy"
+
+    running = executor.submit("s2", slow_answer, "stale", 0.2)
+    time.sleep(0.05)
+    executor.submit("s2", slow_answer, "fresh", 0.0)
+    assert running.result(timeout=2) is None
+    assert executor.get("s2").result(timeout=2) == "fresh"
+    assert executor.get_stats()["cancelled"] == 2
+    executor.shutdown()
+
+    print("✅ Cancellation test passed")
+
+
+def test_stream_collects_and_stops():
+    """Test token streams fill handle.text and stop when cancelled"""
+    print("Testing streaming requests...")
+
+    executor = BackgroundExecutor(max_workers=2, max_pending=4)
+    closed = threading.Event()
+
+    def tokens(words, delay):
+        try:
+            for word in words:
+                time.sleep(delay)
+                yield word
+        finally:
+            closed.set()
+
+    handle = executor.submit("s1", tokens, ["Use ", "the ", "Metro"], 0.01, stream=True)
+    assert handle.result(timeout=2) == "Use the Metro"
+
+    closed.clear()
+    endless = executor.submit("s2", tokens, ["jam "] * 1000, 0.01, stream=True)
+    time.sleep(0.05)
+    assert endless.text.startswith("jam")
+    executor.cancel("s2")
+    assert closed.wait(1)
+    assert endless.result(timeout=2) is None
+    executor.shutdown()
+
+    print("✅ Streaming test passed")
+
+
+def test_bounded_pending():
+    """Test requests beyond the pending limit are rejected immediately"""
+    print("Testing global concurrency bound...")
+
+    executor = BackgroundExecutor(max_workers=1, max_pending=2)
+    first = executor.submit("a", slow_answer, "a", 0.1)
+    second = executor.submit("b", slow_answer, "b", 0.1)
+    third = executor.submit("c", slow_answer, "c", 0.1)
+    assert third.done and third.result() == BUSY_MESSAGE
+    # The apps poll by session rather than keeping the handle
+    assert executor.get("c") is third
+    assert executor.pop_finished("c") is third and executor.get("c") is None
+    assert first.result(timeout=2) == "a" and second.result(timeout=2) == "b"
+
+    stats = executor.get_stats()
+    assert stats["rejected"] == 1 and stats["in_flight"] == 0
+    assert stats["mean_queue_wait_ms"] > 0
+    executor.shutdown()
+
+    print("✅ Concurrency bound test passed")
+
+
+def test_lane_limit():
+    """Test a slow lane cannot occupy every worker"""
+    print("Testing per-lane limits...")
+
+    executor = BackgroundExecutor(max_workers=4, max_pending=16, max_per_lane=2)
+    slow = [executor.submit(f"slow-{i}", slow_answer, "slow", 0.3, lane="gemini") for i in range(4)]
+    fast = executor.submit("fast", slow_answer, "fast", 0.0, lane="openai")
+    assert fast.result(timeout=0.2) == "fast"
+
+    stats = executor.get_stats()
+    assert stats["lane_running"] == {"gemini": 2} and stats["lane_queued"] == {"gemini": 2}
+
+    executor.cancel("slow-3")
+    assert slow[3].done and slow[3].result() is None
+    assert executor.get_stats()["lane_queued"] == {"gemini": 1}
+    assert [handle.result(timeout=2) for handle in slow[:3]] == ["slow"] * 3
+    assert executor.get_stats()["in_flight"] == 0
+    executor.shutdown()
+
+    print("✅ Per-lane limit test passed")
+
+
+def test_cancel_in_stuck_lane():
+    """Test requests cancelled while queued behind a stalled lane free their pending slots"""
+    print("Testing cancellation in a stuck lane...")
+
+    release = threading.Event()
+    executor = BackgroundExecutor(max_workers=2, max_pending=3, max_per_lane=1)
+    stuck = executor.submit("stuck", release.wait, lane="gemini")
+    for attempt in range(10):
+        handle = executor.submit("impatient", slow_answer, attempt, 0.0, lane="gemini")
+        assert not handle.done, "rejected as busy"
+    assert executor.get_stats()["in_flight"] == 2
+
+    executor.cancel("impatient")
+    assert executor.get_stats()["in_flight"] == 1 and executor.get_stats()["lane_queued"] == {}
+    release.set()
+    assert stuck.result(timeout=2) is True
+    assert executor.get_stats()["in_flight"] == 0
+    executor.shutdown()
+
+    print("✅ Stuck lane cancellation test passed")
+
+
+def test_worker_exception():
+    """Test an exception in the worker is re-raised by result()"""
+    print("Testing worker failures...")
+
+    def broken():
+        raise ValueError("bad payload")
+
+    executor = BackgroundExecutor(max_workers=1, max_pending=2)
+    handle = executor.submit("s1", broken)
+    try:
+        handle.result(timeout=2)
+        raise AssertionError("expected ValueError")
+    except ValueError:
+        pass
+    assert executor.get_stats()["failed"] == 1
+    executor.shutdown()
+
+    print("✅ Worker failure test passed")
+
+
+def main():
+    """Run all tests"""
+    print("Running background executor tests...\n")
+
+    try:
+        test_submit_and_poll()
+        test_resubmit_cancels_previous()
+        test_stream_collects_and_stops()
+        test_bounded_pending()
+        test_lane_limit()
+        test_cancel_in_stuck_lane()
+        test_worker_exception()
+
+        print("\n🎉 All background executor tests passed!")
+
+    except Exception as e:
+        print(f"\n❌ Test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
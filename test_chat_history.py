@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Test script for the bounded chat history and multi-turn payloads
+"""
+
+import sys
+import os
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from trafficwise.chat_history import ChatHistory, context_fingerprint, estimate_tokens, summarize_message
+from trafficwise.providers import _build_gemini_payload, _build_openai_payload
+
+
+def add_turns(history, count, answer="Take the M-2 motorway. It avoids the GT Road bottlenecks."):
+    for turn in range(count):
+        history.append({"role": "user", "content": f"Question {turn} about Lahore traffic?"})
+        history.append({"role": "assistant", "content": f"**Answer {turn}:** {answer}"})
+
+
+def test_window_and_digest():
+    """Test old messages fold into a bounded digest"""
+    print("Testing window and digest...")
+
+    history = ChatHistory(window=6, digest_lines=4)
+    add_turns(history, 2)
+    assert len(history) == 4 and history.digest == ""
+
+    add_turns(history, 8)
+    assert len(history) == 6
+    assert history.total == 20 and history.folded == 14
+    assert [message["content"] for message in history][0] == "Question 5 about Lahore traffic?"
+    digest = history.digest.split("\n")
+    assert digest[0] == "(10 earlier messages omitted)"
+    assert digest[1:] == [
+        "User: Question 3 about Lahore traffic?",
+        "TrafficWise: Answer 3: Take the M-2 motorway.",
+        "User: Question 4 about Lahore traffic?",
+        "TrafficWise: Answer 4: Take the M-2 motorway.",
+    ]
+
+    history.clear()
+    assert len(history) == 0 and history.digest == "" and history.total == 0
+
+    print("✅ Window and digest test passed")
+
+
+def test_summarize_message():
+    """Test digest lines keep the first sentence, without markdown, truncated"""
+    print("Testing message summaries...")
+
+    line = summarize_message({"role": "assistant", "content": "## Route\n**Use** the M-2. Then exit at Kot Momin."})
+    assert line == "TrafficWise: Route Use the M-2."
+    line = summarize_message({"role": "user", "content": "x" * 500}, max_chars=20)
+    assert line == "User: " + "x" * 19 + "…"
+
+    print("✅ Message summary test passed")
+
+
+def test_pagination():
+    """Test pages run newest first and hold messages in chronological order"""
+    print("Testing pagination...")
+
+    history = ChatHistory(window=50, page_size=4)
+    add_turns(history, 5)
+    assert history.page_count() == 3
+    assert [message["content"][:10] for message in history.page(0)] == [
+        "Question 3", "**Answer 3", "Question 4", "**Answer 4",
+    ]
+    assert len(history.page(2)) == 2
+    assert history.page(3) == []
+    assert ChatHistory().page_count() == 1
+
+    print("✅ Pagination test passed")
+
+
+def test_context_budget():
+    """Test the context fits the token budget, skips errors and summarizes older turns"""
+    print("Testing context budget...")
+
+    history = ChatHistory(window=50)
+    add_turns(history, 2)
+    history.append({"role": "user", "content": "And tomorrow?"})
+    history.append({"role": "assistant", "content": "❌ Rate Limit: Too many requests."})
+    context = history.context(max_tokens=1000)
+    assert len(context) == 5
+    assert all(not message["content"].startswith("❌") for message in context)
+
+    add_turns(history, 40)
+    context = history.context(max_tokens=300)
+    assert context[0]["role"] == "system"
+    assert context[0]["content"].startswith("Summary of the earlier conversation:")
+    assert sum(estimate_tokens(message["content"]) for message in context) <= 300
+    assert context[-1]["content"].startswith("**Answer 39:**")
+    assert estimate_tokens(context[0]["content"]) <= 75
+
+    assert context_fingerprint([]) == ""
+    assert context_fingerprint(context) == context_fingerprint(list(context))
+    assert context_fingerprint(context) != context_fingerprint(context[1:])
+
+    print("✅ Context budget test passed")
+
+
+def test_multi_turn_payloads():
+    """Test the Gemini and OpenAI payloads carry the conversation"""
+    print("Testing multi-turn payloads...")
+
+    context = [
+        {"role": "system", "content": "Summary of the earlier conversation:\nUser: Lahore to Multan?"},
+        {"role": "assistant", "content": "Dangling answer"},
+        {"role": "user", "content": "Best route to Islamabad?"},
+        {"role": "assistant", "content": "Take the M-2."},
+        {"role": "user", "content": "What about fog?"},
+    ]
+    payload = _build_gemini_payload("And tomorrow?", 0.7, context)
+    contents = payload["contents"]
+    assert [content["role"] for content in contents] == ["user", "model", "user"]
+    assert contents[0]["parts"][0]["text"] == "Best route to Islamabad?"
+    assert contents[2]["parts"][0]["text"].startswith("What about fog?\n\nYou are a traffic")
+    assert "And tomorrow?" in contents[2]["parts"][0]["text"]
+    assert payload["systemInstruction"]["parts"][0]["text"].endswith("Lahore to Multan?")
+
+    legacy = _build_gemini_payload("And tomorrow?", 0.7, context, model="gemini-pro")
+    assert "systemInstruction" not in legacy
+    assert [content["role"] for content in legacy["contents"]] == ["user", "model", "user", "model", "user"]
+    assert legacy["contents"][0]["parts"][0]["text"].endswith("Lahore to Multan?")
+    assert legacy["contents"][2:] == contents
+
+    single = _build_gemini_payload("And tomorrow?", 0.7)
+    assert len(single["contents"]) == 1 and "systemInstruction" not in single
+
+    messages = _build_openai_payload("And tomorrow?", 0.7, history=context)["messages"]
+    assert [message["role"] for message in messages] == ["system", "assistant", "user", "assistant", "user", "user"]
+    assert messages[-1]["content"].endswith("And tomorrow?")
+
+    print("✅ Multi-turn payload test passed")
+
+
+def main():
+    """Run all tests"""
+    print("Running chat history tests...\n")
+
+    try:
+        test_window_and_digest()
+        test_summarize_message()
+        test_pagination()
+        test_context_budget()
+        test_multi_turn_payloads()
+
+        print("\n🎉 All chat history tests passed!")
+
+    except Exception as e:
+        print(f"\n❌ Test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Test script for pipelined chunk transcription
+"""
+
+import sys
+import os
+import asyncio
+import random
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from trafficwise import chunk_pipeline
+from trafficwise.chunk_pipeline import OrderedChunkTranscriber, dedupe_overlap, get_transcription_semaphore
+
+
+def mock_stt_service(seed, failing=()):
+    """STTService stand-in whose transcriptions finish after random delays"""
+    rng = random.Random(seed)
+    state = {"active": 0, "peak": 0}
+
+    async def transcribe(chunk):
+        state["active"] += 1
+        state["peak"] = max(state["peak"], state["active"])
+        try:
+            await asyncio.sleep(rng.uniform(0.001, 0.02))
+            if chunk["sequence_id"] in failing:
+                raise RuntimeError("provider timeout")
+            return SimpleNamespace(text=f"word{chunk['sequence_id']}", confidence=0.9)
+        finally:
+            state["active"] -= 1
+
+    return SimpleNamespace(transcribe_chunk=AsyncMock(side_effect=transcribe), state=state)
+
+
+async def run_session(service, chunk_ids, in_flight, semaphore):
+    transcriber = OrderedChunkTranscriber(service.transcribe_chunk, in_flight=in_flight, semaphore=semaphore)
+    results = []
+    for sequence_id in chunk_ids:
+        results.extend(await transcriber.submit(sequence_id, {"sequence_id": sequence_id}))
+        assert transcriber.get_stats()["buffered"] <= in_flight
+    results.extend(await transcriber.drain())
+    return results, transcriber
+
+
+def test_ordered_output():
+    """Test results come back in sequence order despite random latencies"""
+    print("Testing ordered reassembly...")
+
+    async def scenario():
+        service = mock_stt_service(seed=1)
+        results, transcriber = await run_session(service, range(40), 4, asyncio.Semaphore(32))
+        assert [result.sequence_id for result in results] == list(range(40))
+        assert [result.text for result in results] == [f"word{index}" for index in range(40)]
+        assert service.state["peak"] == 4
+        assert transcriber.get_stats()["max_reorder_depth"] > 1
+        assert service.transcribe_chunk.await_count == 40
+
+    asyncio.run(scenario())
+    print("✅ Ordered reassembly test passed")
+
+
+def test_global_limit_and_gaps():
+    """Test the shared semaphore bounds all sessions and skipped ids are not awaited"""
+    print("Testing global limit and sequence gaps...")
+
+    async def scenario():
+        service = mock_stt_service(seed=2, failing={5})
+        semaphore = asyncio.Semaphore(3)
+        chunk_ids = [index for index in range(30) if index % 7]
+        sessions = await asyncio.gather(*(run_session(service, chunk_ids, 4, semaphore) for _ in range(4)))
+        assert service.state["peak"] == 3
+        for results, transcriber in sessions:
+            assert [result.sequence_id for result in results] == chunk_ids
+            failed = [result for result in results if result.error is not None]
+            assert [result.sequence_id for result in failed] == [5] and failed[0].text == ""
+            assert transcriber.get_stats()["errors"] == 1
+
+        transcriber = OrderedChunkTranscriber(service.transcribe_chunk, in_flight=2, semaphore=semaphore)
+        await transcriber.submit(3, {"sequence_id": 3})
+        try:
+            await transcriber.submit(3, {"sequence_id": 3})
+            raise AssertionError("expected ValueError")
+        except ValueError:
+            pass
+        await transcriber.cancel()
+        assert transcriber.get_stats()["in_flight"] == 0
+
+    asyncio.run(scenario())
+    print("✅ Global limit and gap test passed")
+
+
+def test_default_semaphore_per_loop():
+    """Test the default semaphore works across successive event loops"""
+    print("Testing default semaphore across event loops...")
+
+    async def scenario():
+        assert get_transcription_semaphore() is get_transcription_semaphore()
+        service = mock_stt_service(seed=4)
+        results, _ = await run_session(service, range(12), 4, None)
+        assert [result.text for result in results] == [f"word{index}" for index in range(12)]
+        assert all(result.error is None for result in results)
+        assert service.state["peak"] == 1
+
+    max_concurrent = chunk_pipeline.DEFAULT_MAX_CONCURRENT
+    chunk_pipeline.DEFAULT_MAX_CONCURRENT = 1
+    try:
+        # A semaphore bound to the first loop fails once contended on the second
+        asyncio.run(scenario())
+        asyncio.run(scenario())
+    finally:
+        chunk_pipeline.DEFAULT_MAX_CONCURRENT = max_concurrent
+    print("✅ Default semaphore test passed")
+
+
+def test_overlap_dedupe():
+    """Test words repeated across a chunk boundary are dropped"""
+    print("Testing overlap dedupe...")
+
+    assert dedupe_overlap("Traffic on the motorway", "motorway near Lahore") == "near Lahore"
+    assert dedupe_overlap("heavy near the Ring", "the ring road, please") == "road, please"
+    assert dedupe_overlap("Take Mall Road.", "Mall Road. Avoid it") == "Avoid it"
+    assert dedupe_overlap("Take the bus", "the Orange Line") == "the Orange Line"
+    assert dedupe_overlap("", "hello") == "hello"
+    assert dedupe_overlap("hello", "hello") == ""
+
+    async def scenario():
+        texts = {0: "traffic on the", 1: "the motorway is", 2: "is heavy"}
+
+        async def transcribe(chunk):
+            await asyncio.sleep(0.01 * (3 - chunk))
+            return texts[chunk]
+
+        transcriber = OrderedChunkTranscriber(transcribe, in_flight=3, semaphore=asyncio.Semaphore(3))
+        for sequence_id in texts:
+            await transcriber.submit(sequence_id, sequence_id)
+        results = await transcriber.drain()
+        assert [result.text for result in results] == ["traffic on the", "motorway is", "heavy"]
+        assert transcriber.get_stats()["deduped_words"] == 2
+
+    asyncio.run(scenario())
+    print("✅ Overlap dedupe test passed")
+
+
+def main():
+    """Run all tests"""
+    print("Running chunk pipeline tests...\n")
+
+    try:
+        test_ordered_output()
+        test_global_limit_and_gaps()
+        test_default_semaphore_per_loop()
+        test_overlap_dedupe()
+
+        print("\n🎉 All chunk pipeline tests passed!")
+
+    except Exception as e:
+        print(f"\n❌ Test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
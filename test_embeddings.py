@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Test script for lazy embedding model loading and the query embedding cache
+"""
+
+import sys
+import os
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from trafficwise.embeddings import LazyEmbedder
+
+
+class FakeModel:
+    """Counts encode calls instead of running a SentenceTransformer"""
+
+    def __init__(self):
+        self.calls = []
+
+    def encode(self, texts, **kwargs):
+        self.calls.append(texts)
+        if isinstance(texts, str):
+            return [float(len(texts))]
+        return [[float(len(text))] for text in texts]
+
+
+def test_model_loads_lazily():
+    """Test the model is only loaded when an embedding is needed"""
+    print("Testing lazy loading...")
+
+    loads = []
+
+    def loader(name):
+        loads.append(name)
+        return FakeModel()
+
+    embedder = LazyEmbedder("all-MiniLM-L6-v2", loader=loader)
+    assert not embedder.is_loaded
+    assert embedder.get_stats()["load_seconds"] is None
+    assert loads == []
+
+    embedder.encode(["Ring Road"])
+    embedder.encode_query("Ring Road")
+    assert loads == ["all-MiniLM-L6-v2"]
+    assert embedder.is_loaded
+    assert embedder.get_stats()["load_seconds"] is not None
+
+    print("✅ Lazy loading test passed")
+
+
+def test_query_cache():
+    """Test normalized query embeddings are cached with LRU eviction"""
+    print("Testing query embedding cache...")
+
+    model = FakeModel()
+    embedder = LazyEmbedder("all-MiniLM-L6-v2", loader=lambda name: model, cache_size=2)
+
+    first = embedder.encode_query("Best route Lahore?")
+    assert embedder.encode_query("best route  lahore") is first
+    assert len(model.calls) == 1
+
+    embedder.encode_query("karachi")
+    embedder.encode_query("islamabad")  # evicts "best route lahore"
+    embedder.encode_query("best route lahore")
+    assert len(model.calls) == 4
+
+    stats = embedder.get_stats()
+    assert stats["query_hits"] == 1
+    assert stats["query_misses"] == 4
+    assert stats["cached_queries"] == 2
+
+    print("✅ Query embedding cache test passed")
+
+
+def main():
+    """Run all tests"""
+    print("Running embedding tests...\n")
+
+    try:
+        test_model_loads_lazily()
+        test_query_cache()
+
+        print("\n🎉 All embedding tests passed!")
+
+    except Exception as e:
+        print(f"\n❌ Test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
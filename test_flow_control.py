@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Test script for the bounded streaming audio queue
+"""
+
+import sys
+import os
+import threading
+import time
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from trafficwise.flow_control import ACCEPTED, DROPPED, PAUSED, AudioQueue
+
+
+def chunk(tag, size=100):
+    return bytes([tag]) * size
+
+
+def test_drop_oldest():
+    """Test the oldest chunks go first and both caps hold"""
+    print("Testing drop-oldest policy...")
+
+    queue = AudioQueue(max_chunks=3, max_bytes=1000, policy="drop_oldest")
+    for tag in range(5):
+        assert queue.put(chunk(tag)) == ACCEPTED
+    assert [queue.get(0)[0] for _ in range(3)] == [2, 3, 4]
+    assert queue.get(timeout=0) is None
+
+    queue.put(chunk(1, 600))
+    queue.put(chunk(2, 600))
+    assert queue.bytes == 1000 and queue.get(0) == chunk(1, 400)
+    # Whole chunks go first, then the oldest remaining one is cut
+    queue.put(chunk(3, 1200))
+    assert queue.get(0) == chunk(3, 1000)
+    stats = queue.get_stats()
+    assert stats["dropped_chunks"] == 3 and stats["dropped_bytes"] == 200 + 200 + 600 + 200
+    assert stats["max_depth"] == 3 and stats["max_bytes"] <= 1000
+
+    # An odd cap still cuts whole 16-bit samples
+    samples = bytes(range(20))
+    queue = AudioQueue(max_chunks=4, max_bytes=7, policy="drop_oldest")
+    queue.put(samples[:6])
+    queue.put(samples[6:10])
+    assert queue.bytes == 6 and queue.get(0) == samples[4:6] and queue.get(0) == samples[6:10]
+    queue.put(samples[10:14])
+    queue.put(samples[14:18])
+    assert queue.bytes <= 7 and queue.get(0) == samples[12:14]
+
+    print("✅ Drop-oldest policy test passed")
+
+
+def test_coalesce():
+    """Test chunks over the depth cap merge into the newest one"""
+    print("Testing coalesce policy...")
+
+    queue = AudioQueue(max_chunks=2, max_bytes=1000, policy="coalesce")
+    for tag in range(4):
+        assert queue.put(chunk(tag)) == ACCEPTED
+    assert len(queue) == 2
+    assert queue.get(0) == chunk(0)
+    assert queue.get(0) == chunk(1) + chunk(2) + chunk(3)
+    for tag in range(12):
+        queue.put(chunk(tag))
+    assert queue.bytes == 1000
+    assert len(queue) <= 2 and queue.get_stats()["coalesced"] == 11
+
+    print("✅ Coalesce policy test passed")
+
+
+def test_pause_and_resume():
+    """Test the client is paused at the watermark, rejected over it and resumed at half"""
+    print("Testing pause policy...")
+
+    events = []
+    queue = AudioQueue(max_chunks=4, max_bytes=10000, policy="pause",
+                       on_pause=lambda: events.append("pause"), on_resume=lambda: events.append("resume"))
+    statuses = [queue.put(chunk(tag)) for tag in range(5)]
+    assert statuses == [ACCEPTED, ACCEPTED, ACCEPTED, PAUSED, DROPPED]
+    assert events == ["pause"] and queue.paused
+    queue.get(0)
+    assert events == ["pause"]
+    queue.get(0)
+    assert events == ["pause", "resume"] and not queue.paused
+    stats = queue.get_stats()
+    assert stats["pauses"] == 1 and stats["rejected"] == 1 and stats["dropped_chunks"] == 0
+
+    print("✅ Pause policy test passed")
+
+
+def test_stalled_consumer_and_close():
+    """Test memory stays capped while the consumer stalls and close drains the queue"""
+    print("Testing stalled consumer...")
+
+    queue = AudioQueue(max_chunks=8, max_bytes=64000, policy="drop_oldest")
+    received = []
+
+    def consumer():
+        time.sleep(0.05)  # stalled provider
+        while True:
+            data = queue.get(timeout=1)
+            if data is None:
+                return
+            received.append(data)
+
+    thread = threading.Thread(target=consumer)
+    thread.start()
+    for tag in range(200):
+        queue.put(chunk(tag % 256, 8000))
+        assert queue.bytes <= 64000 and len(queue) <= 8
+    queue.close()
+    thread.join()
+    assert queue.put(chunk(0)) == DROPPED
+    assert received[-1] == chunk(199, 8000)
+    stats = queue.get_stats()
+    assert stats["enqueued"] == stats["dequeued"] + stats["dropped_chunks"]
+
+    print("✅ Stalled consumer test passed")
+
+
+def main():
+    """Run all tests"""
+    print("Running flow control tests...\n")
+
+    try:
+        test_drop_oldest()
+        test_coalesce()
+        test_pause_and_resume()
+        test_stalled_consumer_and_close()
+
+        print("\n🎉 All flow control tests passed!")
+
+    except Exception as e:
+        print(f"\n❌ Test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
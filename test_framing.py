@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Test script for streaming transcription wire formats
+"""
+
+import sys
+import os
+import json
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from trafficwise.framing import (
+    BINARY_HEADER, TranscriptFrame, available_formats, decode_frame, negotiate_format,
+)
+from trafficwise.transcript import TranscriptAssembler
+
+
+def test_round_trip():
+    """Test every available format decodes back to the same frame"""
+    print("Testing frame round trips...")
+
+    frame = TranscriptFrame(type="transcript_delta", seq=7, offset=12, text=" لاہور سے motorway",
+                            stable=10, is_final=True, confidence=0.75, language="ur", timestamp=1718000000.25)
+    for fmt in available_formats():
+        decoded = decode_frame(frame.encode(fmt), fmt)
+        assert decoded.model_dump() == frame.model_dump(), fmt
+
+    encoded = frame.encode("binary")
+    assert isinstance(encoded, bytes)
+    assert len(encoded) == BINARY_HEADER.size + len("ur") + len(frame.text.encode("utf-8"))
+    message = json.loads(frame.encode("json"))
+    assert message["timestamp"].startswith("2024-06-") and message["text"] == frame.text
+
+    try:
+        frame.encode("xml")
+        raise AssertionError("expected ValueError")
+    except ValueError:
+        pass
+
+    print("✅ Frame round trip test passed")
+
+
+def test_encoding_cached():
+    """Test each format is serialized once per frame"""
+    print("Testing encoding cache...")
+
+    frame = TranscriptFrame(text="Hello world")
+    assert frame.encode("binary") is frame.encode("binary")
+    assert frame.encode("json") is frame.encode("json")
+    try:
+        frame.text = "changed"
+        raise AssertionError("expected frozen frame")
+    except Exception as e:
+        assert "frozen" in str(e).lower()
+
+    copy = frame.model_copy(update={"text": "Goodbye"})
+    assert decode_frame(copy.encode("binary"), "binary").text == "Goodbye"
+    assert json.loads(copy.encode("json"))["text"] == "Goodbye"
+    assert decode_frame(frame.encode("binary"), "binary").text == "Hello world"
+
+    print("✅ Encoding cache test passed")
+
+
+def test_negotiation():
+    """Test the first supported format in the client's list is chosen"""
+    print("Testing format negotiation...")
+
+    assert negotiate_format("binary,json") == "binary"
+    assert negotiate_format(["XML", " Binary "]) == "binary"
+    assert negotiate_format("xml") == "json"
+    assert negotiate_format(None) == "json"
+    expected = "msgpack" if "msgpack" in available_formats() else "json"
+    assert negotiate_format("msgpack,json") == expected
+
+    print("✅ Format negotiation test passed")
+
+
+def test_assembler_messages():
+    """Test assembler deltas and syncs frame without loss"""
+    print("Testing assembler frames...")
+
+    assembler = TranscriptAssembler(resync_every=2)
+    for text in ("Hello", "Hello world"):
+        message = assembler.update(text)
+        frame = TranscriptFrame.from_message(message, confidence=0.9, timestamp=1.0)
+        decoded = decode_frame(frame.encode("binary"), "binary")
+        assert (decoded.type, decoded.text, decoded.seq) == (message["type"], message["text"], message["seq"])
+    assert decoded.type == "transcript_sync" and decoded.offset == 0
+
+    print("✅ Assembler frame test passed")
+
+
+def main():
+    """Run all tests"""
+    print("Running framing tests...\n")
+
+    try:
+        test_round_trip()
+        test_encoding_cached()
+        test_negotiation()
+        test_assembler_messages()
+
+        print("\n🎉 All framing tests passed!")
+
+    except Exception as e:
+        print(f"\n❌ Test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Test script for the traffic map geo store
+"""
+
+import sys
+import os
+import tempfile
+
+import numpy as np
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from trafficwise.geo_store import GeoStore, LineLayer, PointLayer, congestion_level, douglas_peucker, tile_bounds
+
+
+def grid_store(rows=50, cols=50):
+    """Intersections on a regular grid around Lahore plus one zig-zag road"""
+    lat, lon = np.meshgrid(np.linspace(31.45, 31.65, rows), np.linspace(74.2, 74.45, cols))
+    levels = np.zeros(rows * cols, dtype=np.uint8)
+    levels[7] = 3
+    zigzag = [[31.5, 74.2 + 0.001 * i] if i % 2 else [31.5 + 0.00001, 74.2 + 0.001 * i] for i in range(40)]
+    return GeoStore(
+        PointLayer([f"J{i}" for i in range(rows * cols)], lat.ravel(), lon.ravel(), levels),
+        LineLayer.from_paths(["Canal Road", "Ferozepur Road"], [zigzag, [[31.4, 74.3], [31.6, 74.35]]], [1, 2]),
+    )
+
+
+def test_loading():
+    """Test GeoJSON and CSV loading into arrays"""
+    print("Testing GeoJSON and CSV loading...")
+
+    store = GeoStore.from_geojson({
+        "type": "FeatureCollection",
+        "features": [
+            {"type": "Feature", "geometry": {"type": "Point", "coordinates": [74.33, 31.58]},
+             "properties": {"name": "Kalma Chowk", "congestion": "Very Heavy"}},
+            {"type": "Feature", "geometry": {"type": "MultiLineString",
+                                             "coordinates": [[[74.3, 31.5], [74.4, 31.6]], [[74.4, 31.6], [74.5, 31.7]]]},
+             "properties": {"name": "Ring Road", "congestion": 1}},
+        ],
+    })
+    assert len(store.points) == 1 and store.points.levels[0] == 3
+    assert store.points.lat[0] == 31.58 and store.points.lon[0] == 74.33
+    assert len(store.lines) == 2 and store.lines.path(1).tolist() == [[31.6, 74.4], [31.7, 74.5]]
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "junctions.csv")
+        with open(path, "w", encoding="utf-8") as handle:
+            handle.write("name,lat,lon,congestion\nFaizabad,33.66,73.08,Heavy\nZero Point,33.69,73.05,0\n")
+        store = GeoStore.from_file(path)
+    assert store.points.names == ["Faizabad", "Zero Point"]
+    assert store.points.levels.tolist() == [2, 0]
+
+    assert congestion_level("moderate") == 1 and congestion_level(9) == 3
+
+    print("✅ Loading test passed")
+
+
+def test_version_tracks_updates():
+    """Test live congestion updates change the store version"""
+    print("Testing versioning...")
+
+    store = grid_store()
+    before = store.version
+    assert store.version == before
+    store.update_levels(point_levels={0: "Heavy"}, line_levels={1: 0})
+    assert store.points.levels[0] == 2 and store.lines.levels[1] == 0
+    assert store.version != before
+
+    print("✅ Versioning test passed")
+
+
+def test_clusters_bounded():
+    """Test clustering keeps every point and respects the marker cap"""
+    print("Testing clustering...")
+
+    store = grid_store()
+    coarse = store.clusters(zoom=6)
+    assert sum(cluster.count for cluster in coarse) == len(store.points)
+    assert len(coarse) < 5
+    assert max(cluster.level for cluster in coarse) == 3
+
+    detailed = store.clusters(zoom=16, max_markers=100)
+    assert len(detailed) <= 100
+    assert sum(cluster.count for cluster in detailed) == len(store.points)
+
+    single = store.clusters(zoom=20, bounds=(31.449, 74.199, 31.451, 74.201))
+    assert len(single) == 1 and single[0].name == "J0" and single[0].count == 1
+
+    print("✅ Clustering test passed")
+
+
+def test_line_simplification():
+    """Test Douglas-Peucker and zoom-dependent line dropping"""
+    print("Testing line simplification...")
+
+    points = np.array([[0, 0], [1, 1.01], [2, 1.99], [3, 3], [4, 0]], dtype=float)
+    keep = douglas_peucker(points, 0.1)
+    assert keep.tolist() == [True, False, False, True, True]
+
+    store = grid_store()
+    low = store.simplified_lines(zoom=6)
+    high = store.simplified_lines(zoom=18)
+    assert len(high) == 2
+    assert len(low) <= 2
+    # Most congested line first; the near-straight zig-zag collapses at low zoom
+    assert high[0].name == "Ferozepur Road"
+    zigzag_low = [line for line in store.simplified_lines(zoom=12) if line.name == "Canal Road"][0]
+    assert len(zigzag_low.path) == 2
+
+    budget = store.simplified_lines(zoom=18, max_vertices=10)
+    assert sum(len(line.path) for line in budget) <= 10
+
+    print("✅ Line simplification test passed")
+
+
+def test_tiles():
+    """Test tile bounds and tile GeoJSON stay within the tile"""
+    print("Testing GeoJSON tiles...")
+
+    south, west, north, east = tile_bounds(0, 0, 0)
+    assert west == -180 and east == 180 and north > 85 and south < -85
+
+    store = grid_store()
+    collection = store.tile(12, 2893, 1668)
+    assert collection["type"] == "FeatureCollection"
+    south, west, north, east = tile_bounds(12, 2893, 1668)
+    for feature in collection["features"]:
+        if feature["geometry"]["type"] == "Point":
+            lon, lat = feature["geometry"]["coordinates"]
+            assert south <= lat <= north and west <= lon <= east
+
+    print("✅ GeoJSON tile test passed")
+
+
+def main():
+    """Run all tests"""
+    print("Running geo store tests...\n")
+
+    try:
+        test_loading()
+        test_version_tracks_updates()
+        test_clusters_bounded()
+        test_line_simplification()
+        test_tiles()
+
+        print("\n🎉 All geo store tests passed!")
+
+    except Exception as e:
+        print(f"\n❌ Test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Test script for batched, incremental RAG document ingestion
+"""
+
+import sys
+import os
+import json
+import tempfile
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from trafficwise.ingestion import IngestionPipeline, InvalidDocumentError, chunk_text, extract_documents
+
+
+class FakeModel:
+    """Records encode calls instead of running a SentenceTransformer"""
+
+    def __init__(self):
+        self.batches = []
+
+    def encode(self, texts, batch_size=32):
+        self.batches.append(len(texts))
+        return [[float(len(text)), 1.0] for text in texts]
+
+
+class FakeCollection:
+    """In-memory stand-in for a Chroma collection"""
+
+    def __init__(self):
+        self.items = {}
+
+    def get(self, ids):
+        return {"ids": [i for i in ids if i in self.items]}
+
+    def add(self, ids, documents, metadatas, embeddings):
+        assert len(ids) == len(documents) == len(metadatas) == len(embeddings)
+        for identifier, document, metadata, embedding in zip(ids, documents, metadatas, embeddings):
+            self.items[identifier] = (document, metadata, embedding)
+
+
+def test_chunking_with_overlap():
+    """Test chunks have the configured size and overlap"""
+    print("Testing chunking...")
+
+    words = [f"w{i}" for i in range(25)]
+    chunks = chunk_text(" ".join(words), chunk_words=10, overlap_words=3)
+
+    assert chunks[0].split() == words[0:10]
+    assert chunks[1].split() == words[7:17]
+    assert chunks[-1].split()[-1] == "w24"
+    assert chunk_text("", 10, 3) == []
+
+    print(f"✅ Chunking test passed - {len(chunks)} chunks")
+
+
+def test_json_extraction():
+    """Test JSON uploads are split into documents"""
+    print("Testing JSON extraction...")
+
+    content = json.dumps([
+        {"city": "Lahore", "info": "Heavy traffic on Canal Road"},
+        "Karachi Green Line BRT",
+        {"city": "Multan"},
+    ])
+    documents = extract_documents("cities.json", content)
+
+    assert documents[0] == "Heavy traffic on Canal Road"
+    assert documents[1] == "Karachi Green Line BRT"
+    assert "Multan" in documents[2]
+    assert extract_documents("notes.txt", "plain text") == ["plain text"]
+
+    print("✅ JSON extraction test passed")
+
+
+def test_batched_incremental_ingestion():
+    """Test batching, precomputed embeddings and duplicate skipping"""
+    print("Testing incremental ingestion...")
+
+    model = FakeModel()
+    collection = FakeCollection()
+    pipeline = IngestionPipeline(model, collection, batch_size=4, chunk_words=10, overlap_words=2)
+
+    text = " ".join(f"word{i}" for i in range(100))
+    report = pipeline.ingest_text(text, filename="corridors.txt")
+
+    assert report.chunks_added == report.chunks_total == len(collection.items)
+    assert max(model.batches) <= 4
+    assert all(len(embedding) == 2 for _, _, embedding in collection.items.values())
+
+    # Re-ingesting the same document only checks hashes, nothing is re-embedded
+    encode_calls = len(model.batches)
+    again = pipeline.ingest_text(text, filename="corridors.txt")
+    assert again.chunks_added == 0
+    assert again.duplicate_skip_rate == 1.0
+    assert len(model.batches) == encode_calls
+
+    print(f"✅ Incremental ingestion test passed - {report.summary()}")
+
+
+def test_directory_ingestion():
+    """Test bulk ingestion of a TXT/JSON directory"""
+    print("Testing directory ingestion...")
+
+    pipeline = IngestionPipeline(FakeModel(), FakeCollection(), batch_size=8, chunk_words=10, overlap_words=2)
+    with tempfile.TemporaryDirectory() as tmp:
+        os.makedirs(os.path.join(tmp, "punjab"))
+        with open(os.path.join(tmp, "punjab", "lahore.txt"), "w") as handle:
+            handle.write("Mall Road congestion peaks between 5 and 8 PM")
+        with open(os.path.join(tmp, "routes.json"), "w") as handle:
+            json.dump([{"text": "M-2 Lahore Islamabad"}, {"text": "Mall Road congestion peaks between 5 and 8 PM"}], handle)
+        with open(os.path.join(tmp, "map.png"), "wb") as handle:
+            handle.write(b"\x89PNG")
+
+        report = pipeline.ingest_directory(tmp)
+
+    assert report.files == 2
+    assert report.chunks_total == 3
+    assert report.chunks_added == 2
+    assert report.chunks_skipped == 1
+
+    print(f"✅ Directory ingestion test passed - {report.summary()}")
+
+
+def test_invalid_files():
+    """Test malformed JSON and non-UTF-8 files are rejected without aborting a bulk import"""
+    print("Testing invalid files...")
+
+    pipeline = IngestionPipeline(FakeModel(), FakeCollection(), batch_size=8, chunk_words=10, overlap_words=2)
+    for filename, data in (("routes.json", b'[{"text": "M-2"'), ("notes.txt", b"Mall Road \xff\xfe")):
+        try:
+            pipeline.ingest_upload(filename, data)
+            raise AssertionError("expected InvalidDocumentError")
+        except InvalidDocumentError as e:
+            assert filename in str(e)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        with open(os.path.join(tmp, "broken.json"), "w") as handle:
+            handle.write("{not json")
+        with open(os.path.join(tmp, "lahore.txt"), "w") as handle:
+            handle.write("Canal Road is busy at rush hour")
+        report = pipeline.ingest_directory(tmp)
+
+    assert report.files == 1 and report.chunks_added == 1
+    assert len(report.skipped_files) == 1 and "broken.json" in report.skipped_files[0]
+
+    print("✅ Invalid file test passed")
+
+
+def main():
+    """Run all tests"""
+    print("Running ingestion tests...\n")
+
+    try:
+        test_chunking_with_overlap()
+        test_json_extraction()
+        test_batched_incremental_ingestion()
+        test_directory_ingestion()
+        test_invalid_files()
+
+        print("\n🎉 All ingestion tests passed!")
+
+    except Exception as e:
+        print(f"\n❌ Test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
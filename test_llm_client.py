@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Test script for the pooled LLM client and provider calls
+"""
+
+import sys
+import os
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from trafficwise.llm_client import LLMClient, get_llm_client
+from trafficwise.providers import chat_with_gemini, chat_with_openai
+from trafficwise.stub_server import StubLLMServer, DEFAULT_REPLY
+
+
+def test_shared_client_is_process_wide():
+    """Test that get_llm_client returns one instance per process"""
+    print("Testing shared client caching...")
+
+    assert get_llm_client() is get_llm_client()
+
+    print("✅ Shared client caching test passed")
+
+
+def test_pooled_client_reuses_connections():
+    """Test that repeated provider calls reuse one keep-alive connection"""
+    print("Testing connection reuse...")
+
+    client = LLMClient(pool_maxsize=2)
+    with StubLLMServer() as server:
+        for _ in range(5):
+            reply = chat_with_gemini("Lahore traffic", 0.7, "key", "gemini-1.5-flash",
+                                     client=client, base_url=server.base_url)
+            assert reply == DEFAULT_REPLY
+        for _ in range(5):
+            reply = chat_with_openai("Lahore traffic", 0.7, "key",
+                                     client=client, base_url=server.base_url)
+            assert reply == DEFAULT_REPLY
+
+        assert server.requests == 10
+        assert server.connections == 1
+    client.close()
+
+    assert client.get_stats()["request_count"] == 10
+
+    print("✅ Connection reuse test passed")
+
+
+def test_connection_error_becomes_message():
+    """Test that an unreachable provider is reported as a chat message"""
+    print("Testing connection error handling...")
+
+    client = LLMClient()
+    reply = chat_with_gemini("Lahore traffic", 0.7, "key", "gemini-1.5-flash",
+                             client=client, base_url="http://127.0.0.1:9")
+    assert reply.startswith("❌ Connection Error")
+    client.close()
+
+    print("✅ Connection error handling test passed")
+
+
+def main():
+    """Run all tests"""
+    print("Running LLM client tests...\n")
+
+    try:
+        test_shared_client_is_process_wide()
+        test_pooled_client_reuses_connections()
+        test_connection_error_becomes_message()
+
+        print("\n🎉 All LLM client tests passed!")
+
+    except Exception as e:
+        print(f"\n❌ Test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
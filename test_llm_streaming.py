@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Test script for token streaming from the Gemini and OpenAI providers
+"""
+
+import sys
+import os
+import time
+
+import requests
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from trafficwise.llm_client import LLMClient, iter_sse_data
+from trafficwise.providers import StreamInterrupted, stream_gemini, stream_openai
+from trafficwise.stub_server import StubLLMServer, DEFAULT_REPLY
+
+
+class FakeSSEResponse:
+    """Minimal stand-in for a streamed requests.Response"""
+
+    encoding = None
+
+    def __init__(self, lines):
+        self.lines = lines
+
+    def iter_lines(self, decode_unicode=False):
+        return iter(self.lines)
+
+
+def test_sse_parsing():
+    """Test SSE data extraction including multi-line events and comments"""
+    print("Testing SSE parsing...")
+
+    response = FakeSSEResponse([
+        ": keep-alive comment",
+        "event: message",
+        "data: first",
+        "",
+        "data: line one",
+        "data:line two",
+        "",
+        "data: [DONE]",
+    ])
+
+    assert list(iter_sse_data(response)) == ["first", "line one\nline two", "[DONE]"]
+
+    print("✅ SSE parsing test passed")
+
+
+def check_streaming(stream_factory):
+    """Consume a token stream, returning (tokens, time to first token, total time)"""
+    start = time.perf_counter()
+    first_token_at = None
+    tokens = []
+    for token in stream_factory():
+        if first_token_at is None:
+            first_token_at = time.perf_counter() - start
+        tokens.append(token)
+    return tokens, first_token_at, time.perf_counter() - start
+
+
+def test_gemini_streaming():
+    """Test Gemini streamGenerateContent tokens arrive incrementally"""
+    print("Testing Gemini streaming...")
+
+    client = LLMClient()
+    with StubLLMServer(token_delay=0.02) as server:
+        tokens, ttft, total = check_streaming(lambda: stream_gemini(
+            "Lahore to Islamabad", 0.7, "key", "gemini-1.5-flash",
+            client=client, base_url=server.base_url))
+
+    assert "".join(tokens) == DEFAULT_REPLY
+    assert len(tokens) > 1
+    assert ttft < total / 2
+    client.close()
+
+    print(f"✅ Gemini streaming test passed - {len(tokens)} tokens, TTFT {ttft * 1000:.1f}ms of {total * 1000:.1f}ms")
+
+
+def test_openai_streaming():
+    """Test OpenAI stream=True deltas arrive incrementally"""
+    print("Testing OpenAI streaming...")
+
+    client = LLMClient()
+    with StubLLMServer(token_delay=0.02) as server:
+        tokens, ttft, total = check_streaming(lambda: stream_openai(
+            "Lahore to Islamabad", 0.7, "key",
+            client=client, base_url=server.base_url))
+
+    assert "".join(tokens) == DEFAULT_REPLY
+    assert len(tokens) > 1
+    assert ttft < total / 2
+    client.close()
+
+    print(f"✅ OpenAI streaming test passed - {len(tokens)} tokens, TTFT {ttft * 1000:.1f}ms of {total * 1000:.1f}ms")
+
+
+def test_streaming_error_message():
+    """Test stream errors are yielded as a chat message"""
+    print("Testing streaming error handling...")
+
+    client = LLMClient()
+    tokens = list(stream_gemini("Lahore", 0.7, "key", "gemini-1.5-flash",
+                                client=client, base_url="http://127.0.0.1:9"))
+    assert len(tokens) == 1 and tokens[0].startswith("❌ Connection Error")
+    client.close()
+
+    print("✅ Streaming error handling test passed")
+
+
+class BrokenStreamClient:
+    """Client whose streamed response drops the connection after the first event"""
+
+    def __init__(self, first_event):
+        self.first_event = first_event
+
+    def post(self, url, **kwargs):
+        return BrokenStreamResponse(self.first_event)
+
+
+class BrokenStreamResponse(FakeSSEResponse):
+    status_code = 200
+    headers = {}
+
+    def __init__(self, first_event):
+        super().__init__([f"data: {first_event}", ""])
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+    def iter_lines(self, decode_unicode=False):
+        yield from self.lines
+        raise requests.exceptions.ConnectionError("connection reset")
+
+
+def test_stream_fails_after_first_token():
+    """Test a failure after some tokens is raised, not appended to the partial answer"""
+    print("Testing mid-stream failures...")
+
+    streams = [
+        stream_openai("Lahore", 0.7, "key", client=BrokenStreamClient(
+            '{"choices": [{"delta": {"content": "Take the M-2 motorway"}}]}')),
+        stream_gemini("Lahore", 0.7, "key", "gemini-1.5-flash", client=BrokenStreamClient(
+            '{"candidates": [{"content": {"parts": [{"text": "Take the M-2 motorway"}]}}]}')),
+    ]
+    for stream in streams:
+        tokens = []
+        try:
+            for token in stream:
+                tokens.append(token)
+            raise AssertionError("expected StreamInterrupted")
+        except StreamInterrupted as e:
+            assert str(e).startswith("❌ Answer interrupted") and "connection reset" in str(e)
+            assert e.error_message.startswith("❌")
+        assert tokens == ["Take the M-2 motorway"]
+
+    print("✅ Mid-stream failure test passed")
+
+
+class CutStreamClient:
+    """Client whose streamed response ends cleanly after the given events, like a proxy cut-off"""
+
+    def __init__(self, *events):
+        self.events = events
+
+    def post(self, url, **kwargs):
+        return CutStreamResponse(self.events)
+
+
+class CutStreamResponse(BrokenStreamResponse):
+    def __init__(self, events):
+        FakeSSEResponse.__init__(self, [line for event in events for line in (f"data: {event}", "")])
+
+    def iter_lines(self, decode_unicode=False):
+        yield from self.lines
+
+
+def test_stream_without_end_marker():
+    """Test a stream must end with [DONE] / a finishReason to count as complete"""
+    print("Testing streams without an end marker...")
+
+    openai_token = '{"choices": [{"delta": {"content": "Take the M-2"}}]}'
+    gemini_token = '{"candidates": [{"content": {"parts": [{"text": "Take the M-2"}]}}]}'
+    truncated = [
+        stream_openai("Lahore", 0.7, "key", client=CutStreamClient(openai_token)),
+        stream_gemini("Lahore", 0.7, "key", "gemini-1.5-flash", client=CutStreamClient(gemini_token)),
+        stream_gemini("Lahore", 0.7, "key", "gemini-1.5-flash", client=CutStreamClient(
+            gemini_token, '{"candidates": [{"finishReason": "SAFETY"}]}')),
+    ]
+    for stream in truncated:
+        tokens = []
+        try:
+            for token in stream:
+                tokens.append(token)
+            raise AssertionError("expected StreamInterrupted")
+        except StreamInterrupted as e:
+            assert str(e).startswith("❌ Answer interrupted")
+        assert tokens == ["Take the M-2"]
+
+    complete = list(stream_gemini("Lahore", 0.7, "key", "gemini-1.5-flash", client=CutStreamClient(
+        gemini_token, '{"candidates": [{"finishReason": "MAX_TOKENS"}]}')))
+    assert complete == ["Take the M-2"]
+
+    # Nothing produced: an error message instead of an empty answer
+    for stream in (
+        stream_openai("Lahore", 0.7, "key", client=CutStreamClient()),
+        stream_openai("Lahore", 0.7, "key", client=CutStreamClient('{"choices": []}', "[DONE]")),
+        stream_gemini("Lahore", 0.7, "key", "gemini-1.5-flash", client=CutStreamClient(
+            '{"candidates": [{"finishReason": "STOP"}]}')),
+    ):
+        tokens = list(stream)
+        assert len(tokens) == 1 and tokens[0].startswith("❌"), tokens
+
+    print("✅ End marker test passed")
+
+
+def main():
+    """Run all tests"""
+    print("Running LLM streaming tests...\n")
+
+    try:
+        test_sse_parsing()
+        test_gemini_streaming()
+        test_openai_streaming()
+        test_streaming_error_message()
+        test_stream_fails_after_first_token()
+        test_stream_without_end_marker()
+
+        print("\n🎉 All LLM streaming tests passed!")
+
+    except Exception as e:
+        print(f"\n❌ Test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Test script for the local Whisper backend and its micro-batcher
+"""
+
+import sys
+import os
+import asyncio
+import threading
+import time
+
+import numpy as np
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from trafficwise.local_whisper import LocalWhisperBackend, MicroBatcher, pcm16_to_float32
+
+
+class FakeModel:
+    """Batched model stand-in: one call per batch, text from the first sample"""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.batch_sizes = []
+
+    def __call__(self, batch):
+        self.batch_sizes.append(len(batch))
+        time.sleep(self.delay)
+        return [f"chunk {int(round(audio[0] * 32768))}" for audio in batch]
+
+
+def chunk(index, samples=1600):
+    return np.full(samples, index, dtype=np.int16).tobytes()
+
+
+def test_batches_across_sessions():
+    """Test concurrent sessions share forward passes and get their own results"""
+    print("Testing cross-session batching...")
+
+    model = FakeModel(delay=0.02)
+    loads = []
+    backend = LocalWhisperBackend(max_batch=4, max_wait_ms=50,
+                                  loader=lambda *args: loads.append(args) or model)
+    assert not backend.is_loaded
+
+    async def session(index):
+        return [await backend.transcribe(chunk(index * 10 + step)) for step in range(3)]
+
+    async def scenario():
+        return await asyncio.gather(*(session(index) for index in range(8)))
+
+    results = asyncio.run(scenario())
+    assert results == [[f"chunk {index * 10 + step}" for step in range(3)] for index in range(8)]
+    assert len(loads) == 1 and loads[0][1] == "int8"
+    assert max(model.batch_sizes) == 4 and len(model.batch_sizes) < 24
+
+    stats = backend.get_stats()
+    assert stats["items"] == 24 and stats["mean_batch"] > 1
+    assert abs(stats["audio_seconds"] - 24 * 0.1) < 1e-9
+    assert stats["real_time_factor"] is not None
+    backend.close()
+
+    print("✅ Cross-session batching test passed")
+
+
+def test_latency_budget():
+    """Test a lone chunk is dispatched once the wait budget expires"""
+    print("Testing batch wait budget...")
+
+    model = FakeModel()
+    batcher = MicroBatcher(model, max_batch=8, max_wait_ms=30)
+    start = time.monotonic()
+    assert batcher.submit(pcm16_to_float32(chunk(5))).result(timeout=2) == "chunk 5"
+    elapsed = time.monotonic() - start
+    assert 0.02 <= elapsed < 0.5, elapsed
+    assert model.batch_sizes == [1]
+
+    futures = [batcher.submit(pcm16_to_float32(chunk(index))) for index in range(8)]
+    assert [future.result(timeout=2) for future in futures] == [f"chunk {index}" for index in range(8)]
+    assert model.batch_sizes[1:] == [8]
+    batcher.close()
+    try:
+        batcher.submit(pcm16_to_float32(chunk(1)))
+        raise AssertionError("expected RuntimeError")
+    except RuntimeError:
+        pass
+
+    print("✅ Batch wait budget test passed")
+
+
+def test_errors_and_cancellation():
+    """Test a failed pass fails its batch only and cancelled chunks are skipped"""
+    print("Testing errors and cancellation...")
+
+    calls = []
+    gate = threading.Event()
+
+    def infer(batch):
+        calls.append(len(batch))
+        gate.wait(2)
+        if len(calls) == 1:
+            raise RuntimeError("model crashed")
+        return ["ok"] * len(batch)
+
+    batcher = MicroBatcher(infer, max_batch=2, max_wait_ms=5)
+    first = [batcher.submit(index) for index in range(2)]
+    time.sleep(0.05)
+    second = [batcher.submit(index) for index in range(2)]
+    cancelled = batcher.submit(9)
+    assert cancelled.cancel()
+    gate.set()
+    for future in first:
+        try:
+            future.result(timeout=2)
+            raise AssertionError("expected RuntimeError")
+        except RuntimeError:
+            pass
+    assert [future.result(timeout=2) for future in second] == ["ok", "ok"]
+    batcher.close()
+    assert calls == [2, 2]
+    assert batcher.get_stats()["errors"] == 1
+
+    print("✅ Errors and cancellation test passed")
+
+
+def test_pcm_conversion():
+    """Test PCM16 bytes become float32 samples in [-1, 1)"""
+    print("Testing PCM conversion...")
+
+    audio = pcm16_to_float32(np.array([0, 16384, -32768], dtype=np.int16).tobytes())
+    assert audio.dtype == np.float32
+    assert audio.tolist() == [0.0, 0.5, -1.0]
+    floats = np.zeros(4, dtype=np.float32)
+    assert pcm16_to_float32(floats) is floats
+
+    print("✅ PCM conversion test passed")
+
+
+def main():
+    """Run all tests"""
+    print("Running local Whisper tests...\n")
+
+    try:
+        test_batches_across_sessions()
+        test_latency_budget()
+        test_errors_and_cancellation()
+        test_pcm_conversion()
+
+        print("\n🎉 All local Whisper tests passed!")
+
+    except Exception as e:
+        print(f"\n❌ Test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Test script for prompt templates and token budgets
+"""
+
+import sys
+import os
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from trafficwise.llm_client import LLMClient
+from trafficwise.prompts import (
+    GEMINI_SAFETY_SETTINGS, OPENAI_MAX_OUTPUT_TOKENS, RAG_PROMPT, PromptTemplate, PromptTooLongError,
+    build_rag_prompt, estimate_tokens, fit_documents, fit_history, input_budget, truncate_to_tokens,
+)
+from trafficwise.providers import _build_gemini_payload, chat_with_gemini, stream_openai
+from trafficwise.stub_server import StubLLMServer
+
+
+def test_template_render():
+    """Test a compiled template renders like str.format"""
+    print("Testing template rendering...")
+
+    text = "Route from {origin} to {destination}.\n{origin} first, then {destination}"
+    template = PromptTemplate(text)
+    assert template.fields == ("origin", "destination", "origin", "destination")
+    values = {"origin": "Lahore", "destination": "Islamabad"}
+    assert template.render(**values) == text.format(**values)
+    assert template.static_tokens == estimate_tokens(text.format(origin="", destination=""))
+    assert PromptTemplate("no fields").render() == "no fields"
+    assert set(RAG_PROMPT.fields) == {"context", "user_message"}
+
+    print("✅ Template rendering test passed")
+
+
+def test_estimate_tokens():
+    """Test the estimate is conservative for English and non-Latin text"""
+    print("Testing token estimation...")
+
+    assert estimate_tokens("") == 1
+    assert estimate_tokens("Take the M-2") == 4
+    # About four characters per real token in English; the estimate uses three
+    english = "Use the motorway outside peak hours to avoid congestion. " * 20
+    assert estimate_tokens(english) >= len(english) / 4
+    urdu = "لاہور سے اسلام آباد کا بہترین راستہ"
+    assert estimate_tokens(urdu) == len(urdu)
+
+    assert input_budget("gemini-1.5-flash") == 8000
+    assert input_budget("gemini-pro", max_input_tokens=100000) == 30720
+    assert input_budget("gpt-3.5-turbo", OPENAI_MAX_OUTPUT_TOKENS, max_input_tokens=100000) == 15385
+    assert input_budget("unknown-model", max_input_tokens=500) == 500
+
+    print("✅ Token estimation test passed")
+
+
+def test_fit_history():
+    """Test history is trimmed oldest first, keeping the summary, and oversized prompts raise"""
+    print("Testing history fitting...")
+
+    history = [{"role": "system", "content": "s" * 30}] + [
+        {"role": "user" if turn % 2 == 0 else "assistant", "content": f"{turn}" * 30} for turn in range(6)
+    ]
+    fitted = fit_history(history, "p" * 30, budget=40)
+    assert [message["content"][0] for message in fitted] == ["s", "4", "5"]
+    fitted = fit_history(history, "p" * 30, budget=20)
+    assert [message["content"][0] for message in fitted] == ["s"]
+    assert fit_history(None, "p" * 30, budget=10) == []
+    try:
+        fit_history(history, "p" * 300, budget=40)
+        raise AssertionError("expected PromptTooLongError")
+    except PromptTooLongError as e:
+        assert e.tokens == 100 and e.budget == 40
+
+    print("✅ History fitting test passed")
+
+
+def test_fit_documents():
+    """Test RAG documents are kept best first and the last one is cut at a sentence"""
+    print("Testing document fitting...")
+
+    documents = ["A" * 150, "Fog closes the M-2 in winter. " * 20, "C" * 300]
+    kept = fit_documents(documents, max_tokens=150)
+    assert kept[0] == documents[0]
+    assert len(kept) == 2 and kept[1].endswith("winter.")
+    assert sum(estimate_tokens(document) for document in kept) <= 150
+    assert fit_documents(documents, max_tokens=60) == [documents[0]]
+    assert truncate_to_tokens("short", 10) == "short"
+
+    prompt = build_rag_prompt("Best route?", ["x" * 30000] * 3, max_context_tokens=500)
+    assert estimate_tokens(prompt) <= RAG_PROMPT.static_tokens + estimate_tokens("Best route?") + 500 + 2
+    try:
+        build_rag_prompt("q" * 3000, ["doc"], max_input_tokens=500)
+        raise AssertionError("expected PromptTooLongError")
+    except PromptTooLongError:
+        pass
+
+    print("✅ Document fitting test passed")
+
+
+def test_payload_skeleton():
+    """Test payloads share the safety settings skeleton and carry the prompt"""
+    print("Testing payload skeleton...")
+
+    first = _build_gemini_payload("Lahore to Multan?", 0.7)
+    second = _build_gemini_payload("Karachi traffic?", 0.2)
+    assert first["safetySettings"] is GEMINI_SAFETY_SETTINGS is second["safetySettings"]
+    assert first["generationConfig"]["temperature"] == 0.7 and second["generationConfig"]["temperature"] == 0.2
+    assert first["generationConfig"]["maxOutputTokens"] == 1024
+    assert "Lahore to Multan?" in first["contents"][0]["parts"][0]["text"]
+
+    print("✅ Payload skeleton test passed")
+
+
+def test_oversized_prompt_not_sent():
+    """Test an oversized question is answered locally and never reaches the provider"""
+    print("Testing oversized prompts...")
+
+    client = LLMClient()
+    with StubLLMServer() as server:
+        huge = "Lahore traffic " * 5000
+        answer = chat_with_gemini(huge, 0.7, "key", "gemini-1.5-flash", client=client, base_url=server.base_url)
+        assert answer.startswith("❌ Prompt too long")
+        tokens = list(stream_openai(huge, 0.7, "key", client=client, base_url=server.base_url))
+        assert len(tokens) == 1 and tokens[0].startswith("❌ Prompt too long")
+        assert server.requests == 0
+
+        answer = chat_with_gemini("Lahore traffic?", 0.7, "key", "gemini-1.5-flash", client=client,
+                                  base_url=server.base_url, history=[{"role": "user", "content": huge}])
+        assert not answer.startswith("❌") and server.requests == 1
+    client.close()
+
+    print("✅ Oversized prompt test passed")
+
+
+def main():
+    """Run all tests"""
+    print("Running prompt tests...\n")
+
+    try:
+        test_template_render()
+        test_estimate_tokens()
+        test_fit_history()
+        test_fit_documents()
+        test_payload_skeleton()
+        test_oversized_prompt_not_sent()
+
+        print("\n🎉 All prompt tests passed!")
+
+    except Exception as e:
+        print(f"\n❌ Test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Test script for the Gemini rate limiter and request coalescing
+"""
+
+import sys
+import os
+import threading
+import time
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from trafficwise.llm_client import LLMClient
+from trafficwise.providers import chat_with_gemini
+from trafficwise.rate_limit import (
+    RATE_LIMITED_MESSAGE, RateLimiter, RequestCoalescer, TokenBucket, parse_retry_after, quota_rate,
+)
+from trafficwise.stub_server import StubLLMServer
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_token_bucket():
+    """Test burst, refill spacing, max wait and pauses"""
+    print("Testing token bucket...")
+
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2.0, burst=3, clock=clock)
+    assert [bucket.reserve() for _ in range(3)] == [0.0, 0.0, 0.0]
+    # Queued callers are spaced one refill interval apart, first come first served
+    assert bucket.reserve() == 0.5
+    assert bucket.reserve() == 1.0
+    assert bucket.reserve(max_wait=1.2) is None
+    clock.now += 1.0
+    assert bucket.reserve(max_wait=1.2) == 0.5
+
+    clock.now += 10.0
+    bucket.pause(4.0)
+    assert bucket.reserve() == 4.0
+    # No burst right after a pause
+    assert bucket.reserve() == 4.5
+
+    print("✅ Token bucket test passed")
+
+
+def test_quota_window():
+    """Test the burst plus one minute of refill stays within the quota"""
+    print("Testing quota window...")
+
+    assert quota_rate(15, 60, 3) == 0.2
+    clock = FakeClock()
+    bucket = TokenBucket(quota_rate(15, 60, 3), burst=3, clock=clock)
+    granted = [clock.now + bucket.reserve() for _ in range(40)]
+    for start in granted:
+        assert sum(1 for t in granted if start <= t < start + 60) <= 15
+
+    print("✅ Quota window test passed")
+
+
+def test_parse_retry_after():
+    """Test Retry-After as seconds, as an HTTP date, and missing"""
+    print("Testing Retry-After parsing...")
+
+    assert parse_retry_after("7") == 7.0
+    assert parse_retry_after(None, default=3.0) == 3.0
+    assert parse_retry_after("garbage", default=3.0) == 3.0
+    http_date = time.strftime("%a, %d %b %Y %H:%M:%S GMT", time.gmtime(time.time() + 30))
+    assert 28 <= parse_retry_after(http_date) <= 30
+
+    print("✅ Retry-After parsing test passed")
+
+
+def test_rate_limiter_stats():
+    """Test per-key buckets, rejection and queue-wait metrics"""
+    print("Testing rate limiter...")
+
+    limiter = RateLimiter(requests_per_minute=602, burst=1, max_wait=0.5)
+    assert limiter.acquire("key-a") == 0.0
+    start = time.monotonic()
+    assert limiter.acquire("key-a") > 0.0
+    assert time.monotonic() - start >= 0.09
+    # Another key has its own bucket
+    assert limiter.acquire("key-b") == 0.0
+    limiter.retry_after("key-a", "5")
+    assert limiter.acquire("key-a") is None
+
+    stats = limiter.get_stats()
+    assert stats["keys"] == 2 and stats["acquired"] == 3 and stats["rejected"] == 1
+    assert stats["delayed"] == 1 and stats["retry_after_pauses"] == 1
+    assert 90 <= stats["max_queue_wait_ms"] <= 100
+    assert "key-a" not in repr(limiter._buckets)
+
+    print("✅ Rate limiter test passed")
+
+
+def test_coalescing():
+    """Test concurrent identical requests share one upstream call"""
+    print("Testing request coalescing...")
+
+    coalescer = RequestCoalescer()
+    calls = []
+    started = threading.Event()
+
+    def upstream(prompt):
+        calls.append(prompt)
+        started.set()
+        time.sleep(0.2)
+        return f"answer to {prompt}"
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(coalescer.call("k", upstream, "M-2")))
+    leader.start()
+    started.wait(2)
+    followers = [
+        threading.Thread(target=lambda: results.append(coalescer.call("k", upstream, "M-2")))
+        for _ in range(4)
+    ]
+    for thread in followers:
+        thread.start()
+    for thread in [leader] + followers:
+        thread.join()
+
+    assert calls == ["M-2"]
+    assert results == ["answer to M-2"] * 5
+    stats = coalescer.get_stats()
+    assert stats["calls"] == 5 and stats["coalesced"] == 4 and stats["upstream"] == 1
+    assert stats["coalesced_ratio"] == 0.8 and stats["in_flight"] == 0
+
+    # A finished call is not reused
+    assert coalescer.call("k", upstream, "M-2") == "answer to M-2"
+    assert len(calls) == 2
+
+    print("✅ Coalescing test passed")
+
+
+def test_coalescing_does_not_share_errors():
+    """Test followers of a failed call make their own call"""
+    print("Testing coalescing with an error answer...")
+
+    coalescer = RequestCoalescer()
+    answers = iter(["❌ Rate Limit: Too many requests.", "Take the M-2"])
+    started = threading.Event()
+
+    def upstream():
+        started.set()
+        time.sleep(0.1)
+        return next(answers)
+
+    results = {}
+    leader = threading.Thread(target=lambda: results.setdefault("leader", coalescer.call("k", upstream)))
+    leader.start()
+    started.wait(2)
+    follower = threading.Thread(target=lambda: results.setdefault("follower", coalescer.call("k", upstream)))
+    follower.start()
+    leader.join()
+    follower.join()
+
+    assert results["leader"].startswith("❌")
+    assert results["follower"] == "Take the M-2"
+    assert coalescer.get_stats()["coalesced"] == 0
+
+    print("✅ Error sharing test passed")
+
+
+def test_gemini_with_limiter():
+    """Test a 429 pauses the key for Retry-After and later calls are rejected without a request"""
+    print("Testing Gemini calls through the limiter...")
+
+    client = LLMClient()
+    with StubLLMServer(quota=2, quota_window=30) as server:
+        limiter = RateLimiter(requests_per_minute=600, burst=5, max_wait=1.0)
+        ask = lambda: chat_with_gemini("Lahore to Islamabad", 0.7, "key", "gemini-1.5-flash",
+                                       client=client, base_url=server.base_url, limiter=limiter)
+        assert not ask().startswith("❌")
+        assert not ask().startswith("❌")
+        assert ask().startswith("❌ Rate Limit")
+        assert server.rate_limited == 1
+
+        # Retry-After (about 30 s) exceeds the limiter's max wait: rejected locally
+        assert ask() == RATE_LIMITED_MESSAGE
+        assert server.requests == 3
+        assert limiter.get_stats()["retry_after_pauses"] == 1
+    client.close()
+
+    print("✅ Gemini limiter test passed")
+
+
+def main():
+    """Run all tests"""
+    print("Running rate limit tests...\n")
+
+    try:
+        test_token_bucket()
+        test_quota_window()
+        test_parse_retry_after()
+        test_rate_limiter_stats()
+        test_coalescing()
+        test_coalescing_does_not_share_errors()
+        test_gemini_with_limiter()
+
+        print("\n🎉 All rate limit tests passed!")
+
+    except Exception as e:
+        print(f"\n❌ Test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Test script for the LLM response cache
+"""
+
+import sys
+import os
+import tempfile
+import time
+
+import numpy as np
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from trafficwise.response_cache import ResponseCache, make_cache_key
+
+MODEL = "gemini:gemini-1.5-flash"
+VOCABULARY = ["best", "route", "lahore", "islamabad", "peak", "hours", "karachi", "metro"]
+
+
+def bag_of_words(text):
+    """Tiny deterministic embedding for semantic lookup tests"""
+    words = text.replace("?", "").split()
+    return np.array([float(words.count(term)) for term in VOCABULARY])
+
+
+def test_normalized_keys():
+    """Test case, whitespace and trailing punctuation do not change the key"""
+    print("Testing key normalization...")
+
+    assert make_cache_key("Best route  Lahore?", MODEL, 0.7) == make_cache_key("best route lahore", MODEL, 0.7)
+    assert make_cache_key("best route lahore", MODEL, 0.7) != make_cache_key("best route lahore", MODEL, 0.2)
+    assert make_cache_key("best route lahore", MODEL, 0.7) != make_cache_key("best route lahore", "openai:x", 0.7)
+
+    cache = ResponseCache(disk_path=None)
+    cache.put("Best route Lahore to Islamabad?", MODEL, 0.7, "Take the M-2")
+    assert cache.get("best route lahore to islamabad", MODEL, 0.7) == "Take the M-2"
+    assert cache.get("best route lahore to islamabad", MODEL, 0.2) is None
+
+    stats = cache.get_stats()
+    assert stats["memory_hits"] == 1 and stats["misses"] == 1
+
+    print("✅ Key normalization test passed")
+
+
+def test_errors_not_cached():
+    """Test provider error messages are never cached"""
+    print("Testing error responses...")
+
+    cache = ResponseCache(disk_path=None)
+    cache.put("route", MODEL, 0.7, "❌ Rate Limit: Too many requests.")
+    assert cache.get("route", MODEL, 0.7) is None
+
+    print("✅ Error response test passed")
+
+
+def test_ttl_and_byte_bound():
+    """Test TTL expiry and LRU eviction by size"""
+    print("Testing TTL and LRU eviction...")
+
+    cache = ResponseCache(disk_path=None, ttl_seconds=0.05)
+    cache.put("route", MODEL, 0.7, "answer")
+    time.sleep(0.1)
+    assert cache.get("route", MODEL, 0.7) is None
+    assert cache.get_stats()["expired"] == 1
+
+    cache = ResponseCache(disk_path=None, max_bytes=250)
+    for i in range(5):
+        cache.put(f"question {i}", MODEL, 0.7, "x" * 100)
+        cache.get("question 0", MODEL, 0.7)  # keep question 0 recently used
+
+    stats = cache.get_stats()
+    assert stats["bytes"] <= 250
+    assert stats["evictions"] == 3
+    assert cache.get("question 0", MODEL, 0.7) is not None
+    assert cache.get("question 4", MODEL, 0.7) is not None
+    assert cache.get("question 1", MODEL, 0.7) is None
+
+    print("✅ TTL and LRU eviction test passed")
+
+
+def test_disk_tier_survives_restart():
+    """Test answers persist across cache instances"""
+    print("Testing disk tier...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "responses.db")
+        first = ResponseCache(disk_path=path)
+        first.put("best route lahore to islamabad", MODEL, 0.7, "Take the M-2")
+
+        restarted = ResponseCache(disk_path=path)
+        assert restarted.get_stats()["entries"] == 1
+        assert restarted.get("Best route Lahore to Islamabad?", MODEL, 0.7) == "Take the M-2"
+
+        # A cold memory tier still finds the answer on disk
+        cold = ResponseCache(disk_path=path, max_bytes=1)
+        assert cold.get("best route lahore to islamabad", MODEL, 0.7) == "Take the M-2"
+        assert cold.get_stats()["disk_hits"] == 1
+
+    print("✅ Disk tier test passed")
+
+
+def test_semantic_lookup():
+    """Test near-duplicate questions are answered from the cache"""
+    print("Testing semantic lookup...")
+
+    cache = ResponseCache(disk_path=None, embed_fn=bag_of_words, similarity_threshold=0.9)
+    cache.put("best route lahore islamabad peak hours", MODEL, 0.7, "Take the M-2")
+
+    assert cache.get("peak hours best route lahore islamabad?", MODEL, 0.7) == "Take the M-2"
+    assert cache.get("karachi metro", MODEL, 0.7) is None
+    assert cache.get("best route lahore islamabad peak hours now", "openai:x", 0.7) is None
+
+    stats = cache.get_stats()
+    assert stats["semantic_hits"] == 1
+    assert stats["misses"] == 2
+
+    # Answers embedded by a previous embedding model (kept on disk) are skipped, not compared
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "responses.db")
+        ResponseCache(disk_path=path, embed_fn=lambda text: np.ones(3)).put("karachi metro", MODEL, 0.7, "Green Line")
+        restarted = ResponseCache(disk_path=path, embed_fn=bag_of_words, similarity_threshold=0.9)
+        restarted.put("best route lahore islamabad peak hours", MODEL, 0.7, "Take the M-2")
+        assert restarted.get("peak hours best route lahore islamabad?", MODEL, 0.7) == "Take the M-2"
+        assert restarted.get("karachi metro", MODEL, 0.7) == "Green Line"
+
+    print("✅ Semantic lookup test passed")
+
+
+def main():
+    """Run all tests"""
+    print("Running response cache tests...\n")
+
+    try:
+        test_normalized_keys()
+        test_errors_not_cached()
+        test_ttl_and_byte_bound()
+        test_disk_tier_survives_restart()
+        test_semantic_lookup()
+
+        print("\n🎉 All response cache tests passed!")
+
+    except Exception as e:
+        print(f"\n❌ Test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
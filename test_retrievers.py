@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Test script for the pluggable RAG retrievers
+"""
+
+import sys
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from trafficwise.retrievers import ChromaRetriever, IVFRetriever, NumpyRetriever, normalize_rows
+
+
+def row_lookup(rows):
+    rows = [int(r) for r in rows]
+    return rows, [f"doc-{r}" for r in rows], [{"row": r} for r in rows]
+
+
+def clustered_corpus(size=2000, dim=32, seed=1):
+    rng = np.random.default_rng(seed)
+    centres = rng.standard_normal((20, dim))
+    return normalize_rows(centres[rng.integers(0, 20, size)] + 0.3 * rng.standard_normal((size, dim)))
+
+
+def test_flat_search_is_exact():
+    """Test batched flat search matches a full sort, in float32 and float16"""
+    print("Testing flat search...")
+
+    corpus = clustered_corpus()
+    queries = corpus[[5, 50, 500]] + 0.01
+    expected = np.argsort(-(normalize_rows(queries) @ corpus.T), axis=1)[:, :5]
+
+    results = NumpyRetriever(corpus, row_lookup).search(queries, top_k=5)
+    assert [[chunk.id for chunk in chunks] for chunks in results] == expected.tolist()
+    assert all(chunks[0].score >= chunks[-1].score for chunks in results)
+    assert results[0][0].metadata == {"row": int(expected[0][0])}
+
+    half = NumpyRetriever(corpus.astype(np.float16), row_lookup).search(queries, top_k=1)
+    assert [chunks[0].id for chunks in half] == expected[:, 0].tolist()
+
+    print("✅ Flat search test passed")
+
+
+def test_from_arrays():
+    """Test the in-memory constructor resolves documents"""
+    print("Testing in-memory retriever...")
+
+    retriever = NumpyRetriever.from_arrays(
+        [[1, 0], [0, 1]], ["lahore", "karachi"], ["Canal Road", "Shahrah-e-Faisal"]
+    )
+    chunks = retriever.search([[0.1, 0.9]], top_k=5)[0]
+    assert [chunk.document for chunk in chunks] == ["Shahrah-e-Faisal", "Canal Road"]
+
+    print("✅ In-memory retriever test passed")
+
+
+def test_ivf_recall_and_appended_rows():
+    """Test IVF recall on clustered data and that rows added after training are found"""
+    print("Testing IVF search...")
+
+    corpus = clustered_corpus()
+    queries = corpus[::100] + 0.01
+    exact = NumpyRetriever(corpus, row_lookup).search(queries, top_k=10)
+
+    current = {"matrix": corpus}
+    ivf = IVFRetriever(lambda: current["matrix"], row_lookup, n_cells=20, nprobe=4).train()
+    approximate = ivf.search(queries, top_k=10)
+
+    recall = np.mean([
+        len({c.id for c in a} & {c.id for c in e}) / 10 for a, e in zip(approximate, exact)
+    ])
+    assert recall >= 0.9, recall
+
+    new_row = normalize_rows(np.ones((1, corpus.shape[1])))
+    current["matrix"] = np.vstack([corpus, new_row])
+    assert ivf.search(new_row, top_k=1)[0][0].id == len(corpus)
+
+    print(f"✅ IVF search test passed - recall@10 {recall:.2f}")
+
+
+def test_ivf_retrains_when_tail_grows():
+    """Test the IVF index retrains once appended rows pass the retrain fraction"""
+    print("Testing IVF retraining...")
+
+    corpus = clustered_corpus()
+    current = {"matrix": corpus[:1000]}
+    ivf = IVFRetriever(lambda: current["matrix"], row_lookup, n_cells=20, nprobe=4, retrain_fraction=0.25).train()
+
+    # A tail within the fraction is scanned exactly
+    current["matrix"] = corpus[:1200]
+    assert ivf.search(corpus[1100:1101], top_k=1)[0][0].id == 1100
+    assert ivf.trained_rows == 1000
+
+    current["matrix"] = corpus[:1300]
+    assert ivf.search(corpus[1299:1300], top_k=1)[0][0].id == 1299
+    assert ivf.trained_rows == 1300
+    assert len(ivf.cell_rows) == 1300
+
+    # Retraining can be left to the caller
+    current["matrix"] = corpus[:1000]
+    manual = IVFRetriever(lambda: current["matrix"], row_lookup, n_cells=20, retrain_fraction=None).train()
+    current["matrix"] = corpus
+    assert manual.search(corpus[1999:2000], top_k=1)[0][0].id == 1999
+    assert manual.trained_rows == 1000
+
+    # Concurrent searches share one retrain and keep answering from the old index meanwhile
+    current["matrix"] = corpus[:1000]
+    shared = IVFRetriever(lambda: current["matrix"], row_lookup, n_cells=20, nprobe=4).train()
+    current["matrix"] = corpus
+    builds = []
+    build_index = shared._build_index
+
+    def slow_build():
+        builds.append(1)
+        time.sleep(0.2)
+        return build_index()
+
+    shared._build_index = slow_build
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        found = list(pool.map(lambda row: shared.search(corpus[row:row + 1], top_k=1)[0][0].id, range(1990, 2000)))
+    assert found == list(range(1990, 2000))
+    assert len(builds) == 1 and shared.trained_rows == 2000
+
+    print("✅ IVF retraining test passed")
+
+
+def test_chroma_result_mapping():
+    """Test Chroma's nested result lists are mapped per query"""
+    print("Testing Chroma retriever...")
+
+    class FakeCollection:
+        def query(self, query_embeddings, n_results, include):
+            assert len(query_embeddings) == 2
+            return {
+                "ids": [["a", "b"], ["c"]],
+                "documents": [["Ring Road", "Mall Road"], ["M-2"]],
+                "metadatas": [[{"city": "Lahore"}, None], [{}]],
+                "distances": [[0.1, 0.3], [0.2]],
+            }
+
+    results = ChromaRetriever(FakeCollection()).search([[1.0, 0.0], [0.0, 1.0]], top_k=2)
+    assert [chunk.document for chunk in results[0]] == ["Ring Road", "Mall Road"]
+    assert results[0][1].metadata == {}
+    assert abs(results[1][0].score - 0.8) < 1e-9
+
+    print("✅ Chroma retriever test passed")
+
+
+def main():
+    """Run all tests"""
+    print("Running retriever tests...\n")
+
+    try:
+        test_flat_search_is_exact()
+        test_from_arrays()
+        test_ivf_recall_and_appended_rows()
+        test_ivf_retrains_when_tail_grows()
+        test_chroma_result_mapping()
+
+        print("\n🎉 All retriever tests passed!")
+
+    except Exception as e:
+        print(f"\n❌ Test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Test script for hedged multi-provider routing
+"""
+
+import sys
+import os
+import threading
+import time
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from trafficwise.llm_client import LLMClient
+from trafficwise.providers import StreamInterrupted
+from trafficwise.routing import (
+    MIN_SAMPLES, OFFLINE_BACKEND, Backend, HedgedRouter, LatencyProfile, RoutingProfiles, collect_stream,
+    provider_backends,
+)
+from trafficwise.stub_server import StubLLMServer
+
+
+def fake_backend(name, delay, text="answer", cancelled=None):
+    """Backend that sleeps (interruptibly) then answers"""
+    def call(message, cancel):
+        if cancel.wait(delay):
+            if cancelled is not None:
+                cancelled.set()
+            return None
+        return f"{text} from {name}"
+    return Backend(name, call)
+
+
+def warm(profiles, name, latency, count=MIN_SAMPLES):
+    for _ in range(count):
+        profiles.profile(name).record(latency, True)
+
+
+def test_latency_profile():
+    """Test rolling percentiles and error rate"""
+    print("Testing latency profiles...")
+
+    profile = LatencyProfile(window=50)
+    assert profile.latency(95, default=3.0) == 3.0
+    for index in range(40):
+        profile.record(0.1 if index < 37 else 1.0, True)
+    for _ in range(10):
+        profile.record(5.0, False)
+    assert profile.latency(50) == 0.1
+    assert profile.latency(95) == 1.0
+    assert abs(profile.error_rate - 0.2) < 1e-9
+    stats = profile.get_stats()
+    assert stats["calls"] == 50 and stats["p50_ms"] == 100.0
+
+    print("✅ Latency profile test passed")
+
+
+def test_ranking():
+    """Test the faster healthy backend is tried first"""
+    print("Testing latency-aware ranking...")
+
+    profiles = RoutingProfiles()
+    warm(profiles, "gemini", 0.5)
+    warm(profiles, "openai", 0.1)
+    router = HedgedRouter([fake_backend("gemini", 0), fake_backend("openai", 0)], profiles=profiles)
+    assert [backend.name for backend in router.rank()] == ["openai", "gemini"]
+
+    for _ in range(MIN_SAMPLES * 2):
+        profiles.profile("openai").record(0.1, False)
+    assert [backend.name for backend in router.rank()] == ["gemini", "openai"]
+
+    print("✅ Ranking test passed")
+
+
+def test_hedge_cancels_loser():
+    """Test a slow primary is hedged after its p95 and the loser is cancelled"""
+    print("Testing hedged requests...")
+
+    profiles = RoutingProfiles(hedge_budget=1.0)
+    warm(profiles, "gemini", 0.05)
+    warm(profiles, "openai", 0.08)
+    cancelled = threading.Event()
+    router = HedgedRouter(
+        [fake_backend("gemini", 1.0, cancelled=cancelled), fake_backend("openai", 0.05)],
+        profiles=profiles, deadline=5,
+    )
+    result = router.route("Lahore to Islamabad")
+    assert result.backend == "openai" and result.hedged and result.attempts == 2
+    assert result.latency < 0.5
+    assert cancelled.wait(1)
+
+    stats = profiles.get_stats()
+    assert stats["hedged"] == 1 and stats["cancelled"] == 1 and stats["wins"] == {"openai": 1}
+
+    print("✅ Hedged request test passed")
+
+
+def test_hedge_budget():
+    """Test hedges stop once the budget fraction is used"""
+    print("Testing hedge budget...")
+
+    profiles = RoutingProfiles(hedge_budget=0.0)
+    warm(profiles, "gemini", 0.01)
+    warm(profiles, "openai", 0.02)
+    router = HedgedRouter([fake_backend("gemini", 0.2), fake_backend("openai", 0.0)], profiles=profiles, deadline=5)
+    result = router.route("query")
+    assert result.backend == "gemini" and not result.hedged and result.attempts == 1
+
+    print("✅ Hedge budget test passed")
+
+
+def test_failover_on_error():
+    """Test an error answer (e.g. 429) fails over immediately"""
+    print("Testing failover...")
+
+    profiles = RoutingProfiles()
+    warm(profiles, "gemini", 0.01)
+    warm(profiles, "openai", 0.02)
+    limited = Backend("gemini", lambda message, cancel: "❌ Rate Limit: Too many requests.")
+    router = HedgedRouter([limited, fake_backend("openai", 0.0)], profiles=profiles, deadline=5)
+    result = router.route("query")
+    assert result.backend == "openai" and not result.hedged
+    assert profiles.get_stats()["failovers"] == 1
+    assert profiles.profile("gemini").error_rate > 0
+
+    print("✅ Failover test passed")
+
+
+def test_broken_stream_does_not_win():
+    """Test a stream failing partway (or opening with an error) loses to the healthy attempt"""
+    print("Testing broken streams...")
+
+    def broken_stream():
+        yield "Take the M-2 motorway"
+        raise StreamInterrupted("❌ OpenAI Error: connection reset")
+
+    def error_stream():
+        yield "❌ Rate Limit: Too many requests."
+
+    for stream in (broken_stream, error_stream):
+        profiles = RoutingProfiles(hedge_budget=1.0)
+        warm(profiles, "openai", 0.01)
+        warm(profiles, "gemini", 0.02)
+        broken = Backend("openai", lambda message, cancel: collect_stream(stream(), cancel))
+        healthy_cancelled = threading.Event()
+        router = HedgedRouter([broken, fake_backend("gemini", 0.1, cancelled=healthy_cancelled)],
+                              profiles=profiles, deadline=5)
+        result = router.route("Lahore to Islamabad")
+        assert result.backend == "gemini" and result.text == "answer from gemini"
+        assert not healthy_cancelled.is_set()
+        assert profiles.get_stats()["wins"] == {"gemini": 1}
+        assert profiles.profile("openai").error_rate > 0
+
+    print("✅ Broken stream test passed")
+
+
+def test_deadline_fallback():
+    """Test the offline engine answers when every backend misses the deadline"""
+    print("Testing deadline fallback...")
+
+    profiles = RoutingProfiles()
+    router = HedgedRouter(
+        [fake_backend("gemini", 5.0), fake_backend("openai", 5.0)],
+        profiles=profiles, deadline=0.3, default_hedge_delay=0.1,
+        fallback=lambda message: f"offline: {message}",
+    )
+    start = time.monotonic()
+    result = router.route("congestion")
+    assert time.monotonic() - start < 1.0
+    assert result.backend == OFFLINE_BACKEND and result.text == "offline: congestion"
+    assert profiles.profile("gemini").error_rate == 1.0
+
+    no_keys = HedgedRouter([], profiles=profiles, fallback=lambda message: "offline")
+    assert no_keys.route("x").backend == OFFLINE_BACKEND
+
+    print("✅ Deadline fallback test passed")
+
+
+def test_stub_servers():
+    """Test hedging against stub servers closes the losing stream"""
+    print("Testing routing against stub servers...")
+
+    client = LLMClient()
+    with StubLLMServer(delay=1.0, token_delay=0.05) as gemini, StubLLMServer(delay=0.05) as openai:
+        profiles = RoutingProfiles(hedge_budget=1.0)
+        warm(profiles, "gemini", 0.05)
+        warm(profiles, "openai", 0.1)
+        router = HedgedRouter(
+            provider_backends(0.7, "key", "key", client=client,
+                              gemini_base_url=gemini.base_url, openai_base_url=openai.base_url),
+            profiles=profiles, deadline=5,
+        )
+        result = router.route("Lahore to Islamabad")
+        assert result.backend == "openai" and result.hedged
+        assert result.text == "Use Motorway M-2 outside peak hours (7-9 AM, 5-8 PM)."
+
+        deadline = time.monotonic() + 3
+        while gemini.disconnects == 0 and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert gemini.disconnects == 1
+
+        openai.configure(error_rate=1.0)
+        gemini.configure(delay=0.0)
+        result = router.route("Lahore to Islamabad")
+        assert result.backend == "gemini"
+    client.close()
+
+    print("✅ Stub server routing test passed")
+
+
+def main():
+    """Run all tests"""
+    print("Running routing tests...\n")
+
+    try:
+        test_latency_profile()
+        test_ranking()
+        test_hedge_cancels_loser()
+        test_hedge_budget()
+        test_failover_on_error()
+        test_broken_stream_does_not_win()
+        test_deadline_fallback()
+        test_stub_servers()
+
+        print("\n🎉 All routing tests passed!")
+
+    except Exception as e:
+        print(f"\n❌ Test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Test script for the sharded session store and timer wheel
+"""
+
+import sys
+import os
+import random
+import threading
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from trafficwise.session_store import SessionStore, TimerWheel
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_timer_wheel_matches_deadlines():
+    """Test every timer fires at its deadline tick, across levels and cascades"""
+    print("Testing timer wheel...")
+
+    rng = random.Random(5)
+    wheel = TimerWheel(tick=1.0, slots=8, levels=3, now=0.0)
+    deadlines = {f"t{i}": rng.randint(1, 2000) for i in range(500)}
+    for key, deadline in deadlines.items():
+        wheel.schedule(key, deadline)
+    cancelled = [f"t{i}" for i in range(0, 500, 7)]
+    for key in cancelled:
+        assert wheel.cancel(key)
+    assert not wheel.cancel("missing")
+
+    fired = {}
+    now = 0
+    while wheel:
+        now += rng.randint(1, 40)
+        for key in wheel.advance(now):
+            fired[key] = now
+    assert set(fired) == set(deadlines) - set(cancelled)
+    for key, when in fired.items():
+        # Fired on the first advance at or past the deadline
+        assert deadlines[key] <= when < deadlines[key] + 41
+
+    # Beyond the top level (8 ** 3 ticks) and in the past
+    wheel.schedule("far", now + 5000)
+    wheel.schedule("past", now - 10)
+    assert wheel.advance(now + 1) == ["past"]
+    assert wheel.advance(now + 4999) == [] and wheel.advance(now + 5000) == ["far"]
+
+    print("✅ Timer wheel test passed")
+
+
+def test_store_operations():
+    """Test put/get/remove and that expiry honours activity"""
+    print("Testing session store...")
+
+    clock = FakeClock()
+    store = SessionStore(shards=4, timeout=300, clock=clock)
+    for i in range(10):
+        store.put(f"session-{i}", {"text": i})
+    assert len(store) == 10 and store.get("session-3") == {"text": 3}
+    assert store.remove("session-3") and not store.remove("session-3")
+    assert store.get("session-3") is None and "session-3" not in store
+
+    clock.now += 200
+    assert store.touch("session-1") and not store.touch("session-3")
+    clock.now += 100
+    expired = dict(store.expire())
+    assert set(expired) == {f"session-{i}" for i in range(10)} - {"session-1", "session-3"}
+    assert len(store) == 1 and store.get_stats()["rearmed"] == 1
+
+    clock.now += 199
+    assert store.expire() == []
+    clock.now += 1
+    assert [session_id for session_id, _ in store.expire()] == ["session-1"]
+
+    # Already past its timeout when added: removed by the next cleanup
+    store.put("stale", "s", last_activity=clock.now - 301)
+    assert store.expire() == [("stale", "s")]
+
+    # Replacing a session reschedules it
+    store.put("late", "a", last_activity=clock.now - 400)
+    store.put("late", "b")
+    assert store.expire() == [] and store.get("late") == "b"
+    stats = store.get_stats()
+    assert stats["created"] == 12 and stats["expired"] == 10 and stats["removed"] == 1
+
+    print("✅ Session store test passed")
+
+
+def test_concurrent_access():
+    """Test concurrent puts, touches and removals leave the store consistent"""
+    print("Testing concurrent access...")
+
+    clock = FakeClock()
+    store = SessionStore(shards=8, timeout=60, clock=clock)
+
+    def worker(offset):
+        for i in range(2000):
+            session_id = f"{offset}-{i}"
+            store.put(session_id, i)
+            store.touch(session_id)
+            assert store.get(session_id) == i
+            if i % 2:
+                assert store.remove(session_id)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(store) == 4000
+    clock.now += 60
+    assert len(store.expire()) == 4000 and len(store) == 0
+
+    print("✅ Concurrent access test passed")
+
+
+def main():
+    """Run all tests"""
+    print("Running session store tests...\n")
+
+    try:
+        test_timer_wheel_matches_deadlines()
+        test_store_operations()
+        test_concurrent_access()
+
+        print("\n🎉 All session store tests passed!")
+
+    except Exception as e:
+        print(f"\n❌ Test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Test script for the cached traffic map
+"""
+
+import sys
+import os
+import copy
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from trafficwise.geo_store import GeoStore, PointLayer
+from trafficwise.traffic_map import CITIES, DEFAULT_ZOOM, HIGHWAY_ROUTES, TrafficMapCache, data_version
+
+
+def test_data_version():
+    """Test the data version changes only when map data changes"""
+    print("Testing data version...")
+
+    assert data_version() == data_version(copy.deepcopy(CITIES), copy.deepcopy(HIGHWAY_ROUTES))
+
+    updated = copy.deepcopy(CITIES)
+    updated[0]["traffic"] = "Light"
+    assert data_version(updated) != data_version()
+
+    rerouted = copy.deepcopy(HIGHWAY_ROUTES)
+    rerouted[0]["path"].append([35.0, 72.0])
+    assert data_version(routes=rerouted) != data_version()
+
+    print("✅ Data version test passed")
+
+
+def test_render_once_per_version():
+    """Test the map is rendered once per data version and size"""
+    print("Testing cached rendering...")
+
+    builds = []
+
+    def renderer(cities, routes, store, zoom):
+        builds.append(len(cities))
+        return f"<html>{len(cities)} cities</html>"
+
+    cache = TrafficMapCache(max_entries=2, renderer=renderer)
+    first = cache.get_html()
+    assert cache.get_html() is first
+    assert len(builds) == 1
+
+    cache.get_html(zoom=DEFAULT_ZOOM + 2)
+    assert len(builds) == 2
+
+    updated = copy.deepcopy(CITIES)[:3]
+    assert cache.get_html(updated) == "<html>3 cities</html>"
+    assert len(builds) == 3
+
+    # LRU bound: the first entry was evicted
+    assert cache.get_stats()["entries"] == 2
+    cache.get_html()
+    assert len(builds) == 4
+
+    stats = cache.get_stats()
+    assert stats["hits"] == 1 and stats["renders"] == 4
+
+    print("✅ Cached rendering test passed")
+
+
+def test_folium_render():
+    """Test the real Folium map renders markers and highways"""
+    print("Testing Folium rendering...")
+
+    try:
+        import folium  # noqa: F401
+    except ImportError:
+        print("⚠️ folium not installed, skipping")
+        return
+
+    html = TrafficMapCache().get_html()
+    for city in CITIES:
+        assert city["city"] in html
+    assert "Major Highway: GT Road" in html
+    assert html.count("L.polyline") == len(HIGHWAY_ROUTES)
+
+    store = GeoStore(PointLayer(["Kalma Chowk"], [31.5], [74.33], [3]))
+    network_html = TrafficMapCache().get_html(store=store, zoom=10)
+    assert "Kalma Chowk" in network_html and "L.CircleMarker" in network_html
+
+    print("✅ Folium rendering test passed")
+
+
+def main():
+    """Run all tests"""
+    print("Running traffic map tests...\n")
+
+    try:
+        test_data_version()
+        test_render_once_per_version()
+        test_folium_render()
+
+        print("\n🎉 All traffic map tests passed!")
+
+    except Exception as e:
+        print(f"\n❌ Test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Test script for incremental transcript assembly
+"""
+
+import sys
+import os
+import random
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from trafficwise.transcript import TranscriptAssembler, apply_message, common_prefix_length
+
+DEMO_HYPOTHESES = [
+    "Hello",
+    "Hello world",
+    "Hello world, this",
+    "Hello world, this is",
+    "Hello world, this is a",
+    "Hello world, this is a test",
+    "Hello world, this is a test of",
+    "Hello world, this is a test of streaming",
+    "Hello world, this is a test of streaming transcription.",
+]
+
+
+def test_common_prefix_length():
+    """Test the slice-comparing prefix search against a character loop"""
+    print("Testing common prefix length...")
+
+    rng = random.Random(2)
+    for _ in range(500):
+        a = "".join(rng.choice("ab ") for _ in range(rng.randint(0, 30)))
+        b = a[:rng.randint(0, len(a))] + "".join(rng.choice("ab ") for _ in range(rng.randint(0, 10)))
+        expected = 0
+        while expected < min(len(a), len(b)) and a[expected] == b[expected]:
+            expected += 1
+        assert common_prefix_length(a, b) == expected
+
+    print("✅ Common prefix length test passed")
+
+
+def test_deltas_carry_only_new_text():
+    """Test the demo sequence produces appends only and the client reconstructs it"""
+    print("Testing transcript deltas...")
+
+    assembler = TranscriptAssembler(resync_every=0)
+    client = ""
+    messages = []
+    for index, hypothesis in enumerate(DEMO_HYPOTHESES):
+        message = assembler.update(hypothesis, is_final=index == len(DEMO_HYPOTHESES) - 1)
+        client = apply_message(client, message)
+        assert client == assembler.text == hypothesis
+        messages.append(message)
+
+    assert [message["text"] for message in messages[:3]] == ["Hello", " world", ", this"]
+    assert messages[2]["offset"] == 11 and messages[2]["stable"] == 5
+    assert messages[-1]["is_final"] and messages[-1]["stable"] == len(DEMO_HYPOTHESES[-1])
+    stats = assembler.get_stats()
+    assert stats["delta_chars"] == len(DEMO_HYPOTHESES[-1]) and stats["finals"] == 1
+
+    print("✅ Transcript delta test passed")
+
+
+def test_revisions_and_utterances():
+    """Test a revised hypothesis rewrites only the tail and finals are never revisited"""
+    print("Testing revisions and utterances...")
+
+    assembler = TranscriptAssembler(resync_every=0)
+    client = ""
+    script = [
+        ("Take the", False), ("Take the motor", False), ("Take the motorway", False),
+        ("Take the M-2 motorway", True),
+        ("Avoid", False), ("Avoid mall", False), ("Avoid Mall Road", True),
+    ]
+    messages = []
+    for text, is_final in script:
+        message = assembler.update(text, is_final)
+        client = apply_message(client, message)
+        assert client == assembler.text
+        messages.append(message)
+
+    assert messages[3]["offset"] == len("Take the ") and messages[3]["text"] == "M-2 motorway"
+    assert client == "Take the M-2 motorway Avoid Mall Road"
+    assert messages[4]["offset"] == len("Take the M-2 motorway")
+    # The committed first utterance is stable from the start of the second
+    assert messages[4]["stable"] >= len("Take the M-2 motorway")
+    assert messages[5]["offset"] == len("Take the M-2 motorway Avoid") and messages[5]["text"] == " mall"
+    assert assembler.committed_length == len(client)
+
+    print("✅ Revision test passed")
+
+
+def test_resync():
+    """Test periodic and requested full-text syncs"""
+    print("Testing resync...")
+
+    assembler = TranscriptAssembler(resync_every=3)
+    types = [assembler.update(text)["type"] for text in DEMO_HYPOTHESES[:6]]
+    assert types == ["transcript_delta", "transcript_delta", "transcript_sync"] * 2
+    assembler.resync()
+    message = assembler.update(DEMO_HYPOTHESES[6])
+    assert message["type"] == "transcript_sync" and apply_message("stale", message) == DEMO_HYPOTHESES[6]
+    assert assembler.sync_message()["text"] == DEMO_HYPOTHESES[6]
+    assert assembler.get_stats()["syncs"] == 4
+
+    print("✅ Resync test passed")
+
+
+def main():
+    """Run all tests"""
+    print("Running transcript tests...\n")
+
+    try:
+        test_common_prefix_length()
+        test_deltas_carry_only_new_text()
+        test_revisions_and_utterances()
+        test_resync()
+
+        print("\n🎉 All transcript tests passed!")
+
+    except Exception as e:
+        print(f"\n❌ Test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
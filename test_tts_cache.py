@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Test script for the TTS audio cache
+"""
+
+import sys
+import os
+import tempfile
+from unittest import mock
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from trafficwise.tts_cache import TTSAudioCache, make_audio_key
+
+
+class FakeClock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_keys():
+    """Test keys change with every synthesis parameter but not with spacing"""
+    print("Testing cache keys...")
+
+    key = make_audio_key("Welcome to  TrafficWise.", "rachel", "elevenlabs", "telephony_clear")
+    assert key == make_audio_key(" Welcome to TrafficWise. ", "rachel", "elevenlabs", "telephony_clear")
+    assert key != make_audio_key("Welcome to TrafficWise!", "rachel", "elevenlabs", "telephony_clear")
+    assert key != make_audio_key("Welcome to TrafficWise.", "adam", "elevenlabs", "telephony_clear")
+    assert key != make_audio_key("Welcome to TrafficWise.", "rachel", "polly", "telephony_clear")
+    assert key != make_audio_key("Welcome to TrafficWise.", "rachel", "elevenlabs", "telephony_warm")
+    assert len(key) == 64
+
+    print("✅ Cache key test passed")
+
+
+def test_tiers_and_restart():
+    """Test memory hits, disk hits after a restart, and atomic files"""
+    print("Testing memory and disk tiers...")
+
+    with tempfile.TemporaryDirectory() as directory:
+        cache = TTSAudioCache(cache_dir=directory)
+        audio = b"RIFF" + bytes(range(256)) * 40
+        assert cache.get("Hello", "rachel", "elevenlabs", "clear") is None
+        key = cache.put("Hello", "rachel", "elevenlabs", "clear", audio)
+        assert cache.get("Hello", "rachel", "elevenlabs", "clear") == audio
+
+        files = [name for _, _, names in os.walk(directory) for name in names]
+        assert files == [key + ".audio"]
+
+        restarted = TTSAudioCache(cache_dir=directory)
+        assert restarted.contains("Hello", "rachel", "elevenlabs", "clear")
+        assert restarted.get_stats()["entries"] == 0
+        cached = restarted.get("Hello", "rachel", "elevenlabs", "clear")
+        assert isinstance(cached, bytes) and cached == audio
+        assert restarted.get("Hello", "rachel", "elevenlabs", "clear") is cached
+
+        stats = restarted.get_stats()
+        assert (stats["disk_hits"], stats["memory_hits"], stats["misses"]) == (1, 1, 0)
+        assert stats["bytes_served"] == 2 * len(audio) and stats["disk_bytes"] == len(audio)
+
+        # Leftovers from an interrupted write are ignored
+        open(os.path.join(directory, key[:2], "partial.tmp"), "wb").close()
+        assert TTSAudioCache(cache_dir=directory).get_stats()["disk_entries"] == 1
+
+        # Nothing keeps the file open or mapped, so it can be replaced (Windows refuses mapped files)
+        restarted.put("Hello", "rachel", "elevenlabs", "clear", audio[::-1])
+        assert restarted.get("Hello", "rachel", "elevenlabs", "clear") == audio[::-1]
+
+        restarted.clear()
+        assert os.listdir(os.path.join(directory, key[:2])) == ["partial.tmp"]
+        assert restarted.get("Hello", "rachel", "elevenlabs", "clear") is None
+
+    print("✅ Memory and disk tier test passed")
+
+
+def test_scan_races_other_writers():
+    """Test files that vanish during the startup scan (renamed or evicted by another process) are skipped"""
+    print("Testing startup scan races...")
+
+    with tempfile.TemporaryDirectory() as directory:
+        cache = TTSAudioCache(cache_dir=directory)
+        kept = cache.put("Hello", "rachel", "elevenlabs", "clear", b"kept audio")
+        gone = cache.put("Goodbye", "rachel", "elevenlabs", "clear", b"gone audio")
+        scandir = os.scandir
+
+        def racing_scandir(path):
+            entries = list(scandir(path))
+            if path != directory:
+                for entry in entries:
+                    if entry.name.startswith(gone):
+                        os.unlink(entry.path)
+            return iter(entries)
+
+        with mock.patch("trafficwise.tts_cache.os.scandir", racing_scandir):
+            restarted = TTSAudioCache(cache_dir=directory)
+        assert restarted.get_stats()["disk_entries"] == 1
+        assert restarted.get_by_key(kept) == b"kept audio"
+
+    print("✅ Startup scan race test passed")
+
+
+def test_eviction_by_size():
+    """Test both tiers stay within their byte budgets, evicting least recently used"""
+    print("Testing size eviction...")
+
+    with tempfile.TemporaryDirectory() as directory:
+        cache = TTSAudioCache(max_bytes=2500, disk_max_bytes=3500, cache_dir=directory)
+        for index in range(4):
+            cache.put(f"prompt {index}", "v", "p", "x", bytes([index]) * 1000)
+            if index == 2:
+                assert cache.get("prompt 1", "v", "p", "x") is not None
+
+        stats = cache.get_stats()
+        assert stats["bytes"] <= 2500 and stats["disk_bytes"] <= 3500
+        assert stats["evictions"] == 2 and stats["disk_evictions"] == 1
+        assert not cache.contains("prompt 0", "v", "p", "x")
+        assert cache.get("prompt 1", "v", "p", "x") == bytes([1]) * 1000
+
+        memory_only = TTSAudioCache(max_bytes=100, cache_dir=None)
+        memory_only.put("too long", "v", "p", "x", b"a" * 200)
+        assert memory_only.get("too long", "v", "p", "x") is None
+
+    print("✅ Size eviction test passed")
+
+
+def test_ttl():
+    """Test entries expire in both tiers, including across restarts"""
+    print("Testing TTL expiry...")
+
+    with tempfile.TemporaryDirectory() as directory:
+        clock = FakeClock()
+        cache = TTSAudioCache(ttl_seconds=86400, cache_dir=directory, clock=clock)
+        cache.put("Goodbye", "v", "p", "x", b"audio")
+        clock.now += 86000
+        cache.put("Please hold", "v", "p", "x", b"audio2")
+        assert cache.get("Goodbye", "v", "p", "x") == b"audio"
+
+        clock.now += 1000
+        assert cache.get("Goodbye", "v", "p", "x") is None
+        assert cache.get_stats()["expired"] == 2
+        assert TTSAudioCache(ttl_seconds=86400, cache_dir=directory, clock=clock).get_stats()["disk_entries"] == 1
+
+        clock.now += 86400
+        assert cache.expire() == 2
+        assert cache.get_stats()["disk_entries"] == 0 and cache.get_stats()["entries"] == 0
+
+    print("✅ TTL expiry test passed")
+
+
+def main():
+    """Run all tests"""
+    print("Running TTS cache tests...\n")
+
+    try:
+        test_keys()
+        test_tiers_and_restart()
+        test_scan_races_other_writers()
+        test_eviction_by_size()
+        test_ttl()
+
+        print("\n🎉 All TTS cache tests passed!")
+
+    except Exception as e:
+        print(f"\n❌ Test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
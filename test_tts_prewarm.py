@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Test script for phrase catalog pre-warming
+"""
+
+import sys
+import os
+import asyncio
+import json
+import random
+import tempfile
+from types import SimpleNamespace
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from trafficwise.tts_cache import TTSAudioCache
+from trafficwise.tts_prewarm import Phrase, PhrasePrewarmer, load_phrase_catalog
+
+VOICES = {
+    "en": SimpleNamespace(voice_id="Joanna", provider="polly"),
+    "fr": SimpleNamespace(voice_id="Lea", provider="polly"),
+}
+
+
+class FakeSynthesizer:
+    """TTS provider stand-in with random latencies that records concurrency"""
+
+    def __init__(self, seed=0, failing=()):
+        self.rng = random.Random(seed)
+        self.failing = failing
+        self.active = 0
+        self.peak = 0
+        self.calls = []
+
+    async def __call__(self, text, voice):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        self.calls.append((text, voice.voice_id))
+        try:
+            await asyncio.sleep(self.rng.uniform(0.001, 0.01))
+            if text in self.failing:
+                return "❌ TTS provider error"
+            return f"{voice.voice_id}:{text}".encode("utf-8")
+        finally:
+            self.active -= 1
+
+
+def test_catalog():
+    """Test the shipped catalog covers English and French for every phrase"""
+    print("Testing phrase catalog...")
+
+    phrases = load_phrase_catalog()
+    by_language = {}
+    for phrase in phrases:
+        by_language.setdefault(phrase.language, set()).add(phrase.id)
+    assert set(by_language) == {"en", "fr"}
+    assert by_language["en"] == by_language["fr"] and "greeting" in by_language["en"]
+    assert all(phrase.language == "fr" for phrase in load_phrase_catalog(languages={"fr"}))
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "catalog.json")
+        with open(path, "w") as f:
+            json.dump({"version": 2, "phrases": []}, f)
+        try:
+            load_phrase_catalog(path)
+            raise AssertionError("expected ValueError")
+        except ValueError:
+            pass
+
+    print("✅ Phrase catalog test passed")
+
+
+def test_prewarm_fills_cache():
+    """Test startup returns at once and every phrase ends up cached for the chosen voice"""
+    print("Testing background pre-warm...")
+
+    async def scenario(cache):
+        synthesize = FakeSynthesizer(seed=1)
+        progress = []
+        prewarmer = PhrasePrewarmer(synthesize, cache, VOICES.get, concurrency=3, on_progress=progress.append)
+        phrases = load_phrase_catalog()
+
+        task = prewarmer.start(phrases)
+        assert not task.done() and prewarmer.get_stats()["done"] == 0
+        await prewarmer.wait()
+
+        stats = prewarmer.get_stats()
+        assert stats["synthesized"] == len(phrases) and stats["failed"] == 0
+        assert stats["progress"] == 1.0 and not stats["running"]
+        assert synthesize.peak == 3
+        assert [event["done"] for event in progress] == list(range(1, len(phrases) + 1))
+        for phrase in phrases:
+            voice = VOICES[phrase.language]
+            assert cache.get(phrase.text, voice.voice_id, voice.provider, "standard") is not None
+        assert cache.get_stats()["hit_rate"] == 1.0
+
+        # A restart finds everything in the disk tier and synthesizes nothing
+        again = FakeSynthesizer()
+        stats = await PhrasePrewarmer(again, TTSAudioCache(cache_dir=cache.cache_dir), VOICES.get).run(phrases)
+        assert again.calls == [] and stats["already_cached"] == len(phrases)
+
+    with tempfile.TemporaryDirectory() as directory:
+        asyncio.run(scenario(TTSAudioCache(cache_dir=directory)))
+
+    print("✅ Background pre-warm test passed")
+
+
+def test_failures_and_cancel():
+    """Test failed phrases and missing voices are counted, and cancel stops the job"""
+    print("Testing failures and cancellation...")
+
+    phrases = [
+        Phrase("greeting", "en", "Hello"),
+        Phrase("goodbye", "en", "Goodbye"),
+        Phrase("greeting", "de", "Hallo"),
+    ]
+
+    async def scenario():
+        synthesize = FakeSynthesizer(failing={"Goodbye"})
+        cache = TTSAudioCache(cache_dir=None)
+        stats = await PhrasePrewarmer(synthesize, cache, VOICES.get).run(phrases)
+        assert (stats["synthesized"], stats["failed"]) == (1, 2)
+        assert stats["skipped_languages"] == ["de"]
+        assert not cache.contains("Goodbye", "Joanna", "polly", "standard")
+
+        async def slow(text, voice):
+            await asyncio.sleep(10)
+
+        prewarmer = PhrasePrewarmer(slow, cache, VOICES.get, concurrency=1)
+        prewarmer.start(load_phrase_catalog())
+        await asyncio.sleep(0.01)
+        await prewarmer.cancel()
+        assert prewarmer.get_stats()["synthesized"] == 0 and not prewarmer.get_stats()["running"]
+
+    asyncio.run(scenario())
+    print("✅ Failures and cancellation test passed")
+
+
+def main():
+    """Run all tests"""
+    print("Running TTS pre-warm tests...\n")
+
+    try:
+        test_catalog()
+        test_prewarm_fills_cache()
+        test_failures_and_cancel()
+
+        print("\n🎉 All TTS pre-warm tests passed!")
+
+    except Exception as e:
+        print(f"\n❌ Test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
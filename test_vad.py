@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Test script for voice activity detection on synthetic PCM
+"""
+
+import sys
+import os
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+
+from trafficwise.vad import VoiceActivityDetector, frame_features
+
+SAMPLE_RATE = 16000
+CHUNK_SAMPLES = SAMPLE_RATE // 4  # 250 ms
+
+
+def silence(samples=CHUNK_SAMPLES):
+    return np.zeros(samples, dtype=np.int16)
+
+
+def voiced(samples=CHUNK_SAMPLES, level=0.3, offset=0):
+    """Vowel-like tone: 150 Hz fundamental with a few harmonics"""
+    t = (np.arange(samples) + offset) / SAMPLE_RATE
+    wave = sum(np.sin(2 * np.pi * 150 * k * t) / k for k in range(1, 5))
+    return (wave / np.max(np.abs(wave)) * level * 32767).astype(np.int16)
+
+
+def hiss(samples=CHUNK_SAMPLES, level=0.1, seed=0):
+    rng = np.random.default_rng(seed)
+    return np.clip(rng.normal(0, level * 32767, samples), -32768, 32767).astype(np.int16)
+
+
+def test_frame_features():
+    """Test RMS and zero-crossing rate separate tone, hiss and silence"""
+    print("Testing frame features...")
+
+    rms, zcr = frame_features(silence(), 480)
+    assert len(rms) == CHUNK_SAMPLES // 480 and np.all(rms == 0) and np.all(zcr == 0)
+    rms, zcr = frame_features(voiced(), 480)
+    assert np.all(rms > 0.1) and np.all(zcr < 0.1)
+    rms, zcr = frame_features(hiss(), 480)
+    assert np.all(rms > 0.05) and np.all(zcr > 0.4)
+
+    print("✅ Frame features test passed")
+
+
+def test_gate_and_utterance_end():
+    """Test silent chunks are dropped (after a trailing chunk) and the utterance ends after the hangover"""
+    print("Testing speech gating...")
+
+    vad = VoiceActivityDetector(hangover_ms=300)
+    script = [silence(), silence(), voiced(), voiced(offset=CHUNK_SAMPLES), silence(), silence(), silence()]
+    decisions = [vad.process(chunk) for chunk in script]
+
+    # The chunk after speech still goes out, carrying quiet word endings
+    assert [decision.forward for decision in decisions] == [False, False, True, True, True, False, False]
+    # 250 ms chunks hold eight 30 ms frames; 300 ms of silence ends on the second silent chunk
+    assert [decision.utterance_ended for decision in decisions] == [False, False, False, False, False, True, False]
+    stats = vad.get_stats()
+    assert stats["chunks"] == 7 and stats["chunks_dropped"] == 4 and stats["utterances"] == 1
+    assert abs(stats["speech_ratio"] - 2 / 7) < 1e-9
+
+    vad = VoiceActivityDetector(hangover_ms=300, trailing_chunks=0)
+    assert [vad.process(chunk).forward for chunk in script] == [False, False, True, True, False, False, False]
+    vad = VoiceActivityDetector(hangover_ms=300, trailing_chunks=2)
+    assert [vad.process(chunk).forward for chunk in script] == [False, False, True, True, True, True, False]
+
+    # Speech then silence within one chunk: the trailing silence counts toward the hangover
+    vad = VoiceActivityDetector(hangover_ms=300)
+    mixed = np.concatenate([voiced(CHUNK_SAMPLES // 2), silence(CHUNK_SAMPLES // 2)])
+    assert vad.process(mixed).forward and vad.in_utterance
+    assert vad.process(silence()).utterance_ended
+
+    print("✅ Speech gating test passed")
+
+
+def test_noise_rejection():
+    """Test quiet and broadband background noise are not forwarded"""
+    print("Testing noise rejection...")
+
+    vad = VoiceActivityDetector()
+    for seed in range(8):
+        assert not vad.process(hiss(level=0.005, seed=seed)).forward
+        assert not vad.process(hiss(level=0.2, seed=seed + 100)).forward
+    assert vad.process(voiced(level=0.1)).forward
+    assert vad.get_stats()["utterances"] == 0
+
+    print("✅ Noise rejection test passed")
+
+
+def test_webrtc_mode():
+    """Test the WebRTC classifier is used when available and falls back otherwise"""
+    print("Testing WebRTC mode...")
+
+    class LoudFrames:
+        def is_speech(self, frame, sample_rate):
+            return np.frombuffer(frame, dtype=np.int16).any()
+
+    vad = VoiceActivityDetector(mode="webrtc", trailing_chunks=0, loader=lambda aggressiveness: LoudFrames())
+    assert vad.mode == "webrtc"
+    assert vad.process(voiced()).speech_frames == 8
+    assert not vad.process(silence()).forward
+
+    def missing(aggressiveness):
+        raise ImportError("No module named 'webrtcvad'")
+
+    vad = VoiceActivityDetector(mode="webrtc", loader=missing)
+    assert vad.mode == "energy" and vad.process(voiced()).forward
+
+    print("✅ WebRTC mode test passed")
+
+
+def main():
+    """Run all tests"""
+    print("Running VAD tests...\n")
+
+    try:
+        test_frame_features()
+        test_gate_and_utterance_end()
+        test_noise_rejection()
+        test_webrtc_mode()
+
+        print("\n🎉 All VAD tests passed!")
+
+    except Exception as e:
+        print(f"\n❌ Test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
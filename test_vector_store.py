@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Test script for the persistent RAG vector store
+"""
+
+import sys
+import os
+import json
+import tempfile
+
+import numpy as np
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from trafficwise.vector_store import PersistentVectorStore, EMBEDDINGS_FILE, MANIFEST_FILE
+
+DOCUMENTS = [
+    "Lahore Ring Road congestion",
+    "Karachi Shahrah-e-Faisal traffic",
+    "Islamabad Blue Area office hours",
+]
+EMBEDDINGS = [[1.0, 0.0, 0.0], [0.0, 1.0, 0.0], [0.0, 0.0, 2.0]]
+
+
+def test_add_query_and_reopen():
+    """Test chunks survive a restart and are found by cosine similarity"""
+    print("Testing add, query and reopen...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = PersistentVectorStore(tmp, dim=3, model_name="all-MiniLM-L6-v2")
+        added = store.add(["a", "b", "c"], DOCUMENTS, [{"city": "Lahore"}, {}, {}], EMBEDDINGS)
+        assert added == 3
+        assert store.add(["a"], ["duplicate"], None, [[1.0, 0.0, 0.0]]) == 0
+        assert store.get(["a", "zzz"]) == {"ids": ["a"]}
+        store.close()
+
+        reopened = PersistentVectorStore(tmp, dim=3, model_name="all-MiniLM-L6-v2")
+        assert reopened.count() == 3
+        result = reopened.query([[0.1, 0.0, 0.9], [0.9, 0.2, 0.0]], n_results=2)
+
+        assert result["documents"][0][0] == DOCUMENTS[2]
+        assert result["ids"][1] == ["a", "b"]
+        assert result["metadatas"][1][0] == {"city": "Lahore"}
+        assert result["distances"][0][0] < result["distances"][0][1]
+        reopened.close()
+
+    print("✅ Add, query and reopen test passed")
+
+
+def test_manifest_mismatch():
+    """Test an index refuses a different embedding model or dimension"""
+    print("Testing manifest validation...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        PersistentVectorStore(tmp, dim=3, model_name="all-MiniLM-L6-v2").close()
+        for kwargs in ({"dim": 4}, {"model_name": "another-model"}):
+            try:
+                PersistentVectorStore(tmp, **kwargs)
+            except ValueError:
+                pass
+            else:
+                raise AssertionError(f"Expected ValueError for {kwargs}")
+
+    print("✅ Manifest validation test passed")
+
+
+def test_interrupted_batch_is_rolled_back():
+    """Test rows beyond the manifest count are discarded on open"""
+    print("Testing crash recovery...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = PersistentVectorStore(tmp, dim=3)
+        store.add(["a", "b"], DOCUMENTS[:2], None, EMBEDDINGS[:2])
+        manifest = dict(store.manifest)
+        store.add(["c"], DOCUMENTS[2:], None, EMBEDDINGS[2:])
+        store.close()
+
+        # Simulate a crash after the data was written but before the manifest was
+        with open(os.path.join(tmp, MANIFEST_FILE), "w") as handle:
+            json.dump(manifest, handle)
+
+        recovered = PersistentVectorStore(tmp)
+        assert recovered.count() == 2
+        assert recovered.get(["c"]) == {"ids": []}
+        assert recovered.add(["c"], DOCUMENTS[2:], None, EMBEDDINGS[2:]) == 1
+        assert recovered.query([[0.0, 0.0, 1.0]], n_results=1)["ids"] == [["c"]]
+        recovered.close()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # A first batch cut short before its manifest was written
+        PersistentVectorStore(tmp).close()
+        with open(os.path.join(tmp, EMBEDDINGS_FILE), "wb") as handle:
+            handle.write(b"\0" * 16)
+        recovered = PersistentVectorStore(tmp)
+        recovered.add(["a"], DOCUMENTS[:1], None, EMBEDDINGS[:1])
+        assert np.allclose(recovered.embeddings, [[1.0, 0.0, 0.0]])
+        recovered.close()
+
+    print("✅ Crash recovery test passed")
+
+
+def test_failed_batch_is_undone():
+    """Test a batch that fails after its vectors were written leaves no stray rows"""
+    print("Testing failed batch rollback...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = PersistentVectorStore(tmp)
+        # Unserializable metadata makes the insert fail after the vectors were appended
+        try:
+            store.add(["x"], ["broken"], [{"bad": object()}], [[0.5, 0.5, 0.5, 0.5]])
+        except TypeError:
+            pass
+        else:
+            raise AssertionError("Expected TypeError")
+        assert store.dim is None and store.count() == 0
+
+        store.add(["a", "b"], DOCUMENTS[:2], None, EMBEDDINGS[:2])
+
+        def failing_manifest():
+            raise OSError("disk full")
+
+        store._write_manifest = failing_manifest
+        try:
+            store.add(["y"], ["lost"], None, [[1.0, 1.0, 0.0]])
+        except OSError:
+            pass
+        else:
+            raise AssertionError("Expected OSError")
+        del store._write_manifest
+
+        assert store.add(["c"], DOCUMENTS[2:], None, EMBEDDINGS[2:]) == 1
+        assert store.get(["x", "y"]) == {"ids": []}
+        assert np.allclose(store.embeddings, np.eye(3))
+        assert store.query([[0.0, 0.0, 1.0]], n_results=1)["ids"] == [["c"]]
+        store.close()
+
+        reopened = PersistentVectorStore(tmp)
+        assert reopened.count() == 3 and np.allclose(reopened.embeddings, np.eye(3))
+        reopened.close()
+
+    print("✅ Failed batch rollback test passed")
+
+
+def test_float16_storage():
+    """Test half-precision storage returns the same ranking"""
+    print("Testing float16 storage...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = PersistentVectorStore(tmp, dim=3, dtype="float16")
+        store.add(["a", "b", "c"], DOCUMENTS, None, EMBEDDINGS)
+        assert store.embeddings.dtype == np.float16
+        assert store.query([[0.0, 1.0, 0.1]], n_results=3)["ids"] == [["b", "c", "a"]]
+        store.close()
+
+    print("✅ float16 storage test passed")
+
+
+def main():
+    """Run all tests"""
+    print("Running vector store tests...\n")
+
+    try:
+        test_add_query_and_reopen()
+        test_manifest_mismatch()
+        test_interrupted_batch_is_rolled_back()
+        test_failed_batch_is_undone()
+        test_float16_storage()
+
+        print("\n🎉 All vector store tests passed!")
+
+    except Exception as e:
+        print(f"\n❌ Test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,3 @@
+"""
+TrafficWise Urban Planner - shared building blocks for the Streamlit apps
+"""
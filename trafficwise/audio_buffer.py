@@ -0,0 +1,125 @@
+"""
+Preallocated ring buffer for streaming PCM audio
+
+The chunking loop of the streaming STT session (see
+``streaming_demo.MockStreamingDemo.demonstrate_audio_buffering``) extends a
+``bytearray``, copies each chunk out with ``bytes(buffer[:chunk_size])`` and
+then reslices ``buffer = buffer[chunk_size - overlap_size:]``: two copies and
+two allocations per chunk, per session.
+
+``AudioRingBuffer`` preallocates its storage once. Writes copy the incoming
+bytes in at the write index; chunks come out as ``memoryview`` slices of the
+storage, and the overlap between consecutive chunks is handled by advancing
+the read index ``chunk_size - overlap_size`` bytes, so it is re-read rather
+than copied. When a write would run past the end, the unread tail (less than
+one chunk) is moved to the front in place and both indices wrap, which keeps
+every chunk contiguous. ``as_int16`` gives a NumPy view of a chunk without
+copying.
+
+A chunk view aliases the storage: consume it (or copy it with ``bytes()``)
+before the next write.
+"""
+
+import numpy as np
+
+SAMPLE_WIDTH = 2
+
+
+class AudioRingBuffer:
+    """Fixed-capacity byte buffer yielding overlapping, zero-copy chunks"""
+
+    def __init__(self, chunk_size, overlap_size=0, capacity=None, sample_width=SAMPLE_WIDTH):
+        if chunk_size <= 0 or chunk_size % sample_width:
+            raise ValueError(f"chunk_size must be a positive multiple of {sample_width} bytes")
+        if not 0 <= overlap_size < chunk_size or overlap_size % sample_width:
+            raise ValueError("overlap_size must be a sample-aligned value below chunk_size")
+        capacity = capacity or 4 * chunk_size
+        if capacity < chunk_size or capacity % sample_width:
+            raise ValueError("capacity must be sample-aligned and hold at least one chunk")
+
+        self.chunk_size = chunk_size
+        self.overlap_size = overlap_size
+        self.step = chunk_size - overlap_size
+        self.capacity = capacity
+        self.sample_width = sample_width
+        self._storage = bytearray(capacity)
+        self._view = memoryview(self._storage)
+        self._read = 0
+        self._write = 0
+        self.chunks_emitted = 0
+        self.wraps = 0
+
+    def __len__(self):
+        """Bytes buffered and not yet consumed"""
+        return self._write - self._read
+
+    @property
+    def free(self):
+        return self.capacity - (self._write - self._read)
+
+    def write(self, data):
+        """Copy as much of ``data`` as fits; return the number of bytes accepted"""
+        write = self._write
+        count = len(data)
+        if write + count > self.capacity:
+            # Wrap: move the unread tail to the front (memmove, no allocation)
+            read = self._read
+            view = self._view
+            view[:write - read] = view[read:write]
+            write -= read
+            self._read = 0
+            self.wraps += 1
+            free = self.capacity - write
+            if count > free:
+                if not free:
+                    self._write = write
+                    return 0
+                data = memoryview(data)[:free]
+                count = free
+        self._view[write:write + count] = data
+        self._write = write + count
+        return count
+
+    def next_chunk(self):
+        """Return the next full chunk as a memoryview, or None until enough audio is buffered"""
+        read = self._read
+        if self._write - read < self.chunk_size:
+            return None
+        self._read = read + self.step
+        self.chunks_emitted += 1
+        return self._view[read:read + self.chunk_size]
+
+    def flush(self):
+        """Return whatever is left (a final partial chunk) and empty the buffer, or None"""
+        read, write = self._read, self._write
+        if read == write:
+            return None
+        self._read = self._write = 0
+        self.chunks_emitted += 1
+        return self._view[read:write]
+
+    def feed(self, data):
+        """Write ``data`` and yield every chunk that completes, writing the rest as chunks drain
+
+        Each chunk must be consumed before the generator is resumed.
+        """
+        # Draining leaves less than a chunk buffered, so every pass writes something
+        offset = self.write(data)
+        data = memoryview(data) if offset < len(data) else None
+        while True:
+            chunk = self.next_chunk()
+            while chunk is not None:
+                yield chunk
+                chunk = self.next_chunk()
+            if data is None or offset >= len(data):
+                return
+            offset += self.write(data[offset:])
+
+    def reset(self):
+        self._read = self._write = 0
+        self.chunks_emitted = 0
+
+
+def as_int16(chunk):
+    """NumPy int16 samples viewing a chunk (no copy)"""
+    return np.frombuffer(chunk, dtype=np.int16)
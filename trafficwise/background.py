@@ -0,0 +1,283 @@
+"""
+Background executor for LLM requests
+
+Streamlit runs ``on_change`` callbacks on the session's script thread, so a
+provider call made there blocks that user's UI for up to the HTTP timeout.
+``BackgroundExecutor`` moves the call onto a thread pool shared by every
+session in the process:
+
+- ``submit(session_id, fn, ...)`` returns a ``PendingRequest`` handle at once;
+  the app polls it on later reruns (``done``, ``text``, ``result()``).
+- A session has at most one pending request. Submitting again cancels the
+  previous one: a queued call never starts, a running plain call has its
+  result discarded, and a running token stream stops at the next token
+  (closing the HTTP response).
+- ``LLM_MAX_WORKERS`` bounds concurrent provider calls across all sessions
+  and ``LLM_MAX_PENDING`` bounds queued + running requests; beyond it the
+  handle completes immediately with a "server busy" message instead of
+  queueing without limit.
+- Requests carry a ``lane`` (the provider). At most ``LLM_MAX_PER_LANE``
+  calls of one lane run at once; the rest wait in that lane's queue, so a
+  slow or stalled provider can never hold every worker and requests for
+  other providers keep flowing.
+"""
+
+import itertools
+import logging
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+from functools import lru_cache
+
+DEFAULT_MAX_WORKERS = int(os.getenv("LLM_MAX_WORKERS", "8"))
+DEFAULT_MAX_PENDING = int(os.getenv("LLM_MAX_PENDING", "64"))
+# 0 = half the workers
+DEFAULT_MAX_PER_LANE = int(os.getenv("LLM_MAX_PER_LANE", "0"))
+BUSY_MESSAGE = "❌ Server busy: Too many requests in progress. Please try again in a moment."
+
+logger = logging.getLogger(__name__)
+
+
+class PendingRequest:
+    """Handle for one background request; safe to keep in ``st.session_state``"""
+
+    def __init__(self, request_id, session_id, stream, lane=None):
+        self.request_id = request_id
+        self.session_id = session_id
+        self.stream = stream
+        self.lane = lane
+        self.submitted_at = time.monotonic()
+        self.started_at = None
+        self.finished_at = None
+        self._cancel_event = threading.Event()
+        self._parts = []
+        self._result = None
+        self._error = None
+        self._done = threading.Event()
+        self._future = None
+
+    @property
+    def done(self):
+        return self._done.is_set()
+
+    @property
+    def cancelled(self):
+        return self._cancel_event.is_set()
+
+    @property
+    def text(self):
+        """Tokens received so far (streams) or the final answer once done"""
+        if self._result is not None:
+            return self._result
+        return "".join(self._parts)
+
+    @property
+    def elapsed(self):
+        return (self.finished_at or time.monotonic()) - self.submitted_at
+
+    def result(self, timeout=None):
+        """Wait for and return the answer; re-raises a worker exception"""
+        if not self._done.wait(timeout):
+            raise TimeoutError(f"Request {self.request_id} still running")
+        if self._error is not None:
+            raise self._error
+        return self._result
+
+    def cancel(self):
+        """Stop the request; its result is discarded even if the call completes"""
+        self._cancel_event.set()
+        # Not yet handed to the pool (waiting in its lane), or removed from the pool queue
+        if self._future is None or self._future.cancel():
+            self._finish(None)
+
+    def _finish(self, result, error=None):
+        if self.done:
+            return
+        self._result = result
+        self._error = error
+        self.finished_at = time.monotonic()
+        self._done.set()
+
+
+class BackgroundExecutor:
+    """Shared worker pool with one pending request per session"""
+
+    def __init__(self, max_workers=DEFAULT_MAX_WORKERS, max_pending=DEFAULT_MAX_PENDING,
+                 max_per_lane=DEFAULT_MAX_PER_LANE):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.max_per_lane = max_per_lane or max(1, max_workers // 2)
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="llm-worker")
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._sessions = {}
+        self._in_flight = 0
+        self._lane_running = defaultdict(int)
+        self._lane_queues = defaultdict(deque)
+        self._stats = {
+            "submitted": 0,
+            "completed": 0,
+            "cancelled": 0,
+            "rejected": 0,
+            "failed": 0,
+            "queue_wait_seconds": 0.0,
+            "started": 0,
+        }
+
+    def submit(self, session_id, fn, *args, stream=False, lane=None, **kwargs):
+        """Run ``fn(*args, **kwargs)`` in the background for ``session_id``
+
+        With ``stream=True`` the function must return an iterator of text
+        tokens, which are collected into ``handle.text`` as they arrive.
+        ``lane`` groups requests for the per-lane concurrency limit.
+        """
+        with self._lock:
+            previous = self._sessions.pop(session_id, None)
+        if previous is not None and not previous.done:
+            self._cancel(previous)
+
+        handle = PendingRequest(next(self._ids), session_id, stream, lane)
+        with self._lock:
+            self._stats["submitted"] += 1
+            if self._in_flight >= self.max_pending:
+                self._stats["rejected"] += 1
+                handle._finish(BUSY_MESSAGE)
+                # Kept like any other request, so the app's polling delivers the busy message
+                self._sessions[session_id] = handle
+                return handle
+            self._in_flight += 1
+            self._sessions[session_id] = handle
+            if lane is not None and self._lane_running[lane] >= self.max_per_lane:
+                self._lane_queues[lane].append((handle, fn, args, kwargs))
+                return handle
+            if lane is not None:
+                self._lane_running[lane] += 1
+
+        self._dispatch(handle, fn, args, kwargs)
+        return handle
+
+    def get(self, session_id):
+        """The session's current request handle, if any"""
+        with self._lock:
+            return self._sessions.get(session_id)
+
+    def pop_finished(self, session_id):
+        """Return and forget the session's request once it is done and not cancelled"""
+        with self._lock:
+            handle = self._sessions.get(session_id)
+            if handle is None or not handle.done:
+                return None
+            del self._sessions[session_id]
+        return None if handle.cancelled else handle
+
+    def cancel(self, session_id):
+        """Cancel the session's pending request (e.g. when the chat is cleared)"""
+        with self._lock:
+            handle = self._sessions.pop(session_id, None)
+        if handle is not None and not handle.done:
+            self._cancel(handle)
+
+    def get_stats(self):
+        """Counters plus current queue depth and mean queue wait"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["in_flight"] = self._in_flight
+            stats["sessions"] = len(self._sessions)
+            stats["lane_running"] = {lane: count for lane, count in self._lane_running.items() if count}
+            stats["lane_queued"] = {lane: len(queue) for lane, queue in self._lane_queues.items() if queue}
+        started = stats.pop("started")
+        stats["mean_queue_wait_ms"] = stats["queue_wait_seconds"] / started * 1000 if started else 0.0
+        return stats
+
+    def shutdown(self, wait=False):
+        with self._lock:
+            handles = list(self._sessions.values())
+            self._sessions.clear()
+        for handle in handles:
+            self._cancel(handle)
+        self._pool.shutdown(wait=wait)
+
+    def _dispatch(self, handle, fn, args, kwargs):
+        handle._future = self._pool.submit(self._run, handle, fn, args, kwargs)
+        handle._future.add_done_callback(lambda future: self._release(handle, future))
+
+    def _next_in_lane(self, lane):
+        """Pop the lane's next live request (caller holds the lock); cancelled ones are dropped"""
+        queue = self._lane_queues[lane]
+        while queue:
+            entry = queue.popleft()
+            if not entry[0].cancelled:
+                self._lane_running[lane] += 1
+                return entry
+            self._in_flight -= 1
+        return None
+
+    def _cancel(self, handle):
+        handle.cancel()
+        with self._lock:
+            self._stats["cancelled"] += 1
+            # A request still waiting in its lane gives its pending slot back now, not when the lane moves
+            queue = self._lane_queues.get(handle.lane)
+            for entry in queue or ():
+                if entry[0] is handle:
+                    queue.remove(entry)
+                    self._in_flight -= 1
+                    break
+
+    def _run(self, handle, fn, args, kwargs):
+        handle.started_at = time.monotonic()
+        with self._lock:
+            self._stats["started"] += 1
+            self._stats["queue_wait_seconds"] += handle.started_at - handle.submitted_at
+        if handle.cancelled:
+            return None
+
+        if not handle.stream:
+            return fn(*args, **kwargs)
+
+        tokens = fn(*args, **kwargs)
+        try:
+            for token in tokens:
+                if handle.cancelled:
+                    break
+                handle._parts.append(token)
+        finally:
+            close = getattr(tokens, "close", None)
+            if close is not None:
+                close()
+        return "".join(handle._parts)
+
+    def _release(self, handle, future):
+        next_entry = None
+        with self._lock:
+            self._in_flight -= 1
+            if handle.lane is not None:
+                self._lane_running[handle.lane] -= 1
+                next_entry = self._next_in_lane(handle.lane)
+        if next_entry is not None:
+            self._dispatch(*next_entry)
+
+        try:
+            result = future.result()
+        except CancelledError:
+            handle._finish(None)
+            return
+        except Exception as e:
+            logger.exception("Background request %s failed", handle.request_id)
+            with self._lock:
+                self._stats["failed"] += 1
+            handle._finish(None, e)
+            return
+
+        if not handle.cancelled:
+            with self._lock:
+                self._stats["completed"] += 1
+        handle._finish(None if handle.cancelled else result)
+
+
+@lru_cache(maxsize=None)
+def get_background_executor():
+    """Return the process-wide executor shared by all Streamlit sessions"""
+    return BackgroundExecutor()
@@ -0,0 +1,179 @@
+"""
+Bounded chat history with a compact digest of older turns
+
+``st.session_state.chat_history`` used to be a plain list that grew with
+every turn and was re-rendered in full on each rerun. ``ChatHistory`` keeps
+it flat over long sessions:
+
+- the last ``CHAT_HISTORY_WINDOW`` messages are kept verbatim;
+- a message leaving the window is folded into a digest of one short line
+  per message (its first sentence), itself capped at ``CHAT_DIGEST_LINES``
+  lines with a count of anything older;
+- the UI renders one page of ``CHAT_PAGE_SIZE`` messages at a time
+  (page 0 is the most recent);
+- ``context()`` builds the multi-turn provider context within
+  ``CHAT_CONTEXT_TOKENS``: the newest turns verbatim, preceded by a summary
+  of anything older. Assistant errors ("❌ ...") are never sent back.
+
+Messages are the same ``{"role": ..., "content": ...}`` dicts the apps
+already append, so ``append`` / ``len`` / iteration work as on the list.
+"""
+
+import hashlib
+import os
+import re
+from collections import deque
+
+from trafficwise.prompts import estimate_tokens
+
+DEFAULT_WINDOW = int(os.getenv("CHAT_HISTORY_WINDOW", "50"))
+DEFAULT_DIGEST_LINES = int(os.getenv("CHAT_DIGEST_LINES", "20"))
+DEFAULT_PAGE_SIZE = int(os.getenv("CHAT_PAGE_SIZE", "10"))
+DEFAULT_CONTEXT_TOKENS = int(os.getenv("CHAT_CONTEXT_TOKENS", "1500"))
+DIGEST_LINE_CHARS = 160
+SUMMARY_HEADER = "Summary of the earlier conversation:\n"
+
+_MARKDOWN = re.compile(r"[*_#`>]+")
+_WHITESPACE = re.compile(r"\s+")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s")
+
+
+def is_error_message(message):
+    return message["role"] == "assistant" and message["content"].lstrip().startswith("❌")
+
+
+def summarize_message(message, max_chars=DIGEST_LINE_CHARS):
+    """One digest line for a message: its first sentence without markdown, truncated"""
+    text = _WHITESPACE.sub(" ", _MARKDOWN.sub("", message["content"])).strip()
+    text = _SENTENCE_END.split(text, 1)[0]
+    if len(text) > max_chars:
+        text = text[:max_chars - 1].rstrip() + "…"
+    speaker = "User" if message["role"] == "user" else "TrafficWise"
+    return f"{speaker}: {text}"
+
+
+def context_fingerprint(messages):
+    """Short hash of a context, used to keep cache keys of follow-up questions apart"""
+    if not messages:
+        return ""
+    payload = "\x1e".join(f"{message['role']}\x1f{message['content']}" for message in messages)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+class ChatHistory:
+    """Recent messages verbatim plus a bounded digest of everything older"""
+
+    def __init__(self, window=DEFAULT_WINDOW, digest_lines=DEFAULT_DIGEST_LINES, page_size=DEFAULT_PAGE_SIZE):
+        self.window = window
+        self.page_size = page_size
+        self._messages = deque()
+        # Digest line and token estimate per message, computed once on append
+        self._summaries = deque()
+        self._tokens = deque()
+        self._digest = deque(maxlen=digest_lines)
+        self._folded = 0
+        self.total = 0
+
+    def append(self, message):
+        message = {"role": message["role"], "content": message["content"]}
+        error = is_error_message(message)
+        self._messages.append(message)
+        self._summaries.append(None if error else summarize_message(message))
+        self._tokens.append(None if error else estimate_tokens(message["content"]))
+        self.total += 1
+        while len(self._messages) > self.window:
+            self._messages.popleft()
+            self._tokens.popleft()
+            summary = self._summaries.popleft()
+            self._folded += 1
+            if summary is not None:
+                self._digest.append(summary)
+
+    def clear(self):
+        self._messages.clear()
+        self._summaries.clear()
+        self._tokens.clear()
+        self._digest.clear()
+        self._folded = 0
+        self.total = 0
+
+    def __len__(self):
+        return len(self._messages)
+
+    def __iter__(self):
+        return iter(self._messages)
+
+    @property
+    def folded(self):
+        """Number of messages that left the window"""
+        return self._folded
+
+    @property
+    def digest(self):
+        """Compact text summary of the messages that left the window"""
+        return self._format_digest(list(self._digest), self._folded)
+
+    @staticmethod
+    def _format_digest(lines, summarized):
+        if not summarized:
+            return ""
+        omitted = summarized - len(lines)
+        if omitted > 0:
+            lines = [f"({omitted} earlier messages omitted)"] + lines
+        return "\n".join(lines)
+
+    def page_count(self, page_size=None):
+        page_size = page_size or self.page_size
+        return max(1, -(-len(self._messages) // page_size))
+
+    def page(self, number=0, page_size=None):
+        """Messages of one page in chronological order; page 0 holds the most recent"""
+        page_size = page_size or self.page_size
+        end = len(self._messages) - number * page_size
+        start = max(0, end - page_size)
+        if end <= 0:
+            return []
+        return [self._messages[index] for index in range(start, end)]
+
+    def context(self, max_tokens=DEFAULT_CONTEXT_TOKENS):
+        """Conversation context for the provider payloads within ``max_tokens``
+
+        The newest messages are sent verbatim. When older material exists
+        (folded messages, or window messages that do not fit), up to a
+        quarter of the budget goes to a summary of it, sent first as a
+        system message.
+        """
+        # (message, digest line, tokens) of the window, without assistant errors
+        entries = [entry for entry in zip(self._messages, self._summaries, self._tokens) if entry[2] is not None]
+        selected = self._newest(entries, max_tokens)
+        if len(selected) == len(entries) and not self._folded:
+            return [message for message, _, _ in selected]
+
+        summary_budget = max_tokens // 4
+        selected = self._newest(entries, max_tokens - summary_budget)
+        older = entries[:len(entries) - len(selected)]
+        lines = list(self._digest) + [summary for _, summary, _ in older]
+        summarized = self._folded + len(older)
+        # Keep the newest summary lines that fit; header plus room for the "(N ... omitted)" line
+        kept = []
+        used = estimate_tokens(SUMMARY_HEADER) + 10
+        for line in reversed(lines):
+            used += estimate_tokens(line)
+            if used > summary_budget:
+                break
+            kept.append(line)
+        kept.reverse()
+        summary = {"role": "system", "content": SUMMARY_HEADER + self._format_digest(kept, summarized)}
+        return [summary] + [message for message, _, _ in selected]
+
+    @staticmethod
+    def _newest(entries, max_tokens):
+        selected = []
+        used = 0
+        for entry in reversed(entries):
+            used += entry[2]
+            if used > max_tokens:
+                break
+            selected.append(entry)
+        selected.reverse()
+        return selected
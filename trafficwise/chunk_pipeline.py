@@ -0,0 +1,157 @@
+"""
+Pipelined chunk transcription with ordered reassembly
+
+Whisper has no streaming API, so a streaming session transcribes its audio
+chunk by chunk. Awaiting each chunk's call before starting the next caps a
+session at one chunk per provider round trip, which falls behind real time
+whenever a call takes longer than the chunk's duration.
+
+``OrderedChunkTranscriber`` keeps up to ``STT_CHUNKS_IN_FLIGHT`` chunks of
+one session submitted at once (counted until their result is emitted, so
+the reorder buffer is bounded too), while a semaphore shared by all
+sessions on the event loop (``STT_MAX_CONCURRENT``) bounds calls across
+sessions; the transcriber must be created on that loop. Results are
+released strictly in ``sequence_id`` order; ids skipped by the caller
+(chunks the VAD dropped) are not waited for. Consecutive chunks overlap by
+a few tens of milliseconds, so a word at a chunk boundary can appear in
+both transcripts; ``dedupe_overlap`` drops the repeated words from the
+start of the later one.
+"""
+
+import asyncio
+import os
+import re
+import weakref
+from collections import deque, namedtuple
+
+DEFAULT_IN_FLIGHT = int(os.getenv("STT_CHUNKS_IN_FLIGHT", "4"))
+DEFAULT_MAX_CONCURRENT = int(os.getenv("STT_MAX_CONCURRENT", "32"))
+# Longest run of words a chunk overlap can repeat
+DEFAULT_MAX_OVERLAP_WORDS = 4
+
+ChunkResult = namedtuple("ChunkResult", ["sequence_id", "text", "error"])
+
+_WORD = re.compile(r"\w+(?:'\w+)?")
+
+# An asyncio.Semaphore binds to the loop that first waits on it, so each loop gets its own
+_semaphores = weakref.WeakKeyDictionary()
+
+
+def get_transcription_semaphore():
+    """Bound on concurrent chunk transcriptions, shared by all sessions on the running loop"""
+    loop = asyncio.get_running_loop()
+    semaphore = _semaphores.get(loop)
+    if semaphore is None:
+        semaphore = _semaphores[loop] = asyncio.Semaphore(DEFAULT_MAX_CONCURRENT)
+    return semaphore
+
+
+def _words(text):
+    return [word.lower() for word in _WORD.findall(text)]
+
+
+def dedupe_overlap(previous, text, max_words=DEFAULT_MAX_OVERLAP_WORDS):
+    """``text`` without leading words that repeat the end of ``previous`` (case and punctuation ignored)"""
+    if not previous or not text:
+        return text
+    tail = _words(previous)[-max_words:]
+    head_matches = list(_WORD.finditer(text))[:max_words]
+    head = [match.group().lower() for match in head_matches]
+    for size in range(min(len(tail), len(head)), 0, -1):
+        if tail[-size:] == head[:size]:
+            return text[head_matches[size - 1].end():].lstrip(" ,.;:!?")
+    return text
+
+
+class OrderedChunkTranscriber:
+    """Per-session pipeline: N chunk transcriptions in flight, results in sequence order"""
+
+    def __init__(self, transcribe, in_flight=DEFAULT_IN_FLIGHT, semaphore=None,
+                 max_overlap_words=DEFAULT_MAX_OVERLAP_WORDS):
+        """``transcribe(chunk)`` is a coroutine returning text, or an object with a ``text`` attribute"""
+        self.transcribe = transcribe
+        self.in_flight = max(1, in_flight)
+        self.semaphore = semaphore if semaphore is not None else get_transcription_semaphore()
+        self.max_overlap_words = max_overlap_words
+        self._window = asyncio.Semaphore(self.in_flight)
+        self._tasks = {}
+        self._completed = {}
+        self._pending = deque()
+        self._previous_text = ""
+        self._stats = {
+            "submitted": 0,
+            "emitted": 0,
+            "errors": 0,
+            "deduped_words": 0,
+            "max_reorder_depth": 0,
+        }
+
+    async def _run(self, sequence_id, chunk):
+        try:
+            async with self.semaphore:
+                result = await self.transcribe(chunk)
+            text = result if isinstance(result, str) else getattr(result, "text", "")
+            self._completed[sequence_id] = (text or "", None)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self._completed[sequence_id] = ("", e)
+        finally:
+            self._tasks.pop(sequence_id, None)
+        self._stats["max_reorder_depth"] = max(self._stats["max_reorder_depth"], len(self._completed))
+
+    async def submit(self, sequence_id, chunk):
+        """Start transcribing a chunk, waiting while the window is full; return results now in order"""
+        if self._pending and sequence_id <= self._pending[-1]:
+            raise ValueError(f"Chunk {sequence_id} submitted after chunk {self._pending[-1]}")
+        ready = self.ready()
+        while self._window.locked():
+            await asyncio.wait(set(self._tasks.values()), return_when=asyncio.FIRST_COMPLETED)
+            ready.extend(self.ready())
+        await self._window.acquire()
+        self._stats["submitted"] += 1
+        self._pending.append(sequence_id)
+        self._tasks[sequence_id] = asyncio.ensure_future(self._run(sequence_id, chunk))
+        return ready
+
+    def ready(self):
+        """Results that can be emitted now, in sequence order"""
+        ready = []
+        while self._pending and self._pending[0] in self._completed:
+            sequence_id = self._pending.popleft()
+            text, error = self._completed.pop(sequence_id)
+            if error is not None:
+                self._stats["errors"] += 1
+            elif text:
+                deduped = dedupe_overlap(self._previous_text, text, self.max_overlap_words)
+                self._stats["deduped_words"] += len(_words(text)) - len(_words(deduped))
+                text = deduped
+                if text:
+                    self._previous_text = text
+            ready.append(ChunkResult(sequence_id, text, error))
+            self._window.release()
+            self._stats["emitted"] += 1
+        return ready
+
+    async def drain(self):
+        """Wait for every submitted chunk; return the remaining results in order"""
+        ready = self.ready()
+        while self._tasks:
+            await asyncio.wait(set(self._tasks.values()), return_when=asyncio.FIRST_COMPLETED)
+            ready.extend(self.ready())
+        ready.extend(self.ready())
+        return ready
+
+    async def cancel(self):
+        """Abandon chunks still in flight (session closed)"""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks.clear()
+        self._pending.clear()
+        self._completed.clear()
+        self._window = asyncio.Semaphore(self.in_flight)
+
+    def get_stats(self):
+        return {**self._stats, "in_flight": len(self._tasks), "buffered": len(self._completed)}
@@ -0,0 +1,99 @@
+"""
+Lazily loaded embedding model with a query embedding cache
+
+Loading SentenceTransformer takes seconds, so ``LazyEmbedder`` defers it to
+the first call that actually needs an embedding (a RAG query or an upload);
+Gemini/OpenAI/offline sessions never pay for it. Query embeddings are kept
+in an LRU cache keyed by normalized text, so repeated questions skip the
+encoder entirely. Load time and per-query encode cost are recorded for the
+app's instrumentation panel.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from trafficwise.response_cache import normalize_prompt
+
+DEFAULT_QUERY_CACHE_SIZE = int(os.getenv("RAG_QUERY_CACHE_SIZE", "1024"))
+
+logger = logging.getLogger(__name__)
+
+
+def _load_sentence_transformer(model_name):
+    from sentence_transformers import SentenceTransformer
+
+    return SentenceTransformer(model_name)
+
+
+class LazyEmbedder:
+    """SentenceTransformer wrapper that loads on first use and caches query vectors"""
+
+    def __init__(self, model_name, loader=_load_sentence_transformer, cache_size=DEFAULT_QUERY_CACHE_SIZE):
+        self.model_name = model_name
+        self.cache_size = cache_size
+        self._loader = loader
+        self._model = None
+        self._load_lock = threading.Lock()
+        self._cache_lock = threading.Lock()
+        self._query_cache = OrderedDict()
+        self._stats = {
+            "load_seconds": None,
+            "query_hits": 0,
+            "query_misses": 0,
+            "encode_seconds": 0.0,
+        }
+
+    @property
+    def is_loaded(self):
+        return self._model is not None
+
+    @property
+    def model(self):
+        """The underlying model, loaded on first access"""
+        if self._model is None:
+            with self._load_lock:
+                if self._model is None:
+                    start = time.perf_counter()
+                    self._model = self._loader(self.model_name)
+                    self._stats["load_seconds"] = time.perf_counter() - start
+                    logger.info("Loaded embedding model %s in %.2fs", self.model_name, self._stats["load_seconds"])
+        return self._model
+
+    def encode(self, texts, **kwargs):
+        """Encode documents (no caching); same signature as SentenceTransformer.encode"""
+        return self.model.encode(texts, **kwargs)
+
+    def encode_query(self, text):
+        """Embedding for a query string, served from the LRU cache when possible"""
+        key = normalize_prompt(text)
+        with self._cache_lock:
+            vector = self._query_cache.get(key)
+            if vector is not None:
+                self._query_cache.move_to_end(key)
+                self._stats["query_hits"] += 1
+                return vector
+
+        start = time.perf_counter()
+        vector = self.model.encode(key)
+        elapsed = time.perf_counter() - start
+
+        with self._cache_lock:
+            self._stats["query_misses"] += 1
+            self._stats["encode_seconds"] += elapsed
+            self._query_cache[key] = vector
+            if len(self._query_cache) > self.cache_size:
+                self._query_cache.popitem(last=False)
+        return vector
+
+    def get_stats(self):
+        """Return load time, cache counters and mean per-query encode cost"""
+        with self._cache_lock:
+            stats = dict(self._stats)
+            stats["loaded"] = self.is_loaded
+            stats["cached_queries"] = len(self._query_cache)
+            misses = stats["query_misses"]
+            stats["mean_encode_ms"] = stats["encode_seconds"] / misses * 1000 if misses else 0.0
+            return stats
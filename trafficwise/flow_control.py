@@ -0,0 +1,171 @@
+"""
+Bounded per-session audio queue with backpressure policies
+
+Audio arrives on the streaming WebSocket as fast as the client sends it,
+while transcription runs at the provider's pace. Without flow control a
+stalled provider lets audio pile up in the session without limit.
+``AudioQueue`` sits between receipt and transcription and caps both the
+number of queued chunks (``STREAM_QUEUE_CHUNKS``) and their bytes
+(``STREAM_QUEUE_BYTES``). When a new chunk would exceed a cap, one policy
+(``STREAM_QUEUE_POLICY``) applies:
+
+- ``drop_oldest``: discard the oldest chunks, keeping the newest audio;
+- ``coalesce``: append the chunk to the newest queued one, so the provider
+  gets fewer, larger requests (the byte cap still drops the oldest audio);
+- ``pause``: ask the client to pause at the high watermark (``on_pause``)
+  and to resume once the queue drains to half (``on_resume``); chunks that
+  still arrive over the cap are rejected.
+
+Queued chunks are copied to ``bytes``, since chunk views from
+``AudioRingBuffer`` are overwritten by the next write. When the byte cap
+cuts into a chunk, whole samples are dropped, so the PCM stream stays
+aligned.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+
+from trafficwise.audio_buffer import SAMPLE_WIDTH
+
+DEFAULT_MAX_CHUNKS = int(os.getenv("STREAM_QUEUE_CHUNKS", "8"))
+# 256 KB is about 8 s of 16 kHz 16-bit audio
+DEFAULT_MAX_BYTES = int(os.getenv("STREAM_QUEUE_BYTES", str(256 * 1024)))
+DEFAULT_POLICY = os.getenv("STREAM_QUEUE_POLICY", "drop_oldest")
+POLICIES = ("drop_oldest", "coalesce", "pause")
+
+ACCEPTED = "accepted"
+DROPPED = "dropped"
+PAUSED = "paused"
+
+
+class AudioQueue:
+    """Bounded FIFO of audio chunks for one streaming session"""
+
+    def __init__(self, max_chunks=DEFAULT_MAX_CHUNKS, max_bytes=DEFAULT_MAX_BYTES, policy=DEFAULT_POLICY,
+                 on_pause=None, on_resume=None, sample_width=SAMPLE_WIDTH):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown queue policy: {policy}")
+        if max_chunks < 1 or max_bytes < 1:
+            raise ValueError("max_chunks and max_bytes must be positive")
+        self.max_chunks = max_chunks
+        self.max_bytes = max_bytes
+        self.policy = policy
+        self.sample_width = sample_width
+        self.on_pause = on_pause
+        self.on_resume = on_resume
+        self.paused = False
+        self.closed = False
+        self._chunks = deque()
+        self._bytes = 0
+        self._cond = threading.Condition()
+        self._stats = {
+            "enqueued": 0,
+            "dequeued": 0,
+            "dropped_chunks": 0,
+            "dropped_bytes": 0,
+            "coalesced": 0,
+            "rejected": 0,
+            "pauses": 0,
+            "max_depth": 0,
+            "max_bytes": 0,
+        }
+
+    def __len__(self):
+        return len(self._chunks)
+
+    @property
+    def bytes(self):
+        return self._bytes
+
+    def _drop_oldest(self):
+        dropped = self._chunks.popleft()
+        self._bytes -= len(dropped)
+        self._stats["dropped_chunks"] += 1
+        self._stats["dropped_bytes"] += len(dropped)
+
+    def _trim_to(self, limit):
+        """Drop the oldest audio until at most ``limit`` bytes are queued, cutting the oldest chunk if needed"""
+        while self._bytes - len(self._chunks[0]) >= limit:
+            self._drop_oldest()
+        if self._bytes > limit:
+            # Round up to whole samples; a shifted byte would turn the rest of the stream into noise
+            excess = -(-(self._bytes - limit) // self.sample_width) * self.sample_width
+            if excess >= len(self._chunks[0]):
+                self._drop_oldest()
+                return
+            self._chunks[0] = self._chunks[0][excess:]
+            self._bytes -= excess
+            self._stats["dropped_bytes"] += excess
+
+    def put(self, chunk):
+        """Queue a chunk; return ``ACCEPTED``, ``PAUSED`` (accepted, client should pause) or ``DROPPED``"""
+        data = bytes(chunk)
+        size = len(data)
+        notify_pause = False
+        with self._cond:
+            if self.closed:
+                return DROPPED
+            full = len(self._chunks) >= self.max_chunks or self._bytes + size > self.max_bytes
+            if self.policy == "pause" and full:
+                self._stats["rejected"] += 1
+                self._stats["dropped_bytes"] += size
+                return DROPPED
+            if self.policy == "coalesce" and self._chunks and len(self._chunks) >= self.max_chunks:
+                self._chunks[-1] += data
+                self._stats["coalesced"] += 1
+            else:
+                if self.policy == "drop_oldest":
+                    while self._chunks and len(self._chunks) >= self.max_chunks:
+                        self._drop_oldest()
+                self._chunks.append(data)
+            self._bytes += size
+            if self._bytes > self.max_bytes:
+                self._trim_to(self.max_bytes)
+            self._stats["enqueued"] += 1
+            self._stats["max_depth"] = max(self._stats["max_depth"], len(self._chunks))
+            self._stats["max_bytes"] = max(self._stats["max_bytes"], self._bytes)
+            status = ACCEPTED
+            if self.policy == "pause" and (len(self._chunks) >= self.max_chunks or self._bytes >= self.max_bytes):
+                status = PAUSED
+                if not self.paused:
+                    self.paused = notify_pause = True
+                    self._stats["pauses"] += 1
+            self._cond.notify()
+        if notify_pause and self.on_pause:
+            self.on_pause()
+        return status
+
+    def get(self, timeout=None):
+        """Next chunk, waiting up to ``timeout`` seconds; None on timeout or once closed and drained"""
+        notify_resume = False
+        with self._cond:
+            deadline = None if timeout is None else time.monotonic() + timeout
+            while not self._chunks:
+                if self.closed:
+                    return None
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return None
+                self._cond.wait(remaining)
+            data = self._chunks.popleft()
+            self._bytes -= len(data)
+            self._stats["dequeued"] += 1
+            if self.paused and len(self._chunks) <= self.max_chunks // 2 and self._bytes <= self.max_bytes // 2:
+                self.paused = False
+                notify_resume = True
+        if notify_resume and self.on_resume:
+            self.on_resume()
+        return data
+
+    def close(self):
+        """Stop accepting audio; ``get`` returns what is queued, then None"""
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+    def get_stats(self):
+        with self._cond:
+            return {**self._stats, "depth": len(self._chunks), "bytes": self._bytes, "policy": self.policy,
+                    "paused": self.paused}
@@ -0,0 +1,178 @@
+"""
+Wire formats for streaming transcription results
+
+Each interim result used to be a dict with ``timestamp.isoformat()``
+serialized by ``json.dumps``; at high interim rates the formatting and the
+repeated key names dominate both CPU and bytes. ``TranscriptFrame`` is the
+result as a frozen Pydantic model that encodes to one of three formats,
+agreed per session with ``negotiate_format``:
+
+- ``json``: the existing text message (ISO timestamp), the default;
+- ``binary``: a fixed 32-byte little-endian header followed by the
+  language code and the UTF-8 text; the timestamp stays a float;
+- ``msgpack``: the same fields packed with MessagePack, when the
+  ``msgpack`` package is installed (imported on first use).
+
+Encodings are cached on the frame, so a result sent to several listeners
+or re-sent after a reconnect is serialized once per format.
+"""
+
+import json
+import struct
+import time
+from datetime import datetime
+from functools import cached_property
+
+from pydantic import BaseModel, ConfigDict, Field
+
+FORMATS = ("binary", "msgpack", "json")
+DEFAULT_FORMAT = "json"
+BINARY_VERSION = 1
+
+# version, kind, flags, language length, seq, offset, stable, confidence, timestamp, text length
+BINARY_HEADER = struct.Struct("<BBBBIIIfdI")
+KIND_CODES = {"transcript_delta": 1, "transcript_sync": 2}
+KIND_NAMES = {code: kind for kind, code in KIND_CODES.items()}
+FLAG_FINAL = 1
+
+_msgpack = None
+
+
+def _load_msgpack():
+    """The msgpack module, or None when it is not installed"""
+    global _msgpack
+    if _msgpack is None:
+        try:
+            import msgpack
+        except ImportError:
+            msgpack = False
+        _msgpack = msgpack
+    return _msgpack or None
+
+
+def available_formats():
+    return tuple(fmt for fmt in FORMATS if fmt != "msgpack" or _load_msgpack() is not None)
+
+
+def negotiate_format(requested):
+    """First format from the client's preference list (a list or comma-separated string) that we support"""
+    if isinstance(requested, str):
+        requested = requested.split(",")
+    supported = available_formats()
+    for fmt in requested or ():
+        fmt = fmt.strip().lower()
+        if fmt in supported:
+            return fmt
+    return DEFAULT_FORMAT
+
+
+class TranscriptFrame(BaseModel):
+    """One streaming transcription result, encodable to any wire format"""
+
+    model_config = ConfigDict(frozen=True)
+
+    type: str = "transcript_delta"
+    seq: int = 0
+    offset: int = 0
+    text: str = ""
+    stable: int = 0
+    is_final: bool = False
+    confidence: float = 0.0
+    language: str = "en"
+    timestamp: float = Field(default_factory=time.time)
+
+    @cached_property
+    def _encoded(self):
+        """Encodings by format; created on first encode (cheaper than a private attribute per frame)"""
+        return {}
+
+    @classmethod
+    def from_message(cls, message, confidence=0.0, language="en", timestamp=None):
+        """Frame for a ``TranscriptAssembler`` message (a sync message's text starts at offset 0)"""
+        return cls(
+            type=message["type"],
+            seq=message["seq"],
+            offset=message.get("offset", 0),
+            text=message["text"],
+            stable=message["stable"],
+            is_final=message["is_final"],
+            confidence=confidence,
+            language=language,
+            timestamp=time.time() if timestamp is None else timestamp,
+        )
+
+    def model_copy(self, *, update=None, deep=False):
+        """Copy without the encoding cache, which Pydantic would otherwise share with the copy"""
+        copied = super().model_copy(update=update, deep=deep)
+        copied.__dict__.pop("_encoded", None)
+        return copied
+
+    def encode(self, fmt=DEFAULT_FORMAT):
+        """Serialized frame: ``str`` for json (a text frame), ``bytes`` otherwise; cached per format"""
+        encoded = self._encoded.get(fmt)
+        if encoded is None:
+            if fmt == "binary":
+                encoded = self._encode_binary()
+            elif fmt == "msgpack":
+                msgpack = _load_msgpack()
+                if msgpack is None:
+                    raise ValueError("msgpack is not installed")
+                encoded = msgpack.packb(self.model_dump())
+            elif fmt == "json":
+                encoded = json.dumps(self.to_json_message())
+            else:
+                raise ValueError(f"Unknown wire format: {fmt}")
+            self._encoded[fmt] = encoded
+        return encoded
+
+    def to_json_message(self):
+        """The JSON text message, with the ISO timestamp existing clients expect"""
+        return {
+            "type": self.type,
+            "seq": self.seq,
+            "offset": self.offset,
+            "text": self.text,
+            "stable": self.stable,
+            "is_final": self.is_final,
+            "confidence": self.confidence,
+            "language": self.language,
+            "timestamp": datetime.fromtimestamp(self.timestamp).isoformat(),
+        }
+
+    def _encode_binary(self):
+        text = self.text.encode("utf-8")
+        language = self.language.encode("ascii")
+        header = BINARY_HEADER.pack(
+            BINARY_VERSION, KIND_CODES[self.type], FLAG_FINAL if self.is_final else 0, len(language),
+            self.seq, self.offset, self.stable, self.confidence, self.timestamp, len(text),
+        )
+        return b"".join((header, language, text))
+
+
+def decode_frame(data, fmt=DEFAULT_FORMAT):
+    """Client side: a ``TranscriptFrame`` from an encoded message"""
+    if fmt == "json":
+        message = json.loads(data)
+        message["timestamp"] = datetime.fromisoformat(message["timestamp"]).timestamp()
+        return TranscriptFrame(**message)
+    if fmt == "msgpack":
+        msgpack = _load_msgpack()
+        if msgpack is None:
+            raise ValueError("msgpack is not installed")
+        return TranscriptFrame(**msgpack.unpackb(data))
+    if fmt != "binary":
+        raise ValueError(f"Unknown wire format: {fmt}")
+
+    (version, kind, flags, language_length, seq, offset, stable, confidence, timestamp,
+     text_length) = BINARY_HEADER.unpack_from(data)
+    if version != BINARY_VERSION:
+        raise ValueError(f"Unsupported binary frame version: {version}")
+    start = BINARY_HEADER.size
+    language = bytes(data[start:start + language_length]).decode("ascii")
+    start += language_length
+    text = bytes(data[start:start + text_length]).decode("utf-8")
+    return TranscriptFrame(
+        type=KIND_NAMES[kind], seq=seq, offset=offset, text=text, stable=stable,
+        is_final=bool(flags & FLAG_FINAL), confidence=confidence, language=language, timestamp=timestamp,
+    )
+
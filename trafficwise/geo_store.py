@@ -0,0 +1,363 @@
+"""
+Array-backed store for intersections and road segments on the traffic map
+
+Points (intersections, junctions) and polylines (road segments) are held in
+NumPy arrays instead of per-feature dicts:
+
+    PointLayer   names, lat, lon, congestion level
+    LineLayer    names, congestion level, all vertices in one (N, 2) lat/lon
+                 array with per-line offsets
+
+Stores load from GeoJSON (Point / LineString / MultiLineString features) or
+CSV (``name,lat,lon,congestion`` rows). Congestion levels are 0-3
+(Light, Moderate, Heavy, Very Heavy) and can be updated in place as live data
+arrives; every change bumps the store ``version`` used as the map cache key.
+
+The browser never receives the raw features. ``clusters`` merges points into
+a Web Mercator pixel grid for a zoom level, ``simplified_lines`` drops
+sub-pixel segments and applies Douglas-Peucker at a pixel tolerance, and both
+are capped (``max_markers`` / ``max_vertices``), so the GeoJSON payload for a
+view or a ``tile(z, x, y)`` stays bounded however large the network grows.
+"""
+
+import csv
+import hashlib
+import json
+import math
+import os
+import threading
+from collections import namedtuple
+from functools import lru_cache
+
+import numpy as np
+
+CONGESTION_LEVELS = ["Light", "Moderate", "Heavy", "Very Heavy"]
+LEVEL_COLORS = ["green", "orange", "red", "darkred"]
+
+TILE_SIZE = 256
+DEFAULT_CELL_PIXELS = int(os.getenv("MAP_CLUSTER_CELL_PIXELS", "64"))
+DEFAULT_MAX_MARKERS = int(os.getenv("MAP_MAX_MARKERS", "500"))
+DEFAULT_TOLERANCE_PIXELS = float(os.getenv("MAP_SIMPLIFY_PIXELS", "1.5"))
+DEFAULT_MAX_VERTICES = int(os.getenv("MAP_MAX_VERTICES", "20000"))
+# 5 decimal places is about 1 m, finer than any screen pixel at street zoom
+COORDINATE_DECIMALS = 5
+
+Cluster = namedtuple("Cluster", ["lat", "lon", "count", "level", "name"])
+SimplifiedLine = namedtuple("SimplifiedLine", ["name", "level", "path"])
+
+
+def congestion_level(value):
+    """Congestion level 0-3 from an int or a label such as "Very Heavy" """
+    if isinstance(value, str):
+        label = value.strip().lower()
+        for level, name in enumerate(CONGESTION_LEVELS):
+            if name.lower() == label:
+                return level
+        value = float(label) if label else 0
+    return int(min(max(int(value), 0), len(CONGESTION_LEVELS) - 1))
+
+
+def project(lat, lon, zoom):
+    """Web Mercator pixel coordinates (x, y) at ``zoom``"""
+    scale = TILE_SIZE * 2.0 ** zoom
+    lat = np.asarray(lat, dtype=np.float64)
+    lon = np.asarray(lon, dtype=np.float64)
+    x = (lon + 180.0) / 360.0 * scale
+    sin_lat = np.clip(np.sin(np.radians(lat)), -0.9999, 0.9999)
+    y = (0.5 - np.log((1 + sin_lat) / (1 - sin_lat)) / (4 * np.pi)) * scale
+    return x, y
+
+
+def tile_bounds(z, x, y):
+    """(south, west, north, east) of slippy-map tile ``z/x/y``"""
+    n = 2.0 ** z
+
+    def lat(row):
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * row / n))))
+
+    return lat(y + 1), x / n * 360.0 - 180.0, lat(y), (x + 1) / n * 360.0 - 180.0
+
+
+def douglas_peucker(points, tolerance):
+    """Boolean mask of the vertices kept by Douglas-Peucker simplification"""
+    count = len(points)
+    keep = np.zeros(count, dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, count - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+        segment = points[end] - points[start]
+        offsets = points[start + 1:end] - points[start]
+        length = math.hypot(segment[0], segment[1])
+        if length == 0:
+            distances = np.hypot(offsets[:, 0], offsets[:, 1])
+        else:
+            distances = np.abs(segment[0] * offsets[:, 1] - segment[1] * offsets[:, 0]) / length
+        farthest = int(np.argmax(distances))
+        if distances[farthest] > tolerance:
+            farthest += start + 1
+            keep[farthest] = True
+            stack.append((start, farthest))
+            stack.append((farthest, end))
+    return keep
+
+
+class PointLayer:
+    """Point features as parallel arrays"""
+
+    def __init__(self, names=(), lat=(), lon=(), levels=()):
+        self.names = list(names)
+        self.lat = np.asarray(lat, dtype=np.float64)
+        self.lon = np.asarray(lon, dtype=np.float64)
+        self.levels = np.asarray(levels, dtype=np.uint8)
+        if not (len(self.names) == len(self.lat) == len(self.lon) == len(self.levels)):
+            raise ValueError("PointLayer arrays must have the same length")
+
+    def __len__(self):
+        return len(self.lat)
+
+
+class LineLayer:
+    """Polyline features: one vertex array plus per-line offsets"""
+
+    def __init__(self, names=(), coords=None, offsets=(0,), levels=()):
+        self.names = list(names)
+        self.coords = np.empty((0, 2)) if coords is None else np.asarray(coords, dtype=np.float64).reshape(-1, 2)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.levels = np.asarray(levels, dtype=np.uint8)
+        if len(self.offsets) != len(self.names) + 1 or len(self.levels) != len(self.names):
+            raise ValueError("LineLayer needs one offset per line plus one and one level per line")
+        if len(self.names) and np.any(np.diff(self.offsets) < 2):
+            raise ValueError("Every line needs at least two vertices")
+
+    @classmethod
+    def from_paths(cls, names, paths, levels):
+        """Build from a list of ``[[lat, lon], ...]`` paths"""
+        lengths = [len(path) for path in paths]
+        coords = np.concatenate([np.asarray(path, dtype=np.float64) for path in paths]) if paths else None
+        return cls(names, coords, np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64), levels)
+
+    def __len__(self):
+        return len(self.names)
+
+    def path(self, index):
+        return self.coords[self.offsets[index]:self.offsets[index + 1]]
+
+
+class GeoStore:
+    """Points and lines with live congestion levels and a change version"""
+
+    def __init__(self, points=None, lines=None):
+        self.points = PointLayer() if points is None else points
+        self.lines = LineLayer() if lines is None else lines
+        self._lock = threading.Lock()
+        self._version = None
+
+    @classmethod
+    def from_geojson(cls, source):
+        """Load from a GeoJSON FeatureCollection (dict or file path)"""
+        if not isinstance(source, dict):
+            with open(source, "r", encoding="utf-8") as handle:
+                source = json.load(handle)
+
+        point_names, lats, lons, point_levels = [], [], [], []
+        line_names, paths, line_levels = [], [], []
+        for index, feature in enumerate(source.get("features", [])):
+            geometry = feature.get("geometry") or {}
+            properties = feature.get("properties") or {}
+            name = str(properties.get("name", feature.get("id", index)))
+            level = congestion_level(properties.get("congestion", properties.get("traffic", 0)))
+            kind = geometry.get("type")
+            if kind == "Point":
+                lon, lat = geometry["coordinates"][:2]
+                point_names.append(name)
+                lats.append(lat)
+                lons.append(lon)
+                point_levels.append(level)
+            elif kind in ("LineString", "MultiLineString"):
+                parts = geometry["coordinates"] if kind == "MultiLineString" else [geometry["coordinates"]]
+                for part in parts:
+                    if len(part) >= 2:
+                        line_names.append(name)
+                        # GeoJSON is [lon, lat]; the store is [lat, lon] like Folium
+                        paths.append([[vertex[1], vertex[0]] for vertex in part])
+                        line_levels.append(level)
+
+        return cls(
+            PointLayer(point_names, lats, lons, point_levels),
+            LineLayer.from_paths(line_names, paths, line_levels),
+        )
+
+    @classmethod
+    def from_csv(cls, path):
+        """Load points from a CSV file with ``name,lat,lon,congestion`` columns"""
+        names, lats, lons, levels = [], [], [], []
+        with open(path, "r", encoding="utf-8", newline="") as handle:
+            for row in csv.DictReader(handle):
+                names.append(row.get("name", str(len(names))))
+                lats.append(float(row["lat"]))
+                lons.append(float(row["lon"]))
+                levels.append(congestion_level(row.get("congestion") or 0))
+        return cls(PointLayer(names, lats, lons, levels))
+
+    @classmethod
+    def from_file(cls, path):
+        """Load a ``.csv`` or GeoJSON file"""
+        if path.lower().endswith(".csv"):
+            return cls.from_csv(path)
+        return cls.from_geojson(path)
+
+    @property
+    def version(self):
+        """Content hash of geometry and congestion levels"""
+        with self._lock:
+            if self._version is None:
+                digest = hashlib.sha256()
+                for array in (self.points.lat, self.points.lon, self.points.levels,
+                              self.lines.coords, self.lines.offsets, self.lines.levels):
+                    digest.update(np.ascontiguousarray(array).tobytes())
+                digest.update("\n".join(self.points.names + self.lines.names).encode("utf-8"))
+                self._version = digest.hexdigest()[:16]
+            return self._version
+
+    def update_levels(self, point_levels=None, line_levels=None):
+        """Apply live congestion updates as ``{index: level}`` mappings"""
+        with self._lock:
+            for layer, updates in ((self.points, point_levels), (self.lines, line_levels)):
+                if updates:
+                    indexes = np.fromiter(updates.keys(), dtype=np.int64, count=len(updates))
+                    values = [congestion_level(value) for value in updates.values()]
+                    layer.levels[indexes] = np.asarray(values, dtype=np.uint8)
+            self._version = None
+
+    def clusters(self, zoom, bounds=None, cell_pixels=DEFAULT_CELL_PIXELS, max_markers=DEFAULT_MAX_MARKERS):
+        """Grid-cluster points in pixel space; each cluster reports its worst congestion
+
+        The cell size doubles until at most ``max_markers`` clusters remain.
+        """
+        points = self.points
+        mask = self._bounds_mask(points.lat, points.lon, bounds)
+        lat, lon, levels = points.lat[mask], points.lon[mask], points.levels[mask]
+        if len(lat) == 0:
+            return []
+        names = np.asarray(points.names, dtype=object)[mask]
+
+        x, y = project(lat, lon, zoom)
+        cell = float(cell_pixels)
+        while True:
+            keys = (np.floor(x / cell).astype(np.int64) << 32) + np.floor(y / cell).astype(np.int64)
+            cells, inverse, counts = np.unique(keys, return_inverse=True, return_counts=True)
+            if len(cells) <= max_markers:
+                break
+            cell *= 2
+
+        inverse = inverse.ravel()
+        center_lat = np.bincount(inverse, weights=lat) / counts
+        center_lon = np.bincount(inverse, weights=lon) / counts
+        worst = np.zeros(len(cells), dtype=np.uint8)
+        np.maximum.at(worst, inverse, levels)
+        first_member = np.full(len(cells), len(lat), dtype=np.int64)
+        np.minimum.at(first_member, inverse, np.arange(len(lat)))
+
+        return [
+            Cluster(
+                float(center_lat[i]), float(center_lon[i]), int(counts[i]), int(worst[i]),
+                names[first_member[i]] if counts[i] == 1 else f"{counts[i]} intersections",
+            )
+            for i in range(len(cells))
+        ]
+
+    def simplified_lines(self, zoom, bounds=None, tolerance_pixels=DEFAULT_TOLERANCE_PIXELS,
+                         max_vertices=DEFAULT_MAX_VERTICES):
+        """Lines simplified for ``zoom``, most congested first, within a vertex budget
+
+        Lines whose extent is below the tolerance would render as a dot and
+        are dropped before Douglas-Peucker runs.
+        """
+        lines = self.lines
+        if len(lines) == 0:
+            return []
+        starts = lines.offsets[:-1]
+        lat, lon = lines.coords[:, 0], lines.coords[:, 1]
+        south, north = np.minimum.reduceat(lat, starts), np.maximum.reduceat(lat, starts)
+        west, east = np.minimum.reduceat(lon, starts), np.maximum.reduceat(lon, starts)
+
+        candidate = np.ones(len(lines), dtype=bool)
+        if bounds is not None:
+            b_south, b_west, b_north, b_east = bounds
+            candidate &= (north >= b_south) & (south <= b_north) & (east >= b_west) & (west <= b_east)
+
+        x, y = project(lat, lon, zoom)
+        x_extent = np.maximum.reduceat(x, starts) - np.minimum.reduceat(x, starts)
+        y_extent = np.maximum.reduceat(y, starts) - np.minimum.reduceat(y, starts)
+        candidate &= np.maximum(x_extent, y_extent) >= tolerance_pixels
+
+        indexes = np.flatnonzero(candidate)
+        # Most congested, then longest on screen, survive the vertex budget
+        order = np.lexsort((-np.hypot(x_extent[indexes], y_extent[indexes]), -lines.levels[indexes].astype(np.int64)))
+        pixels = np.column_stack([x, y])
+
+        result = []
+        budget = max_vertices
+        for index in indexes[order]:
+            start, end = lines.offsets[index], lines.offsets[index + 1]
+            keep = douglas_peucker(pixels[start:end], tolerance_pixels)
+            kept = int(keep.sum())
+            if kept > budget:
+                continue
+            budget -= kept
+            result.append(SimplifiedLine(lines.names[index], int(lines.levels[index]), lines.coords[start:end][keep]))
+            if budget < 2:
+                break
+        return result
+
+    def to_geojson(self, zoom, bounds=None, **kwargs):
+        """Bounded FeatureCollection of clusters and simplified lines for one view"""
+        cluster_kwargs = {key: kwargs[key] for key in ("cell_pixels", "max_markers") if key in kwargs}
+        line_kwargs = {key: kwargs[key] for key in ("tolerance_pixels", "max_vertices") if key in kwargs}
+        features = []
+        for cluster in self.clusters(zoom, bounds, **cluster_kwargs):
+            features.append({
+                "type": "Feature",
+                "geometry": {
+                    "type": "Point",
+                    "coordinates": [round(cluster.lon, COORDINATE_DECIMALS), round(cluster.lat, COORDINATE_DECIMALS)],
+                },
+                "properties": {
+                    "name": cluster.name,
+                    "count": cluster.count,
+                    "congestion": CONGESTION_LEVELS[cluster.level],
+                    "color": LEVEL_COLORS[cluster.level],
+                },
+            })
+        for line in self.simplified_lines(zoom, bounds, **line_kwargs):
+            path = np.round(line.path[:, ::-1], COORDINATE_DECIMALS).tolist()
+            features.append({
+                "type": "Feature",
+                "geometry": {"type": "LineString", "coordinates": path},
+                "properties": {
+                    "name": line.name,
+                    "congestion": CONGESTION_LEVELS[line.level],
+                    "color": LEVEL_COLORS[line.level],
+                },
+            })
+        return {"type": "FeatureCollection", "features": features}
+
+    def tile(self, z, x, y, **kwargs):
+        """GeoJSON for slippy-map tile ``z/x/y`` (for a tile endpoint or client-side loading)"""
+        return self.to_geojson(z, tile_bounds(z, x, y), **kwargs)
+
+    @staticmethod
+    def _bounds_mask(lat, lon, bounds):
+        if bounds is None:
+            return np.ones(len(lat), dtype=bool)
+        south, west, north, east = bounds
+        return (lat >= south) & (lat <= north) & (lon >= west) & (lon <= east)
+
+
+@lru_cache(maxsize=None)
+def load_geo_store(path):
+    """Process-wide store for a GeoJSON/CSV file, loaded once"""
+    return GeoStore.from_file(path)
@@ -0,0 +1,218 @@
+"""
+Batched, incremental document ingestion for the RAG knowledge base
+
+Documents are split into overlapping word chunks, each chunk is identified
+by the SHA-256 of its text so re-uploading the same data is a no-op, and
+new chunks are embedded in batches and handed to the collection together
+with their precomputed embeddings. A file that is not valid UTF-8 (or not
+valid JSON) raises ``InvalidDocumentError`` from an upload and is skipped,
+and listed in the report, by a directory import.
+"""
+
+import hashlib
+import json
+import os
+import time
+from dataclasses import dataclass, field
+
+DEFAULT_CHUNK_WORDS = int(os.getenv("RAG_CHUNK_WORDS", "120"))
+DEFAULT_CHUNK_OVERLAP = int(os.getenv("RAG_CHUNK_OVERLAP", "20"))
+DEFAULT_BATCH_SIZE = int(os.getenv("RAG_BATCH_SIZE", "64"))
+
+SUPPORTED_EXTENSIONS = (".txt", ".json")
+_JSON_TEXT_FIELDS = ("text", "content", "description", "info")
+
+
+class InvalidDocumentError(ValueError):
+    """An uploaded or imported file could not be decoded or parsed"""
+
+
+def chunk_text(text, chunk_words=DEFAULT_CHUNK_WORDS, overlap_words=DEFAULT_CHUNK_OVERLAP):
+    """Split text into chunks of ``chunk_words`` words overlapping by ``overlap_words``"""
+    if overlap_words >= chunk_words:
+        raise ValueError("overlap_words must be smaller than chunk_words")
+
+    words = text.split()
+    if not words:
+        return []
+
+    step = chunk_words - overlap_words
+    chunks = []
+    for start in range(0, len(words), step):
+        chunks.append(" ".join(words[start:start + chunk_words]))
+        if start + chunk_words >= len(words):
+            break
+    return chunks
+
+
+def chunk_id(chunk):
+    """Content hash used as the collection id of a chunk"""
+    return hashlib.sha256(chunk.encode("utf-8")).hexdigest()
+
+
+def extract_documents(filename, content):
+    """Turn an uploaded TXT/JSON file into a list of document strings
+
+    JSON lists yield one document per item; objects use their ``text``,
+    ``content``, ``description`` or ``info`` field when present and are
+    otherwise serialized whole.
+    """
+    if not filename.lower().endswith(".json"):
+        return [content]
+
+    try:
+        data = json.loads(content)
+    except json.JSONDecodeError as e:
+        raise InvalidDocumentError(f"{filename} is not valid JSON ({e})") from e
+    items = data if isinstance(data, list) else [data]
+    documents = []
+    for item in items:
+        if isinstance(item, str):
+            documents.append(item)
+        elif isinstance(item, dict):
+            field = next((f for f in _JSON_TEXT_FIELDS if isinstance(item.get(f), str)), None)
+            documents.append(item[field] if field else json.dumps(item, ensure_ascii=False))
+        else:
+            documents.append(json.dumps(item, ensure_ascii=False))
+    return documents
+
+
+@dataclass
+class IngestionReport:
+    """Counters for one ingestion run"""
+
+    files: int = 0
+    chunks_total: int = 0
+    chunks_added: int = 0
+    chunks_skipped: int = 0
+    seconds: float = 0.0
+    skipped_files: list = field(default_factory=list)
+
+    @property
+    def chunks_per_second(self):
+        return self.chunks_total / self.seconds if self.seconds else 0.0
+
+    @property
+    def duplicate_skip_rate(self):
+        return self.chunks_skipped / self.chunks_total if self.chunks_total else 0.0
+
+    def merge(self, other):
+        self.files += other.files
+        self.chunks_total += other.chunks_total
+        self.chunks_added += other.chunks_added
+        self.chunks_skipped += other.chunks_skipped
+        self.seconds += other.seconds
+        self.skipped_files.extend(other.skipped_files)
+        return self
+
+    def summary(self):
+        return (f"{self.chunks_added} chunks added, {self.chunks_skipped} duplicates skipped "
+                f"({self.duplicate_skip_rate:.0%}) at {self.chunks_per_second:.0f} chunks/s")
+
+
+class IngestionPipeline:
+    """Chunk, deduplicate, batch-embed and index documents into a collection
+
+    ``model`` is a SentenceTransformer (anything with ``encode(list, batch_size=...)``)
+    and ``collection`` a Chroma collection (anything with ``get(ids=...)`` and
+    ``add(ids=, documents=, metadatas=, embeddings=)``).
+    """
+
+    def __init__(
+        self,
+        model,
+        collection,
+        batch_size=DEFAULT_BATCH_SIZE,
+        chunk_words=DEFAULT_CHUNK_WORDS,
+        overlap_words=DEFAULT_CHUNK_OVERLAP,
+    ):
+        self.model = model
+        self.collection = collection
+        self.batch_size = batch_size
+        self.chunk_words = chunk_words
+        self.overlap_words = overlap_words
+
+    def ingest_text(self, text, source="uploaded", filename=None):
+        """Ingest one document and return an IngestionReport"""
+        return self.ingest_documents([text], source=source, filename=filename)
+
+    def ingest_documents(self, documents, source="uploaded", filename=None):
+        """Ingest several documents in batches and return an IngestionReport"""
+        start = time.perf_counter()
+        report = IngestionReport(files=1 if filename else 0)
+
+        batch = []
+        seen = set()
+        for document in documents:
+            for index, chunk in enumerate(chunk_text(document, self.chunk_words, self.overlap_words)):
+                report.chunks_total += 1
+                identifier = chunk_id(chunk)
+                if identifier in seen:
+                    report.chunks_skipped += 1
+                    continue
+                seen.add(identifier)
+
+                metadata = {"source": source, "chunk": index}
+                if filename:
+                    metadata["file"] = filename
+                batch.append((identifier, chunk, metadata))
+
+                if len(batch) >= self.batch_size:
+                    self._index_batch(batch, report)
+                    batch = []
+
+        if batch:
+            self._index_batch(batch, report)
+
+        report.seconds = time.perf_counter() - start
+        return report
+
+    def ingest_file(self, path, source="bulk"):
+        """Ingest a TXT or JSON file from disk"""
+        filename = os.path.basename(path)
+        try:
+            with open(path, "r", encoding="utf-8") as handle:
+                content = handle.read()
+        except UnicodeDecodeError as e:
+            raise InvalidDocumentError(f"{filename} is not UTF-8 text ({e.reason})") from e
+        return self.ingest_documents(extract_documents(filename, content), source=source, filename=filename)
+
+    def ingest_upload(self, filename, data, source="uploaded"):
+        """Ingest the bytes of an uploaded TXT or JSON file"""
+        try:
+            content = data.decode("utf-8")
+        except UnicodeDecodeError as e:
+            raise InvalidDocumentError(f"{filename} is not UTF-8 text ({e.reason})") from e
+        documents = extract_documents(filename, content)
+        return self.ingest_documents(documents, source=source, filename=filename)
+
+    def ingest_directory(self, directory, source="bulk"):
+        """Ingest every TXT/JSON file below a directory; unreadable files are skipped and listed"""
+        report = IngestionReport()
+        for root, _, filenames in os.walk(directory):
+            for filename in sorted(filenames):
+                if filename.lower().endswith(SUPPORTED_EXTENSIONS):
+                    try:
+                        report.merge(self.ingest_file(os.path.join(root, filename), source=source))
+                    except InvalidDocumentError as e:
+                        report.skipped_files.append(str(e))
+        return report
+
+    def _index_batch(self, batch, report):
+        ids = [identifier for identifier, _, _ in batch]
+        existing = set(self.collection.get(ids=ids).get("ids", []))
+
+        new = [item for item in batch if item[0] not in existing]
+        report.chunks_skipped += len(batch) - len(new)
+        if not new:
+            return
+
+        documents = [chunk for _, chunk, _ in new]
+        embeddings = self.model.encode(documents, batch_size=self.batch_size)
+        self.collection.add(
+            ids=[identifier for identifier, _, _ in new],
+            documents=documents,
+            metadatas=[metadata for _, _, metadata in new],
+            embeddings=embeddings.tolist() if hasattr(embeddings, "tolist") else [list(v) for v in embeddings],
+        )
+        report.chunks_added += len(new)
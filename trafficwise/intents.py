@@ -0,0 +1,151 @@
+"""
+Data-driven offline intent engine
+
+Intents and their answer templates are loaded from a JSON file (by default
+``trafficwise/data/offline_intents.json``):
+
+    {
+      "version": 1,
+      "default": {"name": "general_tips", "response": "..."},
+      "intents": [
+        {"name": "route_planning", "keywords": ["route", "road"], "weight": 1.0,
+         "response": "... $query ..."}
+      ]
+    }
+
+All keywords of all intents are compiled into one Aho-Corasick automaton, so
+matching a message is a single pass over its characters regardless of how
+many intents exist. Keywords match as case-insensitive substrings. Each
+intent scores ``weight`` x number of distinct keywords found, accumulated
+with one ``numpy.bincount``; the highest score wins and ties go to the
+intent listed first. Templates are rendered
+with ``string.Template.safe_substitute`` (``$query`` is the user message).
+"""
+
+import json
+import os
+from collections import deque
+from functools import lru_cache
+from string import Template
+
+import numpy as np
+
+DEFAULT_INTENTS_PATH = os.getenv(
+    "OFFLINE_INTENTS_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "offline_intents.json"),
+)
+
+
+class KeywordAutomaton:
+    """Aho-Corasick automaton reporting which keyword ids occur in a text"""
+
+    def __init__(self, keywords):
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [()]
+
+        for keyword_id, keyword in enumerate(keywords):
+            state = 0
+            for char in keyword:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append(())
+                state = next_state
+            self._output[state] = self._output[state] + (keyword_id,)
+
+        # Breadth-first construction of failure links; outputs are merged along them
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                if self._fail[next_state] == next_state:
+                    self._fail[next_state] = 0
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def find(self, text):
+        """Return the set of keyword ids occurring in ``text``"""
+        goto, fail, output = self._goto, self._fail, self._output
+        found = set()
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                found.update(output[state])
+        return found
+
+
+class IntentEngine:
+    """Scores a message against every intent in one automaton pass"""
+
+    def __init__(self, intents, default):
+        self.intents = intents
+        self.default = default
+        self._templates = [Template(intent["response"]) for intent in intents]
+        self._default_template = Template(default["response"])
+
+        keywords = []
+        self._keyword_intents = []
+        index_by_keyword = {}
+        for intent_index, intent in enumerate(intents):
+            for keyword in intent["keywords"]:
+                keyword = keyword.lower()
+                if keyword not in index_by_keyword:
+                    index_by_keyword[keyword] = len(keywords)
+                    keywords.append(keyword)
+                    self._keyword_intents.append([])
+                self._keyword_intents[index_by_keyword[keyword]].append(intent_index)
+        self._automaton = KeywordAutomaton(keywords)
+        self._keyword_intents = [np.array(indexes, dtype=np.intp) for indexes in self._keyword_intents]
+        self._weights = np.array([float(intent.get("weight", 1.0)) for intent in intents])
+
+    @classmethod
+    def from_file(cls, path=DEFAULT_INTENTS_PATH):
+        with open(path, "r", encoding="utf-8") as handle:
+            data = json.load(handle)
+        return cls(data["intents"], data["default"])
+
+    def _scores(self, message):
+        """Score vector over all intents, or None when no keyword occurs"""
+        found = self._automaton.find(message.lower())
+        if not found:
+            return None
+        indexes = np.concatenate([self._keyword_intents[keyword_id] for keyword_id in found])
+        return np.bincount(indexes, weights=self._weights[indexes], minlength=len(self.intents))
+
+    def match(self, message):
+        """Return ``[(intent_name, score), ...]`` for matching intents, best first"""
+        scores = self._scores(message)
+        if scores is None:
+            return []
+        ranked = np.argsort(-scores, kind="stable")
+        return [(self.intents[index]["name"], float(scores[index])) for index in ranked if scores[index] > 0]
+
+    def respond(self, message):
+        """Render the answer template of the best matching intent"""
+        scores = self._scores(message)
+        if scores is None:
+            return self._default_template.safe_substitute(query=message)
+        # argmax returns the first maximum, so ties go to the intent listed first
+        return self._templates[int(np.argmax(scores))].safe_substitute(query=message)
+
+
+@lru_cache(maxsize=None)
+def get_intent_engine():
+    """Return the process-wide intent engine loaded from the default intents file"""
+    return IntentEngine.from_file()
+
+
+def offline_traffic_response(user_message):
+    """Provide offline traffic responses using the intent engine"""
+    return get_intent_engine().respond(user_message)
@@ -0,0 +1,114 @@
+"""
+Pooled HTTP client shared by the LLM provider calls
+
+Every chat turn used to go through a bare ``requests.post``, paying a fresh
+DNS lookup, TCP connect and TLS handshake each time. ``LLMClient`` keeps a
+``requests.Session`` with keep-alive connection pools per provider host, and
+``get_llm_client`` hands out a single instance per process so every
+Streamlit session reuses the same warm connections.
+"""
+
+import os
+import threading
+from functools import lru_cache
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Number of distinct provider hosts to keep a pool for
+DEFAULT_POOL_CONNECTIONS = int(os.getenv("LLM_POOL_CONNECTIONS", "4"))
+# Maximum simultaneous connections per provider host
+DEFAULT_POOL_MAXSIZE = int(os.getenv("LLM_POOL_MAXSIZE", os.getenv("HTTP_MAX_CONNECTIONS", "20")))
+# Block (instead of opening throwaway connections) once a host's pool is exhausted
+DEFAULT_POOL_BLOCK = os.getenv("LLM_POOL_BLOCK", "true").lower() == "true"
+DEFAULT_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "30"))
+
+
+class LLMClient:
+    """Keep-alive HTTP client with bounded per-host connection pools"""
+
+    def __init__(
+        self,
+        pool_connections=DEFAULT_POOL_CONNECTIONS,
+        pool_maxsize=DEFAULT_POOL_MAXSIZE,
+        pool_block=DEFAULT_POOL_BLOCK,
+        timeout=DEFAULT_TIMEOUT,
+    ):
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.pool_block = pool_block
+        self.timeout = timeout
+
+        self.session = requests.Session()
+        # Retries are handled by the callers, which turn failures into chat messages
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block,
+            max_retries=0,
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self._lock = threading.Lock()
+        self.request_count = 0
+
+    def post(self, url, **kwargs):
+        """POST through the pooled session (same signature as ``requests.post``)"""
+        kwargs.setdefault("timeout", self.timeout)
+        with self._lock:
+            self.request_count += 1
+        return self.session.post(url, **kwargs)
+
+    def get(self, url, **kwargs):
+        """GET through the pooled session (same signature as ``requests.get``)"""
+        kwargs.setdefault("timeout", self.timeout)
+        with self._lock:
+            self.request_count += 1
+        return self.session.get(url, **kwargs)
+
+    def get_stats(self):
+        """Return pool configuration and usage counters"""
+        return {
+            "pool_connections": self.pool_connections,
+            "pool_maxsize": self.pool_maxsize,
+            "pool_block": self.pool_block,
+            "timeout": self.timeout,
+            "request_count": self.request_count,
+        }
+
+    def close(self):
+        """Close all pooled connections"""
+        self.session.close()
+
+
+def iter_sse_data(response):
+    """Yield the ``data:`` payloads of a server-sent events response
+
+    Multi-line events are joined with newlines; comments and other fields
+    (``event:``, ``id:``, ``retry:``) are ignored.
+    """
+    # Event streams are UTF-8 by definition but rarely declare a charset
+    if response.encoding is None or response.encoding.lower() == "iso-8859-1":
+        response.encoding = "utf-8"
+
+    data_lines = []
+    for line in response.iter_lines(decode_unicode=True):
+        if line is None:
+            continue
+        if line == "":
+            if data_lines:
+                yield "\n".join(data_lines)
+                data_lines = []
+            continue
+        if line.startswith("data:"):
+            value = line[5:]
+            data_lines.append(value[1:] if value.startswith(" ") else value)
+    if data_lines:
+        yield "\n".join(data_lines)
+
+
+@lru_cache(maxsize=None)
+def get_llm_client():
+    """Return the process-wide LLM client, creating it on first use"""
+    return LLMClient()
@@ -0,0 +1,243 @@
+"""
+Local CPU Whisper inference with cross-session micro-batching
+
+The cloud providers add a network round trip to every chunk and need
+connectivity. ``LocalWhisperBackend`` runs a CTranslate2 (faster-whisper)
+Whisper model on the CPU with int8 weights instead; the model is loaded on
+the first chunk, so processes that never use it pay nothing.
+
+Whisper's encoder always sees a padded 30-second window, so one short
+chunk costs almost as much as several: batching is where CPU throughput
+comes from. ``MicroBatcher`` collects chunks from all concurrent sessions
+and runs them as one forward pass when ``LOCAL_WHISPER_BATCH`` chunks are
+waiting or the oldest has waited ``LOCAL_WHISPER_BATCH_WAIT_MS``, so a
+lone session pays at most that wait. Inference runs on the batcher's
+worker thread (CTranslate2 releases the GIL), and async callers await it
+without blocking the event loop.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+import numpy as np
+
+DEFAULT_MODEL = os.getenv("LOCAL_WHISPER_MODEL", "base.en")
+DEFAULT_COMPUTE_TYPE = os.getenv("LOCAL_WHISPER_COMPUTE_TYPE", "int8")
+DEFAULT_CPU_THREADS = int(os.getenv("LOCAL_WHISPER_THREADS", str(os.cpu_count() or 4)))
+DEFAULT_LANGUAGE = os.getenv("LOCAL_WHISPER_LANGUAGE", "en")
+DEFAULT_MAX_BATCH = int(os.getenv("LOCAL_WHISPER_BATCH", "8"))
+DEFAULT_MAX_WAIT_MS = float(os.getenv("LOCAL_WHISPER_BATCH_WAIT_MS", "30"))
+SAMPLE_RATE = 16000
+# Mel frames in Whisper's 30-second input window
+WINDOW_FRAMES = 3000
+
+logger = logging.getLogger(__name__)
+
+
+def pcm16_to_float32(audio):
+    """Model input from 16-bit PCM bytes (or an int16/float array)"""
+    if isinstance(audio, (bytes, bytearray, memoryview)):
+        audio = np.frombuffer(audio, dtype=np.int16)
+    audio = np.asarray(audio)
+    if audio.dtype == np.int16:
+        return audio.astype(np.float32) / 32768.0
+    return audio.astype(np.float32, copy=False)
+
+
+class _FasterWhisperBatch:
+    """Batched greedy decoding with a faster-whisper model's CTranslate2 engine"""
+
+    def __init__(self, model, language):
+        import ctranslate2
+        from faster_whisper.audio import pad_or_trim
+        from faster_whisper.tokenizer import Tokenizer
+
+        self._storage_view = ctranslate2.StorageView.from_array
+        self._pad_or_trim = pad_or_trim
+        self.model = model
+        multilingual = model.model.is_multilingual
+        self.tokenizer = Tokenizer(model.hf_tokenizer, multilingual, task="transcribe",
+                                   language=language if multilingual else None)
+        self.prompt = list(self.tokenizer.sot_sequence) + [self.tokenizer.no_timestamps]
+
+    def __call__(self, batch):
+        features = np.stack([
+            self._pad_or_trim(self.model.feature_extractor(audio)[:, :WINDOW_FRAMES], WINDOW_FRAMES)
+            for audio in batch
+        ]).astype(np.float32)
+        results = self.model.model.generate(
+            self._storage_view(np.ascontiguousarray(features)),
+            [self.prompt] * len(batch),
+            beam_size=1,
+            suppress_blank=True,
+        )
+        return [self.tokenizer.decode(result.sequences_ids[0]).strip() for result in results]
+
+
+def _load_faster_whisper(model_name, compute_type, cpu_threads, language):
+    from faster_whisper import WhisperModel
+
+    model = WhisperModel(model_name, device="cpu", compute_type=compute_type, cpu_threads=cpu_threads)
+    return _FasterWhisperBatch(model, language)
+
+
+class MicroBatcher:
+    """Groups submissions from many callers into batched calls on one worker thread"""
+
+    def __init__(self, infer_batch, max_batch=DEFAULT_MAX_BATCH, max_wait_ms=DEFAULT_MAX_WAIT_MS,
+                 clock=time.monotonic):
+        """``infer_batch(items)`` returns one result per item, in order"""
+        self.infer_batch = infer_batch
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max_wait_ms / 1000.0
+        self.clock = clock
+        self._queue = deque()
+        self._condition = threading.Condition()
+        self._closed = False
+        self._worker = None
+        self._stats = {
+            "batches": 0,
+            "items": 0,
+            "max_batch_seen": 0,
+            "infer_seconds": 0.0,
+            "wait_seconds": 0.0,
+            "errors": 0,
+        }
+
+    def submit(self, item):
+        """A ``Future`` for the item's result"""
+        future = Future()
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("MicroBatcher is closed")
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="whisper-batcher", daemon=True)
+                self._worker.start()
+            self._queue.append((item, future, self.clock()))
+            if len(self._queue) == 1 or len(self._queue) >= self.max_batch:
+                self._condition.notify()
+        return future
+
+    async def submit_async(self, item):
+        return await asyncio.wrap_future(self.submit(item))
+
+    def close(self):
+        """Stop the worker after it finishes the queued items"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        if self._worker is not None:
+            self._worker.join()
+
+    def _next_batch(self):
+        with self._condition:
+            while not self._queue and not self._closed:
+                self._condition.wait()
+            if not self._queue:
+                return None
+            deadline = self._queue[0][2] + self.max_wait
+            while len(self._queue) < self.max_batch and not self._closed:
+                remaining = deadline - self.clock()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+            return [self._queue.popleft() for _ in range(min(self.max_batch, len(self._queue)))]
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            # Callers that gave up (a closed session) are dropped from the pass
+            batch = [entry for entry in batch if entry[1].set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            start = self.clock()
+            self._stats["wait_seconds"] += sum(start - submitted for _, _, submitted in batch)
+            try:
+                results = self.infer_batch([item for item, _, _ in batch])
+            except Exception as e:
+                self._stats["errors"] += 1
+                for _, future, _ in batch:
+                    future.set_exception(e)
+                continue
+            finally:
+                self._stats["infer_seconds"] += self.clock() - start
+            self._stats["batches"] += 1
+            self._stats["items"] += len(batch)
+            self._stats["max_batch_seen"] = max(self._stats["max_batch_seen"], len(batch))
+            for (_, future, _), result in zip(batch, results):
+                future.set_result(result)
+
+    def get_stats(self):
+        stats = dict(self._stats)
+        stats["mean_batch"] = stats["items"] / stats["batches"] if stats["batches"] else 0.0
+        stats["queued"] = len(self._queue)
+        return stats
+
+
+class LocalWhisperBackend:
+    """Offline CPU transcription provider; chunks from all sessions share batched forward passes"""
+
+    def __init__(self, model_name=DEFAULT_MODEL, compute_type=DEFAULT_COMPUTE_TYPE,
+                 cpu_threads=DEFAULT_CPU_THREADS, language=DEFAULT_LANGUAGE, max_batch=DEFAULT_MAX_BATCH,
+                 max_wait_ms=DEFAULT_MAX_WAIT_MS, loader=_load_faster_whisper):
+        self.model_name = model_name
+        self.compute_type = compute_type
+        self.cpu_threads = cpu_threads
+        self.language = language
+        self._loader = loader
+        self._model = None
+        self._load_lock = threading.Lock()
+        self._load_seconds = None
+        self._audio_seconds = 0.0
+        self.batcher = MicroBatcher(self._infer, max_batch=max_batch, max_wait_ms=max_wait_ms)
+
+    @property
+    def is_loaded(self):
+        return self._model is not None
+
+    @property
+    def model(self):
+        """The batched inference callable, loaded on first access"""
+        if self._model is None:
+            with self._load_lock:
+                if self._model is None:
+                    start = time.perf_counter()
+                    self._model = self._loader(self.model_name, self.compute_type, self.cpu_threads, self.language)
+                    self._load_seconds = time.perf_counter() - start
+                    logger.info("Loaded local Whisper model %s (%s) in %.2fs",
+                                self.model_name, self.compute_type, self._load_seconds)
+        return self._model
+
+    def load(self):
+        """Load the model now (at startup) rather than on the first chunk"""
+        return self.model
+
+    def _infer(self, batch):
+        self._audio_seconds += sum(len(audio) for audio in batch) / SAMPLE_RATE
+        return self.model(batch)
+
+    async def transcribe(self, audio):
+        """Text for one chunk of 16 kHz mono audio (PCM16 bytes or an array)"""
+        return await self.batcher.submit_async(pcm16_to_float32(audio))
+
+    def transcribe_sync(self, audio, timeout=None):
+        return self.batcher.submit(pcm16_to_float32(audio)).result(timeout)
+
+    def close(self):
+        self.batcher.close()
+
+    def get_stats(self):
+        stats = self.batcher.get_stats()
+        stats["model"] = self.model_name
+        stats["load_seconds"] = self._load_seconds
+        stats["audio_seconds"] = self._audio_seconds
+        # Compute seconds per audio second; below 1 is faster than real time
+        stats["real_time_factor"] = (stats["infer_seconds"] / self._audio_seconds) if self._audio_seconds else None
+        return stats
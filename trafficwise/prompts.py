@@ -0,0 +1,242 @@
+"""
+Prompt templates, payload skeletons and token budgets
+
+The provider prompts (the long Pakistan-context Gemini prompt, the OpenAI
+prompt and the RAG prompt) are ``PromptTemplate`` objects parsed once at
+import; rendering only joins the pre-split literal pieces with the values.
+The constant parts of the request bodies (``safetySettings``, the fixed
+``generationConfig`` fields) are module-level skeletons shared by every
+payload instead of being rebuilt per call.
+
+``estimate_tokens`` is a fast, deliberately conservative local estimate
+(three characters per token for ASCII text, one per character otherwise),
+so a prompt that passes the budget check also fits the real tokenizer.
+Budgets come from the model's input limit (for OpenAI, whose context window
+also holds the answer, minus ``max_tokens``) capped by
+``PROMPT_MAX_INPUT_TOKENS``. ``fit_history`` drops the oldest turns that do
+not fit, ``fit_documents`` trims retrieved RAG chunks, and a prompt that
+cannot fit raises ``PromptTooLongError`` before anything is sent upstream.
+"""
+
+import os
+import re
+from string import Formatter
+
+# Cap on input tokens per request, below the model limits, to bound latency and cost
+DEFAULT_MAX_INPUT_TOKENS = int(os.getenv("PROMPT_MAX_INPUT_TOKENS", "8000"))
+# Retrieved knowledge base text allowed in a RAG prompt
+DEFAULT_RAG_CONTEXT_TOKENS = int(os.getenv("RAG_CONTEXT_TOKENS", "1500"))
+GEMINI_MAX_OUTPUT_TOKENS = 1024
+OPENAI_MAX_OUTPUT_TOKENS = 1000
+# Truncated RAG chunks shorter than this are dropped instead
+MIN_DOCUMENT_TOKENS = 32
+
+# Input token limits (Gemini counts input and output separately)
+MODEL_INPUT_LIMITS = {
+    "gemini-1.5-flash": 1048576,
+    "gemini-1.5-pro": 2097152,
+    "gemini-pro": 30720,
+}
+# Gemini 1.0 models reject the systemInstruction field
+GEMINI_NO_SYSTEM_INSTRUCTION = {"gemini-pro", "gemini-1.0-pro"}
+# Context windows shared by input and output
+MODEL_CONTEXT_WINDOWS = {
+    "gpt-3.5-turbo": 16385,
+}
+
+_BOUNDARY = re.compile(r"[.!?\n]\s")
+
+
+class PromptTooLongError(ValueError):
+    """Raised when a prompt cannot fit the model's input budget"""
+
+    def __init__(self, tokens, budget):
+        super().__init__(f"Prompt too long: about {tokens} tokens, the limit is {budget}. Please shorten your question.")
+        self.tokens = tokens
+        self.budget = budget
+
+
+def estimate_tokens(text):
+    """Conservative token count: three characters per token for ASCII, one per character otherwise"""
+    if text.isascii():
+        return max(1, (len(text) + 2) // 3)
+    return max(1, len(text))
+
+
+def input_budget(model, max_output_tokens=0, max_input_tokens=DEFAULT_MAX_INPUT_TOKENS):
+    """Input tokens allowed for ``model``, never above ``max_input_tokens``"""
+    if model in MODEL_CONTEXT_WINDOWS:
+        return min(max_input_tokens, MODEL_CONTEXT_WINDOWS[model] - max_output_tokens)
+    return min(max_input_tokens, MODEL_INPUT_LIMITS.get(model, max_input_tokens))
+
+
+class PromptTemplate:
+    """A ``str.format``-style template parsed once; ``render`` only joins pieces"""
+
+    def __init__(self, text):
+        self.text = text
+        self._pieces = []
+        self._slots = []
+        for literal, field, _, _ in Formatter().parse(text):
+            if literal:
+                self._pieces.append(literal)
+            if field is not None:
+                self._slots.append((len(self._pieces), field))
+                self._pieces.append("")
+        self.fields = tuple(field for _, field in self._slots)
+        # Tokens of the fixed text, counted once
+        self.static_tokens = estimate_tokens("".join(self._pieces))
+
+    def render(self, **values):
+        pieces = list(self._pieces)
+        for index, field in self._slots:
+            pieces[index] = values[field]
+        return "".join(pieces)
+
+
+GEMINI_PROMPT = PromptTemplate("""You are a traffic and urban planning expert for Pakistan. Help with the following query: {user_message}
+
+    Consider Pakistani context including:
+    - Local traffic patterns and peak hours (7-9 AM, 5-8 PM)
+    - Public transport systems (Metro Bus, Orange Line, BRT)
+    - Weather impacts (monsoon season July-Sept, fog Dec-Feb)
+    - Cultural and religious events affecting traffic (Friday prayers, Ramadan, Eid)
+    - Infrastructure challenges and ongoing development projects
+    - Major cities: Karachi, Lahore, Islamabad, Rawalpindi, Faisalabad, Peshawar
+    - Highway systems: Motorways (M-1, M-2, M-3), GT Road, National Highways
+
+    Provide practical, actionable advice specific to Pakistani traffic conditions.
+    """)
+
+OPENAI_PROMPT = PromptTemplate("""As a traffic and urban planning expert for Pakistan, help with: {user_message}""")
+
+RAG_PROMPT = PromptTemplate("""You are a senior traffic and urban planning consultant specializing in Pakistani cities. Use the following knowledge base to answer the query:
+
+### Knowledge Base:
+{context}
+
+### Query:
+{user_message}
+
+### Response:""")
+
+GEMINI_SAFETY_SETTINGS = [
+    {
+        "category": "HARM_CATEGORY_HARASSMENT",
+        "threshold": "BLOCK_MEDIUM_AND_ABOVE"
+    },
+    {
+        "category": "HARM_CATEGORY_HATE_SPEECH",
+        "threshold": "BLOCK_MEDIUM_AND_ABOVE"
+    },
+    {
+        "category": "HARM_CATEGORY_SEXUALLY_EXPLICIT",
+        "threshold": "BLOCK_MEDIUM_AND_ABOVE"
+    },
+    {
+        "category": "HARM_CATEGORY_DANGEROUS_CONTENT",
+        "threshold": "BLOCK_MEDIUM_AND_ABOVE"
+    }
+]
+
+GEMINI_GENERATION_CONFIG = {
+    "topK": 40,
+    "topP": 0.95,
+    "maxOutputTokens": GEMINI_MAX_OUTPUT_TOKENS,
+}
+
+
+def gemini_payload(contents, temperature, system_text=""):
+    """Gemini request body around the shared skeleton (the shared parts must not be mutated)"""
+    payload = {
+        "contents": contents,
+        "generationConfig": {"temperature": temperature, **GEMINI_GENERATION_CONFIG},
+        "safetySettings": GEMINI_SAFETY_SETTINGS,
+    }
+    if system_text:
+        payload["systemInstruction"] = {"parts": [{"text": system_text}]}
+    return payload
+
+
+def openai_payload(model, messages, temperature, stream=False):
+    """OpenAI chat/completions request body"""
+    payload = {
+        "model": model,
+        "messages": messages,
+        "temperature": temperature,
+        "max_tokens": OPENAI_MAX_OUTPUT_TOKENS
+    }
+    if stream:
+        payload["stream"] = True
+    return payload
+
+
+def fit_history(history, prompt, budget):
+    """Newest history turns that fit ``budget`` tokens together with ``prompt``
+
+    A leading "system" summary is kept when it fits, ahead of the turns.
+    Raises ``PromptTooLongError`` when the prompt alone is over budget.
+    """
+    prompt_tokens = estimate_tokens(prompt)
+    if prompt_tokens > budget:
+        raise PromptTooLongError(prompt_tokens, budget)
+    if not history:
+        return []
+    history = list(history)
+    remaining = budget - prompt_tokens
+    summary = history.pop(0) if history and history[0]["role"] == "system" else None
+    if summary is not None:
+        summary_tokens = estimate_tokens(summary["content"])
+        if summary_tokens <= remaining:
+            remaining -= summary_tokens
+        else:
+            summary = None
+    kept = []
+    for message in reversed(history):
+        tokens = estimate_tokens(message["content"])
+        if tokens > remaining:
+            break
+        kept.append(message)
+        remaining -= tokens
+    kept.reverse()
+    return ([summary] if summary is not None else []) + kept
+
+
+def truncate_to_tokens(text, max_tokens):
+    """Cut ``text`` to about ``max_tokens``, at the last sentence or line break when there is one"""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    chars = max_tokens * 3 if text.isascii() else max_tokens
+    cut = text[:chars]
+    boundaries = [match.end() for match in _BOUNDARY.finditer(cut)]
+    if boundaries and boundaries[-1] > chars // 2:
+        cut = cut[:boundaries[-1]]
+    return cut.rstrip()
+
+
+def fit_documents(documents, max_tokens=DEFAULT_RAG_CONTEXT_TOKENS, separator="\n"):
+    """Retrieved documents (best first) that fit ``max_tokens``; the last one may be truncated"""
+    kept = []
+    remaining = max_tokens
+    separator_tokens = estimate_tokens(separator)
+    for document in documents:
+        tokens = estimate_tokens(document) + (separator_tokens if kept else 0)
+        if tokens <= remaining:
+            kept.append(document)
+            remaining -= tokens
+            continue
+        if remaining >= MIN_DOCUMENT_TOKENS:
+            kept.append(truncate_to_tokens(document, remaining - (separator_tokens if kept else 0)))
+        break
+    return kept
+
+
+def build_rag_prompt(user_message, documents, max_context_tokens=DEFAULT_RAG_CONTEXT_TOKENS,
+                     max_input_tokens=DEFAULT_MAX_INPUT_TOKENS):
+    """RAG prompt with the retrieved documents trimmed to the context and input budgets"""
+    fixed_tokens = RAG_PROMPT.static_tokens + estimate_tokens(user_message)
+    if fixed_tokens > max_input_tokens:
+        raise PromptTooLongError(fixed_tokens, max_input_tokens)
+    budget = min(max_context_tokens, max_input_tokens - fixed_tokens)
+    context = "\n".join(fit_documents(documents, budget))
+    return RAG_PROMPT.render(context=context, user_message=user_message)
@@ -0,0 +1,310 @@
+"""
+LLM provider calls for the TrafficWise chat (Google Gemini and OpenAI)
+
+Each provider has a blocking call returning the full answer and a streaming
+generator yielding text fragments as they arrive. Errors are reported as a
+chat message starting with "❌" rather than raised, in both modes, with one
+exception: a stream that fails after it has already yielded text raises
+``StreamInterrupted``, so the truncated answer is never taken for a
+complete one (cached, kept in the history or counted as a routing win).
+A stream only counts as finished when the provider says so (OpenAI's
+``[DONE]`` event, a Gemini ``finishReason``); one that just stops is a
+failure too, and one that finishes without text yields an error message.
+
+All calls accept an optional ``history``: earlier messages of the
+conversation as ``{"role", "content"}`` dicts (see
+``chat_history.ChatHistory.context``), sent as multi-turn ``contents`` /
+``messages``. A "system" message carries the summary of older turns.
+
+Prompts and payload skeletons come from ``prompts``. Requests are checked
+against the model's input budget before anything is sent: the oldest
+history turns are dropped to fit, and a question that cannot fit on its own
+is answered with a "❌ Prompt too long" message.
+
+The Gemini calls accept an optional ``limiter`` (``rate_limit.RateLimiter``):
+the call waits for a token for its API key before posting, and a 429 pauses
+the key for the response's ``Retry-After`` interval.
+"""
+
+import json
+import os
+
+import requests
+
+from trafficwise.llm_client import get_llm_client, iter_sse_data
+from trafficwise.prompts import (
+    GEMINI_NO_SYSTEM_INSTRUCTION, GEMINI_PROMPT, OPENAI_MAX_OUTPUT_TOKENS, OPENAI_PROMPT, PromptTooLongError, fit_history, gemini_payload,
+    input_budget, openai_payload,
+)
+from trafficwise.rate_limit import RATE_LIMITED_MESSAGE
+
+GEMINI_API_BASE = os.getenv("GEMINI_API_BASE", "https://generativelanguage.googleapis.com/v1beta")
+OPENAI_API_BASE = os.getenv("OPENAI_API_BASE", "https://api.openai.com/v1")
+
+OPENAI_MODEL = "gpt-3.5-turbo"
+# Gemini finish reasons of a complete answer; others (SAFETY, RECITATION, ...) cut it short
+GEMINI_COMPLETE_FINISH_REASONS = {"STOP", "MAX_TOKENS"}
+
+
+class StreamInterrupted(Exception):
+    """A token stream failed after yielding part of the answer; ``str()`` is a "❌" chat message"""
+
+    def __init__(self, error_message):
+        self.error_message = error_message
+        super().__init__(f"❌ Answer interrupted: {error_message.lstrip('❌ ')}")
+
+
+def _gemini_contents(history, prompt):
+    """Multi-turn Gemini ``contents`` (user/model turns, same-role turns merged) and the system text"""
+    if not history:
+        return [{"role": "user", "parts": [{"text": prompt}]}], ""
+    system_parts = []
+    contents = []
+    for message in list(history) + [{"role": "user", "content": prompt}]:
+        if message["role"] == "system":
+            system_parts.append(message["content"])
+            continue
+        role = "model" if message["role"] == "assistant" else "user"
+        # The conversation must open with a user turn and alternate
+        if not contents and role == "model":
+            continue
+        if contents and contents[-1]["role"] == role:
+            contents[-1]["parts"][0]["text"] += "\n\n" + message["content"]
+        else:
+            contents.append({"role": role, "parts": [{"text": message["content"]}]})
+    return contents, "\n\n".join(system_parts)
+
+
+def _build_gemini_payload(user_message, temperature, history=None, model="gemini-1.5-flash"):
+    """Build the Gemini generateContent/streamGenerateContent request body within the input budget"""
+    enhanced_prompt = GEMINI_PROMPT.render(user_message=user_message)
+    history = fit_history(history, enhanced_prompt, input_budget(model))
+    contents, system_text = _gemini_contents(history, enhanced_prompt)
+    if system_text and model in GEMINI_NO_SYSTEM_INSTRUCTION:
+        # Without systemInstruction the summary opens the conversation as an acknowledged user turn
+        contents = [
+            {"role": "user", "parts": [{"text": system_text}]},
+            {"role": "model", "parts": [{"text": "Understood."}]},
+        ] + contents
+        system_text = ""
+    return gemini_payload(contents, temperature, system_text)
+
+
+def _gemini_status_error(response, model):
+    """Translate a Gemini HTTP error status into a chat message, or None"""
+    if response.status_code == 400:
+        error_detail = response.json()
+        return f"❌ Gemini API Error 400: {error_detail.get('error', {}).get('message', 'Bad request - check your API key and request format')}"
+    elif response.status_code == 403:
+        return "❌ API Error 403: Invalid API key or insufficient permissions. Please check your Gemini API key."
+    elif response.status_code == 429:
+        return "❌ Rate Limit: Too many requests. Please wait a moment and try again."
+    elif response.status_code == 404:
+        return f"❌ Model not found: {model}. Try using 'gemini-pro' or 'gemini-1.5-flash'"
+    return None
+
+
+def _gemini_candidate_text(response_data):
+    """Extract the generated text from a Gemini response (or stream event)"""
+    if 'candidates' in response_data and len(response_data['candidates']) > 0:
+        candidate = response_data['candidates'][0]
+        if 'content' in candidate and 'parts' in candidate['content']:
+            return candidate['content']['parts'][0]['text']
+        else:
+            return "❌ Unexpected response format from Gemini API"
+    else:
+        return "❌ No response generated. The content might have been blocked by safety filters."
+
+
+def _build_openai_payload(user_message, temperature, stream=False, history=None):
+    """Build the OpenAI chat/completions request body within the input budget"""
+    enhanced_prompt = OPENAI_PROMPT.render(user_message=user_message)
+    history = fit_history(history, enhanced_prompt, input_budget(OPENAI_MODEL, OPENAI_MAX_OUTPUT_TOKENS))
+
+    messages = [{"role": message["role"], "content": message["content"]} for message in history]
+    messages.append({"role": "user", "content": enhanced_prompt})
+    return openai_payload(OPENAI_MODEL, messages, temperature, stream)
+
+
+def chat_with_gemini(user_message, temperature, api_key, model, client=None, base_url=GEMINI_API_BASE,
+                     limiter=None, history=None):
+    """Chat with Google Gemini API"""
+    client = client or get_llm_client()
+
+    # Gemini API endpoint
+    url = f"{base_url}/models/{model}:generateContent?key={api_key}"
+    try:
+        payload = _build_gemini_payload(user_message, temperature, history, model)
+    except PromptTooLongError as e:
+        return f"❌ {e}"
+    headers = {
+        "Content-Type": "application/json"
+    }
+
+    if limiter is not None and limiter.acquire(api_key) is None:
+        return RATE_LIMITED_MESSAGE
+
+    try:
+        response = client.post(url, headers=headers, json=payload, timeout=30)
+        if response.status_code == 429 and limiter is not None:
+            limiter.retry_after(api_key, response.headers.get("Retry-After"))
+
+        error_message = _gemini_status_error(response, model)
+        if error_message:
+            return error_message
+
+        response.raise_for_status()
+        return _gemini_candidate_text(response.json())
+
+    except requests.exceptions.Timeout:
+        return "❌ Request timed out. Please try again."
+    except requests.exceptions.RequestException as e:
+        return f"❌ Connection Error: {str(e)}"
+    except json.JSONDecodeError:
+        return "❌ Invalid response format from Gemini API"
+    except Exception as e:
+        return f"❌ Unexpected Error: {str(e)}"
+
+
+def stream_gemini(user_message, temperature, api_key, model, client=None, base_url=GEMINI_API_BASE,
+                  limiter=None, history=None):
+    """Stream a Gemini answer, yielding text fragments as they arrive (SSE)"""
+    client = client or get_llm_client()
+
+    url = f"{base_url}/models/{model}:streamGenerateContent?alt=sse&key={api_key}"
+    try:
+        payload = _build_gemini_payload(user_message, temperature, history, model)
+    except PromptTooLongError as e:
+        yield f"❌ {e}"
+        return
+    headers = {
+        "Content-Type": "application/json",
+        "Accept": "text/event-stream"
+    }
+
+    if limiter is not None and limiter.acquire(api_key) is None:
+        yield RATE_LIMITED_MESSAGE
+        return
+
+    produced = False
+    finish_reason = None
+    try:
+        with client.post(url, headers=headers, json=payload, timeout=30, stream=True) as response:
+            if response.status_code == 429 and limiter is not None:
+                limiter.retry_after(api_key, response.headers.get("Retry-After"))
+            error_message = _gemini_status_error(response, model)
+            if error_message:
+                yield error_message
+                return
+
+            response.raise_for_status()
+            for data in iter_sse_data(response):
+                candidates = json.loads(data).get('candidates') or []
+                # The last event may carry only finishReason/usage metadata
+                parts = candidates[0].get('content', {}).get('parts', []) if candidates else []
+                for part in parts:
+                    if part.get('text'):
+                        produced = True
+                        yield part['text']
+                if candidates and candidates[0].get('finishReason'):
+                    finish_reason = candidates[0]['finishReason']
+
+    except requests.exceptions.Timeout as e:
+        cause, error_message = e, "❌ Request timed out. Please try again."
+    except requests.exceptions.RequestException as e:
+        cause, error_message = e, f"❌ Connection Error: {str(e)}"
+    except json.JSONDecodeError as e:
+        cause, error_message = e, "❌ Invalid response format from Gemini API"
+    except Exception as e:
+        cause, error_message = e, f"❌ Unexpected Error: {str(e)}"
+    else:
+        if not produced:
+            yield "❌ No response generated. The content might have been blocked by safety filters."
+            return
+        if finish_reason in GEMINI_COMPLETE_FINISH_REASONS:
+            return
+        # No finishReason means the body just stopped (proxy cut-off, dropped connection)
+        cause = None
+        error_message = (f"❌ Gemini stopped the answer early ({finish_reason})" if finish_reason
+                         else "❌ Gemini stream ended before the answer was complete")
+    if produced:
+        raise StreamInterrupted(error_message) from cause
+    yield error_message
+
+
+def chat_with_openai(user_message, temperature, api_key, client=None, base_url=OPENAI_API_BASE, history=None):
+    """Chat with OpenAI API"""
+    client = client or get_llm_client()
+
+    headers = {
+        "Authorization": f"Bearer {api_key}",
+        "Content-Type": "application/json"
+    }
+    try:
+        payload = _build_openai_payload(user_message, temperature, history=history)
+    except PromptTooLongError as e:
+        return f"❌ {e}"
+
+    try:
+        response = client.post(
+            f"{base_url}/chat/completions",
+            headers=headers,
+            json=payload,
+            timeout=30
+        )
+        response.raise_for_status()
+        return response.json()["choices"][0]["message"]["content"]
+    except Exception as e:
+        return f"❌ OpenAI Error: {str(e)}"
+
+
+def stream_openai(user_message, temperature, api_key, client=None, base_url=OPENAI_API_BASE, history=None):
+    """Stream an OpenAI answer (``stream=True``), yielding text fragments"""
+    client = client or get_llm_client()
+
+    headers = {
+        "Authorization": f"Bearer {api_key}",
+        "Content-Type": "application/json",
+        "Accept": "text/event-stream"
+    }
+    try:
+        payload = _build_openai_payload(user_message, temperature, stream=True, history=history)
+    except PromptTooLongError as e:
+        yield f"❌ {e}"
+        return
+
+    produced = False
+    done = False
+    try:
+        with client.post(
+            f"{base_url}/chat/completions",
+            headers=headers,
+            json=payload,
+            timeout=30,
+            stream=True
+        ) as response:
+            response.raise_for_status()
+            for data in iter_sse_data(response):
+                if data == "[DONE]":
+                    done = True
+                    break
+                choices = json.loads(data).get("choices") or []
+                if choices:
+                    text = choices[0].get("delta", {}).get("content")
+                    if text:
+                        produced = True
+                        yield text
+    except Exception as e:
+        if produced:
+            raise StreamInterrupted(f"❌ OpenAI Error: {str(e)}") from e
+        yield f"❌ OpenAI Error: {str(e)}"
+        return
+
+    if not done:
+        # A proxy cut-off or dropped keep-alive ends the body without [DONE]
+        error_message = "❌ OpenAI Error: the stream ended before the answer was complete"
+        if produced:
+            raise StreamInterrupted(error_message)
+        yield error_message
+    elif not produced:
+        yield "❌ No response generated by OpenAI."
@@ -0,0 +1,234 @@
+"""
+Client-side rate limiting and request coalescing for the Gemini free tier
+
+The free tier allows ``GEMINI_RPM`` (15) requests per minute per API key.
+Rather than finding out from a 429, every Gemini call first takes a token
+from a process-wide bucket for its key:
+
+- ``TokenBucket`` holds ``burst`` tokens refilled at ``rate`` per second.
+  It is implemented by virtual scheduling (GCRA): each caller reserves the
+  next free slot under a lock and sleeps until it, so waiting callers are
+  served first come, first served. A caller whose slot is further away than
+  ``max_wait`` seconds is rejected at once and takes no slot.
+- ``RateLimiter`` keeps one bucket per API key. The refill rate is chosen so
+  that the burst plus the refill never exceeds the quota in any one-minute
+  window. A 429 response pauses the key's bucket for the ``Retry-After``
+  interval (``RATE_LIMIT_DEFAULT_BACKOFF`` when the header is missing).
+- ``RequestCoalescer`` lets identical in-flight requests (same normalized
+  prompt, model and temperature) from concurrent sessions share one
+  upstream call. Only successful answers are shared; a follower whose
+  leader got an "❌" answer makes its own call.
+"""
+
+import email.utils
+import hashlib
+import os
+import threading
+import time
+from functools import lru_cache
+
+DEFAULT_REQUESTS_PER_MINUTE = int(os.getenv("GEMINI_RPM", "15"))
+DEFAULT_BURST = int(os.getenv("GEMINI_BURST", "3"))
+DEFAULT_MAX_WAIT = float(os.getenv("RATE_LIMIT_MAX_WAIT", "20"))
+# Pause after a 429 that carries no Retry-After header
+DEFAULT_BACKOFF = float(os.getenv("RATE_LIMIT_DEFAULT_BACKOFF", "10"))
+RATE_LIMITED_MESSAGE = "❌ Rate Limit: Too many requests queued for this API key. Please wait a moment and try again."
+
+
+def quota_rate(requests, window, burst):
+    """Refill rate (tokens/second) keeping ``burst`` + refill within ``requests`` per ``window`` seconds"""
+    return max(1, requests - burst) / float(window)
+
+
+def parse_retry_after(value, default=DEFAULT_BACKOFF):
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)"""
+    if value is None:
+        return default
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return default
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+class TokenBucket:
+    """Token bucket with FIFO queueing, a maximum wait and external pauses"""
+
+    def __init__(self, rate, burst=1, clock=time.monotonic):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._interval = 1.0 / rate
+        self._tolerance = (self.burst - 1) * self._interval
+        self._clock = clock
+        self._lock = threading.Lock()
+        # Theoretical arrival time of the next request
+        self._tat = clock()
+
+    def reserve(self, max_wait=None):
+        """Reserve the next slot; return seconds until it, or None if beyond ``max_wait``"""
+        with self._lock:
+            now = self._clock()
+            tat = max(self._tat, now)
+            wait = max(0.0, tat - self._tolerance - now)
+            if max_wait is not None and wait > max_wait:
+                return None
+            self._tat = tat + self._interval
+            return wait
+
+    def acquire(self, max_wait=None):
+        """Block until a token is available; return the seconds waited, or None if rejected"""
+        wait = self.reserve(max_wait)
+        if wait:
+            time.sleep(wait)
+        return wait
+
+    def pause(self, seconds):
+        """Hand out no token for ``seconds`` (e.g. after a 429 with Retry-After), with no burst after"""
+        with self._lock:
+            self._tat = max(self._tat, self._clock() + seconds + self._tolerance)
+
+
+class RateLimiter:
+    """One token bucket per API key, with queue-wait statistics"""
+
+    def __init__(self, requests_per_minute=DEFAULT_REQUESTS_PER_MINUTE, burst=DEFAULT_BURST,
+                 max_wait=DEFAULT_MAX_WAIT, window=60.0):
+        self.requests_per_minute = requests_per_minute
+        self.burst = burst
+        self.max_wait = max_wait
+        self.rate = quota_rate(requests_per_minute, window, burst)
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self._stats = {
+            "acquired": 0,
+            "rejected": 0,
+            "delayed": 0,
+            "waiting": 0,
+            "retry_after_pauses": 0,
+            "queue_wait_seconds": 0.0,
+            "max_queue_wait_seconds": 0.0,
+        }
+
+    def _bucket(self, api_key):
+        # Keys are only held as hashes
+        key_id = hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
+        with self._lock:
+            if key_id not in self._buckets:
+                self._buckets[key_id] = TokenBucket(self.rate, self.burst)
+            return self._buckets[key_id]
+
+    def acquire(self, api_key, max_wait=None):
+        """Wait for the key's next token; return the seconds waited, or None if the wait would exceed ``max_wait``"""
+        bucket = self._bucket(api_key)
+        wait = bucket.reserve(self.max_wait if max_wait is None else max_wait)
+        with self._lock:
+            if wait is None:
+                self._stats["rejected"] += 1
+                return None
+            self._stats["acquired"] += 1
+            self._stats["queue_wait_seconds"] += wait
+            self._stats["max_queue_wait_seconds"] = max(self._stats["max_queue_wait_seconds"], wait)
+            if wait:
+                self._stats["delayed"] += 1
+                self._stats["waiting"] += 1
+        if wait:
+            try:
+                time.sleep(wait)
+            finally:
+                with self._lock:
+                    self._stats["waiting"] -= 1
+        return wait
+
+    def retry_after(self, api_key, header_value=None):
+        """Pause the key after a 429, honouring the response's Retry-After header"""
+        self._bucket(api_key).pause(parse_retry_after(header_value))
+        with self._lock:
+            self._stats["retry_after_pauses"] += 1
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["keys"] = len(self._buckets)
+        acquired = stats["acquired"]
+        stats["mean_queue_wait_ms"] = stats["queue_wait_seconds"] / acquired * 1000 if acquired else 0.0
+        stats["max_queue_wait_ms"] = stats.pop("max_queue_wait_seconds") * 1000
+        return stats
+
+
+class _Flight:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class RequestCoalescer:
+    """Share one in-flight call among concurrent callers with the same key"""
+
+    def __init__(self):
+        self._flights = {}
+        self._lock = threading.Lock()
+        self._stats = {"calls": 0, "coalesced": 0, "upstream": 0}
+
+    def call(self, key, fn, *args, **kwargs):
+        """Return ``fn(*args, **kwargs)``, joining an identical call already in flight"""
+        with self._lock:
+            self._stats["calls"] += 1
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is None and not _is_error(flight.result):
+                with self._lock:
+                    self._stats["coalesced"] += 1
+                return flight.result
+            # The shared call failed; this caller tries on its own
+            return self._call_upstream(fn, args, kwargs)
+
+        try:
+            flight.result = self._call_upstream(fn, args, kwargs)
+            return flight.result
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    def _call_upstream(self, fn, args, kwargs):
+        with self._lock:
+            self._stats["upstream"] += 1
+        return fn(*args, **kwargs)
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["in_flight"] = len(self._flights)
+        stats["coalesced_ratio"] = stats["coalesced"] / stats["calls"] if stats["calls"] else 0.0
+        return stats
+
+
+def _is_error(text):
+    return not isinstance(text, str) or text.lstrip().startswith("❌")
+
+
+@lru_cache(maxsize=None)
+def get_gemini_rate_limiter():
+    """Return the process-wide Gemini rate limiter (one bucket per API key)"""
+    return RateLimiter()
+
+
+@lru_cache(maxsize=None)
+def get_request_coalescer():
+    """Return the process-wide coalescer for in-flight LLM requests"""
+    return RequestCoalescer()
@@ -0,0 +1,292 @@
+"""
+Response cache in front of the LLM backends
+
+Answers are keyed on the normalized prompt plus model and temperature. The
+memory tier is an LRU bounded in bytes with a TTL; an optional SQLite disk
+tier keeps answers across Streamlit restarts. When an embedding function is
+configured (the RAG app passes its SentenceTransformer), near-duplicate
+questions are matched by cosine similarity as a last resort.
+"""
+
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+
+DEFAULT_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
+DEFAULT_DISK_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_DISK_MAX_BYTES", str(256 * 1024 * 1024)))
+DEFAULT_TTL_SECONDS = int(os.getenv("RESPONSE_CACHE_TTL", os.getenv("CACHE_DEFAULT_TTL", "86400")))
+DEFAULT_DISK_PATH = os.getenv("RESPONSE_CACHE_PATH", os.path.join(".trafficwise_cache", "responses.db"))
+DEFAULT_SIMILARITY_THRESHOLD = float(os.getenv("RESPONSE_CACHE_SIMILARITY", "0.92"))
+
+_WHITESPACE = re.compile(r"\s+")
+_EDGE_PUNCTUATION = "?!.,;: "
+
+
+def normalize_prompt(prompt):
+    """Normalize a prompt so trivially different spellings share a cache key"""
+    return _WHITESPACE.sub(" ", prompt.lower()).strip(_EDGE_PUNCTUATION)
+
+
+def make_cache_key(prompt, model, temperature):
+    """Build the cache key for a prompt/model/temperature combination"""
+    raw = f"{model}|{float(temperature):.2f}|{normalize_prompt(prompt)}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class _Entry:
+    __slots__ = ("response", "model", "temperature", "created_at", "size", "embedding")
+
+    def __init__(self, response, model, temperature, created_at, embedding=None):
+        self.response = response
+        self.model = model
+        self.temperature = float(temperature)
+        self.created_at = created_at
+        self.embedding = embedding
+        self.size = len(response.encode("utf-8")) + (embedding.nbytes if embedding is not None else 0)
+
+
+class ResponseCache:
+    """Two-tier (memory LRU + SQLite) cache of LLM answers with optional semantic lookup"""
+
+    def __init__(
+        self,
+        max_bytes=DEFAULT_MAX_BYTES,
+        ttl_seconds=DEFAULT_TTL_SECONDS,
+        disk_path=DEFAULT_DISK_PATH,
+        disk_max_bytes=DEFAULT_DISK_MAX_BYTES,
+        embed_fn=None,
+        similarity_threshold=DEFAULT_SIMILARITY_THRESHOLD,
+    ):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.disk_max_bytes = disk_max_bytes
+        self.similarity_threshold = similarity_threshold
+        self.embed_fn = embed_fn
+
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self._stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "semantic_hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "expired": 0,
+        }
+
+        self._db = None
+        if disk_path:
+            directory = os.path.dirname(disk_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(disk_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, model TEXT, temperature REAL, response TEXT, "
+                "created_at REAL, size INTEGER, embedding BLOB)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS responses_created ON responses (created_at)")
+            self._db.commit()
+            self._warm_from_disk()
+
+    def set_embedder(self, embed_fn):
+        """Enable semantic lookup using ``embed_fn(text) -> vector``"""
+        self.embed_fn = embed_fn
+
+    def get(self, prompt, model, temperature):
+        """Return the cached answer for a prompt, or None"""
+        key = make_cache_key(prompt, model, temperature)
+        now = time.time()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if now - entry.created_at <= self.ttl_seconds:
+                    self._entries.move_to_end(key)
+                    self._stats["memory_hits"] += 1
+                    return entry.response
+                self._remove(key)
+                self._stats["expired"] += 1
+
+            entry = self._load_from_disk(key, now)
+            if entry is not None:
+                self._insert(key, entry)
+                self._stats["disk_hits"] += 1
+                return entry.response
+
+        if self.embed_fn is not None:
+            response = self._semantic_lookup(prompt, model, temperature, now)
+            if response is not None:
+                with self._lock:
+                    self._stats["semantic_hits"] += 1
+                return response
+
+        with self._lock:
+            self._stats["misses"] += 1
+        return None
+
+    def put(self, prompt, model, temperature, response):
+        """Cache a complete answer (callers skip streams that broke off); error messages are never cached"""
+        if not response or response.startswith("❌"):
+            return
+
+        key = make_cache_key(prompt, model, temperature)
+        embedding = self._embed(prompt) if self.embed_fn is not None else None
+        entry = _Entry(response, model, temperature, time.time(), embedding)
+
+        with self._lock:
+            self._insert(key, entry)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (key, model, entry.temperature, response, entry.created_at, entry.size,
+                     embedding.tobytes() if embedding is not None else None),
+                )
+                self._trim_disk()
+                self._db.commit()
+
+    def clear(self):
+        """Drop every cached answer from both tiers"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            if self._db is not None:
+                self._db.execute("DELETE FROM responses")
+                self._db.commit()
+
+    def get_stats(self):
+        """Return hit/miss counters and tier sizes"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["hits"] = stats["memory_hits"] + stats["disk_hits"] + stats["semantic_hits"]
+            lookups = stats["hits"] + stats["misses"]
+            stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+            stats["entries"] = len(self._entries)
+            stats["bytes"] = self._bytes
+            stats["max_bytes"] = self.max_bytes
+            return stats
+
+    def _embed(self, text):
+        import numpy as np
+
+        vector = np.asarray(self.embed_fn(normalize_prompt(text)), dtype=np.float32).ravel()
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _semantic_lookup(self, prompt, model, temperature, now):
+        import numpy as np
+
+        query = self._embed(prompt)
+        temperature = float(temperature)
+
+        with self._lock:
+            candidates = [
+                (key, entry) for key, entry in self._entries.items()
+                if entry.embedding is not None
+                # Rows cached under a different embedding model (e.g. from disk) are not comparable
+                and entry.embedding.shape == query.shape
+                and entry.model == model
+                and entry.temperature == temperature
+                and now - entry.created_at <= self.ttl_seconds
+            ]
+            if not candidates:
+                return None
+
+            matrix = np.stack([entry.embedding for _, entry in candidates])
+            scores = matrix @ query
+            best = int(np.argmax(scores))
+            if scores[best] < self.similarity_threshold:
+                return None
+
+            key, entry = candidates[best]
+            self._entries.move_to_end(key)
+            return entry.response
+
+    def _insert(self, key, entry):
+        if key in self._entries:
+            self._remove(key)
+        if entry.size > self.max_bytes:
+            return
+        self._entries[key] = entry
+        self._bytes += entry.size
+        while self._bytes > self.max_bytes:
+            oldest_key = next(iter(self._entries))
+            self._remove(oldest_key)
+            self._stats["evictions"] += 1
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+
+    def _load_from_disk(self, key, now):
+        if self._db is None:
+            return None
+        row = self._db.execute(
+            "SELECT model, temperature, response, created_at, embedding FROM responses WHERE key = ?",
+            (key,),
+        ).fetchone()
+        if row is None:
+            return None
+        if now - row[3] > self.ttl_seconds:
+            self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._db.commit()
+            self._stats["expired"] += 1
+            return None
+        return self._row_to_entry(row)
+
+    def _row_to_entry(self, row):
+        model, temperature, response, created_at, embedding = row
+        if embedding is not None:
+            import numpy as np
+
+            embedding = np.frombuffer(embedding, dtype=np.float32)
+        return _Entry(response, model, temperature, created_at, embedding)
+
+    def _warm_from_disk(self):
+        """Load the most recent unexpired answers into memory after a restart"""
+        cutoff = time.time() - self.ttl_seconds
+        self._db.execute("DELETE FROM responses WHERE created_at < ?", (cutoff,))
+        self._db.commit()
+
+        rows = self._db.execute(
+            "SELECT key, model, temperature, response, created_at, embedding "
+            "FROM responses ORDER BY created_at DESC"
+        )
+        loaded = []
+        total = 0
+        for key, *row in rows:
+            entry = self._row_to_entry(row)
+            if total + entry.size > self.max_bytes:
+                break
+            total += entry.size
+            loaded.append((key, entry))
+
+        # Oldest first, so the most recent answers end up at the LRU tail
+        for key, entry in reversed(loaded):
+            self._insert(key, entry)
+
+    def _trim_disk(self):
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.disk_max_bytes:
+            return
+        excess = total - self.disk_max_bytes
+        rows = self._db.execute("SELECT key, size FROM responses ORDER BY created_at ASC")
+        doomed = []
+        for key, size in rows:
+            if excess <= 0:
+                break
+            doomed.append((key,))
+            excess -= size
+        self._db.executemany("DELETE FROM responses WHERE key = ?", doomed)
+
+
+@lru_cache(maxsize=None)
+def get_response_cache():
+    """Return the process-wide response cache, creating it on first use"""
+    return ResponseCache()
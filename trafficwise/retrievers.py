@@ -0,0 +1,269 @@
+"""
+Pluggable retrievers for the RAG knowledge base
+
+Every retriever answers ``search(query_embeddings, top_k)`` with one list of
+``RetrievedChunk`` per query, best match first:
+
+    ChromaRetriever   wraps a Chroma collection's query path
+    NumpyRetriever    exact cosine search over a float32/float16 matrix
+    IVFRetriever      approximate search over k-means cells (inverted file)
+
+The NumPy retrievers read rows from a matrix (or a callable returning the
+current matrix, e.g. a growing memory-mapped store) and resolve row numbers
+to documents through a ``lookup(rows) -> (ids, documents, metadatas)``
+callable.
+"""
+
+import os
+import threading
+from collections import namedtuple
+
+import numpy as np
+
+DEFAULT_IVF_CELLS = int(os.getenv("RAG_IVF_CELLS", "0"))  # 0 = sqrt(rows)
+DEFAULT_IVF_NPROBE = int(os.getenv("RAG_IVF_NPROBE", "8"))
+# Retrain once rows appended since training exceed this fraction of the trained rows
+DEFAULT_IVF_RETRAIN_FRACTION = float(os.getenv("RAG_IVF_RETRAIN_FRACTION", "0.25"))
+# Rows scored per block in exact search, bounding temporary memory
+SEARCH_BLOCK_ROWS = 65536
+KMEANS_SAMPLE_ROWS = 65536
+
+RetrievedChunk = namedtuple("RetrievedChunk", ["id", "document", "metadata", "score"])
+# Trained IVF state, replaced as a whole so searches never see half of a retrain
+_IVFIndex = namedtuple("_IVFIndex", ["centroids", "cell_offsets", "cell_rows", "trained_rows"])
+
+
+def normalize_rows(vectors):
+    """L2-normalize a batch of vectors as float32 (zero rows stay zero)"""
+    vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+def top_k_rows(scores, k):
+    """Indices of the k highest scores per row, sorted best first (argpartition)"""
+    k = min(k, scores.shape[1])
+    if k == 0:
+        return np.empty((scores.shape[0], 0), dtype=np.int64)
+    partition = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    order = np.argsort(-np.take_along_axis(scores, partition, axis=1), axis=1)
+    return np.take_along_axis(partition, order, axis=1)
+
+
+class Retriever:
+    """Base class: ``search`` takes a batch of query embeddings"""
+
+    def search(self, query_embeddings, top_k=3):
+        raise NotImplementedError
+
+
+class ChromaRetriever(Retriever):
+    """Retriever backed by a Chroma collection"""
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    def search(self, query_embeddings, top_k=3):
+        queries = np.atleast_2d(np.asarray(query_embeddings, dtype=np.float32))
+        results = self.collection.query(
+            query_embeddings=queries.tolist(),
+            n_results=top_k,
+            include=["documents", "metadatas", "distances"],
+        )
+        batches = []
+        for index in range(len(queries)):
+            ids = results["ids"][index]
+            metadatas = (results.get("metadatas") or [[None] * len(ids)] * len(queries))[index]
+            batches.append([
+                RetrievedChunk(identifier, document, metadata or {}, 1.0 - float(distance))
+                for identifier, document, metadata, distance in zip(
+                    ids, results["documents"][index], metadatas, results["distances"][index]
+                )
+            ])
+        return batches
+
+
+class _MatrixRetriever(Retriever):
+    def __init__(self, matrix, lookup):
+        self._matrix = matrix if callable(matrix) else (lambda: matrix)
+        self.lookup = lookup
+
+    @property
+    def matrix(self):
+        return self._matrix()
+
+    def _resolve(self, rows, scores):
+        ids, documents, metadatas = self.lookup(rows)
+        return [
+            RetrievedChunk(identifier, document, metadata, float(score))
+            for identifier, document, metadata, score in zip(ids, documents, metadatas, scores)
+        ]
+
+    def _exact_scores(self, queries, start=0, stop=None):
+        """Scores of every query against matrix rows [start, stop), block by block"""
+        matrix = self.matrix
+        stop = len(matrix) if stop is None else stop
+        blocks = [
+            # float16 rows are widened per block; numpy has no fast float16 matmul
+            queries @ np.asarray(matrix[block:min(block + SEARCH_BLOCK_ROWS, stop)], dtype=np.float32).T
+            for block in range(start, stop, SEARCH_BLOCK_ROWS)
+        ]
+        if not blocks:
+            return np.empty((len(queries), 0), dtype=np.float32)
+        return np.concatenate(blocks, axis=1)
+
+
+class NumpyRetriever(_MatrixRetriever):
+    """Exact normalized dot-product search with argpartition top-k"""
+
+    @classmethod
+    def from_arrays(cls, embeddings, ids, documents, metadatas=None, dtype=np.float32):
+        """Build an in-memory retriever from plain lists/arrays"""
+        matrix = normalize_rows(embeddings).astype(dtype)
+        metadatas = metadatas or [{} for _ in ids]
+
+        def lookup(rows):
+            return [ids[r] for r in rows], [documents[r] for r in rows], [metadatas[r] for r in rows]
+
+        return cls(matrix, lookup)
+
+    def search(self, query_embeddings, top_k=3):
+        queries = normalize_rows(query_embeddings)
+        scores = self._exact_scores(queries)
+        rows = top_k_rows(scores, top_k)
+        return [
+            self._resolve(query_rows, scores[index, query_rows])
+            for index, query_rows in enumerate(rows)
+        ]
+
+
+class IVFRetriever(_MatrixRetriever):
+    """Inverted-file search: probe the ``nprobe`` k-means cells nearest each query
+
+    Rows appended to the matrix after ``train`` are scanned exactly, so the
+    index never misses new documents. That exact tail costs as much as flat
+    search, so once it grows past ``retrain_fraction`` of the trained rows
+    (``RAG_IVF_RETRAIN_FRACTION``, default 25%) the next search retrains;
+    the threshold being relative keeps retraining cost amortized as the
+    store grows. ``retrain_fraction=None`` leaves retraining to the caller.
+
+    One retriever may serve many sessions: a search reads one snapshot of
+    the index, and only one thread retrains at a time while the others keep
+    searching the previous index.
+    """
+
+    def __init__(self, matrix, lookup, n_cells=DEFAULT_IVF_CELLS, nprobe=DEFAULT_IVF_NPROBE,
+                 iterations=10, seed=0, retrain_fraction=DEFAULT_IVF_RETRAIN_FRACTION):
+        super().__init__(matrix, lookup)
+        self.n_cells = n_cells
+        self.nprobe = nprobe
+        self.retrain_fraction = retrain_fraction
+        self.iterations = iterations
+        self.seed = seed
+        self._index = None
+        self._train_lock = threading.Lock()
+
+    @property
+    def centroids(self):
+        return self._index.centroids if self._index is not None else None
+
+    @property
+    def cell_offsets(self):
+        return self._index.cell_offsets if self._index is not None else None
+
+    @property
+    def cell_rows(self):
+        return self._index.cell_rows if self._index is not None else None
+
+    @property
+    def trained_rows(self):
+        return self._index.trained_rows if self._index is not None else 0
+
+    def train(self):
+        """Cluster the current matrix with k-means and build the inverted lists"""
+        with self._train_lock:
+            self._index = self._build_index() or self._index
+        return self
+
+    def _build_index(self):
+        matrix = self.matrix
+        count = len(matrix)
+        if count == 0:
+            return None
+        n_cells = self.n_cells or max(1, int(np.sqrt(count)))
+        n_cells = min(n_cells, count)
+        rng = np.random.default_rng(self.seed)
+
+        sample_rows = np.sort(rng.choice(count, size=min(count, max(KMEANS_SAMPLE_ROWS, n_cells)), replace=False))
+        sample = np.asarray(matrix[sample_rows], dtype=np.float32)
+        centroids = sample[rng.choice(len(sample), size=n_cells, replace=False)].copy()
+
+        for _ in range(self.iterations):
+            assignment = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignment, sample)
+            filled = np.bincount(assignment, minlength=n_cells) > 0
+            # Empty cells keep their previous centroid
+            centroids[filled] = normalize_rows(sums[filled])
+
+        assignment = np.concatenate([
+            np.argmax(np.asarray(matrix[block:block + SEARCH_BLOCK_ROWS], dtype=np.float32) @ centroids.T, axis=1)
+            for block in range(0, count, SEARCH_BLOCK_ROWS)
+        ])
+        order = np.argsort(assignment, kind="stable")
+        counts = np.bincount(assignment, minlength=n_cells)
+
+        return _IVFIndex(centroids, np.concatenate([[0], np.cumsum(counts)]), order.astype(np.int64), count)
+
+    def needs_retrain(self, index=None):
+        """Whether the untrained tail has outgrown ``retrain_fraction`` of the trained rows"""
+        if index is None:
+            index = self._index
+        if self.retrain_fraction is None or index is None:
+            return False
+        return len(self.matrix) - index.trained_rows > self.retrain_fraction * index.trained_rows
+
+    def _current_index(self):
+        index = self._index
+        if index is None:
+            # Nothing to search yet: wait for (or do) the first training
+            with self._train_lock:
+                if self._index is None:
+                    self._index = self._build_index()
+                return self._index
+        # While another thread retrains, keep searching the old index
+        if self.needs_retrain(index) and self._train_lock.acquire(blocking=False):
+            try:
+                if self._index is index:
+                    self._index = self._build_index() or index
+                index = self._index
+            finally:
+                self._train_lock.release()
+        return index
+
+    def search(self, query_embeddings, top_k=3):
+        index = self._current_index()
+        queries = normalize_rows(query_embeddings)
+        matrix = self.matrix
+        if index is None:
+            return [[] for _ in queries]
+
+        nprobe = min(self.nprobe, len(index.centroids))
+        probes = top_k_rows(queries @ index.centroids.T, nprobe)
+        tail_scores = self._exact_scores(queries, start=index.trained_rows)
+        tail_rows = np.arange(index.trained_rows, index.trained_rows + tail_scores.shape[1])
+
+        results = []
+        for position, query in enumerate(queries):
+            # Sorted row numbers keep reads from a memory-mapped matrix sequential
+            cell_candidates = np.sort(np.concatenate([
+                index.cell_rows[index.cell_offsets[cell]:index.cell_offsets[cell + 1]] for cell in probes[position]
+            ]))
+            candidates = np.concatenate([cell_candidates, tail_rows])
+            candidate_scores = np.concatenate([
+                np.asarray(matrix[cell_candidates], dtype=np.float32) @ query,
+                tail_scores[position],
+            ])
+            best = top_k_rows(candidate_scores[np.newaxis, :], top_k)[0]
+            results.append(self._resolve(candidates[best], candidate_scores[best]))
+        return results
@@ -0,0 +1,294 @@
+"""
+Latency-aware, hedged routing across Gemini, OpenAI and the offline engine
+
+Every backend has a rolling ``LatencyProfile`` (last ``ROUTER_WINDOW``
+calls) shared by all sessions in the process. ``HedgedRouter.route``:
+
+1. ranks the online backends by recent error rate, then median latency,
+   and sends the request to the best one;
+2. if that call fails, fails over to the next backend at once. A streamed
+   call fails when its first fragment is an error message (e.g. a 429) or
+   it raises ``StreamInterrupted`` partway through; the partial text of a
+   broken stream never wins;
+3. if it is still running after its own p95 latency, sends a hedged request
+   to the next backend, as long as hedges stay under ``ROUTER_HEDGE_BUDGET``
+   of routed requests, so the extra spend is bounded;
+4. returns the first successful answer and cancels the loser. Calls stream
+   internally, so cancelling closes the HTTP response and generation stops;
+5. if nothing succeeds before ``ROUTER_DEADLINE`` seconds, answers with the
+   offline engine.
+"""
+
+import os
+import threading
+import time
+from collections import deque, namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from functools import lru_cache
+
+from trafficwise.intents import offline_traffic_response
+from trafficwise.providers import GEMINI_API_BASE, OPENAI_API_BASE, StreamInterrupted, stream_gemini, stream_openai
+
+DEFAULT_WINDOW = int(os.getenv("ROUTER_WINDOW", "200"))
+DEFAULT_DEADLINE = float(os.getenv("ROUTER_DEADLINE", "12"))
+# Hedge delay used until a backend has MIN_SAMPLES successful calls
+DEFAULT_HEDGE_DELAY = float(os.getenv("ROUTER_HEDGE_DELAY", "3"))
+DEFAULT_HEDGE_BUDGET = float(os.getenv("ROUTER_HEDGE_BUDGET", "0.1"))
+MIN_SAMPLES = 20
+MIN_HEDGE_DELAY = 0.05
+# Backends failing more often than this are ranked after healthy ones
+UNHEALTHY_ERROR_RATE = 0.5
+OFFLINE_BACKEND = "offline"
+
+Backend = namedtuple("Backend", ["name", "call"])
+RouteResult = namedtuple("RouteResult", ["text", "backend", "hedged", "latency", "attempts"])
+
+
+def is_error_response(text):
+    """Provider errors are chat messages starting with "❌" (see providers.py)"""
+    return text is None or text.lstrip().startswith("❌")
+
+
+class BackendFailed(Exception):
+    """A backend call failed before producing an answer; ``str()`` is the "❌" chat message"""
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class LatencyProfile:
+    """Rolling window of (latency, ok) samples for one backend"""
+
+    def __init__(self, window=DEFAULT_WINDOW):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, latency, ok):
+        with self._lock:
+            self._samples.append((latency, ok))
+
+    def _latencies(self):
+        return [latency for latency, ok in self._samples if ok]
+
+    @property
+    def error_rate(self):
+        with self._lock:
+            if not self._samples:
+                return 0.0
+            return sum(1 for _, ok in self._samples if not ok) / len(self._samples)
+
+    def latency(self, pct, default=None):
+        """Percentile of successful call latency, or ``default`` with too few samples"""
+        with self._lock:
+            latencies = self._latencies()
+        if len(latencies) < MIN_SAMPLES:
+            return default
+        return percentile(latencies, pct)
+
+    def hedge_delay(self, default=DEFAULT_HEDGE_DELAY):
+        """Seconds to wait on this backend before hedging: its p95"""
+        return max(MIN_HEDGE_DELAY, self.latency(95, default))
+
+    def get_stats(self):
+        with self._lock:
+            latencies = self._latencies()
+            calls = len(self._samples)
+            errors = sum(1 for _, ok in self._samples if not ok)
+        return {
+            "calls": calls,
+            "error_rate": errors / calls if calls else 0.0,
+            "p50_ms": percentile(latencies, 50) * 1000 if latencies else None,
+            "p95_ms": percentile(latencies, 95) * 1000 if latencies else None,
+        }
+
+
+class RoutingProfiles:
+    """Process-wide latency profiles and hedge/fallback counters"""
+
+    def __init__(self, window=DEFAULT_WINDOW, hedge_budget=DEFAULT_HEDGE_BUDGET):
+        self.window = window
+        self.hedge_budget = hedge_budget
+        self._profiles = {}
+        self._lock = threading.Lock()
+        self._stats = {"routed": 0, "hedged": 0, "failovers": 0, "fallbacks": 0, "cancelled": 0, "wins": {}}
+
+    def profile(self, name):
+        with self._lock:
+            if name not in self._profiles:
+                self._profiles[name] = LatencyProfile(self.window)
+            return self._profiles[name]
+
+    def try_hedge(self):
+        """Reserve a hedge if hedges stay within the budget fraction of routed requests"""
+        with self._lock:
+            if self._stats["hedged"] + 1 > self.hedge_budget * max(1, self._stats["routed"]):
+                return False
+            self._stats["hedged"] += 1
+            return True
+
+    def count(self, name, amount=1):
+        with self._lock:
+            self._stats[name] += amount
+
+    def record_win(self, backend):
+        with self._lock:
+            self._stats["wins"][backend] = self._stats["wins"].get(backend, 0) + 1
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["wins"] = dict(stats["wins"])
+            names = list(self._profiles)
+        stats["hedge_rate"] = stats["hedged"] / stats["routed"] if stats["routed"] else 0.0
+        stats["backends"] = {name: self.profile(name).get_stats() for name in names}
+        return stats
+
+
+def collect_stream(tokens, cancel_event):
+    """Join a provider token stream; stop and close it as soon as ``cancel_event`` is set
+
+    Raises ``BackendFailed`` when the stream opens with an error message and
+    lets ``StreamInterrupted`` through when it fails partway.
+    """
+    parts = []
+    try:
+        for token in tokens:
+            if cancel_event.is_set():
+                return None
+            # Providers report a failure before any text as a lone "❌" fragment
+            if not parts and is_error_response(token):
+                raise BackendFailed(token)
+            parts.append(token)
+    finally:
+        tokens.close()
+    return "".join(parts)
+
+
+def provider_backends(temperature, gemini_key=None, openai_key=None, gemini_model="gemini-1.5-flash",
+                      client=None, gemini_base_url=GEMINI_API_BASE, openai_base_url=OPENAI_API_BASE,
+                      gemini_limiter=None, history=None):
+    """Backends for the providers that have an API key; ``history`` is the conversation context"""
+    backends = []
+    if gemini_key:
+        backends.append(Backend("gemini", lambda message, cancel: collect_stream(
+            stream_gemini(message, temperature, gemini_key, gemini_model, client=client, base_url=gemini_base_url,
+                          limiter=gemini_limiter, history=history),
+            cancel,
+        )))
+    if openai_key:
+        backends.append(Backend("openai", lambda message, cancel: collect_stream(
+            stream_openai(message, temperature, openai_key, client=client, base_url=openai_base_url,
+                          history=history),
+            cancel,
+        )))
+    return backends
+
+
+@lru_cache(maxsize=None)
+def get_routing_profiles():
+    """Return the process-wide routing profiles shared by all sessions"""
+    return RoutingProfiles()
+
+
+@lru_cache(maxsize=None)
+def _attempt_pool():
+    return ThreadPoolExecutor(max_workers=32, thread_name_prefix="router-attempt")
+
+
+class HedgedRouter:
+    """Routes one message across ranked backends with hedging and an offline deadline fallback"""
+
+    def __init__(self, backends, profiles=None, deadline=DEFAULT_DEADLINE,
+                 default_hedge_delay=DEFAULT_HEDGE_DELAY, fallback=offline_traffic_response):
+        self.backends = list(backends)
+        self.profiles = profiles or get_routing_profiles()
+        self.deadline = deadline
+        self.default_hedge_delay = default_hedge_delay
+        self.fallback = fallback
+
+    def rank(self):
+        """Healthy backends first, then by median latency (unknown latency ranks as the default delay)"""
+        def score(backend):
+            profile = self.profiles.profile(backend.name)
+            return (profile.error_rate > UNHEALTHY_ERROR_RATE, profile.latency(50, self.default_hedge_delay))
+
+        return sorted(self.backends, key=score)
+
+    def route(self, message):
+        started = time.monotonic()
+        deadline_at = started + self.deadline
+        self.profiles.count("routed")
+        queue = deque(self.rank())
+        running = {}
+        attempts = 0
+        hedged = False
+
+        def launch(backend):
+            nonlocal attempts
+            attempts += 1
+            cancel = threading.Event()
+            future = _attempt_pool().submit(self._attempt, backend, message, cancel)
+            running[future] = (backend, cancel)
+            return self.profiles.profile(backend.name).hedge_delay(self.default_hedge_delay)
+
+        hedge_at = started + launch(queue.popleft()) if queue else deadline_at
+        while running:
+            now = time.monotonic()
+            if now >= deadline_at:
+                break
+            wake_at = min(deadline_at, hedge_at) if queue else deadline_at
+            done, _ = wait(list(running), timeout=max(0.0, wake_at - now), return_when=FIRST_COMPLETED)
+
+            for future in done:
+                backend, _ = running.pop(future)
+                text, ok = future.result()
+                if ok:
+                    self._cancel_all(running)
+                    self.profiles.record_win(backend.name)
+                    return RouteResult(text, backend.name, hedged, time.monotonic() - started, attempts)
+                # Failed fast (e.g. 429): fail over immediately rather than waiting for the hedge delay
+                if queue and not running:
+                    self.profiles.count("failovers")
+                    hedge_at = time.monotonic() + launch(queue.popleft())
+
+            if queue and running and time.monotonic() >= hedge_at:
+                if self.profiles.try_hedge():
+                    hedged = True
+                    launch(queue.popleft())
+                # One hedge per request; later backends are only used for failover
+                hedge_at = deadline_at
+
+        self._cancel_all(running, missed_deadline=True)
+        self.profiles.count("fallbacks")
+        fallback_started = time.monotonic()
+        text = self.fallback(message)
+        self.profiles.profile(OFFLINE_BACKEND).record(time.monotonic() - fallback_started, True)
+        self.profiles.record_win(OFFLINE_BACKEND)
+        return RouteResult(text, OFFLINE_BACKEND, hedged, time.monotonic() - started, attempts)
+
+    def _attempt(self, backend, message, cancel):
+        """(text, ok) for one backend call; failures are raised by the call, not read from its text"""
+        started = time.monotonic()
+        try:
+            text = backend.call(message, cancel)
+            # Blocking (non-streamed) calls report errors as a "❌" answer
+            ok = text is not None and not (isinstance(text, str) and is_error_response(text))
+        except (BackendFailed, StreamInterrupted) as e:
+            text, ok = str(e), False
+        except Exception as e:
+            text, ok = f"❌ Unexpected Error: {str(e)}", False
+        if not cancel.is_set():
+            self.profiles.profile(backend.name).record(time.monotonic() - started, ok)
+        return text, ok
+
+    def _cancel_all(self, running, missed_deadline=False):
+        for backend, cancel in running.values():
+            cancel.set()
+            self.profiles.count("cancelled")
+            if missed_deadline:
+                # A backend still running at the deadline counts as a failure, so it ranks lower next time
+                self.profiles.profile(backend.name).record(self.deadline, False)
+        running.clear()
@@ -0,0 +1,248 @@
+"""
+Sharded session store with timer-wheel expiry
+
+Streaming sessions were kept in one dict and expired by a cleanup task that
+called ``is_expired`` on every session, so each cleanup pass cost O(total
+sessions) under a single lock. ``SessionStore`` splits sessions across
+``SESSION_SHARDS`` dicts, each with its own lock, so ``get``/``put``/
+``remove`` are O(1) and only contend within a shard. Each shard schedules
+expiry on a hierarchical ``TimerWheel``: ``expire`` only visits sessions
+whose deadline tick has passed, so its cost follows the number of expiring
+sessions, not the number of live ones.
+
+Activity (``touch``) only records a timestamp. A session that was touched
+after it was scheduled is re-armed for ``last_activity + timeout`` when its
+old deadline comes up, so a busy session costs one wheel operation per
+timeout period rather than one per audio chunk.
+"""
+
+import math
+import os
+import threading
+import time
+
+DEFAULT_SHARDS = int(os.getenv("SESSION_SHARDS", "16"))
+# Inactivity after which a streaming session is removed
+DEFAULT_SESSION_TIMEOUT = float(os.getenv("STREAM_SESSION_TIMEOUT", "300"))
+# Expiry resolution
+DEFAULT_TICK = 1.0
+WHEEL_SLOTS = 64
+WHEEL_LEVELS = 4
+
+
+class TimerWheel:
+    """Hierarchical timing wheel: O(1) schedule/cancel, expiry cost proportional to timers due
+
+    Level ``n`` has ``slots`` buckets of ``slots ** n`` ticks each; timers
+    cascade to finer levels as their bucket comes up. Deadlines beyond the
+    top level wait there and are re-placed each revolution.
+    """
+
+    def __init__(self, tick=DEFAULT_TICK, slots=WHEEL_SLOTS, levels=WHEEL_LEVELS, now=0.0):
+        self.tick = tick
+        self.slots = slots
+        self.levels = levels
+        self._spans = [slots ** level for level in range(levels)]
+        self._wheels = [[set() for _ in range(slots)] for _ in range(levels)]
+        self._entries = {}
+        # Timers scheduled at or before the current tick, returned by the next advance
+        self._due = set()
+        self._current = int(now // tick)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def deadline(self, key):
+        """Deadline tick of ``key``, or None"""
+        entry = self._entries.get(key)
+        return entry[0] if entry else None
+
+    def schedule(self, key, deadline):
+        """(Re)schedule ``key`` to expire at time ``deadline``"""
+        self.cancel(key)
+        tick = math.ceil(deadline / self.tick)
+        if tick <= self._current:
+            self._due.add(key)
+            self._entries[key] = (tick, None, None)
+        else:
+            self._place(key, tick)
+
+    def cancel(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        _, level, index = entry
+        if level is None:
+            self._due.discard(key)
+        else:
+            self._wheels[level][index].discard(key)
+        return True
+
+    def _place(self, key, tick):
+        delta = tick - self._current
+        level = 0
+        while level < self.levels - 1 and delta >= self._spans[level + 1]:
+            level += 1
+        index = (tick // self._spans[level]) % self.slots
+        self._wheels[level][index].add(key)
+        self._entries[key] = (tick, level, index)
+
+    def advance(self, now):
+        """Move the wheel to time ``now``; remove and return the keys that are due"""
+        target = int(now // self.tick)
+        expired = list(self._due)
+        for key in expired:
+            del self._entries[key]
+        self._due.clear()
+        if not self._entries:
+            self._current = max(self._current, target)
+            return expired
+        while self._current < target:
+            self._current += 1
+            current = self._current
+            # Cascade coarser buckets whose span starts at this tick, coarsest first
+            for level in range(self.levels - 1, 0, -1):
+                span = self._spans[level]
+                if current % span:
+                    continue
+                index = (current // span) % self.slots
+                bucket = self._wheels[level][index]
+                if bucket:
+                    self._wheels[level][index] = set()
+                    for key in bucket:
+                        self._place(key, self._entries[key][0])
+            index = current % self.slots
+            bucket = self._wheels[0][index]
+            if bucket:
+                self._wheels[0][index] = set()
+                for key in bucket:
+                    del self._entries[key]
+                expired.extend(bucket)
+            if not self._entries:
+                self._current = target
+        return expired
+
+
+class _Shard:
+    __slots__ = ("lock", "sessions", "activity", "wheel")
+
+    def __init__(self, tick, now):
+        self.lock = threading.Lock()
+        self.sessions = {}
+        self.activity = {}
+        self.wheel = TimerWheel(tick=tick, now=now)
+
+
+class SessionStore:
+    """Session registry sharded by id, with inactivity expiry on per-shard timer wheels"""
+
+    def __init__(self, shards=DEFAULT_SHARDS, timeout=DEFAULT_SESSION_TIMEOUT, tick=DEFAULT_TICK,
+                 clock=time.monotonic):
+        self.timeout = timeout
+        self.clock = clock
+        now = clock()
+        self._shards = [_Shard(tick, now) for _ in range(max(1, shards))]
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "created": 0,
+            "removed": 0,
+            "expired": 0,
+            "rearmed": 0,
+            "cleanups": 0,
+        }
+
+    def _shard(self, session_id):
+        return self._shards[hash(session_id) % len(self._shards)]
+
+    def _count(self, name, amount=1):
+        with self._stats_lock:
+            self._stats[name] += amount
+
+    def __len__(self):
+        return sum(len(shard.sessions) for shard in self._shards)
+
+    def __contains__(self, session_id):
+        return session_id in self._shard(session_id).sessions
+
+    def put(self, session_id, session, last_activity=None):
+        """Add or replace a session, active as of ``last_activity`` (default now)"""
+        last_activity = self.clock() if last_activity is None else last_activity
+        shard = self._shard(session_id)
+        with shard.lock:
+            created = session_id not in shard.sessions
+            shard.sessions[session_id] = session
+            shard.activity[session_id] = last_activity
+            shard.wheel.schedule(session_id, last_activity + self.timeout)
+        if created:
+            self._count("created")
+        return session
+
+    def get(self, session_id):
+        shard = self._shard(session_id)
+        with shard.lock:
+            return shard.sessions.get(session_id)
+
+    def touch(self, session_id, now=None):
+        """Record activity on a session; returns False if it is not stored"""
+        shard = self._shard(session_id)
+        with shard.lock:
+            if session_id not in shard.sessions:
+                return False
+            shard.activity[session_id] = self.clock() if now is None else now
+            return True
+
+    def last_activity(self, session_id):
+        shard = self._shard(session_id)
+        with shard.lock:
+            return shard.activity.get(session_id)
+
+    def remove(self, session_id):
+        """Remove a session; returns True if it was stored"""
+        shard = self._shard(session_id)
+        with shard.lock:
+            if shard.sessions.pop(session_id, None) is None:
+                return False
+            del shard.activity[session_id]
+            shard.wheel.cancel(session_id)
+        self._count("removed")
+        return True
+
+    def expire(self, now=None):
+        """Remove sessions inactive for ``timeout``; return them as ``(session_id, session)`` pairs"""
+        now = self.clock() if now is None else now
+        expired = []
+        rearmed = 0
+        for shard in self._shards:
+            with shard.lock:
+                for session_id in shard.wheel.advance(now):
+                    deadline = shard.activity[session_id] + self.timeout
+                    if deadline > now:
+                        # Touched since it was scheduled
+                        shard.wheel.schedule(session_id, deadline)
+                        rearmed += 1
+                        continue
+                    del shard.activity[session_id]
+                    expired.append((session_id, shard.sessions.pop(session_id)))
+        with self._stats_lock:
+            self._stats["expired"] += len(expired)
+            self._stats["rearmed"] += rearmed
+            self._stats["cleanups"] += 1
+        return expired
+
+    def items(self):
+        """Snapshot of ``(session_id, session)`` pairs"""
+        pairs = []
+        for shard in self._shards:
+            with shard.lock:
+                pairs.extend(shard.sessions.items())
+        return pairs
+
+    def get_stats(self):
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats["active"] = len(self)
+        stats["shards"] = len(self._shards)
+        return stats
@@ -0,0 +1,236 @@
+"""
+Local stand-in for the Gemini and OpenAI HTTP APIs
+
+Used by the benchmarks and tests so provider calls can be exercised without
+network access or API keys. The server speaks HTTP/1.1 with keep-alive, like
+the real endpoints, answers both the blocking and the SSE streaming variants,
+and can inject latency before the response and between streamed tokens.
+For routing and rate-limit tests it can also answer a fraction of requests
+slowly (a latency tail) or with HTTP 429 and a ``Retry-After`` header, and
+can enforce a quota of ``quota`` requests per sliding ``quota_window``
+seconds the way the Gemini free tier does.
+"""
+
+import json
+import math
+import random
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_REPLY = "Use Motorway M-2 outside peak hours (7-9 AM, 5-8 PM)."
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; avoid Nagle/delayed-ACK stalls
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def setup(self):
+        super().setup()
+        with self.server.stats_lock:
+            self.server.connections += 1
+
+    def _read_body(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length) if length else b""
+        return json.loads(body) if body else {}
+
+    def _send_json(self, status, data):
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_sse(self, events, done_marker=False):
+        """Send events as a chunked text/event-stream response"""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        def write_chunk(data):
+            self.wfile.write(f"{len(data):X}\r\n".encode("ascii") + data + b"\r\n")
+            self.wfile.flush()
+
+        for event in events:
+            write_chunk(f"data: {json.dumps(event)}\n\n".encode("utf-8"))
+            if self.server.token_delay:
+                time.sleep(self.server.token_delay)
+        if done_marker:
+            write_chunk(b"data: [DONE]\n\n")
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+    def _over_quota(self):
+        """Count this request against the quota; return the Retry-After seconds if it is exceeded"""
+        server = self.server
+        if server.quota is None:
+            return None
+        now = time.monotonic()
+        with server.stats_lock:
+            while server.quota_log and server.quota_log[0] <= now - server.quota_window:
+                server.quota_log.popleft()
+            if len(server.quota_log) >= server.quota:
+                return math.ceil(server.quota_log[0] + server.quota_window - now)
+            server.quota_log.append(now)
+        return None
+
+    def _send_rate_limited(self, retry_after=None):
+        body = json.dumps({"error": {"code": 429, "message": "Resource has been exhausted (e.g. check quota)."}})
+        body = body.encode("utf-8")
+        self.send_response(429)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        retry_after = self.server.retry_after if retry_after is None else retry_after
+        if retry_after is not None:
+            self.send_header("Retry-After", str(retry_after))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        payload = self._read_body()
+        with self.server.stats_lock:
+            self.server.requests += 1
+
+        quota_retry_after = self._over_quota()
+        if quota_retry_after is not None:
+            with self.server.stats_lock:
+                self.server.rate_limited += 1
+            self._send_rate_limited(quota_retry_after)
+            return
+
+        with self.server.stats_lock:
+            roll = self.server.random.random()
+        if roll < self.server.error_rate:
+            with self.server.stats_lock:
+                self.server.rate_limited += 1
+            self._send_rate_limited()
+            return
+
+        delay = self.server.delay
+        if roll >= 1.0 - self.server.slow_fraction:
+            delay += self.server.slow_delay
+        if delay:
+            time.sleep(delay)
+
+        reply = self.server.reply
+        path = self.path.split("?", 1)[0]
+
+        try:
+            if path.endswith(":streamGenerateContent"):
+                events = [
+                    {"candidates": [{"content": {"parts": [{"text": token}]}}]}
+                    for token in self.server.tokens()
+                ]
+                events[-1]["candidates"][0]["finishReason"] = "STOP"
+                self._send_sse(events)
+            elif path.endswith("/chat/completions") and payload.get("stream"):
+                events = (
+                    {"choices": [{"delta": {"content": token}}]}
+                    for token in self.server.tokens()
+                )
+                self._send_sse(events, done_marker=True)
+            elif path.endswith(":generateContent"):
+                self._send_json(200, {
+                    "candidates": [{"content": {"parts": [{"text": reply}]}}]
+                })
+            elif path.endswith("/chat/completions"):
+                self._send_json(200, {
+                    "model": payload.get("model", "gpt-3.5-turbo"),
+                    "choices": [{"message": {"role": "assistant", "content": reply}}]
+                })
+            else:
+                self._send_json(404, {"error": {"message": f"Unknown path {path}"}})
+        except (BrokenPipeError, ConnectionResetError):
+            # The client closed the connection mid-response (e.g. a cancelled stream)
+            with self.server.stats_lock:
+                self.server.disconnects += 1
+            self.close_connection = True
+
+
+class StubLLMServer:
+    """Threaded local server answering Gemini and OpenAI style requests"""
+
+    def __init__(self, reply=DEFAULT_REPLY, delay=0.0, token_delay=0.0, handler_class=_StubHandler,
+                 slow_fraction=0.0, slow_delay=0.0, error_rate=0.0, retry_after=None, seed=0,
+                 quota=None, quota_window=60.0):
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), handler_class)
+        self.httpd.daemon_threads = True
+        self.httpd.reply = reply
+        self.httpd.delay = delay
+        self.httpd.token_delay = token_delay
+        self.httpd.slow_fraction = slow_fraction
+        self.httpd.slow_delay = slow_delay
+        self.httpd.error_rate = error_rate
+        self.httpd.retry_after = retry_after
+        self.httpd.random = random.Random(seed)
+        self.httpd.quota = quota
+        self.httpd.quota_window = quota_window
+        self.httpd.quota_log = deque()
+        self.httpd.tokens = self.tokens
+        self.httpd.stats_lock = threading.Lock()
+        self.httpd.connections = 0
+        self.httpd.requests = 0
+        self.httpd.rate_limited = 0
+        self.httpd.disconnects = 0
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def tokens(self):
+        """Split the reply into word tokens (leading space kept) for streaming"""
+        words = self.httpd.reply.split(" ")
+        return [words[0]] + [" " + word for word in words[1:]]
+
+    @property
+    def connections(self):
+        """Number of TCP connections accepted so far"""
+        return self.httpd.connections
+
+    @property
+    def requests(self):
+        """Number of requests served so far"""
+        return self.httpd.requests
+
+    @property
+    def rate_limited(self):
+        """Number of requests answered with HTTP 429"""
+        return self.httpd.rate_limited
+
+    @property
+    def disconnects(self):
+        """Number of responses the client abandoned before they were complete"""
+        return self.httpd.disconnects
+
+    def configure(self, **settings):
+        """Change delay, token_delay, slow_fraction, slow_delay, error_rate, retry_after or quota at runtime"""
+        for name, value in settings.items():
+            if name not in ("delay", "token_delay", "slow_fraction", "slow_delay", "error_rate", "retry_after",
+                            "quota", "quota_window"):
+                raise ValueError(f"Unknown stub server setting: {name}")
+            setattr(self.httpd, name, value)
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
@@ -0,0 +1,241 @@
+"""
+Pre-rendered Pakistan traffic map
+
+Building the Folium map (markers, popups, polylines) and serializing it to
+HTML is the most expensive part of a Streamlit rerun with the map shown, and
+its output only changes when the city or highway data changes. The rendered
+HTML is therefore cached under a content hash of that data (the "data
+version") and the zoom; editing any city, traffic level or route produces a
+new version and the next request re-renders. The apps serve the cached HTML
+through ``streamlit.components.v1.html``, which is what ``folium_static``
+does after rendering; the frame size is set there, not in the HTML.
+
+When a ``GeoStore`` road network is supplied, its clustered intersections
+and simplified segments for the requested zoom are added as two GeoJSON
+layers, and the store version becomes part of the cache key.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+
+PAKISTAN_CENTER = [30.3753, 69.3451]
+DEFAULT_ZOOM = 6
+MAX_CACHED_MAPS = 8
+
+# Major Pakistani cities with simulated traffic data
+CITIES = [
+    {
+        "city": "Lahore",
+        "lat": 31.582045,
+        "lon": 74.329376,
+        "color": "red",
+        "traffic": "Heavy",
+        "info": "Cultural capital - Heavy traffic during peak hours (7-9 AM, 5-8 PM)"
+    },
+    {
+        "city": "Karachi",
+        "lat": 24.8607,
+        "lon": 67.0011,
+        "color": "darkred",
+        "traffic": "Very Heavy",
+        "info": "Economic hub - Severe congestion on main arteries"
+    },
+    {
+        "city": "Islamabad",
+        "lat": 33.6844,
+        "lon": 73.0479,
+        "color": "green",
+        "traffic": "Moderate",
+        "info": "Capital city - Well-planned roads, moderate traffic"
+    },
+    {
+        "city": "Rawalpindi",
+        "lat": 33.5651,
+        "lon": 73.0169,
+        "color": "orange",
+        "traffic": "Heavy",
+        "info": "Twin city - Connected to Islamabad, busy commercial area"
+    },
+    {
+        "city": "Faisalabad",
+        "lat": 31.4187,
+        "lon": 73.0790,
+        "color": "blue",
+        "traffic": "Moderate",
+        "info": "Industrial city - Traffic concentrated in textile areas"
+    },
+    {
+        "city": "Peshawar",
+        "lat": 34.0151,
+        "lon": 71.5249,
+        "color": "purple",
+        "traffic": "Moderate",
+        "info": "Historic city - Congestion in old city areas"
+    },
+    {
+        "city": "Multan",
+        "lat": 30.1575,
+        "lon": 71.5249,
+        "color": "cadetblue",
+        "traffic": "Light",
+        "info": "City of Saints - Manageable traffic flow"
+    }
+]
+
+# Major highways
+HIGHWAY_ROUTES = [
+    {
+        "name": "GT Road",
+        "color": "blue",
+        # Grand Trunk Road (Lahore to Peshawar)
+        "path": [[31.582045, 74.329376], [33.6844, 73.0479], [34.0151, 71.5249]],
+    },
+    {
+        "name": "M-1/M-2 Motorway",
+        "color": "red",
+        # Motorway (Lahore to Karachi)
+        "path": [[31.582045, 74.329376], [31.4187, 73.0790], [30.1575, 71.5249], [24.8607, 67.0011]],
+    },
+]
+
+
+def data_version(cities=CITIES, routes=HIGHWAY_ROUTES):
+    """Content hash of the map data; changes whenever any city or route changes"""
+    payload = json.dumps({"cities": cities, "routes": routes}, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def build_traffic_map(cities=CITIES, routes=HIGHWAY_ROUTES, store=None, zoom=DEFAULT_ZOOM):
+    """Build the interactive Folium map of Pakistan with traffic information"""
+    import folium
+
+    m = folium.Map(location=PAKISTAN_CENTER, zoom_start=zoom)
+
+    for city in cities:
+        popup_html = f"""
+        <div style="width: 200px;">
+            <h4>{city['city']}</h4>
+            <p><b>Traffic Level:</b> {city['traffic']}</p>
+            <p>{city['info']}</p>
+            <p><i>Click for route suggestions</i></p>
+        </div>
+        """
+
+        folium.Marker(
+            [city["lat"], city["lon"]],
+            popup=folium.Popup(popup_html, max_width=250),
+            tooltip=f"{city['city']} - {city['traffic']} Traffic",
+            icon=folium.Icon(color=city["color"], icon="car", prefix="fa")
+        ).add_to(m)
+
+    for route in routes:
+        folium.PolyLine(
+            route["path"],
+            color=route["color"],
+            weight=4,
+            opacity=0.7,
+            popup=f"Major Highway: {route['name']}"
+        ).add_to(m)
+
+    if store is not None:
+        add_network_layers(m, store, zoom)
+
+    return m
+
+
+def add_network_layers(m, store, zoom):
+    """Add a store's clustered intersections and simplified segments as GeoJSON layers"""
+    import folium
+
+    features = store.to_geojson(zoom)["features"]
+    segments = [feature for feature in features if feature["geometry"]["type"] == "LineString"]
+    intersections = [feature for feature in features if feature["geometry"]["type"] == "Point"]
+
+    if segments:
+        folium.GeoJson(
+            {"type": "FeatureCollection", "features": segments},
+            name="Road segments",
+            style_function=lambda feature: {"color": feature["properties"]["color"], "weight": 3, "opacity": 0.8},
+            tooltip=folium.GeoJsonTooltip(fields=["name", "congestion"]),
+        ).add_to(m)
+    if intersections:
+        folium.GeoJson(
+            {"type": "FeatureCollection", "features": intersections},
+            name="Intersections",
+            marker=folium.CircleMarker(radius=6, fill=True, fill_opacity=0.8, weight=1),
+            style_function=lambda feature: {
+                "color": feature["properties"]["color"],
+                "fillColor": feature["properties"]["color"],
+            },
+            tooltip=folium.GeoJsonTooltip(fields=["name", "congestion", "count"]),
+        ).add_to(m)
+
+
+def render_map_html(m):
+    """Serialize a Folium map to a standalone HTML document (as folium_static does)"""
+    import folium
+
+    return folium.Figure().add_child(m).render()
+
+
+def render_traffic_map(cities=CITIES, routes=HIGHWAY_ROUTES, store=None, zoom=DEFAULT_ZOOM):
+    """Build and serialize the traffic map in one step"""
+    return render_map_html(build_traffic_map(cities, routes, store, zoom))
+
+
+class TrafficMapCache:
+    """Rendered map HTML keyed by (data version, network version, zoom), LRU-bounded"""
+
+    def __init__(self, max_entries=MAX_CACHED_MAPS, renderer=render_traffic_map):
+        self.max_entries = max_entries
+        self._renderer = renderer
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "renders": 0, "render_seconds": 0.0}
+
+    def get_html(self, cities=CITIES, routes=HIGHWAY_ROUTES, store=None, zoom=DEFAULT_ZOOM):
+        """Return the map HTML, rendering it only for a new data version or zoom"""
+        key = (data_version(cities, routes), store.version if store is not None else None, zoom)
+        with self._lock:
+            html = self._entries.get(key)
+            if html is not None:
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                return html
+
+        start = time.perf_counter()
+        html = self._renderer(cities, routes, store, zoom)
+        elapsed = time.perf_counter() - start
+
+        with self._lock:
+            self._stats["renders"] += 1
+            self._stats["render_seconds"] += elapsed
+            self._entries[key] = html
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return html
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+            return stats
+
+
+@lru_cache(maxsize=None)
+def get_traffic_map_cache():
+    """Return the process-wide map HTML cache"""
+    return TrafficMapCache()
+
+
+def get_traffic_map_html(cities=CITIES, routes=HIGHWAY_ROUTES, store=None, zoom=DEFAULT_ZOOM):
+    """Cached HTML of the traffic map from the process-wide cache (the caller sizes the frame)"""
+    return get_traffic_map_cache().get_html(cities, routes, store, zoom)
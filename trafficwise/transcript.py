@@ -0,0 +1,145 @@
+"""
+Incremental transcript assembly for streaming transcription
+
+Streaming providers return, for the utterance in progress, a full interim
+hypothesis each time ("Hello", "Hello world", "Hello world, this", ...),
+and the session used to replace its accumulated text with each one and
+send the whole text to the client again. Over a long call every message
+then costs O(transcript length) to build, serialize and send.
+
+``TranscriptAssembler`` keeps the transcript as committed segments (final
+utterances, never revisited) plus the volatile tail of the current
+utterance. ``update`` compares the new hypothesis only with the previous
+tail and returns a delta message: replace everything from ``offset`` on
+with ``text``. ``stable`` is the length of the prefix that has not changed
+for ``TRANSCRIPT_STABILITY`` consecutive hypotheses (always including the
+committed text), which clients can render as settled. Every
+``TRANSCRIPT_RESYNC_EVERY`` messages, or on ``resync()``, a full-text sync
+message is sent instead so a client that missed a delta recovers.
+``apply_message`` is the client side of the protocol.
+"""
+
+import os
+from collections import deque
+
+# Hypotheses a prefix must survive unchanged to be reported stable
+DEFAULT_STABILITY = int(os.getenv("TRANSCRIPT_STABILITY", "2"))
+# Send the full text every N messages (0 disables periodic resync)
+DEFAULT_RESYNC_EVERY = int(os.getenv("TRANSCRIPT_RESYNC_EVERY", "100"))
+
+
+def common_prefix_length(a, b):
+    """Length of the common prefix of two strings, compared in slices rather than per character"""
+    n = min(len(a), len(b))
+    if a[:n] == b[:n]:
+        return n
+    low, high = 0, n - 1
+    while low < high:
+        middle = (low + high + 1) // 2
+        if a[:middle] == b[:middle]:
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+class TranscriptAssembler:
+    """Committed transcript plus a volatile tail, emitting O(delta) update messages"""
+
+    def __init__(self, stability=DEFAULT_STABILITY, resync_every=DEFAULT_RESYNC_EVERY, separator=" "):
+        self.stability = max(1, stability)
+        self.resync_every = resync_every
+        self.separator = separator
+        self._segments = []
+        self._committed_length = 0
+        self._tail = ""
+        self._tail_start = 0
+        self._prefix_runs = deque(maxlen=self.stability)
+        self._seq = 0
+        self._since_sync = 0
+        self._resync_pending = False
+        self._stats = {
+            "messages": 0,
+            "deltas": 0,
+            "syncs": 0,
+            "delta_chars": 0,
+            "finals": 0,
+        }
+
+    @property
+    def text(self):
+        """Full transcript (joins the committed segments: O(transcript), not for the hot path)"""
+        return "".join(self._segments) + self._tail
+
+    @property
+    def committed_length(self):
+        return self._committed_length
+
+    def __len__(self):
+        return self._tail_start + len(self._tail)
+
+    def _stable_length(self):
+        if len(self._prefix_runs) < self.stability:
+            return self._tail_start
+        return self._tail_start + min(self._prefix_runs)
+
+    def update(self, text, is_final=False):
+        """Apply an interim or final hypothesis for the current utterance; return the message to send"""
+        if self._segments and self.separator and text:
+            # The separator from the previous utterance belongs to this tail
+            text = self.separator + text
+        kept = common_prefix_length(self._tail, text)
+        offset = self._tail_start + kept
+        appended = text[kept:]
+        self._tail = text
+        self._prefix_runs.append(kept)
+        if is_final:
+            self._commit()
+            self._stats["finals"] += 1
+        stable = len(self) if is_final else self._stable_length()
+
+        self._seq += 1
+        self._since_sync += 1
+        self._stats["messages"] += 1
+        if self._resync_pending or (self.resync_every and self._since_sync >= self.resync_every):
+            return self._sync_message(is_final)
+        self._stats["deltas"] += 1
+        self._stats["delta_chars"] += len(appended)
+        return {"type": "transcript_delta", "seq": self._seq, "offset": offset, "text": appended,
+                "stable": stable, "is_final": is_final}
+
+    def _commit(self):
+        """Close the current utterance: the tail becomes a committed segment"""
+        if self._tail:
+            self._segments.append(self._tail)
+            self._committed_length += len(self._tail)
+        self._tail = ""
+        self._tail_start = self._committed_length
+        self._prefix_runs.clear()
+
+    def resync(self):
+        """Make the next message a full-text sync (e.g. after a client reconnect)"""
+        self._resync_pending = True
+
+    def sync_message(self):
+        """A full-text sync message for the current state"""
+        self._seq += 1
+        self._stats["messages"] += 1
+        return self._sync_message(False)
+
+    def _sync_message(self, is_final):
+        self._resync_pending = False
+        self._since_sync = 0
+        self._stats["syncs"] += 1
+        return {"type": "transcript_sync", "seq": self._seq, "text": self.text,
+                "stable": len(self) if is_final else self._stable_length(), "is_final": is_final}
+
+    def get_stats(self):
+        return {**self._stats, "length": len(self), "committed": self._committed_length}
+
+
+def apply_message(text, message):
+    """Client side: the transcript after applying a delta or sync message to ``text``"""
+    if message["type"] == "transcript_sync":
+        return message["text"]
+    return text[:message["offset"]] + message["text"]
@@ -0,0 +1,302 @@
+"""
+Content-addressed cache of synthesized TTS audio
+
+An IVR says the same few dozen prompts (greetings, confirmations, "please
+hold") thousands of times a day, and every synthesis is a provider round
+trip. Audio is keyed on a hash of everything that changes the output:
+the text (whitespace-normalized), voice, provider and telephony preset.
+
+- The memory tier is an LRU bounded in bytes, like ``ResponseCache``.
+- The disk tier keeps one file per key under ``TTS_CACHE_DIR`` (fanned out
+  by the first two hex digits). Files are written to a temporary name and
+  renamed into place, so a crash never leaves a truncated clip, and read
+  back whole into the memory tier. They are not kept mapped: Windows cannot
+  delete or replace a file while it is mapped. The tier is bounded by
+  ``TTS_CACHE_DISK_MAX_BYTES``, evicting the least recently used files.
+
+Both tiers expire entries after ``CACHE_TTL_TTS_AUDIO`` seconds, counted
+from when the audio was synthesized (the file's mtime on disk).
+"""
+
+import hashlib
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+
+DEFAULT_MAX_BYTES = int(os.getenv("TTS_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+DEFAULT_DISK_MAX_BYTES = int(os.getenv("TTS_CACHE_DISK_MAX_BYTES", str(512 * 1024 * 1024)))
+DEFAULT_TTL_SECONDS = int(os.getenv("CACHE_TTL_TTS_AUDIO", "86400"))
+DEFAULT_CACHE_DIR = os.getenv("TTS_CACHE_DIR", os.path.join(".trafficwise_cache", "tts"))
+AUDIO_SUFFIX = ".audio"
+
+_WHITESPACE = re.compile(r"\s+")
+
+logger = logging.getLogger(__name__)
+
+
+def make_audio_key(text, voice_id, provider, preset):
+    """Cache key for a synthesis request; punctuation and case are kept since they change prosody"""
+    raw = "\x1f".join((provider or "", voice_id or "", preset or "", _WHITESPACE.sub(" ", text).strip()))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class _Entry:
+    __slots__ = ("audio", "created_at")
+
+    def __init__(self, audio, created_at):
+        self.audio = audio
+        self.created_at = created_at
+
+
+class TTSAudioCache:
+    """Two-tier (memory LRU + files on disk) cache of synthesized audio"""
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, ttl_seconds=DEFAULT_TTL_SECONDS,
+                 cache_dir=DEFAULT_CACHE_DIR, disk_max_bytes=DEFAULT_DISK_MAX_BYTES, clock=time.time):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.cache_dir = cache_dir
+        self.disk_max_bytes = disk_max_bytes
+        self.clock = clock
+
+        self._entries = OrderedDict()
+        self._bytes = 0
+        # key -> (size, created_at), least recently used first
+        self._disk = OrderedDict()
+        self._disk_bytes = 0
+        self._lock = threading.RLock()
+        self._stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "disk_evictions": 0,
+            "expired": 0,
+            "bytes_served": 0,
+            "bytes_written": 0,
+            "write_errors": 0,
+        }
+
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+            self._scan_disk()
+
+    def get(self, text, voice_id, provider, preset):
+        """Cached audio bytes for a request, or None"""
+        return self.get_by_key(make_audio_key(text, voice_id, provider, preset))
+
+    def put(self, text, voice_id, provider, preset, audio):
+        """Cache synthesized audio in both tiers; returns the key"""
+        key = make_audio_key(text, voice_id, provider, preset)
+        self.put_by_key(key, audio)
+        return key
+
+    def get_by_key(self, key):
+        now = self.clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if now - entry.created_at <= self.ttl_seconds:
+                    self._entries.move_to_end(key)
+                    self._stats["memory_hits"] += 1
+                    self._stats["bytes_served"] += len(entry.audio)
+                    return entry.audio
+                self._remove(key)
+                self._stats["expired"] += 1
+
+            audio = self._read_disk(key, now)
+            if audio is not None:
+                self._insert(key, _Entry(audio, self._disk[key][1]))
+                self._stats["disk_hits"] += 1
+                self._stats["bytes_served"] += len(audio)
+                return audio
+
+            self._stats["misses"] += 1
+            return None
+
+    def put_by_key(self, key, audio):
+        if not audio:
+            return
+        audio = bytes(audio)
+        created_at = self.clock()
+        with self._lock:
+            self._insert(key, _Entry(audio, created_at))
+        if self.cache_dir:
+            self._write_disk(key, audio, created_at)
+
+    def contains(self, text, voice_id, provider, preset):
+        """Whether unexpired audio is cached, without counting a lookup"""
+        key = make_audio_key(text, voice_id, provider, preset)
+        now = self.clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry.created_at <= self.ttl_seconds:
+                return True
+            disk = self._disk.get(key)
+            return disk is not None and now - disk[1] <= self.ttl_seconds
+
+    def expire(self):
+        """Drop expired entries from both tiers; returns how many were removed"""
+        cutoff = self.clock() - self.ttl_seconds
+        removed = 0
+        with self._lock:
+            for key in [key for key, entry in self._entries.items() if entry.created_at < cutoff]:
+                self._remove(key)
+                removed += 1
+            for key in [key for key, (_, created_at) in self._disk.items() if created_at < cutoff]:
+                self._delete_file(key)
+                removed += 1
+            self._stats["expired"] += removed
+        return removed
+
+    def clear(self):
+        """Drop all cached audio from both tiers"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            for key in list(self._disk):
+                self._delete_file(key)
+
+    def get_stats(self):
+        """Hit/miss/byte counters and tier sizes"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["hits"] = stats["memory_hits"] + stats["disk_hits"]
+            lookups = stats["hits"] + stats["misses"]
+            stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+            stats["entries"] = len(self._entries)
+            stats["bytes"] = self._bytes
+            stats["max_bytes"] = self.max_bytes
+            stats["disk_entries"] = len(self._disk)
+            stats["disk_bytes"] = self._disk_bytes
+            stats["disk_max_bytes"] = self.disk_max_bytes
+            stats["ttl_seconds"] = self.ttl_seconds
+            return stats
+
+    def _insert(self, key, entry):
+        if key in self._entries:
+            self._remove(key)
+        if len(entry.audio) > self.max_bytes:
+            return
+        self._entries[key] = entry
+        self._bytes += len(entry.audio)
+        while self._bytes > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+            self._stats["evictions"] += 1
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        self._bytes -= len(entry.audio)
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key[:2], key + AUDIO_SUFFIX)
+
+    def _read_disk(self, key, now):
+        info = self._disk.get(key)
+        if info is None:
+            return None
+        if now - info[1] > self.ttl_seconds:
+            self._delete_file(key)
+            self._stats["expired"] += 1
+            return None
+        try:
+            with open(self._path(key), "rb") as f:
+                audio = f.read()
+        except OSError:
+            audio = None
+        if not audio:
+            # Removed by another process, or empty
+            self._forget_file(key)
+            return None
+        self._disk.move_to_end(key)
+        return audio
+
+    def _write_disk(self, key, audio, created_at):
+        path = self._path(key)
+        directory = os.path.dirname(path)
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(audio)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.utime(temp_path, (created_at, created_at))
+                os.replace(temp_path, path)
+            except BaseException:
+                os.unlink(temp_path)
+                raise
+        except OSError as e:
+            logger.warning("Could not write TTS cache file %s: %s", path, e)
+            with self._lock:
+                self._stats["write_errors"] += 1
+            return
+
+        with self._lock:
+            self._forget_file(key)
+            self._disk[key] = (len(audio), created_at)
+            self._disk_bytes += len(audio)
+            self._stats["bytes_written"] += len(audio)
+            while self._disk_bytes > self.disk_max_bytes and len(self._disk) > 1:
+                self._delete_file(next(iter(self._disk)))
+                self._stats["disk_evictions"] += 1
+
+    def _forget_file(self, key):
+        info = self._disk.pop(key, None)
+        if info is not None:
+            self._disk_bytes -= info[0]
+
+    def _delete_file(self, key):
+        self._forget_file(key)
+        try:
+            os.unlink(self._path(key))
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning("Could not remove TTS cache file for %s: %s", key, e)
+
+    def _scan_disk(self):
+        """Index the files left by earlier processes; stale temporaries and expired clips are removed"""
+        now = self.clock()
+        cutoff = now - self.ttl_seconds
+        found = []
+        for shard in os.scandir(self.cache_dir):
+            if not shard.is_dir():
+                continue
+            try:
+                items = list(os.scandir(shard.path))
+            except FileNotFoundError:
+                continue
+            for item in items:
+                # Other processes rename temporaries into place and evict files while this runs
+                try:
+                    stat = item.stat()
+                    if not item.name.endswith(AUDIO_SUFFIX):
+                        # Another process may be writing it right now
+                        if stat.st_mtime < now - 3600:
+                            os.unlink(item.path)
+                        continue
+                    if stat.st_mtime < cutoff:
+                        os.unlink(item.path)
+                        continue
+                except FileNotFoundError:
+                    continue
+                found.append((stat.st_mtime, item.name[:-len(AUDIO_SUFFIX)], stat.st_size))
+        for created_at, key, size in sorted(found):
+            self._disk[key] = (size, created_at)
+            self._disk_bytes += size
+        while self._disk_bytes > self.disk_max_bytes and self._disk:
+            self._delete_file(next(iter(self._disk)))
+            self._stats["disk_evictions"] += 1
+
+
+@lru_cache(maxsize=None)
+def get_tts_cache():
+    """Return the process-wide TTS audio cache, creating it on first use"""
+    return TTSAudioCache()
@@ -0,0 +1,166 @@
+"""
+Pre-warming the TTS audio cache from a phrase catalog
+
+Call flows reuse a known set of phrases (greetings, confirmations, "please
+hold") in English and French, but without pre-warming the first caller to
+reach each one pays full synthesis latency. The catalog (by default
+``trafficwise/data/phrase_catalog.json``) lists them:
+
+    {
+      "version": 1,
+      "phrases": [
+        {"id": "greeting", "language": "en", "text": "Thank you for calling ..."}
+      ]
+    }
+
+``PhrasePrewarmer.start()`` is meant to be called from
+``TTSService.initialize()``: it schedules the job as a background task and
+returns at once, so startup never waits on synthesis. The job picks one
+voice per language (``voice_config_manager.get_optimal_voice_for_telephony``
+in the service), skips phrases already in ``TTSAudioCache`` (e.g. from the
+previous run's disk tier), and synthesizes the rest with at most
+``TTS_PREWARM_CONCURRENCY`` requests in flight, reporting progress after
+each phrase. A phrase that fails is logged and left for the first caller.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from collections import namedtuple
+
+DEFAULT_CATALOG_PATH = os.getenv(
+    "TTS_PHRASE_CATALOG",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "phrase_catalog.json"),
+)
+DEFAULT_CONCURRENCY = int(os.getenv("TTS_PREWARM_CONCURRENCY", "4"))
+DEFAULT_PRESET = os.getenv("TTS_TELEPHONY_PRESET", "standard")
+
+Phrase = namedtuple("Phrase", ["id", "language", "text"])
+
+logger = logging.getLogger(__name__)
+
+
+def load_phrase_catalog(path=DEFAULT_CATALOG_PATH, languages=None):
+    """Phrases from a catalog file, optionally only those in ``languages``"""
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    if data.get("version") != 1:
+        raise ValueError(f"Unsupported phrase catalog version: {data.get('version')}")
+
+    phrases = []
+    for index, item in enumerate(data.get("phrases", [])):
+        if not item.get("text") or not item.get("language"):
+            raise ValueError(f"Phrase {index} in {path} needs 'text' and 'language'")
+        phrase = Phrase(item.get("id", str(index)), item["language"], item["text"])
+        if languages is None or phrase.language in languages:
+            phrases.append(phrase)
+    return phrases
+
+
+class PhrasePrewarmer:
+    """Background job synthesizing catalog phrases into the TTS cache"""
+
+    def __init__(self, synthesize, cache, select_voice, preset=DEFAULT_PRESET,
+                 concurrency=DEFAULT_CONCURRENCY, on_progress=None):
+        """
+        ``synthesize(text, voice)`` is a coroutine returning audio bytes; ``select_voice(language)``
+        returns a voice with ``voice_id`` and ``provider`` (or None to skip the language);
+        ``on_progress(stats)`` is called after each phrase.
+        """
+        self.synthesize = synthesize
+        self.cache = cache
+        self.select_voice = select_voice
+        self.preset = preset
+        self.concurrency = max(1, concurrency)
+        self.on_progress = on_progress
+        self._task = None
+        self._stats = {
+            "total": 0,
+            "done": 0,
+            "already_cached": 0,
+            "synthesized": 0,
+            "failed": 0,
+            "skipped_languages": [],
+            "running": False,
+            "elapsed_seconds": 0.0,
+        }
+
+    def start(self, phrases=None):
+        """Schedule the job on the running loop and return its task without waiting"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self.run(phrases))
+        return self._task
+
+    async def wait(self):
+        if self._task is not None:
+            await asyncio.shield(self._task)
+
+    async def cancel(self):
+        """Stop the job (service cleanup); phrases already cached stay cached"""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def run(self, phrases=None):
+        """Synthesize every uncached phrase; returns the final stats"""
+        if phrases is None:
+            phrases = load_phrase_catalog()
+        start = time.perf_counter()
+        self._stats.update(total=len(phrases), done=0, already_cached=0, synthesized=0, failed=0,
+                           skipped_languages=[], running=True)
+
+        voices = {}
+        for language in dict.fromkeys(phrase.language for phrase in phrases):
+            voices[language] = self.select_voice(language)
+            if voices[language] is None:
+                logger.warning("No telephony voice for %s; its phrases are not pre-warmed", language)
+                self._stats["skipped_languages"].append(language)
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        try:
+            await asyncio.gather(*(self._warm(phrase, voices[phrase.language], semaphore) for phrase in phrases))
+        finally:
+            self._stats["running"] = False
+            self._stats["elapsed_seconds"] = time.perf_counter() - start
+        logger.info("Pre-warmed %d phrases in %.1fs (%d already cached, %d failed)",
+                    self._stats["synthesized"], self._stats["elapsed_seconds"],
+                    self._stats["already_cached"], self._stats["failed"])
+        return self.get_stats()
+
+    async def _warm(self, phrase, voice, semaphore):
+        if voice is None:
+            self._stats["failed"] += 1
+        elif self.cache.contains(phrase.text, voice.voice_id, voice.provider, self.preset):
+            self._stats["already_cached"] += 1
+        else:
+            async with semaphore:
+                try:
+                    audio = await self.synthesize(phrase.text, voice)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.warning("Pre-warming phrase %s (%s) failed: %s", phrase.id, phrase.language, e)
+                    audio = None
+            if not audio or isinstance(audio, str):
+                if isinstance(audio, str):
+                    logger.warning("Pre-warming phrase %s (%s) failed: %s", phrase.id, phrase.language, audio)
+                self._stats["failed"] += 1
+            else:
+                # The disk tier fsyncs; keep that off the event loop
+                await asyncio.to_thread(self.cache.put, phrase.text, voice.voice_id, voice.provider,
+                                        self.preset, audio)
+                self._stats["synthesized"] += 1
+        self._stats["done"] += 1
+        if self.on_progress is not None:
+            self.on_progress(self.get_stats())
+
+    def get_stats(self):
+        stats = dict(self._stats)
+        stats["skipped_languages"] = list(stats["skipped_languages"])
+        stats["progress"] = stats["done"] / stats["total"] if stats["total"] else 1.0
+        return stats
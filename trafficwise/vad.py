@@ -0,0 +1,175 @@
+"""
+Voice activity detection for streaming audio chunks
+
+Phone calls are mostly silence, yet every chunk a streaming session cuts
+used to go to the transcription provider. ``VoiceActivityDetector`` sits
+between the chunker (``trafficwise.audio_buffer``) and the provider: it
+splits each chunk into short frames and classifies them all at once with
+NumPy, by RMS energy (above a fixed floor and above an adaptive noise
+estimate) and zero-crossing rate (broadband hiss crosses zero far more
+often than voiced speech). A chunk without speech frames is dropped, except
+for the ``VAD_TRAILING_CHUNKS`` right after speech: quiet word endings
+(fricatives, final consonants) often fall below the speech threshold and
+would otherwise be clipped. After ``VAD_HANGOVER_MS`` of silence following
+speech the utterance is marked as ended, so the caller can finalize the
+transcript (``is_final``) without waiting for the client to close the
+stream.
+
+With ``mode="webrtc"`` frames are classified by WebRTC VAD instead; the
+``webrtcvad`` package is imported on first use and the energy classifier is
+used when it is not installed.
+"""
+
+import logging
+import os
+from collections import namedtuple
+
+import numpy as np
+
+DEFAULT_SAMPLE_RATE = 16000
+# WebRTC VAD accepts 10, 20 or 30 ms frames
+DEFAULT_FRAME_MS = int(os.getenv("VAD_FRAME_MS", "30"))
+# Frame RMS, relative to int16 full scale, below which a frame is silence (~-40 dBFS)
+DEFAULT_ENERGY_THRESHOLD = float(os.getenv("VAD_ENERGY_THRESHOLD", "0.01"))
+# Speech frames must also be this many times louder than the running noise floor
+DEFAULT_NOISE_RATIO = float(os.getenv("VAD_NOISE_RATIO", "3.0"))
+# Fraction of adjacent samples changing sign above which a frame is noise, not speech
+DEFAULT_MAX_ZERO_CROSSING_RATE = float(os.getenv("VAD_MAX_ZCR", "0.4"))
+# Trailing silence that ends an utterance
+DEFAULT_HANGOVER_MS = int(os.getenv("VAD_HANGOVER_MS", "300"))
+# Silent chunks still forwarded after the last chunk with speech
+DEFAULT_TRAILING_CHUNKS = int(os.getenv("VAD_TRAILING_CHUNKS", "1"))
+DEFAULT_WEBRTC_AGGRESSIVENESS = int(os.getenv("VAD_WEBRTC_AGGRESSIVENESS", "2"))
+# Weight of a new silent frame in the noise floor average
+NOISE_FLOOR_ALPHA = 0.05
+
+VadDecision = namedtuple("VadDecision", ["forward", "speech_frames", "frames", "utterance_ended"])
+
+logger = logging.getLogger(__name__)
+
+
+def _load_webrtc_vad(aggressiveness):
+    import webrtcvad
+
+    return webrtcvad.Vad(aggressiveness)
+
+
+def frame_features(samples, frame_length):
+    """Per-frame RMS (0-1 of full scale) and zero-crossing rate of int16 ``samples``
+
+    A trailing partial frame is ignored.
+    """
+    count = len(samples) // frame_length
+    frames = np.asarray(samples[:count * frame_length], dtype=np.float32).reshape(count, frame_length)
+    frames /= 32768.0
+    rms = np.sqrt(np.mean(frames * frames, axis=1))
+    signs = np.signbit(frames)
+    zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / max(1, frame_length - 1)
+    return rms, zcr
+
+
+class VoiceActivityDetector:
+    """Per-session speech/silence gate with utterance boundary detection"""
+
+    def __init__(self, sample_rate=DEFAULT_SAMPLE_RATE, frame_ms=DEFAULT_FRAME_MS,
+                 energy_threshold=DEFAULT_ENERGY_THRESHOLD, noise_ratio=DEFAULT_NOISE_RATIO,
+                 max_zero_crossing_rate=DEFAULT_MAX_ZERO_CROSSING_RATE, hangover_ms=DEFAULT_HANGOVER_MS,
+                 trailing_chunks=DEFAULT_TRAILING_CHUNKS, mode="energy", aggressiveness=DEFAULT_WEBRTC_AGGRESSIVENESS, loader=_load_webrtc_vad):
+        if mode not in ("energy", "webrtc"):
+            raise ValueError(f"Unknown VAD mode: {mode}")
+        self.sample_rate = sample_rate
+        self.frame_ms = frame_ms
+        self.frame_length = sample_rate * frame_ms // 1000
+        self.energy_threshold = energy_threshold
+        self.noise_ratio = noise_ratio
+        self.max_zero_crossing_rate = max_zero_crossing_rate
+        self.hangover_frames = max(1, hangover_ms // frame_ms)
+        self.trailing_chunks = max(0, trailing_chunks)
+        self.noise_floor = energy_threshold / noise_ratio
+        self.in_utterance = False
+        self._silent_run = 0
+        self._trailing_left = 0
+        self._webrtc = None
+        if mode == "webrtc":
+            try:
+                self._webrtc = loader(aggressiveness)
+            except ImportError:
+                logger.warning("webrtcvad is not installed; using the energy VAD")
+                mode = "energy"
+        self.mode = mode
+        self._stats = {
+            "chunks": 0,
+            "chunks_dropped": 0,
+            "frames": 0,
+            "speech_frames": 0,
+            "utterances": 0,
+        }
+
+    def classify(self, samples):
+        """Boolean speech flag per frame of int16 ``samples``"""
+        if self._webrtc is not None:
+            frame_bytes = self.frame_length * 2
+            data = np.asarray(samples, dtype=np.int16).tobytes()
+            return np.array([
+                self._webrtc.is_speech(data[start:start + frame_bytes], self.sample_rate)
+                for start in range(0, len(data) - frame_bytes + 1, frame_bytes)
+            ], dtype=bool)
+
+        rms, zcr = frame_features(samples, self.frame_length)
+        threshold = max(self.energy_threshold, self.noise_floor * self.noise_ratio)
+        tonal = zcr <= self.max_zero_crossing_rate
+        speech = (rms >= threshold) & tonal
+        silent = rms[tonal & ~speech]
+        if len(silent):
+            # Track the background level from quiet frames; hiss is already rejected by its ZCR
+            self.noise_floor += NOISE_FLOOR_ALPHA * (float(np.mean(silent)) - self.noise_floor)
+        return speech
+
+    def process(self, samples):
+        """Classify one chunk of int16 samples; return a ``VadDecision``
+
+        ``forward`` is False for chunks without speech, other than the
+        ``trailing_chunks`` following speech, and ``utterance_ended`` is True
+        on the chunk where trailing silence reaches the hangover.
+        """
+        speech = self.classify(samples)
+        frames = len(speech)
+        speech_frames = int(np.count_nonzero(speech))
+        utterance_ended = False
+        forward = bool(speech_frames)
+
+        if speech_frames:
+            self.in_utterance = True
+            self._trailing_left = self.trailing_chunks
+            # Silent frames after the last speech frame in this chunk
+            self._silent_run = frames - 1 - int(np.flatnonzero(speech)[-1])
+        else:
+            self._silent_run += frames
+            if self._trailing_left:
+                self._trailing_left -= 1
+                forward = True
+        if self.in_utterance and self._silent_run >= self.hangover_frames:
+            self.in_utterance = False
+            utterance_ended = True
+            self._stats["utterances"] += 1
+
+        self._stats["chunks"] += 1
+        self._stats["frames"] += frames
+        self._stats["speech_frames"] += speech_frames
+        if not forward:
+            self._stats["chunks_dropped"] += 1
+        return VadDecision(forward, speech_frames, frames, utterance_ended)
+
+    def reset(self):
+        """Forget the current utterance (the noise floor is kept)"""
+        self.in_utterance = False
+        self._silent_run = 0
+        self._trailing_left = 0
+
+    @property
+    def speech_ratio(self):
+        frames = self._stats["frames"]
+        return self._stats["speech_frames"] / frames if frames else 0.0
+
+    def get_stats(self):
+        return {**self._stats, "speech_ratio": self.speech_ratio, "mode": self.mode}
@@ -0,0 +1,239 @@
+"""
+Persistent on-disk vector store for the RAG knowledge base
+
+Layout of an index directory:
+
+    manifest.json    format version, row count, dimension, dtype, model name
+    embeddings.bin   row-major matrix of L2-normalized embeddings
+    documents.db     SQLite table mapping row -> (id, document, metadata)
+
+The embedding matrix is memory-mapped, so opening an index of hundreds of
+thousands of chunks only reads the manifest; pages are faulted in when a
+query touches them. The manifest is rewritten atomically after each batch
+and its row count is authoritative, so a crash mid-write leaves the index
+at the previous batch; a batch that raises is truncated away before the
+error propagates. The public methods mirror the subset of the Chroma
+collection API used by the app (``add``, ``get``, ``query``, ``count``);
+``retriever()`` exposes the same rows to the NumPy retrievers.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+
+import numpy as np
+
+from trafficwise.retrievers import IVFRetriever, NumpyRetriever
+
+MANIFEST_VERSION = 1
+MANIFEST_FILE = "manifest.json"
+EMBEDDINGS_FILE = "embeddings.bin"
+DOCUMENTS_FILE = "documents.db"
+
+DEFAULT_INDEX_PATH = os.getenv("RAG_INDEX_PATH", os.path.join(".trafficwise_cache", "rag_index"))
+DEFAULT_DTYPE = os.getenv("RAG_INDEX_DTYPE", "float32")
+
+
+class PersistentVectorStore:
+    """Append-only, memory-mapped embedding store with a JSON manifest"""
+
+    def __init__(self, path=DEFAULT_INDEX_PATH, dim=None, dtype=DEFAULT_DTYPE, model_name=None):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self._lock = threading.RLock()
+        self._matrix = None
+
+        manifest = self._read_manifest()
+        if manifest is None:
+            manifest = {
+                "version": MANIFEST_VERSION,
+                "count": 0,
+                "dim": dim,
+                "dtype": np.dtype(dtype).name,
+                "model": model_name,
+            }
+            self.manifest = manifest
+            self._write_manifest()
+        else:
+            if manifest["version"] != MANIFEST_VERSION:
+                raise ValueError(f"Unsupported index version {manifest['version']} in {path}")
+            if dim is not None and manifest["dim"] not in (None, dim):
+                raise ValueError(f"Index {path} has dimension {manifest['dim']}, expected {dim}")
+            if model_name and manifest.get("model") not in (None, model_name):
+                raise ValueError(f"Index {path} was built with {manifest['model']}, not {model_name}")
+        self.manifest = manifest
+        self.dtype = np.dtype(manifest["dtype"])
+
+        self._db = sqlite3.connect(os.path.join(path, DOCUMENTS_FILE), check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS chunks ("
+            "row INTEGER PRIMARY KEY, id TEXT UNIQUE NOT NULL, document TEXT, metadata TEXT)"
+        )
+        self._db.commit()
+        self._recover()
+        self._map()
+        self._flat = self.retriever("flat")
+
+    @property
+    def dim(self):
+        return self.manifest["dim"]
+
+    def count(self):
+        """Number of indexed chunks"""
+        return self.manifest["count"]
+
+    @property
+    def embeddings(self):
+        """Memory-mapped (count, dim) embedding matrix, or an empty array"""
+        if self._matrix is None:
+            return np.empty((0, self.dim or 0), dtype=self.dtype)
+        return self._matrix
+
+    def get(self, ids):
+        """Return the subset of ``ids`` already in the index (Chroma ``get`` shape)"""
+        found = []
+        with self._lock:
+            for start in range(0, len(ids), 500):
+                batch = ids[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._db.execute(f"SELECT id FROM chunks WHERE id IN ({placeholders})", batch)
+                found.extend(row[0] for row in rows)
+        return {"ids": found}
+
+    def add(self, ids, documents, metadatas=None, embeddings=None):
+        """Append chunks with precomputed embeddings; ids already present are skipped"""
+        if embeddings is None:
+            raise ValueError("PersistentVectorStore.add requires precomputed embeddings")
+        metadatas = metadatas or [{} for _ in ids]
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        if vectors.ndim != 2 or len(vectors) != len(ids):
+            raise ValueError("embeddings must be a (len(ids), dim) matrix")
+
+        with self._lock:
+            if self.dim is not None and vectors.shape[1] != self.dim:
+                raise ValueError(f"Embedding dimension {vectors.shape[1]} does not match index dimension {self.dim}")
+
+            existing = set(self.get(list(ids))["ids"])
+            keep = []
+            seen = set()
+            for index, identifier in enumerate(ids):
+                if identifier not in existing and identifier not in seen:
+                    seen.add(identifier)
+                    keep.append(index)
+            if not keep:
+                return 0
+
+            vectors = vectors[keep]
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            vectors = (vectors / np.where(norms == 0, 1, norms)).astype(self.dtype)
+
+            first_row = self.count()
+            previous_dim = self.dim
+            embeddings_path = os.path.join(self.path, EMBEDDINGS_FILE)
+            self.manifest["dim"] = int(vectors.shape[1])
+            try:
+                with open(embeddings_path, "ab") as handle:
+                    handle.write(vectors.tobytes())
+                    handle.flush()
+                    os.fsync(handle.fileno())
+
+                self._db.executemany(
+                    "INSERT INTO chunks (row, id, document, metadata) VALUES (?, ?, ?, ?)",
+                    [
+                        (first_row + offset, ids[index], documents[index], json.dumps(metadatas[index]))
+                        for offset, index in enumerate(keep)
+                    ],
+                )
+                self._db.commit()
+
+                self.manifest["count"] = first_row + len(keep)
+                self._write_manifest()
+            except BaseException:
+                # Undo the partial batch so the next one is appended at the right offset
+                self.manifest["count"] = first_row
+                self.manifest["dim"] = previous_dim
+                self._db.rollback()
+                self._db.execute("DELETE FROM chunks WHERE row >= ?", (first_row,))
+                self._db.commit()
+                if os.path.exists(embeddings_path):
+                    with open(embeddings_path, "r+b") as handle:
+                        handle.truncate(first_row * vectors.shape[1] * self.dtype.itemsize)
+                raise
+            self._map()
+            return len(keep)
+
+    def fetch_rows(self, rows):
+        """Return (ids, documents, metadatas) for matrix row numbers, in order"""
+        if len(rows) == 0:
+            return [], [], []
+        rows = [int(row) for row in rows]
+        with self._lock:
+            placeholders = ",".join("?" * len(rows))
+            records = {
+                row: (identifier, document, json.loads(metadata))
+                for row, identifier, document, metadata in self._db.execute(
+                    f"SELECT row, id, document, metadata FROM chunks WHERE row IN ({placeholders})", rows
+                )
+            }
+        ordered = [records[row] for row in rows]
+        return [r[0] for r in ordered], [r[1] for r in ordered], [r[2] for r in ordered]
+
+    def retriever(self, kind="flat", **kwargs):
+        """Return a NumPy retriever over this store ("flat" exact or "ivf")"""
+        retriever_class = IVFRetriever if kind == "ivf" else NumpyRetriever
+        return retriever_class(lambda: self.embeddings, self.fetch_rows, **kwargs)
+
+    def query(self, query_embeddings, n_results=3, include=None):
+        """Exact cosine search (Chroma ``query`` result shape)"""
+        result = {"ids": [], "documents": [], "metadatas": [], "distances": []}
+        for chunks in self._flat.search(query_embeddings, n_results):
+            result["ids"].append([chunk.id for chunk in chunks])
+            result["documents"].append([chunk.document for chunk in chunks])
+            result["metadatas"].append([chunk.metadata for chunk in chunks])
+            result["distances"].append([1.0 - chunk.score for chunk in chunks])
+        return result
+
+    def close(self):
+        with self._lock:
+            self._matrix = None
+            self._db.close()
+
+    def _read_manifest(self):
+        manifest_path = os.path.join(self.path, MANIFEST_FILE)
+        if not os.path.exists(manifest_path):
+            return None
+        with open(manifest_path, "r", encoding="utf-8") as handle:
+            return json.load(handle)
+
+    def _write_manifest(self):
+        manifest_path = os.path.join(self.path, MANIFEST_FILE)
+        temp_path = manifest_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as handle:
+            json.dump(self.manifest, handle, indent=2)
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(temp_path, manifest_path)
+
+    def _recover(self):
+        """Drop rows written after the last manifest update (interrupted batch)"""
+        count = self.count()
+        self._db.execute("DELETE FROM chunks WHERE row >= ?", (count,))
+        self._db.commit()
+
+        embeddings_path = os.path.join(self.path, EMBEDDINGS_FILE)
+        if os.path.exists(embeddings_path):
+            # An index whose first batch never completed has no dimension yet
+            expected = count * self.dim * self.dtype.itemsize if count and self.dim else 0
+            if os.path.getsize(embeddings_path) > expected:
+                with open(embeddings_path, "r+b") as handle:
+                    handle.truncate(expected)
+
+    def _map(self):
+        count = self.count()
+        if count == 0 or not self.dim:
+            self._matrix = None
+            return
+        self._matrix = np.memmap(
+            os.path.join(self.path, EMBEDDINGS_FILE), dtype=self.dtype, mode="r", shape=(count, self.dim)
+        )